@@ -22,6 +22,11 @@ from src.db.models.alerts import AlertConfiguration, Alert
 from src.db.models.changes import PermissionChange
 from src.db.models.cache import UserGroupMapping
 from src.db.models.auth import ServiceAccount, AuthSession
+from src.db.models.folder_cache import FolderPermissionCache, FolderStructureCache
+from src.db.models.descriptor import SecurityDescriptor
+from src.db.models.trustee_access import TrusteeAccess
+from src.db.models.notifications import NotificationOutbox
+from src.db.models.coordination import EventBusMessage, ServiceLease
 from src.db.models.enums import ScanScheduleType, AlertType, AlertSeverity
 
 # Import the database configuration
@@ -0,0 +1,37 @@
+"""add notification outbox
+
+Revision ID: outbox_005
+Revises: trustee_index_004
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'outbox_005'
+down_revision = 'trustee_index_004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Append-only; catch-up reads are range scans on the seq primary key
+    op.create_table('notification_outbox',
+        sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('notification_id', sa.String(length=36), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('severity', sa.String(length=20), nullable=True),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('target_user', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('idx_notification_outbox_created', 'notification_outbox', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_notification_outbox_created', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
@@ -0,0 +1,43 @@
+"""add content-addressed security descriptor table
+
+Revision ID: descriptors_003
+Revises: cache_001
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'descriptors_003'
+down_revision = 'cache_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per distinct ACL; scan results and cache entries reference it by hash
+    op.create_table('security_descriptors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('descriptor', sa.JSON(), nullable=False),
+        sa.Column('ace_count', sa.Integer(), nullable=True),
+        sa.Column('explicit_ace_count', sa.Integer(), nullable=True),
+        sa.Column('inheritance_enabled', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_security_descriptor_hash', 'security_descriptors', ['hash'], unique=True)
+
+    with op.batch_alter_table('folder_permission_cache') as batch_op:
+        batch_op.add_column(sa.Column('descriptor_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_folder_permission_cache_descriptor_hash'), 'folder_permission_cache', ['descriptor_hash'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_folder_permission_cache_descriptor_hash'), table_name='folder_permission_cache')
+    with op.batch_alter_table('folder_permission_cache') as batch_op:
+        batch_op.drop_column('descriptor_hash')
+
+    op.drop_index('idx_security_descriptor_hash', table_name='security_descriptors')
+    op.drop_table('security_descriptors')
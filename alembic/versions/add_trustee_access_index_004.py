@@ -0,0 +1,48 @@
+"""add trustee to folder reverse access index
+
+Revision ID: trustee_index_004
+Revises: descriptors_003
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'trustee_index_004'
+down_revision = 'descriptors_003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per (trustee, folder); rows of a folder are replaced when it is rescanned
+    op.create_table('trustee_access_index',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('trustee_sid', sa.String(length=255), nullable=False),
+        sa.Column('trustee_name', sa.String(length=255), nullable=True),
+        sa.Column('trustee_domain', sa.String(length=255), nullable=True),
+        sa.Column('folder_path', sa.String(length=500), nullable=False),
+        sa.Column('explicit_allow_mask', sa.BigInteger(), nullable=True),
+        sa.Column('explicit_deny_mask', sa.BigInteger(), nullable=True),
+        sa.Column('inherited_allow_mask', sa.BigInteger(), nullable=True),
+        sa.Column('inherited_deny_mask', sa.BigInteger(), nullable=True),
+        sa.Column('access_mask', sa.BigInteger(), nullable=True),
+        sa.Column('permissions', sa.JSON(), nullable=True),
+        sa.Column('inherited_only', sa.Boolean(), nullable=True),
+        sa.Column('descriptor_hash', sa.String(length=64), nullable=True),
+        sa.Column('scan_job_id', sa.Integer(), nullable=True),
+        sa.Column('scan_result_id', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_trustee_access_sid_path', 'trustee_access_index', ['trustee_sid', 'folder_path'], unique=True)
+    op.create_index('idx_trustee_access_path', 'trustee_access_index', ['folder_path'], unique=False)
+    op.create_index('idx_trustee_access_name', 'trustee_access_index', ['trustee_name', 'trustee_domain'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_trustee_access_name', table_name='trustee_access_index')
+    op.drop_index('idx_trustee_access_path', table_name='trustee_access_index')
+    op.drop_index('idx_trustee_access_sid_path', table_name='trustee_access_index')
+    op.drop_table('trustee_access_index')
@@ -0,0 +1,41 @@
+"""add event bus and service lease tables for multi-worker coordination
+
+Revision ID: coordination_006
+Revises: outbox_005
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'coordination_006'
+down_revision = 'outbox_005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('event_bus_messages',
+        sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('channel', sa.String(length=100), nullable=False),
+        sa.Column('origin', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('idx_event_bus_created', 'event_bus_messages', ['created_at'], unique=False)
+
+    op.create_table('service_leases',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('holder', sa.String(length=100), nullable=True),
+        sa.Column('acquired_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('service_leases')
+    op.drop_index('idx_event_bus_created', table_name='event_bus_messages')
+    op.drop_table('event_bus_messages')
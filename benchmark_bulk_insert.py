@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark scan result persistence against SQLite.
+
+Compares the previous per-object ORM path (one db.add per ScanResult and
+AccessEntry, flush per result) with the batched Core insert path used by
+ScanResultWriter, and reports rows/sec for both.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from src.db.models.base import Base
+from src.db.models import ScanJob, ScanResult, AccessEntry
+from src.db.scan_writer import ScanResultWriter
+
+
+def make_records(folder_count: int, aces_per_folder: int):
+    """Yield synthetic per-folder records in the streaming scan format."""
+    for i in range(folder_count):
+        aces = [
+            {
+                "trustee": {
+                    "name": f"user{(i + a) % 200}",
+                    "domain": "CORP",
+                    "sid": f"S-1-5-21-1000-{(i + a) % 200}"
+                },
+                "type": "Allow",
+                "inherited": a > 0,
+                "is_system": False,
+                "permissions": {"Basic": ["Read", "Write"]}
+            }
+            for a in range(aces_per_folder)
+        ]
+        yield {
+            "path": f"\\\\server\\share\\folder_{i:06d}",
+            "parent": None,
+            "depth": 1,
+            "success": True,
+            "scan_time": datetime.now().isoformat(),
+            "permissions": {"owner": {"name": "admin"}, "aces": aces}
+        }
+
+
+def orm_per_row(db, job_id: int, records) -> None:
+    """The previous persistence path: one ORM object per row."""
+    for record in records:
+        permissions = record["permissions"]
+        result = ScanResult(
+            job_id=job_id,
+            path=record["path"],
+            scan_time=datetime.utcnow(),
+            owner=permissions.get("owner"),
+            permissions=record,
+            success=True
+        )
+        db.add(result)
+        db.flush()
+        for ace in permissions["aces"]:
+            trustee = ace["trustee"]
+            db.add(AccessEntry(
+                scan_result_id=result.id,
+                trustee_name=trustee["name"],
+                trustee_domain=trustee["domain"],
+                trustee_sid=trustee["sid"],
+                access_type=ace["type"],
+                inherited=ace["inherited"],
+                permissions=ace["permissions"]
+            ))
+        db.commit()
+
+
+def bulk_insert(db, job_id: int, records, batch_size: int) -> None:
+    ScanResultWriter(db, job_id, batch_size=batch_size).write_all(records)
+
+
+def run(label: str, url: str, writer, folder_count: int, aces_per_folder: int) -> float:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        job = ScanJob(scan_type="benchmark", status="running")
+        db.add(job)
+        db.commit()
+
+        start = time.perf_counter()
+        writer(db, job.id, make_records(folder_count, aces_per_folder))
+        elapsed = time.perf_counter() - start
+
+        rows = db.query(func.count(ScanResult.id)).scalar() + \
+            db.query(func.count(AccessEntry.id)).scalar()
+        print(f"{label:>16}: {rows} rows in {elapsed:7.2f}s  {rows / elapsed:10.0f} rows/s")
+        return rows / elapsed
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--folders", type=int, default=5000)
+    parser.add_argument("--aces", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--memory", action="store_true",
+                        help="Use an in-memory database instead of a temporary file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="shareguard_bench_") as tmp:
+        def url(name: str) -> str:
+            return "sqlite://" if args.memory else f"sqlite:///{os.path.join(tmp, name)}"
+
+        print(f"{args.folders} folders x {args.aces} ACEs, batch size {args.batch_size}")
+        print("-" * 60)
+        before = run("orm per-row", url("orm.db"), orm_per_row, args.folders, args.aces)
+        after = run(
+            "core bulk", url("bulk.db"),
+            lambda db, job_id, records: bulk_insert(db, job_id, records, args.batch_size),
+            args.folders, args.aces
+        )
+        print(f"speedup {after / before:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel nested-group expansion against the serial depth-first trace.
+
+Builds a synthetic org chart, serves group members from it with a simulated
+directory round-trip latency, expands a set of groups (as for a user who is
+a member of all of them) both ways and checks that the trees are identical.
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.scanner.group_expander import GROUP_TYPES, ParallelGroupExpander
+from src.scanner.membership_index import generate_org_chart
+
+
+class FakeDirectory:
+    """Group members from a static org chart, with a fixed delay per query."""
+
+    def __init__(self, backend, latency: float):
+        self.latency = latency
+        self.queries = 0
+        self._lock = threading.Lock()
+        principals = backend.principals
+        self.accounts = {sid: self._account(p) for sid, p in principals.items()}
+        self.members = {}
+        for member, group in backend.memberships:
+            group_key = self.accounts[group]['full_name']
+            self.members.setdefault(group_key, []).append(self.accounts[member])
+
+    @staticmethod
+    def _account(principal):
+        return {
+            'name': principal.name,
+            'domain': principal.domain,
+            'sid': principal.sid,
+            'full_name': principal.full_name,
+            'type': principal.type,
+            'is_system': False
+        }
+
+    def fetch_members(self, group_name, domain):
+        with self._lock:
+            self.queries += 1
+        time.sleep(self.latency)
+        return self.members.get(f"{domain}\\{group_name}", [])
+
+
+def serial_trace(fetch, group, max_depth, visited=None, current_depth=0):
+    """Reference: the depth-first trace GroupResolver used before parallel expansion."""
+    if visited is None:
+        visited = set()
+    if current_depth >= max_depth:
+        return None
+    group_key = group['full_name']
+    if group_key in visited:
+        return None
+    visited.add(group_key)
+    try:
+        path = {'group': group, 'member_groups': [], 'nested_level': current_depth, 'members': []}
+        path['members'] = fetch(group['name'], group['domain'])
+        for member in path['members']:
+            if member['type'] not in GROUP_TYPES:
+                continue
+            nested_path = serial_trace(fetch, member, max_depth, visited, current_depth + 1)
+            if nested_path:
+                path['member_groups'].append(nested_path)
+                path['nested_level'] = max(path['nested_level'], nested_path['nested_level'] + 1)
+        return path
+    finally:
+        visited.discard(group_key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--groups", type=int, default=300, help="Groups to expand")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated directory round trip")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--max-depth", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    backend = generate_org_chart(users=args.users, project_groups=args.projects, seed=args.seed)
+    directory = FakeDirectory(backend, args.latency_ms / 1000)
+    groups = [a for a in directory.accounts.values() if a['type'] == 'Group']
+    roots = random.Random(args.seed).sample(groups, min(args.groups, len(groups)))
+    print(f"Directory: {len(directory.accounts)} principals, expanding {len(roots)} groups "
+          f"at {args.latency_ms:.0f}ms per query")
+
+    # A per-call memo stands in for a warm-as-you-go resolver cache
+    memo = {}
+
+    def cached_fetch(name, domain):
+        key = f"{domain}\\{name}"
+        if key not in memo:
+            memo[key] = directory.fetch_members(name, domain)
+        return memo[key]
+
+    started = time.perf_counter()
+    expected = [serial_trace(cached_fetch, group, args.max_depth) for group in roots]
+    serial_seconds = time.perf_counter() - started
+    serial_queries, directory.queries = directory.queries, 0
+
+    expander = ParallelGroupExpander(directory.fetch_members, max_workers=args.workers,
+                                     max_depth=args.max_depth)
+    started = time.perf_counter()
+    actual = expander.expand(roots)
+    parallel_seconds = time.perf_counter() - started
+    expander.shutdown()
+
+    if actual != expected:
+        print("MISMATCH between serial and parallel trees")
+        return 1
+    print("Trees identical")
+    print(f"Serial:   {serial_seconds:7.2f}s, {serial_queries} queries")
+    print(f"Parallel: {parallel_seconds:7.2f}s, {directory.queries} queries, "
+          f"{expander.last_stats['levels']} levels, {args.workers} workers")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar health rule evaluation against the per-folder checks, end to end.
+
+Generates synthetic folders (1M ACEs by default) as the scan results the
+analysis pipeline reads, then times both paths over all of them in
+pipeline-sized chunks: the per-folder checks, and the rule engine's
+columnar path including the table build and issue building. Both must
+emit the same issues. With --descriptors, folders share that many ACE
+lists, as folders hydrated from deduplicated security descriptors do.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from src.core.ace_table import AceTable, TYPE_ALLOW, TYPE_DENY, TYPE_OTHER
+from src.core.health_analyzer import HealthAnalyzer, HealthAnalysisConfig
+from src.core.health_rules import RuleStats
+
+TYPE_NAMES = {TYPE_ALLOW: 'allow', TYPE_DENY: 'deny', TYPE_OTHER: 'Allow'}
+
+
+def synthetic_trustees(count: int, rng) -> list:
+    """A trustee pool mixing groups, direct users, orphaned SIDs, system and high-privilege accounts."""
+    trustees = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.05:
+            trustees.append({'sid': f'S-1-5-21-9-{i}', 'name': f'S-1-5-21-9-{i}', 'domain': '', 'type': 'unknown'})
+        elif kind < 0.25:
+            trustees.append({'sid': f'S-1-5-21-1-{i}', 'name': f'user{i}.corp', 'domain': 'CORP', 'type': 'user'})
+        elif kind < 0.27:
+            name = ('Domain Admins', 'Everyone', 'Administrators')[i % 3]
+            trustees.append({'sid': f'S-1-5-21-2-{i}', 'name': name, 'domain': 'CORP', 'type': 'group'})
+        elif kind < 0.30:
+            trustees.append({'sid': 'S-1-5-18', 'name': 'SYSTEM', 'domain': 'NT AUTHORITY',
+                             'type': 'user', 'is_system': True})
+        else:
+            trustees.append({'sid': f'S-1-5-21-3-{i}', 'name': f'grp{i}_staff', 'domain': 'CORP', 'type': 'group'})
+    return trustees
+
+
+def synthetic_table(ace_count: int, trustees: list, mean_aces: int, rng) -> AceTable:
+    """Columns for about ace_count ACEs spread over folders with a long-tailed ACE count."""
+    counts = rng.geometric(1.0 / mean_aces, size=ace_count // mean_aces + 1).astype(np.int64)
+    counts = counts[np.cumsum(counts) <= ace_count]
+    paths = [f'\\\\server\\share\\folder{i}' for i in range(len(counts))]
+    total = int(counts.sum())
+
+    path_id = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    order = (np.arange(total) - np.repeat(starts, counts)).astype(np.int32)
+    trustee_id = rng.integers(0, len(trustees), size=total, dtype=np.int32)
+    sid_index = {}
+    trustee_sid = np.array([sid_index.setdefault(t['sid'], len(sid_index)) for t in trustees], dtype=np.int32)
+    ace_type = rng.choice(np.array([TYPE_ALLOW, TYPE_DENY, TYPE_OTHER], dtype=np.int8),
+                          size=total, p=[0.8, 0.15, 0.05])
+
+    return AceTable(
+        paths, list(rng.random(len(counts)) < 0.9),
+        path_id=path_id,
+        sid_id=trustee_sid[trustee_id],
+        trustee_id=trustee_id,
+        ace_type=ace_type,
+        mask=rng.integers(0, 2 ** 31, size=total, dtype=np.int64),
+        inherited=rng.random(total) < 0.6,
+        order=order,
+        trustees=trustees
+    )
+
+
+def as_folders(table: AceTable, path_count: int) -> list:
+    """The first path_count folders of a table as scan results, as the per-folder checks read them."""
+    folders = []
+    for path_id in range(path_count):
+        rows = range(int(table.starts[path_id]), int(table.starts[path_id + 1]))
+        aces = [{
+            'trustee': table.trustees[table.trustee_id[i]],
+            'type': TYPE_NAMES[int(table.type[i])],
+            'inherited': bool(table.inherited[i]),
+            'access_mask': int(table.mask[i])
+        } for i in rows]
+        folders.append((table.paths[path_id], {
+            'permissions': {'aces': aces, 'inheritance_enabled': bool(table.inheritance[path_id])}
+        }))
+    return folders
+
+
+def share_descriptors(folders: list, descriptors: int) -> list:
+    """Folders whose permissions come from one of the first `descriptors` folders' ACE lists."""
+    return [(path, {'permissions': folders[i % descriptors][1]['permissions']})
+            for i, (path, _) in enumerate(folders)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--aces", type=int, default=1_000_000)
+    parser.add_argument("--mean-aces", type=int, default=12)
+    parser.add_argument("--trustees", type=int, default=5000)
+    parser.add_argument("--descriptors", type=int, default=0,
+                        help="Distinct ACE lists shared by the folders (0: every folder has its own)")
+    parser.add_argument("--chunk-size", type=int, default=HealthAnalysisConfig.chunk_size)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    trustees = synthetic_trustees(args.trustees, rng)
+    table = synthetic_table(args.aces, trustees, args.mean_aces, rng)
+    folders = as_folders(table, len(table.paths))
+    if args.descriptors:
+        folders = share_descriptors(folders, args.descriptors)
+    ace_count = sum(len(scan_result['permissions']['aces']) for _, scan_result in folders)
+    chunks = [folders[i:i + args.chunk_size] for i in range(0, len(folders), args.chunk_size)]
+    print(f"Synthetic folders: {ace_count:,} ACEs over {len(folders):,} folders, {len(trustees)} trustees, "
+          f"{args.descriptors or 'no'} shared descriptors, chunks of {args.chunk_size}")
+    print("-" * 60)
+
+    # Separate analyzers, so neither path starts with the other's rule caches
+    analyzer = HealthAnalyzer(HealthAnalysisConfig(workers=1))
+    started = time.perf_counter()
+    baseline = []
+    for path, scan_result in folders:
+        baseline.extend(analyzer._filter_significant_issues(analyzer._analyze_path_results(path, scan_result, 0)))
+    baseline_elapsed = time.perf_counter() - started
+
+    analyzer = HealthAnalyzer(HealthAnalysisConfig(workers=1))
+    stats = RuleStats()
+    started = time.perf_counter()
+    vectorized = []
+    for chunk in chunks:
+        vectorized.extend(analyzer.rule_engine.analyze_table(chunk, 0, stats))
+    vectorized_elapsed = time.perf_counter() - started
+
+    rules_elapsed = sum(entry['seconds'] for entry in stats.rules.values())
+    print(f"{'per-folder':>12}: {baseline_elapsed:8.2f}s  ({ace_count / baseline_elapsed:,.0f} ACEs/sec)")
+    print(f"{'vectorized':>12}: {vectorized_elapsed:8.2f}s  ({ace_count / vectorized_elapsed:,.0f} ACEs/sec, "
+          f"{baseline_elapsed / vectorized_elapsed:.1f}x)")
+    print(f"{'':>12}  table build and classify {stats.table_seconds:.2f}s, rules and issue building "
+          f"{rules_elapsed:.2f}s, other {vectorized_elapsed - stats.table_seconds - rules_elapsed:.2f}s")
+    for name, entry in stats.as_dict()['rules'].items():
+        print(f"{name:>22}: {entry['seconds']:.3f}s, {entry['issues']:,} issues")
+
+    expected = Counter(issue['issue_type'].value for issue in baseline)
+    actual = Counter(issue['issue_type'].value for issue in vectorized)
+    if expected != actual:
+        print(f"MISMATCH: per-folder {dict(expected)}, vectorized {dict(actual)}")
+        sys.exit(1)
+    print(f"Issues match the per-folder checks: {sum(expected.values()):,} across {len(expected)} rules")
+
+
+if __name__ == "__main__":
+    main()
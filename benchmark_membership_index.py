@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark the membership closure index against per-query nested expansion.
+
+Generates a synthetic org chart, builds the MembershipIndex, verifies it
+against a breadth-first expansion of the same memberships and times
+"is user X in any of these groups" both ways.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.scanner.membership_index import MembershipIndex, generate_org_chart
+
+
+def expand_groups(parents, sid):
+    """Reference answer: walk the nesting graph from sid."""
+    seen = set()
+    queue = deque(parents.get(sid, ()))
+    while queue:
+        group = queue.popleft()
+        if group in seen:
+            continue
+        seen.add(group)
+        queue.extend(parents.get(group, ()))
+    return seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--teams", type=int, default=10, help="Teams per department")
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--groups-per-query", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    backend = generate_org_chart(
+        users=args.users,
+        departments=args.departments,
+        teams_per_department=args.teams,
+        project_groups=args.projects,
+        seed=args.seed
+    )
+    print(f"Directory: {len(backend.principals)} principals, {len(backend.memberships)} memberships")
+
+    index = MembershipIndex.build(backend)
+    print(f"Index build: {index.build_seconds:.2f}s")
+
+    parents = {}
+    for member, group in backend.memberships:
+        parents.setdefault(member, []).append(group)
+
+    rng = random.Random(args.seed)
+    principals = list(backend.principals.values())
+    users = [p.sid for p in principals if not p.is_group]
+    groups = [p.sid for p in principals if p.is_group]
+
+    for sid in rng.sample(users, min(500, len(users))) + groups[:200]:
+        expected = expand_groups(parents, sid)
+        if index.groups_of(sid) != expected:
+            print(f"MISMATCH for {sid}")
+            return 1
+    print("Closure matches breadth-first expansion")
+
+    queries = [
+        (rng.choice(users), rng.sample(groups, args.groups_per_query))
+        for _ in range(args.queries)
+    ]
+
+    started = time.perf_counter()
+    naive_hits = sum(
+        1 for sid, wanted in queries if expand_groups(parents, sid) & set(wanted)
+    )
+    naive_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index_hits = sum(1 for sid, wanted in queries if index.is_member_of_any(sid, wanted))
+    index_seconds = time.perf_counter() - started
+
+    masks = [(sid, index.group_mask(wanted)) for sid, wanted in queries]
+    started = time.perf_counter()
+    mask_hits = sum(1 for sid, mask in masks if index.is_member_of_mask(sid, mask))
+    mask_seconds = time.perf_counter() - started
+
+    assert naive_hits == index_hits == mask_hits
+    per_query = lambda seconds: seconds / len(queries) * 1e6
+    print(f"Expansion per query:        {per_query(naive_seconds):8.2f} us")
+    print(f"Index per query:            {per_query(index_seconds):8.2f} us")
+    print(f"Index, precomputed mask:    {per_query(mask_seconds):8.2f} us")
+
+    started = time.perf_counter()
+    members = index.members_of(groups[0])
+    print(f"Reverse index build + members_of(All Staff): {time.perf_counter() - started:.2f}s, "
+          f"{len(members)} members")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark WebSocket notification fan-out with 1,000 fake sockets.
+
+Compares a per-connection loop (evaluate filters, json.dumps, await send
+for each connection in turn) with ConnectionManager.broadcast, which
+serializes once, matches connections through the subscription index and
+queues the message for each connection's writer task. Recipients of both
+are checked to be identical. With --slow-sockets some clients stall on
+every send, to show that the others are still served at full speed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('USE_SQLITE', 'true')
+
+from src.services.notification_fanout import SEVERITY_LEVELS, message_path, path_components
+from src.services.notification_service import ConnectionManager
+
+# One INFO line per connect would drown the results
+logging.getLogger('notification_service').setLevel(logging.WARNING)
+
+TYPES = ["permission_change", "group_membership_change", "alert_triggered", "system_status"]
+SEVERITIES = list(SEVERITY_LEVELS)
+
+
+class FakeWebSocket:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.received += 1
+
+
+def naive_matches(filters, message) -> bool:
+    """Per-connection filter evaluation with the same semantics as the index."""
+    if filters.get('types') and message.get('type') not in filters['types']:
+        return False
+    min_level = SEVERITY_LEVELS.get(filters.get('min_severity'), 1)
+    if SEVERITY_LEVELS.get(message.get('severity'), 1) < min_level:
+        return False
+    if filters.get('paths'):
+        parts = path_components(message_path(message) or '')
+        if not any(parts[:len(prefix)] == prefix
+                   for prefix in (path_components(path) for path in filters['paths'])):
+            return False
+    return True
+
+
+def random_filters(rng, shares):
+    kind = rng.random()
+    if kind < 1 / 3:
+        return None
+    if kind < 2 / 3:
+        return {'types': rng.sample(TYPES, 2)}
+    share = rng.choice(shares)
+    return {'paths': [share + '\\' + rng.choice(['Finance', 'HR', 'IT', 'Legal'])],
+            'min_severity': rng.choice(SEVERITIES)}
+
+
+def random_message(rng, shares, index):
+    path = f"{rng.choice(shares)}\\{rng.choice(['Finance', 'HR', 'IT', 'Legal'])}\\Folder{index % 50}"
+    return {
+        'id': str(index),
+        'type': rng.choice(TYPES),
+        'title': 'Permission Change Detected',
+        'message': f'Access permissions changed on {path}',
+        'severity': rng.choice(SEVERITIES),
+        'timestamp': '2026-01-01T00:00:00',
+        'data': {
+            'path': path,
+            'previous_state': {'aces': [{'trustee': f'CORP\\user{i}', 'permissions': ['Read']} for i in range(20)]},
+            'current_state': {'aces': [{'trustee': f'CORP\\user{i}', 'permissions': ['Modify']} for i in range(20)]}
+        },
+        'read': False
+    }
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    shares = [f"\\\\fs{n:02d}\\share" for n in range(10)]
+    manager = ConnectionManager()
+    sockets = {}
+    for n in range(args.sockets):
+        socket = FakeWebSocket(args.send_latency_ms / 1000)
+        await manager.connect(socket, f"conn-{n}", filters=random_filters(rng, shares))
+        sockets[f"conn-{n}"] = socket
+    messages = [random_message(rng, shares, n) for n in range(args.messages)]
+
+    slow = set(rng.sample(sorted(sockets), args.slow_sockets))
+    for connection_id in slow:
+        sockets[connection_id].latency = 5.0
+    fast_ids = [connection_id for connection_id in sockets if connection_id not in slow]
+    fast = [sockets[connection_id] for connection_id in fast_ids]
+
+    for message in messages[:20]:
+        expected = {cid for cid in sockets if naive_matches(manager.connection_filters[cid], message)}
+        if manager.subscriptions.match(message) != expected:
+            print(f"MISMATCH for message {message['id']}")
+            return 1
+    expected_fast = sum(
+        1 for message in messages for cid in sockets
+        if cid not in slow and naive_matches(manager.connection_filters[cid], message)
+    )
+
+    naive_seconds = None
+    if not slow:
+        started = time.perf_counter()
+        for message in messages:
+            for connection_id, socket in sockets.items():
+                if naive_matches(manager.connection_filters.get(connection_id, {}), message):
+                    await socket.send_text(json.dumps(message))
+        naive_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for message in messages:
+        await manager.broadcast(message)
+    # Wait for the writer tasks to deliver everything to the healthy clients
+    while any(len(manager.send_queues[cid]) for cid in fast_ids if cid in manager.send_queues):
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(args.send_latency_ms / 1000)
+    indexed_seconds = time.perf_counter() - started
+
+    per_message = lambda seconds: seconds / len(messages) * 1000
+    print(f"{args.sockets} sockets ({len(slow)} stalled), {args.messages} messages, "
+          f"{expected_fast / len(messages):.0f} healthy recipients per message, {args.send_latency_ms}ms per send")
+    if naive_seconds is not None:
+        print(f"Per-connection loop: {per_message(naive_seconds):8.2f} ms per message")
+    print(f"Indexed fan-out:     {per_message(indexed_seconds):8.2f} ms per message")
+    queues = manager.get_send_queue_stats()
+    print(f"Send queues: max depth {queues['max_depth']}, dropped {queues['dropped']}, "
+          f"coalesced {queues['coalesced']}, lagging {queues['lagging_connections']}")
+    for connection_id in list(manager.active_connections):
+        await manager.disconnect(connection_id)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sockets", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--send-latency-ms", type=float, default=0.0,
+                        help="Simulated time each send_text awaits")
+    parser.add_argument("--slow-sockets", type=int, default=0,
+                        help="Clients whose every send takes 5s")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark the parallel tree scanner against the recursive scan on Linux.
+
+Builds a synthetic folder tree, serves security descriptors from a synthetic
+ACL source with simulated lookup latency, and checks that the parallel result
+matches the recursive ShareGuardScanner.scan_path algorithm.
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.parallel_scanner import ParallelTreeScanner
+
+
+class SyntheticAclReader:
+    """Deterministic stand-in for PermissionScanner.get_folder_permissions."""
+
+    def __init__(self, latency_ms: float = 2.0):
+        self.latency = latency_ms / 1000.0
+
+    def __call__(self, folder_path: str) -> dict:
+        # Sleeping releases the GIL the same way GetFileSecurity/LookupAccountSid do
+        if self.latency:
+            time.sleep(self.latency)
+
+        seed = int(hashlib.md5(folder_path.encode()).hexdigest(), 16)
+        ace_count = 3 + seed % 5
+        aces = []
+        for i in range(ace_count):
+            is_system = i < 2
+            aces.append({
+                "trustee": {
+                    "name": f"user{(seed >> i) % 50}",
+                    "domain": "BUILTIN" if is_system else "CORP",
+                    "sid": f"S-1-5-21-1000-{(seed >> i) % 50}",
+                    "full_name": f"CORP\\user{(seed >> i) % 50}",
+                    "is_system": is_system
+                },
+                "type": "Allow",
+                "inherited": i > 0,
+                "is_system": is_system,
+                "permissions": {"Basic": ["Read"]}
+            })
+
+        return {
+            "path": folder_path,
+            "inheritance_enabled": seed % 7 != 0,
+            "aces": aces,
+            "success": True,
+            "metadata": {
+                "total_aces": len(aces),
+                "system_aces": sum(1 for ace in aces if ace["is_system"]),
+                "non_system_aces": sum(1 for ace in aces if not ace["is_system"])
+            }
+        }
+
+
+def recursive_scan(path: str, acl_reader, depth_limit: int) -> dict:
+    """Reference copy of the recursive ShareGuardScanner.scan_path algorithm."""
+    folder_path = Path(path)
+    base_results = acl_reader(str(folder_path))
+    results = {
+        "success": True,
+        "scan_time": datetime.now().isoformat(),
+        "folder_info": {
+            "name": folder_path.name,
+            "path": str(folder_path),
+            "parent": str(folder_path.parent),
+            "is_root": folder_path.parent == folder_path
+        },
+        "permissions": base_results,
+        "subfolders": [],
+        "statistics": {
+            "total_folders": 1,
+            "processed_folders": 1,
+            "error_count": 0,
+            "system_accounts": base_results.get("metadata", {}).get("system_aces", 0),
+            "non_system_accounts": base_results.get("metadata", {}).get("non_system_aces", 0)
+        }
+    }
+    if depth_limit > 0:
+        for subfolder in folder_path.iterdir():
+            if subfolder.is_dir():
+                child = recursive_scan(str(subfolder), acl_reader, depth_limit - 1)
+                results["subfolders"].append(child)
+                stats = results["statistics"]
+                for key in ("total_folders", "processed_folders", "error_count",
+                            "system_accounts", "non_system_accounts"):
+                    stats[key] += child["statistics"][key]
+    return results
+
+
+def strip_times(node: dict) -> dict:
+    """Drop wall-clock fields so two scans of the same tree can be compared."""
+    node = dict(node)
+    node.pop("scan_time", None)
+    node["subfolders"] = [strip_times(child) for child in node.get("subfolders", [])]
+    return node
+
+
+def build_tree(root: str, fanout: int, depth: int) -> int:
+    """Create a synthetic folder tree and return the number of folders."""
+    count = 1
+    if depth == 0:
+        return count
+    for i in range(fanout):
+        child = os.path.join(root, f"folder_{i:03d}")
+        os.mkdir(child)
+        count += build_tree(child, fanout, depth - 1)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="shareguard_bench_")
+    try:
+        folder_count = build_tree(root, args.fanout, args.depth)
+        acl_reader = SyntheticAclReader(args.latency_ms)
+        print(f"Synthetic tree: {folder_count} folders, {args.latency_ms}ms per ACL read")
+        print("-" * 60)
+
+        start = time.perf_counter()
+        reference = recursive_scan(root, acl_reader, args.depth)
+        recursive_elapsed = time.perf_counter() - start
+        print(f"{'recursive':>12}: {recursive_elapsed:8.2f}s  "
+              f"{folder_count / recursive_elapsed:10.0f} folders/s")
+
+        expected = strip_times(reference)
+        for workers in args.workers:
+            tree_scanner = ParallelTreeScanner(acl_reader, max_workers=workers)
+            start = time.perf_counter()
+            result = tree_scanner.scan_tree(root, args.depth)
+            elapsed = time.perf_counter() - start
+
+            identical = strip_times(result) == expected
+            print(f"{workers:>4} workers: {elapsed:8.2f}s  "
+                  f"{folder_count / elapsed:10.0f} folders/s  "
+                  f"speedup {recursive_elapsed / elapsed:5.1f}x  "
+                  f"identical={identical}")
+            if not identical:
+                sys.exit(1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,18 @@
 import os
 from typing import Dict, Any
 
+# Local state files (SID cache) live here rather than in the working directory,
+# so every API worker and service process on the host finds the same files
+APP_DATA_DIR = os.getenv('SHAREGUARD_DATA_DIR', os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # Scanner settings
 SCANNER_CONFIG = {
     "max_depth": 5,            
     "batch_size": 1000,        
+    "scan_workers": 8,         # Parallel ACL reader threads (1 = recursive scan)
+    "sid_batch_folders": 32,   # Folders per ACL read in the parallel scan; their SIDs are resolved together
+    "dedup_descriptors": True, # Store each distinct ACL once in security_descriptors
+    "maintain_trustee_index": True,  # Keep trustee_access_index in sync as results are persisted
     "cache_timeout": 300,      
     "excluded_paths": [        
         "C:\\Windows\\",
@@ -15,6 +23,82 @@ SCANNER_CONFIG = {
     "require_approved_targets": False
 }
 
+# SID resolution cache settings (shared by all API workers on the host)
+SID_CACHE_CONFIG = {
+    "path": os.getenv('SID_CACHE_PATH', os.path.join(APP_DATA_DIR, 'cache', 'sid_cache.db')),
+    "max_entries": int(os.getenv('SID_CACHE_MAX_ENTRIES', '100000')),
+    "evict_interval": 1000,        # Writes between size checks of the shared store
+    "memory_entries": 10000,       # Per-process in-memory front cache
+    "ttl_seconds": 86400,          # Resolved SIDs
+    "negative_ttl_seconds": 900,   # SIDs that could not be resolved
+    "busy_timeout_seconds": 5
+}
+
+# GroupResolver directory lookups: cache (per process) and query concurrency
+GROUP_CACHE_CONFIG = {
+    "max_entries": int(os.getenv('GROUP_CACHE_MAX_ENTRIES', '10000')),  # Per cache type
+    "ttl_seconds": 3600,
+    "stale_seconds": 600,          # Serve expired entries this long while refreshing in the background
+    "refresh_workers": 2,
+    "directory_workers": 8,        # Concurrent member lookups when expanding nested groups
+    "membership_index_interval_seconds": 3600  # Rebuild of the nested membership index on every worker (0: startup and group changes only)
+}
+
+# Permission change monitoring settings
+MONITOR_CONFIG = {
+    "event_source": os.getenv('MONITOR_EVENT_SOURCE', 'auto'),  # auto, win32, inotify, memory, none
+    "poll_interval_seconds": 60,          # Full recheck interval when no event source is available
+    "safety_poll_interval_seconds": 900,  # Full recheck interval as a safety net behind events
+    "debounce_seconds": 2.0,              # Coalesce bursts of events before rechecking
+    "executor_workers": int(os.getenv('MONITOR_EXECUTOR_WORKERS', '4')),  # Threads for ACL reads and DB work
+    "per_root_concurrency": 2,            # Concurrent rechecks within one monitored tree
+    "loop_lag_interval_seconds": 0.5,     # Sampling interval for the event loop lag metric
+    "min_interval_seconds": 15,           # Fastest per-path polling for paths that change often
+    "max_interval_seconds": 1800,         # Slowest per-path polling for quiet paths
+    "checks_per_second": 10,              # Global budget of scheduled path checks
+    "cache_cleanup_interval_seconds": 3600,
+    "track_group_membership": True,       # Run GroupMembershipTracker alongside the change monitor
+    # Interval multipliers by ScanTarget.sensitivity_level; is_sensitive without a level counts as high
+    "sensitivity_interval_factors": {"critical": 0.1, "high": 0.25, "medium": 0.5, "low": 1.0}
+}
+
+# Real-time notification delivery settings
+NOTIFICATION_CONFIG = {
+    "queue_size": 10000,                  # Notifications waiting to be fanned out
+    "enqueue_timeout_seconds": 5.0,       # Producers wait this long for queue space, then persist without live delivery
+    "send_queue_size": 256,               # Outbound messages buffered per WebSocket connection
+    "overflow_policy": "coalesce",        # drop_oldest, drop_newest or coalesce (replace older message for the same type and path)
+    "send_timeout_seconds": 10,           # A single send taking longer than this disconnects the client
+    "max_lag_seconds": 30,                # Disconnect clients whose send queue stays full this long
+    "coalesce_window_seconds": 2.0,       # Collect permission changes this long before alerting (0 disables)
+    "coalesce_max_batch": 500,            # Flush early once this many changes are pending
+    "coalesce_min_batch": 3,              # Smaller groups are still notified folder by folder
+    "batch_sample_paths": 20,             # Paths listed in a batch summary
+    "outbox_batch_size": 100,             # Notifications persisted to the outbox per transaction
+    "outbox_retention_days": 7,           # Outbox entries older than this are compacted away
+    "outbox_max_entries": 100000,         # ...as is everything but the newest this many
+    "outbox_compact_interval_seconds": 3600,
+    "outbox_gap_timeout_seconds": 10,     # Replays wait this long for a skipped seq (another worker's append not yet committed)
+    "replay_batch_size": 200,             # Missed notifications per replay_batch message on resume
+    "replay_max": 5000                    # Beyond this a resuming client is told to reload instead
+}
+
+# Coordination between API worker processes
+CLUSTER_CONFIG = {
+    "event_bus": os.getenv('SHAREGUARD_EVENT_BUS', 'auto'),  # auto, memory or database (auto: database when API_CONFIG workers > 1)
+    "bus_poll_interval_seconds": 0.25,    # How often each worker checks for events from the others
+    "bus_batch_size": 500,                # Events read per poll
+    "bus_retention_seconds": 3600,        # Bus rows are pruned after this
+    "bus_gap_timeout_seconds": 10,        # How long a skipped seq is waited for (uncommitted concurrent insert)
+    "leader_lease_seconds": 30,           # A worker that stops renewing loses the monitor role after this
+    "leader_renew_seconds": 10
+}
+
+# Health scoring settings
+HEALTH_CONFIG = {
+    "incremental_interval_seconds": int(os.getenv('HEALTH_INCREMENTAL_INTERVAL', '300'))  # Re-check changed folders this often on the leader (0 disables)
+}
+
 # API settings
 API_CONFIG = {
     "host": "0.0.0.0",
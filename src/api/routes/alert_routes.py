@@ -15,6 +15,8 @@ from src.db.models.scan import ScanJob, ScanTarget
 from src.db.models.enums import AlertType, AlertSeverity
 from src.services.notification_service import notification_service
 from src.services.change_monitor import change_monitor
+from src.services.event_bus import event_bus
+from src.services.leader_election import monitor_leader, MONITOR_CONTROL_CHANNEL
 # from src.services.group_monitor import GroupMembershipTracker
 from src.api.middleware.auth import get_current_user, get_current_service_account
 from src.utils.logger import setup_logger
@@ -533,6 +535,16 @@ async def start_monitoring(
             paths = [target.path for target in scan_targets if target.path and os.path.exists(target.path)]
             logger.info(f"Auto-detected scan target paths: {paths}")
         
+        if not monitor_leader.is_leader:
+            # Another worker runs the monitors; hand the request to it
+            await event_bus.publish(MONITOR_CONTROL_CHANNEL, {'action': 'start', 'paths': paths})
+            logger.info(f"Forwarded ACL monitoring start on {len(paths)} paths to the monitor leader")
+            return {
+                "message": "Change monitoring start forwarded to the monitoring worker",
+                "monitoring_paths": paths,
+                "path_count": len(paths)
+            }
+        
         await change_monitor.start_monitoring(paths)
         # await group_tracker.start_monitoring()
         
@@ -552,6 +564,11 @@ async def start_monitoring(
 async def stop_monitoring(current_user: dict = Depends(get_current_user)):
     """Stop ACL change monitoring."""
     try:
+        if not monitor_leader.is_leader:
+            await event_bus.publish(MONITOR_CONTROL_CHANNEL, {'action': 'stop'})
+            logger.info("Forwarded ACL monitoring stop to the monitor leader")
+            return {"message": "Change monitoring stop forwarded to the monitoring worker"}
+        
         await change_monitor.stop_monitoring()
         # await group_tracker.stop_monitoring()
         
@@ -573,7 +590,9 @@ async def get_monitoring_status(current_user: dict = Depends(get_current_user)):
         return {
             "change_monitoring_active": change_monitor.is_monitoring,
             "monitored_paths": list(change_monitor.monitoring_paths),
-            "notification_service_stats": notification_stats
+            "monitor_stats": change_monitor.get_monitor_stats(),
+            "notification_service_stats": notification_stats,
+            "monitor_leader": await monitor_leader.get_status()
         }
         
     except Exception as e:
@@ -636,15 +655,34 @@ async def test_websocket_endpoint(websocket: WebSocket):
     await websocket.send_text("Hello WebSocket!")
     await websocket.close()
 
+@router.get("/notifications/since")
+async def get_notifications_since(
+    after_seq: int = Query(0, ge=0),
+    limit: int = Query(200, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user)
+):
+    """Notifications sent after a sequence number, for clients catching up without a WebSocket."""
+    try:
+        return await notification_service.get_notifications_since(after_seq, current_user['username'], limit)
+    except Exception as e:
+        logger.error(f"Error getting notifications since {after_seq}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get notifications")
+
 # WebSocket endpoint for real-time notifications
 @router.websocket("/notifications")
 async def websocket_endpoint(
     websocket: WebSocket,
     user_id: Optional[str] = Query(None),
     filters: Optional[str] = Query(None),
-    token: Optional[str] = Query(None)
+    token: Optional[str] = Query(None),
+    last_seq: Optional[int] = Query(None)
 ):
-    """WebSocket endpoint for real-time alert notifications."""
+    """
+    WebSocket endpoint for real-time alert notifications.
+
+    Reconnecting clients pass the seq of the last notification they received
+    as last_seq to have everything since replayed before live delivery.
+    """
     logger.info(f"=== WEBSOCKET ENDPOINT CALLED === user: {user_id}, token: {token[:20] if token else 'None'}")
     print(f"DEBUG: WebSocket endpoint called - user: {user_id}, token: {token[:20] if token else 'None'}")
     logger.info(f"WebSocket connection attempt from user: {user_id}")
@@ -679,7 +717,7 @@ async def websocket_endpoint(
         
         # Handle the WebSocket connection with authenticated user
         await notification_service.handle_websocket_connection(
-            websocket, user_id or service_account.username, parsed_filters
+            websocket, user_id or username, parsed_filters, last_seq
         )
         
     except WebSocketDisconnect:
@@ -24,15 +24,17 @@ async def clear_all_cache(current_request: Request):
 @require_permissions(["cache:read"])
 async def get_cache_status(current_request: Request):
    """Get current cache statistics."""
-   cache = scanner.group_resolver._cache
+   cache = scanner.group_resolver.cache
+   stats = cache.get_stats()
    return {
-       "groups_cached": len(cache.get('groups', {})),
-       "users_cached": len(cache.get('users', {})),
-       "paths_cached": len(cache.get('paths', {})),
-       "memberships_cached": len(cache.get('memberships', {})),
-       "group_members_cached": len(cache.get('group_members', {})),
-       "last_cleared_by": cache.get('last_cleared_by', None),
-       "last_cleared_at": cache.get('last_cleared_at', None)
+       "groups_cached": cache.size('groups'),
+       "users_cached": cache.size('users'),
+       "paths_cached": cache.size('paths'),
+       "memberships_cached": cache.size('memberships'),
+       "group_members_cached": cache.size('group_members'),
+       "last_cleared_by": None,
+       "last_cleared_at": stats["last_cleared_at"],
+       "resolver": stats
    }
 
 @router.post("/groups/clear", summary="Clear Groups Cache")
@@ -3,6 +3,8 @@ from fastapi import APIRouter, HTTPException, Depends, Request, Query
 from sqlalchemy.orm import Session
 from src.db.database import get_db
 from src.core.scanner import scanner
+from src.core.effective_access import EffectiveAccessEngine, WELL_KNOWN_TOKEN_SIDS
+from src.db.trustee_index import query_trustee_access, find_trustee_sids
 from src.api.middleware.auth import security, require_permissions
 from src.services.cache_service import cache_service
 from typing import Optional, List
@@ -166,16 +168,24 @@ async def get_user_folder_access(
    username: str,
    domain: str,
    current_request: Request,
-   base_path: Optional[str] = None
+   base_path: Optional[str] = None,
+   use_cache: bool = Query(False, description="Evaluate cached folder permissions when the cache covers the whole tree, instead of rescanning"),
+   db: Session = Depends(get_db)
 ):
    try:
        if base_path and not Path(base_path).exists():
            raise HTTPException(status_code=404, detail="Base path does not exist")
 
+       folders = (
+           cache_service.get_tree_permissions_cached(db, base_path, scanner.max_depth)
+           if base_path and use_cache else None
+       )
+
        access_info = scanner.get_user_access(
            username=username,
            domain=domain,
-           base_path=base_path
+           base_path=base_path,
+           folders=folders
        )
 
        return {
@@ -185,12 +195,110 @@ async def get_user_folder_access(
            "access_info": access_info,
            "metadata": {
                "scanned_by": f"{current_request.state.service_account.domain}\\{current_request.state.service_account.username}",
-               "scan_time": access_info.get("scan_time")
+               "scan_time": access_info.get("scan_time"),
+               "data_source": "cache" if folders is not None else "live_scan"
            }
        }
    except Exception as e:
        raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/who-can-access", summary="Who Can Access Folder")
+@require_permissions(["folders:read"])
+async def who_can_access_folder(
+   path: str,
+   current_request: Request,
+   recursive: bool = Query(False, description="Include every folder below path"),
+   use_cache: bool = Query(False, description="Evaluate cached folder permissions when the cache covers the whole tree, instead of rescanning"),
+   db: Session = Depends(get_db)
+):
+   """List the principals with effective access to a folder, expanding nested groups when the membership index is built."""
+   try:
+       max_depth = scanner.max_depth if recursive else 0
+       folders = cache_service.get_tree_permissions_cached(db, path, max_depth) if use_cache else None
+       if folders is None:
+           if not Path(path).exists():
+               raise HTTPException(status_code=404, detail="Path does not exist")
+           engine = EffectiveAccessEngine.from_scan_records(
+               scanner.iter_scan_path(path, max_depth=max_depth),
+               describe_mask=scanner.permission_scanner._get_categorized_permissions
+           )
+           data_source = "live_scan"
+       else:
+           engine = EffectiveAccessEngine(
+               folders, describe_mask=scanner.permission_scanner._get_categorized_permissions
+           )
+           data_source = "cache"
+
+       report = engine.who_can_access(
+           path,
+           membership_index=scanner.group_resolver.membership_index,
+           recursive=recursive
+       )
+       report["data_source"] = data_source
+       return report
+   except HTTPException:
+       raise
+   except Exception as e:
+       raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/trustee-access", summary="Where Trustee Has Access")
+@require_permissions(["folders:read"])
+async def get_trustee_access(
+   trustee: str,
+   current_request: Request,
+   expand_groups: bool = Query(True, description="Include access granted through the trustee's groups"),
+   path_prefix: Optional[str] = Query(None, description="Only folders under this path"),
+   page: int = Query(1, ge=1),
+   page_size: int = Query(100, ge=1, le=1000),
+   db: Session = Depends(get_db)
+):
+   """List the folders a SID, user or group has ACEs on, from the trustee access index maintained by scans."""
+   try:
+       sid, name, domain = _resolve_trustee(db, trustee)
+       if not sid:
+           raise HTTPException(status_code=404, detail=f"Could not resolve trustee {trustee}")
+
+       sids = {sid}
+       index = scanner.group_resolver.membership_index
+       groups_expanded = bool(expand_groups and index is not None and index.principal(sid))
+       if groups_expanded:
+           sids = index.token_sids(sid)
+           if not index.is_group(sid):
+               sids |= WELL_KNOWN_TOKEN_SIDS
+
+       result = query_trustee_access(db, sids, path_prefix=path_prefix, page=page, page_size=page_size)
+       for folder in result["folders"]:
+           if folder["access_mask"] or folder["denied_mask"]:
+               folder["effective_permissions"] = scanner.permission_scanner._get_categorized_permissions(
+                   folder["access_mask"]
+               )
+           else:
+               # Scanned before access masks were recorded
+               folder["effective_permissions"] = folder["permissions"]
+
+       result.update({
+           "trustee": {"sid": sid, "name": name, "domain": domain},
+           "groups_expanded": groups_expanded,
+           "token_sids": len(sids),
+           "pages": (result["total"] + page_size - 1) // page_size
+       })
+       return result
+   except HTTPException:
+       raise
+   except Exception as e:
+       raise HTTPException(status_code=500, detail=str(e))
+
+def _resolve_trustee(db: Session, trustee: str):
+   """(sid, name, domain) for a SID or DOMAIN\\name, using the index before asking Windows."""
+   if trustee.upper().startswith("S-1-"):
+       return trustee.upper(), None, None
+   domain, _, name = trustee.rpartition("\\")
+   sids = find_trustee_sids(db, name, domain or None)
+   if sids:
+       return sids[0], name, domain or None
+   details = scanner.group_resolver._get_account_details(name, domain or None)
+   return details.get("sid"), name, details.get("domain")
+
 @router.post("/validate", summary="Validate Folder Accessibility")
 @require_permissions(["folders:validate"])
 async def validate_folder_access(
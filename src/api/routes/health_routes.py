@@ -11,6 +11,9 @@ from src.db.database import get_db
 from src.db.models.health import Issue, HealthScan, HealthScoreHistory, IssueStatus
 from src.core.health_analyzer import HealthAnalyzer
 from src.api.middleware.auth import get_current_user
+from src.services.event_bus import event_bus
+from src.services.health_refresh import HEALTH_REFRESH_CHANNEL, health_refresher
+from src.services.leader_election import monitor_leader
 from fastapi.responses import StreamingResponse
 
 logger = logging.getLogger(__name__)
@@ -325,6 +328,35 @@ async def trigger_health_scan(
         raise HTTPException(status_code=500, detail=f"Failed to start health scan: {str(e)}")
 
 
+@router.post("/scan/incremental")
+async def trigger_incremental_health_scan(
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Re-check only the folders whose permissions changed since the last health scan."""
+    if not db.query(HealthScan).filter(HealthScan.status == "completed").first():
+        raise HTTPException(status_code=409, detail="Run a full health scan first")
+    
+    if not monitor_leader.is_leader:
+        # The leader runs the periodic incremental scans; two scans would reconcile the same issues
+        await event_bus.publish(HEALTH_REFRESH_CHANNEL, {'requested_by': current_user.get('username')})
+        logger.info("Forwarded incremental health scan request to the monitor leader")
+        return {
+            'message': 'Incremental health scan forwarded to the monitoring worker',
+            'status': 'queued'
+        }
+    
+    if not health_refresher.request_refresh():
+        return {
+            'message': 'An incremental health scan is already pending',
+            'status': 'running'
+        }
+    return {
+        'message': 'Incremental health scan started',
+        'status': 'running'
+    }
+
+
 @router.get("/scans")
 async def get_health_scans(
     skip: int = Query(0, ge=0),
@@ -352,7 +384,10 @@ async def get_health_scans(
                 'processed_paths': scan.processed_paths,
                 'issues_found': scan.issues_found,
                 'overall_score': scan.overall_score,
-                'error_message': scan.error_message
+                'error_message': scan.error_message,
+                'mode': (scan.scan_parameters or {}).get('mode', 'full'),
+                'progress': (scan.scan_parameters or {}).get('progress'),
+                'rule_stats': (scan.scan_parameters or {}).get('rule_stats')
             })
         
         return {
@@ -611,8 +646,9 @@ async def debug_scan_data(
                 "fresh_scan_success": fresh_scan.get('success', False)
             }
         
-        # Parse the stored permissions data
-        permissions_data = scan_result.permissions
+        # Parse the stored permissions data (merging back a deduplicated descriptor)
+        from src.db.descriptor_store import hydrate_scan_results
+        permissions_data = hydrate_scan_results(db, [scan_result])[0]
         if isinstance(permissions_data, str):
             try:
                 permissions_data = json.loads(permissions_data)
@@ -6,10 +6,22 @@ from datetime import datetime
 from src.core.scanner import ShareGuardScanner
 from src.db.database import get_db, SessionLocal
 from src.db.models import ScanTarget, ScanJob, ScanResult, AccessEntry
+from src.core.scan_baseline import load_scan_baseline
+from src.db.descriptor_store import hydrate_scan_results
+from src.db.trustee_index import (
+    update_trustee_index, iter_tree_permissions, iter_unexplored_paths, prune_trustee_index
+)
+from src.db.scan_writer import (
+    ScanResultWriter, scan_result_row, access_entry_rows,
+    insert_scan_results, insert_access_entries
+)
 from src.api.schemas import ScanRequest
 from src.api.middleware.auth import security, require_permissions
 from pathlib import Path
 from config.settings import SCANNER_CONFIG
+from src.utils.logger import setup_logger
+
+logger = setup_logger('scan_routes')
 
 router = APIRouter(
     prefix="/scan",
@@ -59,13 +71,21 @@ def create_scan_job(path: str, parameters: Dict, db: Session, service_account_id
     db.refresh(job)
     return job
 
+def _scan_depth(include_subfolders: bool, max_depth: Optional[int]) -> int:
+    """Depth a scan with these parameters walks below its root."""
+    if not include_subfolders:
+        return 0
+    return max(max_depth if max_depth is not None else scanner.max_depth, 0)
+
 async def run_scan_job(
     job_id: int, 
     path: str, 
     include_subfolders: bool, 
     max_depth: Optional[int],
     simplified_system: bool = True,
-    include_inherited: bool = True
+    include_inherited: bool = True,
+    stream_results: bool = False,
+    incremental: bool = False
 ):
     db = SessionLocal()
     try:
@@ -73,6 +93,13 @@ async def run_scan_job(
         if not job:
             return
         
+        if stream_results or incremental:
+            await run_streaming_scan_job(
+                db, job, path, include_subfolders, max_depth,
+                simplified_system, include_inherited, incremental
+            )
+            return
+        
         scan_results = scanner.scan_path(
             path=path, 
             include_subfolders=include_subfolders, 
@@ -81,31 +108,25 @@ async def run_scan_job(
             include_inherited=include_inherited
         )
         
-        result = ScanResult(
-            job_id=job_id,
-            path=path,
-            scan_time=datetime.utcnow(),
-            owner=scan_results.get('owner'),
-            permissions=scan_results,
-            success=scan_results.get('success', True),
-            error_message=scan_results.get('error')
-        )
-        db.add(result)
-        db.commit()
-        db.refresh(result)
+        result_id = insert_scan_results(db, [
+            scan_result_row(job_id, path, scan_results, owner=scan_results.get('owner'))
+        ])[0]
         
         if scan_results.get('success', True):
-            for ace in scan_results.get('permissions', {}).get('aces', []):
-                entry = AccessEntry(
-                    scan_result_id=result.id,
-                    trustee_name=ace['trustee']['name'],
-                    trustee_domain=ace['trustee']['domain'],
-                    trustee_sid=ace['trustee']['sid'],
-                    access_type=ace['type'],
-                    inherited=ace['inherited'],
-                    permissions=ace['permissions']
+            insert_access_entries(db, access_entry_rows(
+                result_id, scan_results.get('permissions', {}).get('aces', [])
+            ))
+            update_trustee_index(
+                db, iter_tree_permissions(scan_results),
+                job_id=job_id,
+                scan_result_ids={scan_results.get('folder_info', {}).get('path', path): result_id},
+                include_inherited=include_inherited
+            )
+            if include_inherited:
+                prune_trustee_index(
+                    db, str(Path(path)), job_id, _scan_depth(include_subfolders, max_depth),
+                    iter_unexplored_paths(scan_results)
                 )
-                db.add(entry)
         
         job.status = 'completed' if scan_results.get('success', True) else 'failed'
         job.end_time = datetime.utcnow()
@@ -113,6 +134,7 @@ async def run_scan_job(
         
         db.commit()
     except Exception as e:
+        db.rollback()
         if job:
             job.status = 'failed'
             job.end_time = datetime.utcnow()
@@ -121,6 +143,54 @@ async def run_scan_job(
     finally:
         db.close()
 
+async def run_streaming_scan_job(
+    db: Session,
+    job: ScanJob,
+    path: str,
+    include_subfolders: bool,
+    max_depth: Optional[int],
+    simplified_system: bool,
+    include_inherited: bool,
+    incremental: bool = False
+):
+    """Scan a tree and persist one ScanResult per folder in batches as records arrive."""
+    baseline = load_scan_baseline(db, job, path) if incremental else None
+    
+    records = scanner.iter_scan_path(
+        path=path,
+        max_depth=max_depth if include_subfolders else 0,
+        simplified_system=simplified_system,
+        include_inherited=include_inherited,
+        baseline=baseline
+    )
+    writer = ScanResultWriter(db, job.id, batch_size=SCANNER_CONFIG['batch_size'],
+                              include_inherited=include_inherited)
+    write_stats = writer.write_all(records)
+    if include_inherited and writer.walk_complete:
+        prune_trustee_index(
+            db, str(Path(path)), job.id, _scan_depth(include_subfolders, max_depth), writer.unexplored_paths
+        )
+    
+    root_failed = write_stats['folders_written'] == write_stats['failed_folders']
+    job.status = 'failed' if root_failed else 'completed'
+    job.end_time = datetime.utcnow()
+    job.error_message = "Scan failed for all folders" if root_failed else None
+    if incremental:
+        job.parameters = {
+            **(job.parameters or {}),
+            'incremental_summary': {
+                'baseline': baseline.source if baseline is not None else None,
+                'baseline_folders': len(baseline) if baseline is not None else 0,
+                'folders_reanalyzed': write_stats['folders_reanalyzed'],
+                'folders_unchanged': write_stats['folders_unchanged']
+            }
+        }
+        logger.info(
+            f"Incremental scan {job.id}: {write_stats['folders_reanalyzed']} re-analyzed, "
+            f"{write_stats['folders_unchanged']} unchanged"
+        )
+    db.commit()
+
 @router.post("/path", summary="Start Path Scan")
 @require_permissions(["scan:execute"])
 async def scan_path(
@@ -142,7 +212,9 @@ async def scan_path(
                 'include_subfolders': request.include_subfolders,
                 'max_depth': request.max_depth,
                 'simplified_system': request.simplified_system,
-                'include_inherited': request.include_inherited
+                'include_inherited': request.include_inherited,
+                'stream_results': request.stream_results,
+                'incremental': request.incremental
             },
             db=db,
             service_account_id=service_account.id
@@ -155,7 +227,9 @@ async def scan_path(
             request.include_subfolders,
             request.max_depth,
             request.simplified_system,
-            request.include_inherited
+            request.include_inherited,
+            request.stream_results,
+            request.incremental
         )
 
         return {
@@ -185,9 +259,10 @@ async def get_scan_job(
         raise HTTPException(status_code=404, detail="Scan job not found")
         
     results = db.query(ScanResult).filter(ScanResult.job_id == job_id).all()
+    payloads = hydrate_scan_results(db, results)
     
     detailed_results = []
-    for result in results:
+    for result, payload in zip(results, payloads):
         access_entries = db.query(AccessEntry).filter(
             AccessEntry.scan_result_id == result.id
         ).all()
@@ -198,7 +273,7 @@ async def get_scan_job(
             "scan_time": result.scan_time,
             "success": result.success,
             "error_message": result.error_message,
-            "permissions": result.permissions,
+            "permissions": payload,
             "access_entries": [
                 {
                     "trustee_name": entry.trustee_name,
@@ -220,6 +295,7 @@ async def get_scan_job(
             "end_time": job.end_time,
             "error_message": job.error_message,
             "parameters": job.parameters,
+            "baseline_job_id": job.baseline_job_id,
             "created_by": job.created_by
         },
         "results": detailed_results
@@ -241,7 +317,7 @@ async def get_scanner_stats(
     successful_jobs = db.query(ScanJob).filter(ScanJob.status == 'completed').count()
     failed_jobs = db.query(ScanJob).filter(ScanJob.status == 'failed').count()
     
-    cache = scanner.group_resolver._cache
+    cache = scanner.group_resolver.cache
     
     recent_scans = (
         db.query(ScanJob)
@@ -258,11 +334,12 @@ async def get_scanner_stats(
             "success_rate": (successful_jobs / total_jobs * 100) if total_jobs > 0 else 0
         },
         "cache": {
-            "groups_cached": len(cache.get('groups', {})),
-            "users_cached": len(cache.get('users', {})),
-            "paths_cached": len(cache.get('paths', {})),
-            "memberships_cached": len(cache.get('memberships', {})),
-            "group_members_cached": len(cache.get('group_members', {})),
+            "groups_cached": cache.size('groups'),
+            "users_cached": cache.size('users'),
+            "paths_cached": cache.size('paths'),
+            "memberships_cached": cache.size('memberships'),
+            "group_members_cached": cache.size('group_members'),
+            "resolver": cache.get_stats()
         },
         "recent_scans": [
             {
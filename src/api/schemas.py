@@ -9,6 +9,8 @@ class ScanRequest(BaseModel):
     max_depth: Optional[int] = None
     simplified_system: bool = True  # New field
     include_inherited: bool = True  # New field
+    stream_results: bool = False  # Store one ScanResult per folder instead of a nested tree
+    incremental: bool = False  # Reuse results of folders whose ACL is unchanged since the baseline (implies stream_results)
 
 class ScanResult(BaseModel):
     id: int
@@ -126,42 +126,123 @@ async def get_openapi_schema():
 async def health_check():
     return {"status": "healthy"}
 
-@app.on_event("startup")
-async def startup_event():
-    init_db()
+# Group membership tracker, created on the worker that wins the monitor election
+group_tracker = None
+
+async def start_leader_services(paths=None):
+    """Start the services only one worker may run: ACL change monitoring, group membership tracking and incremental health scans."""
+    global group_tracker
+    from src.services.change_monitor import change_monitor
+    from config.settings import MONITOR_CONFIG
     
-    # Start notification service
-    from src.services.notification_service import notification_service
-    await notification_service.start_service()
+    if paths is None:
+        # Get all scan targets and start monitoring them
+        from src.db.database import get_db_sync
+        from src.db.models import ScanTarget
+        db = next(get_db_sync())
+        try:
+            targets = db.query(ScanTarget).filter(ScanTarget.is_active == True).all()
+            paths = [target.path for target in targets]
+        finally:
+            db.close()
     
-    # Start change monitor service
-    from src.services.change_monitor import change_monitor
-    # Get all scan targets and start monitoring them
-    from src.db.database import get_db_sync
-    from src.db.models import ScanTarget
     try:
-        db = next(get_db_sync())
-        targets = db.query(ScanTarget).filter(ScanTarget.is_active == True).all()
-        paths = [target.path for target in targets]
         if paths:
             await change_monitor.start_monitoring(paths)
             logger.info(f"Started monitoring {len(paths)} paths for changes")
     except Exception as e:
         logger.error(f"Error starting change monitor: {str(e)}")
-    finally:
-        db.close()
+    
+    if MONITOR_CONFIG.get('track_group_membership', True):
+        try:
+            if group_tracker is None:
+                from src.services.group_monitor import GroupMembershipTracker
+                group_tracker = GroupMembershipTracker()
+            await group_tracker.start_monitoring()
+        except Exception as e:
+            logger.error(f"Error starting group membership tracker: {str(e)}")
+    
+    from src.services.health_refresh import health_refresher
+    await health_refresher.start()
+
+async def stop_leader_services():
+    from src.services.change_monitor import change_monitor
+    from src.services.health_refresh import health_refresher
+    await health_refresher.stop()
+    await change_monitor.stop_monitoring()
+    if group_tracker is not None:
+        await group_tracker.stop_monitoring()
+
+async def handle_monitor_control(event: dict):
+    """
+    Start/stop requests forwarded over the event bus; only the leader acts on them.
+
+    Like the monitoring routes on the leader itself, these only touch the ACL
+    change monitor; the other leader services follow elections alone.
+    """
+    from src.services.leader_election import monitor_leader
+    from src.services.change_monitor import change_monitor
+    if not monitor_leader.is_leader:
+        return
+    try:
+        if event.get('action') == 'start':
+            paths = event.get('paths') or []
+            await change_monitor.start_monitoring(paths)
+            logger.info(f"Started ACL monitoring on {len(paths)} paths for another worker")
+        elif event.get('action') == 'stop':
+            await change_monitor.stop_monitoring()
+            logger.info("Stopped ACL monitoring for another worker")
+    except Exception as e:
+        logger.error(f"Error handling forwarded monitor control: {str(e)}")
+
+@app.on_event("startup")
+async def startup_event():
+    init_db()
+    
+    # Track event loop lag so blocking work on the loop is visible
+    from src.services.loop_monitor import loop_lag_monitor
+    await loop_lag_monitor.start()
+    
+    # Connect this worker to the others before anything publishes
+    from src.services.event_bus import event_bus
+    await event_bus.start()
+    
+    # Start notification service
+    from src.services.notification_service import notification_service
+    await notification_service.start_service()
+    
+    # Every worker answers access queries from its own nested membership index
+    from src.services.membership_refresh import membership_refresher, GROUP_MEMBERSHIP_CHANNEL
+    event_bus.subscribe(GROUP_MEMBERSHIP_CHANNEL, membership_refresher.on_membership_changed)
+    await membership_refresher.start()
+    
+    # Every worker fans out notifications; one elected worker runs the monitors
+    from src.services.leader_election import monitor_leader, MONITOR_CONTROL_CHANNEL
+    event_bus.subscribe(MONITOR_CONTROL_CHANNEL, handle_monitor_control)
+    from src.services.health_refresh import health_refresher, HEALTH_REFRESH_CHANNEL
+    event_bus.subscribe(HEALTH_REFRESH_CHANNEL, health_refresher.on_refresh_requested)
+    await monitor_leader.start(on_elected=start_leader_services, on_demoted=stop_leader_services)
     
     logger.info("ShareGuard API started successfully")
     logger.info("Configured CORS origins: ['http://localhost:5173', 'http://localhost:8000']")
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    # Hand the monitors over to another worker
+    from src.services.leader_election import monitor_leader
+    await monitor_leader.stop()
+    
+    from src.services.membership_refresh import membership_refresher
+    await membership_refresher.stop()
+    
     # Stop notification service
     from src.services.notification_service import notification_service
     await notification_service.stop_service()
     
-    # Stop change monitor service
-    from src.services.change_monitor import change_monitor
-    await change_monitor.stop_monitoring()
+    from src.services.event_bus import event_bus
+    await event_bus.stop()
+    
+    from src.services.loop_monitor import loop_lag_monitor
+    await loop_lag_monitor.stop()
     
     logger.info("ShareGuard API shutdown complete")
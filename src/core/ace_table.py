@@ -0,0 +1,169 @@
+# src/core/ace_table.py
+import logging
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+# ACE type codes; the rules compare the lowercase strings exactly, like the per-folder checks
+TYPE_OTHER = 0
+TYPE_ALLOW = 1
+TYPE_DENY = 2
+_TYPE_CODES = {'allow': TYPE_ALLOW, 'deny': TYPE_DENY}
+
+# Trustee classification bits of the flags column
+FLAG_DIRECT_USER = 1
+FLAG_ORPHANED_SID = 2
+FLAG_CRITICAL_GROUP = 4
+
+
+class AceTable:
+    """
+    The ACEs of a set of folders as parallel NumPy columns, one row per ACE.
+
+    Columns: path_id, sid_id, trustee_id, type, mask, inherited, order (the
+    ACE's position in its folder's DACL) and flags (trustee classification,
+    filled in by classify_trustees). A folder's ACEs are contiguous and in
+    DACL order, so path_id is sorted. Trustees and SIDs are interned: each
+    distinct trustee is classified once however many ACEs reference it.
+    The original ACE dicts are kept so that issues for flagged folders can
+    carry the same details as the per-folder checks.
+    """
+
+    def __init__(self, paths: List[str], inheritance: List[Any], path_id, sid_id, trustee_id,
+                 ace_type, mask, inherited, order, trustees: List[Dict[str, Any]],
+                 aces: Sequence[Dict[str, Any]] = None):
+        self.paths = paths
+        self.inheritance = inheritance   # raw inheritance_enabled value per path
+        self.path_id = path_id
+        self.sid_id = sid_id
+        self.trustee_id = trustee_id
+        self.type = ace_type
+        self.mask = mask
+        self.inherited = inherited
+        self.order = order
+        self.flags = np.zeros(len(path_id), dtype=np.uint8)
+        self.trustees = trustees
+        self.aces = aces
+        self.ace_count = np.bincount(path_id, minlength=len(paths))
+        self.has_aces = self.ace_count > 0
+        self.inheritance_flags = np.array([bool(value) for value in inheritance], dtype=bool)
+        self.starts = np.concatenate(([0], np.cumsum(self.ace_count)))
+
+    def __len__(self) -> int:
+        return len(self.path_id)
+
+    @classmethod
+    def from_folders(cls, analyzer, folders: Sequence[Tuple[str, Dict[str, Any]]]) -> 'AceTable':
+        """
+        Build the table from (path, scan result) pairs as read by HealthAnalyzer.iter_folder_results.
+
+        Folders hydrated from the same stored descriptor share one ACE list;
+        each distinct list is converted once and its rows are gathered for
+        every folder holding it. The columns are built by one comprehension
+        each over the distinct ACEs rather than an append per ACE and column.
+        """
+        paths, inheritance, counts, sources, aces = [], [], [], [], []
+        distinct_aces: List[Dict[str, Any]] = []
+        first_row: Dict[int, int] = {}
+
+        for path, scan_result in folders:
+            folder_aces, inheritance_data = analyzer._split_scan_result(scan_result)
+            paths.append(path)
+            inheritance.append(analyzer._inheritance_enabled(inheritance_data))
+            count = len(folder_aces) if folder_aces else 0
+            counts.append(count)
+            if not count:
+                sources.append(0)
+                continue
+            # folders keeps every list alive, so its id is not reused during the build
+            start = first_row.get(id(folder_aces))
+            if start is None:
+                start = first_row[id(folder_aces)] = len(distinct_aces)
+                distinct_aces.extend(folder_aces)
+            sources.append(start)
+            aces.extend(folder_aces)
+
+        ace_trustees = [ace.get('trustee', {}) for ace in distinct_aces]
+        keys = [(trustee.get('sid', ''), trustee.get('name'), trustee.get('domain'),
+                 trustee.get('type'), trustee.get('is_system', False)) for trustee in ace_trustees]
+        trustee_index: Dict[Tuple, int] = {}
+        trustee_ids = [trustee_index.setdefault(key, len(trustee_index)) for key in keys]
+        # The first trustee dict seen for each key, in trustee id order
+        first_trustee: Dict[Tuple, Dict[str, Any]] = {}
+        for key, trustee in zip(keys, ace_trustees):
+            first_trustee.setdefault(key, trustee)
+        trustees = list(first_trustee.values())
+        sid_index: Dict[Any, int] = {}
+        trustee_sid_id = np.array([sid_index.setdefault(key[0], len(sid_index)) for key in trustee_index],
+                                  dtype=np.int32)
+
+        # Row i of the table is distinct ACE rows[i]: each folder's run starts at its list's first copy
+        counts = np.array(counts, dtype=np.int64)
+        starts = np.cumsum(counts) - counts
+        order = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(starts, counts)
+        rows = np.repeat(np.array(sources, dtype=np.int64), counts) + order
+
+        trustee_id = np.array(trustee_ids, dtype=np.int32)[rows]
+        return cls(
+            paths, inheritance,
+            path_id=np.repeat(np.arange(len(paths), dtype=np.int32), counts),
+            sid_id=trustee_sid_id[trustee_id],
+            trustee_id=trustee_id,
+            ace_type=np.array([_TYPE_CODES.get(ace.get('type'), TYPE_OTHER) for ace in distinct_aces],
+                              dtype=np.int8)[rows],
+            mask=np.array([ace.get('access_mask') or 0 for ace in distinct_aces], dtype=np.int64)[rows],
+            inherited=np.array([bool(ace.get('inherited', False)) for ace in distinct_aces], dtype=bool)[rows],
+            order=order.astype(np.int32),
+            trustees=trustees,
+            aces=aces
+        )
+
+    def classify_trustees(self, analyzer) -> None:
+        """Fill the flags column by running the analyzer's trustee predicates once per distinct trustee."""
+        trustee_flags = np.zeros(len(self.trustees), dtype=np.uint8)
+        for tid, trustee in enumerate(self.trustees):
+            trustee_flags[tid] = (
+                (FLAG_DIRECT_USER if analyzer._is_direct_user(trustee) else 0)
+                | (FLAG_ORPHANED_SID if analyzer._is_orphaned_sid(trustee) else 0)
+                | (FLAG_CRITICAL_GROUP if analyzer._is_critical_group(trustee) else 0)
+            )
+        self.flags = trustee_flags[self.trustee_id]
+
+    def path_slice(self, path_id: int) -> slice:
+        return slice(int(self.starts[path_id]), int(self.starts[path_id + 1]))
+
+    def per_path(self, row_mask):
+        """Number of rows selected by row_mask in each path."""
+        return np.bincount(self.path_id[row_mask], minlength=len(self.paths))
+
+    def deny_after_allow_counts(self):
+        """
+        Per path, the deny ACEs preceded by an allow ACE for the same SID.
+
+        Sorts the rows by (path, SID) keeping DACL order - path_id is sorted
+        and rows are in DACL order within a path, so a stable sort suffices -
+        and counts the allows before each deny with a cumulative sum
+        restarted at every (path, SID) group.
+        """
+        if not len(self):
+            return np.zeros(len(self.paths), dtype=np.int64)
+        group_key = self.path_id.astype(np.int64) * (int(self.sid_id.max()) + 1) + self.sid_id
+        rows = np.argsort(group_key, kind='stable')
+        sorted_key = group_key[rows]
+        sorted_allow = (self.type[rows] == TYPE_ALLOW).astype(np.int64)
+        allows_before = np.cumsum(sorted_allow) - sorted_allow
+
+        group_start = np.ones(len(rows), dtype=bool)
+        group_start[1:] = sorted_key[1:] != sorted_key[:-1]
+        start_index = np.maximum.accumulate(np.where(group_start, np.arange(len(rows)), 0))
+        allows_before -= allows_before[start_index]
+
+        conflicting = (self.type[rows] == TYPE_DENY) & (allows_before > 0)
+        return np.bincount(self.path_id[rows][conflicting], minlength=len(self.paths))
@@ -0,0 +1,377 @@
+# src/core/effective_access.py
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger('effective_access')
+
+# Every interactive or network logon token carries these
+WELL_KNOWN_TOKEN_SIDS = frozenset({
+    "S-1-1-0",   # Everyone
+    "S-1-5-11"   # Authenticated Users
+})
+
+INHERIT_ONLY_ACE = 0x08
+
+
+@dataclass
+class CompiledAce:
+    """One ACE reduced to what an access check needs."""
+    sid: str
+    deny: bool
+    mask: Optional[int]
+    names: FrozenSet[Tuple[str, str]]
+    ace: Dict
+
+
+class CompiledAcl:
+    """
+    A DACL prepared for repeated access checks against different tokens.
+
+    ACEs are evaluated in DACL order and each right is decided by the first
+    ACE that mentions it, as Windows does: in a canonical DACL (explicit
+    deny, explicit allow, inherited deny, inherited allow) a deny always
+    wins over an allow at the same level. Rights are compared as access mask
+    bits when the scan recorded them, otherwise by permission name.
+    Inherit-only ACEs apply to children and are skipped.
+    """
+
+    def __init__(self, aces: Iterable[Dict]):
+        self.aces: List[CompiledAce] = []
+        for ace in aces:
+            sid = (ace.get("trustee") or {}).get("sid")
+            if not sid or ace.get("ace_flags", 0) & INHERIT_ONLY_ACE:
+                continue
+            self.aces.append(CompiledAce(
+                sid=sid,
+                deny=ace.get("type") == "Deny",
+                mask=ace.get("access_mask"),
+                names=_permission_names(ace.get("permissions")),
+                ace=ace
+            ))
+        self.sids: FrozenSet[str] = frozenset(ace.sid for ace in self.aces)
+        self.use_masks = all(ace.mask is not None for ace in self.aces)
+
+    def evaluate(self, token_sids: Set[str]) -> Optional[Tuple[object, List[Dict]]]:
+        """
+        Return (granted rights, matching ACEs) for a token, or None if no ACE applies.
+
+        Granted rights are an access mask when use_masks is set, otherwise a
+        frozenset of (category, permission name) pairs.
+        """
+        if self.sids.isdisjoint(token_sids):
+            return None
+
+        matched = []
+        if self.use_masks:
+            granted = denied = 0
+            for ace in self.aces:
+                if ace.sid not in token_sids:
+                    continue
+                matched.append(ace.ace)
+                if ace.deny:
+                    denied |= ace.mask & ~granted
+                else:
+                    granted |= ace.mask & ~denied
+            return granted, matched
+
+        granted_names, denied_names = set(), set()
+        for ace in self.aces:
+            if ace.sid not in token_sids:
+                continue
+            matched.append(ace.ace)
+            if ace.deny:
+                denied_names |= ace.names - granted_names
+            else:
+                granted_names |= ace.names - denied_names
+        return frozenset(granted_names), matched
+
+
+def _permission_names(permissions) -> FrozenSet[Tuple[str, str]]:
+    names = set()
+    for category, values in (permissions or {}).items():
+        if isinstance(values, str):
+            values = [values]
+        names.update((category, value) for value in values)
+    return frozenset(names)
+
+
+class EffectiveAccessEngine:
+    """
+    Effective access over a set of already-scanned folders.
+
+    Folders are grouped by ACL (descriptor fingerprint when available), each
+    distinct ACL is compiled and evaluated once per query, and the result is
+    fanned out to every folder sharing it. Tokens are plain SID sets, so a
+    check is a handful of hash lookups instead of name comparisons.
+    """
+
+    def __init__(self, folders: Iterable[Tuple[str, Dict]],
+                 describe_mask: Optional[Callable[[int], Dict]] = None):
+        """
+        Args:
+            folders: (path, permissions) pairs as produced by get_folder_permissions
+            describe_mask: Turns an access mask into categorized permission names
+        """
+        self.describe_mask = describe_mask
+        self._acls: Dict[object, CompiledAcl] = {}
+        self._acl_of: Dict[str, object] = {}
+        self._paths_by_acl: Dict[object, List[str]] = {}
+        self.failed_folders = 0
+
+        for path, permissions in folders:
+            if not permissions or not permissions.get("success", True) or "aces" not in permissions:
+                self.failed_folders += 1
+                continue
+            key = permissions.get("descriptor_fingerprint") or _acl_key(permissions["aces"])
+            if key not in self._acls:
+                self._acls[key] = CompiledAcl(permissions["aces"])
+            self._acl_of[path] = key
+            self._paths_by_acl.setdefault(key, []).append(path)
+
+        for paths in self._paths_by_acl.values():
+            paths.sort()
+
+    @classmethod
+    def from_scan_records(cls, records: Iterable[Dict], **kwargs) -> "EffectiveAccessEngine":
+        """Build from per-folder records as produced by iter_scan_path."""
+        return cls(
+            ((record["path"], record.get("permissions")) for record in records
+             if isinstance(record, dict) and "path" in record),
+            **kwargs
+        )
+
+    @classmethod
+    def from_baseline(cls, baseline, **kwargs) -> "EffectiveAccessEngine":
+        """Build from a ScanBaseline (cached or stored scan results)."""
+        return cls(((folder.path, folder.permissions) for folder in baseline.folders.values()), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self._acl_of)
+
+    @property
+    def unique_acls(self) -> int:
+        return len(self._acls)
+
+    def describe(self, granted) -> Dict[str, List[str]]:
+        """Categorized permission names for a granted-rights value."""
+        if isinstance(granted, int):
+            if self.describe_mask:
+                return self.describe_mask(granted)
+            return {"access_mask": [hex(granted)]}
+        categories: Dict[str, List[str]] = {}
+        for category, name in granted:
+            categories.setdefault(category, []).append(name)
+        return {category: sorted(names) for category, names in categories.items()}
+
+    def _union(self, left, right):
+        """Combine granted rights from two ACLs, falling back to names if only one has masks."""
+        if isinstance(left, int) and isinstance(right, int):
+            return left | right
+        as_names = lambda granted: (
+            _permission_names(self.describe(granted)) if isinstance(granted, int) else granted
+        )
+        return frozenset(as_names(left)) | frozenset(as_names(right))
+
+    def evaluate(self, token_sids: Iterable[str]) -> List[Dict]:
+        """Folders a token can access, with effective permissions and the ACEs that apply."""
+        token = set(token_sids)
+        accessible = []
+        for key, acl in self._acls.items():
+            result = acl.evaluate(token)
+            if result is None:
+                continue
+            granted, matched = result
+            if not granted:
+                continue
+            effective = self.describe(granted)
+            for path in self._paths_by_acl[key]:
+                accessible.append({
+                    "path": path,
+                    "effective_permissions": effective,
+                    "aces": matched
+                })
+        accessible.sort(key=lambda entry: entry["path"])
+        return accessible
+
+    def who_can_access(self, path: str, membership_index=None, recursive: bool = False) -> Dict:
+        """
+        Principals with effective access to path (or anywhere below it when recursive).
+
+        With a membership index, group ACEs are expanded to every transitive
+        member and each member is checked with its own token; members whose
+        token overlaps the ACL in the same way share one evaluation. Without
+        an index the report lists the ACE trustees themselves.
+        """
+        started = time.perf_counter()
+        prefix = path.rstrip("\\/")
+        keys: Dict[object, int] = {}
+        folders_evaluated = 0
+        for folder_path, key in self._acl_of.items():
+            if folder_path == path or folder_path == prefix or (
+                recursive and folder_path.startswith(prefix)
+                and folder_path[len(prefix):len(prefix) + 1] in ("\\", "/")
+            ):
+                keys[key] = keys.get(key, 0) + 1
+                folders_evaluated += 1
+
+        # results[i] = (granted, via) for one ACL; principals collect result indexes
+        results: List[Tuple[object, FrozenSet[str]]] = []
+        result_folders: List[int] = []
+        per_principal: Dict[str, List[int]] = defaultdict(list)
+        trustee_info: Dict[str, Dict] = {}
+        members_cache: Dict[str, Set[str]] = {}
+
+        for key, folder_count in keys.items():
+            acl = self._acls[key]
+            outcomes = self._principal_outcomes(
+                acl, membership_index, results, trustee_info, members_cache
+            )
+            for sid, result_index in outcomes:
+                if result_index is not None:
+                    per_principal[sid].append(result_index)
+            result_folders.extend([folder_count] * (len(results) - len(result_folders)))
+
+        # Principals with the same outcomes across all ACLs share one summary
+        summaries: Dict[tuple, Dict] = {}
+        report = []
+        for sid, outcomes in per_principal.items():
+            outcome_key = tuple(outcomes)
+            summary = summaries.get(outcome_key)
+            if summary is None:
+                granted = None
+                via: Set[str] = set()
+                for result_index in outcomes:
+                    result_granted, result_via = results[result_index]
+                    granted = result_granted if granted is None else self._union(granted, result_granted)
+                    via |= result_via
+                summary = summaries[outcome_key] = {
+                    "effective_permissions": self.describe(granted),
+                    "via": sorted(via),
+                    "folders": sum(result_folders[result_index] for result_index in outcomes)
+                }
+            entry = dict(trustee_info.get(sid) or _index_principal_info(membership_index, sid))
+            entry.update(summary)
+            report.append(entry)
+        report.sort(key=lambda entry: (entry.get("full_name") or "").lower())
+
+        return {
+            "path": path,
+            "recursive": recursive,
+            "folders_evaluated": folders_evaluated,
+            "unique_acls": len(keys),
+            "groups_expanded": membership_index is not None,
+            "acl_evaluations": len(results),
+            "principals": report,
+            "total_principals": len(report),
+            "elapsed_seconds": round(time.perf_counter() - started, 4)
+        }
+
+    def _principal_outcomes(self, acl: CompiledAcl, membership_index, results: List,
+                            trustee_info: Dict[str, Dict], members_cache: Dict[str, Set[str]]):
+        """
+        Yield (sid, result index or None) for every principal an ACL might grant access to.
+
+        The ACL only sees the part of a token that overlaps its own SIDs, so
+        principals are keyed by that overlap and each distinct overlap is
+        evaluated once; new results are appended to results.
+        """
+        by_signature: Dict[object, Optional[int]] = {}
+
+        def outcome(signature, build_token) -> Optional[int]:
+            if signature in by_signature:
+                return by_signature[signature]
+            evaluated = acl.evaluate(build_token())
+            result_index = None
+            if evaluated is not None and evaluated[0]:
+                granted, matched = evaluated
+                via = frozenset(
+                    ace["trustee"].get("full_name") or ace["trustee"].get("sid")
+                    for ace in matched if ace.get("type") != "Deny"
+                )
+                results.append((granted, via))
+                result_index = len(results) - 1
+            by_signature[signature] = result_index
+            return result_index
+
+        trustees = {ace.sid: ace.ace.get("trustee") or {} for ace in acl.aces}
+        acl_mask = membership_index.group_mask(acl.sids) if membership_index is not None else 0
+        seen: Set[str] = set()
+        for ace_sid, trustee in trustees.items():
+            if (membership_index is None or ace_sid in WELL_KNOWN_TOKEN_SIDS
+                    or ace_sid not in membership_index):
+                # Not a directory principal (well-known, foreign or no index); report as is
+                if ace_sid not in seen:
+                    seen.add(ace_sid)
+                    trustee_info.setdefault(ace_sid, _trustee_info(trustee))
+                    yield ace_sid, outcome(("trustee", ace_sid), lambda: {ace_sid})
+                continue
+
+            members = members_cache.get(ace_sid)
+            if members is None:
+                members = {ace_sid}
+                if membership_index.is_group(ace_sid):
+                    members |= membership_index.members_of(ace_sid)
+                members_cache[ace_sid] = members
+
+            group_bits = membership_index.group_bits
+            is_group = membership_index.is_group
+            for sid in members - seen:
+                member_is_group = is_group(sid)
+                signature = (sid if sid in acl.sids else None, group_bits(sid) & acl_mask, member_is_group)
+                if signature in by_signature:
+                    yield sid, by_signature[signature]
+                else:
+                    yield sid, outcome(
+                        signature, lambda: _principal_token(membership_index, acl, sid, member_is_group)
+                    )
+            seen |= members
+
+
+def _principal_token(membership_index, acl: CompiledAcl, sid: str, is_group: bool) -> Set[str]:
+    """The SIDs of a principal's token that an ACL can see."""
+    token = {acl_sid for acl_sid in acl.sids if membership_index.is_member(sid, acl_sid)}
+    if sid in acl.sids:
+        token.add(sid)
+    if not is_group:
+        token |= WELL_KNOWN_TOKEN_SIDS
+    return token
+
+
+def _index_principal_info(membership_index, sid: str) -> Dict:
+    principal = membership_index.principal(sid) if membership_index is not None else None
+    return {
+        "sid": sid,
+        "name": principal.name if principal else "",
+        "domain": principal.domain if principal else "",
+        "full_name": principal.full_name if principal else sid,
+        "type": principal.type if principal else "Unknown"
+    }
+
+
+def _trustee_info(trustee: Dict) -> Dict:
+    return {
+        "sid": trustee.get("sid"),
+        "name": trustee.get("name", ""),
+        "domain": trustee.get("domain", ""),
+        "full_name": trustee.get("full_name") or trustee.get("sid"),
+        "type": trustee.get("account_type") or trustee.get("type", "Unknown")
+    }
+
+
+def _acl_key(aces: List[Dict]) -> tuple:
+    """Hashable identity of an ACL for results without a descriptor fingerprint."""
+    return tuple(
+        (
+            (ace.get("trustee") or {}).get("sid"),
+            ace.get("type"),
+            ace.get("inherited"),
+            ace.get("access_mask"),
+            ace.get("ace_flags"),
+            _permission_names(ace.get("permissions"))
+        )
+        for ace in aces
+    )
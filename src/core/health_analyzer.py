@@ -1,6 +1,6 @@
 # src/core/health_analyzer.py
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime, timezone
 import json
 from dataclasses import dataclass
@@ -8,10 +8,26 @@ from sqlalchemy.orm import Session
 
 from src.db.models.health import Issue, HealthScan, HealthMetrics, HealthScoreHistory, IssueSeverity, IssueType, IssueStatus
 from src.db.database import SessionLocal
-from src.core.scanner import ShareGuardScanner
+from src.db.health_issues import active_issue_totals, load_changed_folders, reconcile_issues, totals_key
+from src.db.trustee_index import iter_tree_permissions
+from src.core.health_pipeline import HealthAnalysisPipeline, analyze_chunk
+from src.core.health_rules import RuleEngine, RuleStats
 
 logger = logging.getLogger(__name__)
 
+# Unreadable changed folders an incremental scan hands on to the next one
+MAX_RETRY_PATHS = 1000
+
+
+def _within_targets(path: str, targets: List[str]) -> bool:
+    """path is one of the targets or lies below one (case-insensitive, either separator)."""
+    folded = path.rstrip('\\/').lower()
+    for target in targets:
+        target = target.rstrip('\\/').lower()
+        if folded == target or folded.startswith(target + '\\') or folded.startswith(target + '/'):
+            return True
+    return False
+
 
 @dataclass
 class HealthAnalysisConfig:
@@ -20,6 +36,12 @@ class HealthAnalysisConfig:
     max_direct_user_aces: int = 5
     critical_groups: List[str] = None
     score_weights: Dict[str, float] = None
+    workers: int = None                      # Analysis processes; None uses every CPU, 1 analyzes inline
+    chunk_size: int = 2000                   # Folders handed to a worker at a time
+    vectorized: bool = True                  # Evaluate each chunk's rules as array operations (needs numpy)
+    progress_interval_seconds: float = 2.0   # How often progress is written to the HealthScan row
+    rule_cache_size: int = 4096              # Findings remembered per rule, keyed by the rule's inputs (0 disables)
+    rule_modules: List[str] = None           # Modules that register additional rules on import
     
     def __post_init__(self):
         if self.critical_groups is None:
@@ -47,9 +69,18 @@ class HealthAnalyzer:
     
     def __init__(self, config: HealthAnalysisConfig = None):
         self.config = config or HealthAnalysisConfig()
-        self.scanner = ShareGuardScanner()
+        self._scanner = None
+        self.rule_engine = RuleEngine(self)
         logger.info("Health analyzer initialized")
     
+    @property
+    def scanner(self):
+        """Live scanner, only needed for paths without stored scan data (and never in analysis workers)."""
+        if self._scanner is None:
+            from src.core.scanner import ShareGuardScanner
+            self._scanner = ShareGuardScanner()
+        return self._scanner
+    
     def run_health_scan(self, target_paths: List[str]) -> int:
         """Run a complete health analysis scan."""
         db = SessionLocal()
@@ -59,7 +90,12 @@ class HealthAnalyzer:
                 start_time=datetime.now(timezone.utc),
                 status="running",
                 total_paths=len(target_paths),
-                scan_parameters={"target_paths": target_paths}
+                scan_parameters={
+                    "target_paths": target_paths,
+                    "mode": "full",
+                    # Incremental scans pick up the changes recorded after this point
+                    "changes_until": datetime.utcnow().isoformat()
+                }
             )
             db.add(scan)
             db.commit()
@@ -68,101 +104,14 @@ class HealthAnalyzer:
             logger.info(f"Started health scan {scan.id} for {len(target_paths)} paths")
             logger.info(f"Target paths to analyze: {target_paths}")
             
-            all_issues = []
-            processed_paths = 0
-            
-            for path in target_paths:
-                try:
-                    # First check if we have existing scan data
-                    from src.db.models import ScanResult
-                    existing_scan = db.query(ScanResult).filter(
-                        ScanResult.path == path,
-                        ScanResult.success == True
-                    ).order_by(ScanResult.scan_time.desc()).first()
-                    
-                    if existing_scan and existing_scan.permissions:
-                        # Use existing scan data
-                        logger.info(f"Using existing scan data for {path}")
-                        # Parse JSON if stored as string
-                        import json
-                        if isinstance(existing_scan.permissions, str):
-                            try:
-                                scan_result = json.loads(existing_scan.permissions)
-                                scan_result['success'] = True  # Mark as successful since it's valid stored data
-                            except json.JSONDecodeError:
-                                logger.error(f"Failed to parse stored permissions JSON for {path}")
-                                scan_result = {'success': False, 'error': 'Invalid JSON in stored scan data'}
-                        else:
-                            scan_result = existing_scan.permissions
-                        # Ensure it has the expected structure
-                        if not isinstance(scan_result, dict):
-                            scan_result = {'success': False, 'error': 'Invalid scan data format'}
-                    else:
-                        # Scan the path if no existing data
-                        logger.warning(f"No existing scan data found for {path}")
-                        logger.info(f"Attempting to scan {path} now")
-                        scan_result = self.scanner.scan_path(path)
-                        
-                        # Store the new scan result in database for future use
-                        if scan_result.get('success', False):
-                            from src.db.models import ScanResult
-                            new_scan_result = ScanResult(
-                                path=path,
-                                scan_time=datetime.now(timezone.utc),
-                                success=True,
-                                permissions=scan_result,  # Store the entire result
-                                error_message=None
-                            )
-                            db.add(new_scan_result)
-                            logger.info(f"Stored new scan result for {path}")
-                        else:
-                            # Also store failed scans to avoid repeated attempts
-                            from src.db.models import ScanResult
-                            new_scan_result = ScanResult(
-                                path=path,
-                                scan_time=datetime.now(timezone.utc),
-                                success=False,
-                                permissions=None,
-                                error_message=scan_result.get('error', 'Unknown scan error')
-                            )
-                            db.add(new_scan_result)
-                            logger.warning(f"Stored failed scan result for {path}")
-                    
-                    if scan_result.get('success', False):
-                        # Analyze the scan result for issues
-                        logger.info(f"Analyzing scan result for {path}")
-                        logger.info(f"Scan result keys for {path}: {list(scan_result.keys())}")
-                        
-                        # Log inheritance information specifically
-                        if 'permissions' in scan_result:
-                            perms = scan_result['permissions']
-                            if isinstance(perms, dict):
-                                logger.info(f"Permissions structure for {path}: {list(perms.keys())}")
-                                logger.info(f"Inheritance enabled for {path}: {perms.get('inheritance_enabled', 'NOT_FOUND')}")
-                                logger.info(f"ACEs count for {path}: {len(perms.get('aces', []))}")
-                        
-                        path_issues = self._analyze_path_results(path, scan_result, scan.id)
-                        logger.info(f"Raw issues found for {path}: {len(path_issues)} - {[issue.get('issue_type', {}).value if hasattr(issue.get('issue_type', {}), 'value') else issue.get('issue_type') for issue in path_issues]}")
-                        
-                        # Filter out non-significant issues
-                        significant_issues = self._filter_significant_issues(path_issues)
-                        logger.info(f"Significant issues for {path}: {len(significant_issues)} - {[issue.get('issue_type', {}).value if hasattr(issue.get('issue_type', {}), 'value') else issue.get('issue_type') for issue in significant_issues]}")
-                        
-                        if significant_issues:
-                            logger.info(f"Adding {len(significant_issues)} significant issues for {path}")
-                            all_issues.extend(significant_issues)
-                        else:
-                            logger.info(f"No significant issues found for {path}")
-                        processed_paths += 1
-                    else:
-                        logger.warning(f"Failed to scan path {path}: {scan_result.get('error', 'Unknown error')}")
-                        
-                except Exception as e:
-                    logger.error(f"Error scanning path {path}: {str(e)}")
-                    continue
+            # Every folder of every target's stored scan tree goes through the rule checks
+            pipeline = HealthAnalysisPipeline(self, db, scan)
+            all_issues, analyzed_paths = pipeline.run(target_paths)
+            processed_paths = pipeline.processed
             
             # Calculate overall health score
-            overall_score = self._calculate_health_score(all_issues)
+            totals = self._issue_totals(all_issues)
+            overall_score = self._score_from_totals(totals)
             logger.info(f"Health scan summary: {processed_paths} paths processed, {len(all_issues)} issues found, score: {overall_score}")
             
             # Update scan record
@@ -172,45 +121,17 @@ class HealthAnalyzer:
             scan.issues_found = len(all_issues)
             scan.overall_score = overall_score
             
-            # Store issues in database with deduplication
-            for issue_data in all_issues:
-                # Check if similar active issue already exists
-                existing_issue = db.query(Issue).filter(
-                    Issue.path == issue_data['path'],
-                    Issue.issue_type == issue_data['issue_type'],
-                    Issue.status == IssueStatus.ACTIVE
-                ).first()
-                
-                if existing_issue:
-                    # Update last_seen timestamp for existing issue
-                    existing_issue.last_seen = datetime.now(timezone.utc)
-                    existing_issue.health_scan_id = scan.id
-                    # Update any changed details
-                    existing_issue.severity = issue_data['severity']
-                    existing_issue.description = issue_data['description']
-                    existing_issue.affected_principals = issue_data.get('affected_principals', [])
-                    existing_issue.acl_details = issue_data.get('acl_details', {})
-                    existing_issue.recommendations = issue_data.get('recommendations')
-                    existing_issue.risk_score = issue_data.get('risk_score', 0.0)
-                else:
-                    # Create new issue only if it doesn't exist
-                    issue = Issue(**issue_data)
-                    db.add(issue)
-            
-            # Create health metrics record
-            metrics = self._create_health_metrics(scan.id, all_issues, overall_score, processed_paths)
-            db.add(metrics)
+            # Insert new issues, refresh ones still present and resolve the ones that are gone
+            reconciliation = reconcile_issues(db, scan.id, all_issues, analyzed_paths)
+            scan.scan_parameters = {
+                **(scan.scan_parameters or {}),
+                'issues': reconciliation,
+                # Starting point for the deltas of the next incremental scan
+                'totals': {'issues': totals, 'paths': processed_paths}
+            }
             
-            # Record score history
-            severity_counts_history = self._get_severity_counts_for_history(all_issues)
-            score_history = HealthScoreHistory(
-                timestamp=datetime.now(timezone.utc),
-                score=overall_score,
-                issue_count=len(all_issues),
-                scan_id=scan.id,
-                **severity_counts_history
-            )
-            db.add(score_history)
+            # Create health metrics record and score history
+            self._record_scores(db, scan.id, totals, overall_score, processed_paths)
             
             db.commit()
             logger.info(f"Health scan {scan.id} completed with score {overall_score:.1f}")
@@ -227,65 +148,257 @@ class HealthAnalyzer:
         finally:
             db.close()
     
+    def run_incremental_health_scan(self) -> Optional[int]:
+        """
+        Re-check only the folders whose ACL changed since the last completed health scan.
+        
+        Changed folders come from PermissionChange records (with the ACL they
+        recorded) and from FolderPermissionCache entries marked stale, which
+        are read again. Only their issues are reconciled, and the new totals
+        are the previous scan's totals plus the resulting issue delta, so the
+        rest of the population is never re-scored. Returns None when there
+        is no completed scan to build on.
+        """
+        db = SessionLocal()
+        try:
+            previous = db.query(HealthScan).filter(
+                HealthScan.status == "completed"
+            ).order_by(HealthScan.end_time.desc()).first()
+            if previous is None:
+                logger.warning("Incremental health scan skipped: run a full health scan first")
+                return None
+            previous_parameters = previous.scan_parameters or {}
+            since = previous_parameters.get('changes_until')
+            since = datetime.fromisoformat(since) if since else previous.start_time.replace(tzinfo=None)
+            previous_totals = previous_parameters.get('totals')
+            # The totals cover the full scan's targets; changes elsewhere must not move them
+            target_paths = previous_parameters.get('target_paths')
+            
+            until = datetime.utcnow()
+            changed = load_changed_folders(db, since)
+            # Folders the previous incremental scan could not read are tried again
+            for path in previous_parameters.get('retry_paths') or ():
+                changed.setdefault(path, None)
+            if target_paths is not None:
+                outside = [path for path in changed if not _within_targets(path, target_paths)]
+                for path in outside:
+                    del changed[path]
+                if outside:
+                    logger.info(f"Incremental health scan ignores {len(outside)} changed folders "
+                                f"outside the {len(target_paths)} scanned targets")
+            scan = HealthScan(
+                start_time=datetime.now(timezone.utc),
+                status="running",
+                total_paths=len(changed),
+                scan_parameters={
+                    "mode": "incremental",
+                    "target_paths": target_paths,
+                    "since": since.isoformat(),
+                    "changes_until": until.isoformat(),
+                    "previous_scan_id": previous.id
+                }
+            )
+            db.add(scan)
+            db.commit()
+            db.refresh(scan)
+            
+            folders, skipped = self._changed_folder_results(changed)
+            issues = []
+            rule_stats = RuleStats()
+            for i in range(0, len(folders), self.config.chunk_size):
+                _, chunk_issues, failed, chunk_stats = analyze_chunk(self, folders[i:i + self.config.chunk_size], scan.id)
+                issues.extend(chunk_issues)
+                skipped.update(failed)
+                rule_stats.merge(chunk_stats)
+            
+            reconciliation = reconcile_issues(db, scan.id, issues, list(changed), skipped_paths=skipped)
+            if previous_totals:
+                totals = dict(previous_totals['issues'])
+                for key, change in reconciliation['delta'].items():
+                    totals[key] = totals.get(key, 0) + change
+                paths_covered = previous_totals.get('paths', 0)
+                negative = {key: count for key, count in totals.items() if count < 0}
+                if negative:
+                    # The running totals drifted from the issue table; count the active issues again
+                    logger.warning(f"Incremental health scan {scan.id}: totals went negative {negative}, recounting")
+                    db.flush()
+                    totals = active_issue_totals(db)
+                totals = {key: count for key, count in totals.items() if count > 0}
+            else:
+                # The previous scan predates totals; count the active issues once
+                db.flush()
+                totals = active_issue_totals(db)
+                paths_covered = previous.processed_paths or 0
+            overall_score = self._score_from_totals(totals)
+            
+            scan.end_time = datetime.now(timezone.utc)
+            scan.status = "completed"
+            scan.processed_paths = len(folders)
+            scan.issues_found = sum(totals.values())
+            scan.overall_score = overall_score
+            scan.scan_parameters = {
+                **(scan.scan_parameters or {}),
+                'issues': reconciliation,
+                'skipped_paths': len(skipped),
+                'retry_paths': sorted(skipped)[:MAX_RETRY_PATHS],
+                'rule_stats': rule_stats.as_dict(),
+                'totals': {'issues': totals, 'paths': paths_covered}
+            }
+            self._record_scores(db, scan.id, totals, overall_score, paths_covered)
+            db.commit()
+            logger.info(f"Incremental health scan {scan.id}: {len(folders)} changed folders re-checked, "
+                        f"{len(skipped)} skipped, score {previous.overall_score} -> {overall_score:.1f}")
+            return scan.id
+            
+        except Exception as e:
+            logger.error(f"Error during incremental health scan: {str(e)}")
+            if 'scan' in locals():
+                db.rollback()
+                scan.status = "failed"
+                scan.error_message = str(e)
+                scan.end_time = datetime.now(timezone.utc)
+                db.commit()
+            raise
+        finally:
+            db.close()
+    
+    def _changed_folder_results(self, changed: Dict[str, Optional[Dict[str, Any]]]) -> Tuple[List[Tuple[str, Dict[str, Any]]], set]:
+        """(path, permissions) for the changed folders, reading the ACLs that were not recorded; also returns the unreadable paths."""
+        folders = [(path, permissions) for path, permissions in changed.items() if permissions is not None]
+        to_read = [path for path, permissions in changed.items() if permissions is None]
+        skipped = set()
+        if to_read:
+            try:
+                results = self.scanner.permission_scanner.get_folder_permissions_batch(to_read)
+            except Exception as e:
+                logger.warning(f"Could not read the ACLs of {len(to_read)} stale folders: {str(e)}")
+                results = {}
+            for path in to_read:
+                permissions = results.get(path)
+                if isinstance(permissions, dict) and permissions.get('success', True) and 'aces' in permissions:
+                    folders.append((path, permissions))
+                else:
+                    # Keeps its issues until the folder can be read
+                    skipped.add(path)
+        return folders, skipped
+    
+    def _load_scan_result(self, db: Session, path: str) -> Tuple[Dict[str, Any], Any]:
+        """Latest stored scan result for a path, scanning it now if there is none; returns (result, ScanResult row)."""
+        from src.db.models import ScanResult
+        existing_scan = db.query(ScanResult).filter(
+            ScanResult.path == path,
+            ScanResult.success == True
+        ).order_by(ScanResult.scan_time.desc()).first()
+        
+        if existing_scan and existing_scan.permissions:
+            # Use existing scan data
+            logger.info(f"Using existing scan data for {path}")
+            # Parse JSON if stored as string
+            if isinstance(existing_scan.permissions, str):
+                try:
+                    scan_result = json.loads(existing_scan.permissions)
+                    scan_result['success'] = True  # Mark as successful since it's valid stored data
+                except json.JSONDecodeError:
+                    logger.error(f"Failed to parse stored permissions JSON for {path}")
+                    scan_result = {'success': False, 'error': 'Invalid JSON in stored scan data'}
+            else:
+                from src.db.descriptor_store import hydrate_scan_results
+                scan_result = hydrate_scan_results(db, [existing_scan])[0]
+            # Ensure it has the expected structure
+            if not isinstance(scan_result, dict):
+                scan_result = {'success': False, 'error': 'Invalid scan data format'}
+            return scan_result, existing_scan
+        
+        # Scan the path if no existing data
+        logger.warning(f"No existing scan data found for {path}")
+        logger.info(f"Attempting to scan {path} now")
+        scan_result = self.scanner.scan_path(path)
+        
+        # Store the new scan result in database for future use
+        if scan_result.get('success', False):
+            new_scan_result = ScanResult(
+                path=path,
+                scan_time=datetime.now(timezone.utc),
+                success=True,
+                permissions=scan_result,  # Store the entire result
+                error_message=None
+            )
+            db.add(new_scan_result)
+            logger.info(f"Stored new scan result for {path}")
+        else:
+            # Also store failed scans to avoid repeated attempts
+            new_scan_result = ScanResult(
+                path=path,
+                scan_time=datetime.now(timezone.utc),
+                success=False,
+                permissions=None,
+                error_message=scan_result.get('error', 'Unknown scan error')
+            )
+            db.add(new_scan_result)
+            logger.warning(f"Stored failed scan result for {path}")
+        return scan_result, None
+    
+    def iter_folder_results(self, db: Session, path: str, page_size: int = 500) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (folder path, scan result) for the target and every folder below it in its stored scan.
+
+        Nested scan results are walked through their subfolders; scans that
+        were streamed as one ScanResult row per folder are read page by page
+        from the same job.
+        """
+        scan_result, row = self._load_scan_result(db, path)
+        if not scan_result.get('success', False):
+            logger.warning(f"Failed to scan path {path}: {scan_result.get('error', 'Unknown error')}")
+            return
+        
+        if scan_result.get('subfolders'):
+            # The target itself once, then each scanned folder below it; failed folders have no ACL to check
+            yield path, scan_result
+            for subfolder in scan_result['subfolders']:
+                for folder_path, permissions in iter_tree_permissions(subfolder):
+                    yield folder_path, {'permissions': permissions}
+            return
+        
+        job_id = row.job_id if row is not None else None
+        yield path, scan_result
+        if job_id is None:
+            return
+        
+        from src.db.models import ScanResult
+        from src.db.descriptor_store import hydrate_scan_results
+        prefix = path.rstrip('\\') + '\\'
+        escaped = prefix.replace('!', '!!').replace('%', '!%').replace('_', '!_').replace('[', '![')
+        last_id = 0
+        while True:
+            # Keyset pages, so progress commits between pages never interrupt an open cursor
+            rows = db.query(ScanResult).filter(
+                ScanResult.job_id == job_id,
+                ScanResult.success == True,
+                ScanResult.id > last_id,
+                ScanResult.path.like(f"{escaped}%", escape='!')
+            ).order_by(ScanResult.id).limit(page_size).all()
+            if not rows:
+                return
+            last_id = rows[-1].id
+            # Read everything off the rows first; a commit between yields would expire them
+            page = [(folder_row.path, payload)
+                    for folder_row, payload in zip(rows, hydrate_scan_results(db, rows))
+                    if isinstance(payload, dict)]
+            yield from page
+    
     def _analyze_path_results(self, path: str, scan_result: Dict[str, Any], scan_id: int) -> List[Dict[str, Any]]:
-        """Analyze scan results for a single path and detect issues."""
-        issues = []
-        
+        """Analyze scan results for a single path and detect issues (before the significance filter)."""
+        return self.rule_engine.analyze_folder(path, scan_result, scan_id, significant_only=False)
+    
+    def _split_scan_result(self, scan_result: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """The ACEs of a scan result and the dict holding its inheritance flag."""
         # Handle different scan result formats
         # Check if this is a nested structure with 'permissions' key
         if 'permissions' in scan_result and isinstance(scan_result['permissions'], dict):
             # Extract ACEs from nested structure
-            aces = scan_result['permissions'].get('aces', [])
-            inheritance_data = scan_result['permissions']
-        else:
-            # Direct structure
-            aces = scan_result.get('aces', [])
-            inheritance_data = scan_result
-            
-        if not aces:
-            logger.warning(f"No ACEs found for path {path}")
-            logger.info(f"Scan result structure for {path}: {list(scan_result.keys())}")
-            if 'permissions' in scan_result:
-                logger.info(f"Permissions structure: {list(scan_result['permissions'].keys()) if isinstance(scan_result['permissions'], dict) else type(scan_result['permissions'])}")
-            return issues
-        
-        # Check for broken inheritance
-        inheritance_issue = self._check_broken_inheritance(path, inheritance_data)
-        if inheritance_issue:
-            inheritance_issue['health_scan_id'] = scan_id
-            issues.append(inheritance_issue)
-        
-        # Check for direct user ACEs
-        direct_user_issues = self._check_direct_user_aces(path, aces)
-        for issue in direct_user_issues:
-            issue['health_scan_id'] = scan_id
-            issues.append(issue)
-        
-        # Check for orphaned SIDs
-        orphaned_issues = self._check_orphaned_sids(path, aces)
-        for issue in orphaned_issues:
-            issue['health_scan_id'] = scan_id
-            issues.append(issue)
-        
-        # Check for excessive ACE count
-        excessive_ace_issue = self._check_excessive_ace_count(path, aces)
-        if excessive_ace_issue:
-            excessive_ace_issue['health_scan_id'] = scan_id
-            issues.append(excessive_ace_issue)
-        
-        # Check for conflicting deny order
-        conflicting_deny_issues = self._check_conflicting_deny_order(path, aces)
-        for issue in conflicting_deny_issues:
-            issue['health_scan_id'] = scan_id
-            issues.append(issue)
-        
-        # Check for over-permissive groups
-        over_permissive_issues = self._check_over_permissive_groups(path, aces)
-        for issue in over_permissive_issues:
-            issue['health_scan_id'] = scan_id
-            issues.append(issue)
-        
-        return issues
+            return scan_result['permissions'].get('aces', []), scan_result['permissions']
+        # Direct structure
+        return scan_result.get('aces', []), scan_result
     
     def _filter_significant_issues(self, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Filter out issues that are not significant or are false positives."""
@@ -316,7 +429,7 @@ class HealthAnalyzer:
                 ]
                 
                 if not non_builtin_principals:
-                    logger.info(f"Skipping direct user ACE issue for {issue.get('path')} - only affects built-in accounts")
+                    logger.debug(f"Skipping direct user ACE issue for {issue.get('path')} - only affects built-in accounts")
                     continue
                     
                 # Update the issue to only include non-builtin principals
@@ -340,151 +453,154 @@ class HealthAnalyzer:
             
         return significant_issues
     
-    def _check_broken_inheritance(self, path: str, scan_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Check if inheritance is broken (disabled)."""
+    # Trustee predicates and issue builders are shared by the per-folder checks
+    # below and the columnar evaluation in src/core/ace_table.py
+
+    BUILTIN_ACCOUNTS = ('administrator', 'guest', 'krbtgt', 'default account',
+                        'default user', 'wdagutilityaccount')
+    BUILTIN_DOMAINS = ('nt authority', 'builtin', 'nt service')
+
+    def _inheritance_enabled(self, scan_result: Dict[str, Any]) -> bool:
         # Check for inheritance_enabled in the permissions section first, then fall back to top level
         permissions = scan_result.get('permissions', {})
-        inheritance_enabled = permissions.get('inheritance_enabled', scan_result.get('inheritance_enabled', True))
-        logger.info(f"Checking broken inheritance for {path}: inheritance_enabled = {inheritance_enabled} (type: {type(inheritance_enabled)})")
-        logger.info(f"Scan result keys for inheritance check: {list(scan_result.keys())}")
-        logger.info(f"Permissions keys for inheritance check: {list(permissions.keys())}")
+        return permissions.get('inheritance_enabled', scan_result.get('inheritance_enabled', True))
+    
+    def _check_broken_inheritance(self, path: str, scan_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Check if inheritance is broken (disabled)."""
+        inheritance_enabled = self._inheritance_enabled(scan_result)
+        logger.debug(f"Checking broken inheritance for {path}: inheritance_enabled = {inheritance_enabled} (type: {type(inheritance_enabled)})")
         
         if not inheritance_enabled:
-            logger.info(f"BROKEN INHERITANCE DETECTED for {path}")
-            return {
-                'issue_type': IssueType.BROKEN_INHERITANCE,
-                'severity': IssueSeverity.MEDIUM,
-                'path': path,
-                'title': 'Inheritance Disabled',
-                'description': f'ACL inheritance is disabled for {path}, which may indicate configuration issues or security risks.',
-                'risk_score': 15.0,
-                'recommendations': 'Review why inheritance is disabled. Consider re-enabling if appropriate, or document the business justification.',
-                'acl_details': {'inheritance_enabled': inheritance_enabled},
-                'first_detected': datetime.now(timezone.utc),
-                'last_seen': datetime.now(timezone.utc)
-            }
-        else:
-            logger.info(f"No broken inheritance issue for {path} (inheritance_enabled = {inheritance_enabled})")
+            logger.debug(f"BROKEN INHERITANCE DETECTED for {path}")
+            return self._broken_inheritance_issue(path, inheritance_enabled)
         return None
     
+    def _broken_inheritance_issue(self, path: str, inheritance_enabled: Any) -> Dict[str, Any]:
+        return {
+            'issue_type': IssueType.BROKEN_INHERITANCE,
+            'severity': IssueSeverity.MEDIUM,
+            'path': path,
+            'title': 'Inheritance Disabled',
+            'description': f'ACL inheritance is disabled for {path}, which may indicate configuration issues or security risks.',
+            'risk_score': 15.0,
+            'recommendations': 'Review why inheritance is disabled. Consider re-enabling if appropriate, or document the business justification.',
+            'acl_details': {'inheritance_enabled': inheritance_enabled},
+            'first_detected': datetime.now(timezone.utc),
+            'last_seen': datetime.now(timezone.utc)
+        }
+    
+    def _is_direct_user(self, trustee: Dict[str, Any]) -> bool:
+        """A non-builtin, non-system user account (rather than a group)."""
+        trustee_name = (trustee.get('name') or '').lower()
+        trustee_domain = (trustee.get('domain') or '').lower()
+        
+        # Check if this is a built-in account that should be excluded
+        is_builtin = (trustee_name in self.BUILTIN_ACCOUNTS or 
+                     trustee_domain in self.BUILTIN_DOMAINS or
+                     trustee_name.startswith('nt ') or
+                     trustee_name.startswith('iis_'))
+        
+        # Check if this is a user (not a group)
+        # Look for user indicators in the trustee structure
+        is_user = False
+        
+        # Check if explicitly marked as user type
+        if trustee.get('type') == 'user':
+            is_user = True
+        # Check if it's a domain user (not a built-in account or group)
+        elif trustee_domain not in self.BUILTIN_DOMAINS and not trustee_name.endswith('_staff') and not trustee_name.endswith('_viewers'):
+            # Check if it has user-like characteristics
+            if '@' in trustee_name or '.' in trustee_name:
+                is_user = True
+        
+        # Exclude system accounts
+        is_system = (trustee.get('is_system', False) or 
+                    trustee_name in ['system', 'creator owner'] or
+                    trustee_domain == 'nt authority')
+        
+        # Only report non-builtin user accounts
+        return bool(is_user and not is_system and not is_builtin)
+    
     def _check_direct_user_aces(self, path: str, aces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Check for direct user ACEs (permissions granted to users instead of groups)."""
-        issues = []
-        direct_user_aces = []
-        
-        for ace in aces:
-            trustee = ace.get('trustee', {})
-            trustee_name = trustee.get('name', '').lower()
-            trustee_domain = trustee.get('domain', '').lower()
-            
-            # Check if this is a built-in account that should be excluded
-            builtin_accounts = [
-                'administrator', 'guest', 'krbtgt', 'default account',
-                'default user', 'wdagutilityaccount'
-            ]
-            builtin_domains = ['nt authority', 'builtin', 'nt service']
-            
-            is_builtin = (trustee_name in builtin_accounts or 
-                         trustee_domain in builtin_domains or
-                         trustee_name.startswith('nt ') or
-                         trustee_name.startswith('iis_'))
-            
-            # Check if this is a user (not a group)
-            # Look for user indicators in the trustee structure
-            is_user = False
-            
-            # Check if explicitly marked as user type
-            if trustee.get('type') == 'user':
-                is_user = True
-            # Check if it's a domain user (not a built-in account or group)
-            elif trustee_domain not in builtin_domains and not trustee_name.endswith('_staff') and not trustee_name.endswith('_viewers'):
-                # Check if it has user-like characteristics
-                if '@' in trustee_name or '.' in trustee_name:
-                    is_user = True
-            
-            # Exclude system accounts
-            is_system = (trustee.get('is_system', False) or 
-                        trustee_name in ['system', 'creator owner'] or
-                        trustee_domain == 'nt authority')
-            
-            # Only report non-builtin user accounts
-            if is_user and not is_system and not is_builtin:
-                direct_user_aces.append(ace)
-                logger.info(f"Found direct user ACE: {trustee.get('full_name', trustee_name)}")
+        direct_user_aces = [ace for ace in aces if self._is_direct_user(ace.get('trustee', {}))]
         
         # Report any direct user ACEs as an issue (best practice is to use groups)
-        if len(direct_user_aces) > 0:
-            severity = IssueSeverity.HIGH if len(direct_user_aces) > 5 else IssueSeverity.MEDIUM
-            
-            issues.append({
-                'issue_type': IssueType.DIRECT_USER_ACE,
-                'severity': severity,
-                'path': path,
-                'title': f'Excessive Direct User Permissions ({len(direct_user_aces)})',
-                'description': f'Found {len(direct_user_aces)} direct user ACEs in {path}. Best practice is to grant permissions to security groups instead of individual users.',
-                'risk_score': 10.0 + (len(direct_user_aces) * 2.0),
-                'affected_principals': [ace['trustee']['name'] for ace in direct_user_aces],
-                'recommendations': 'Replace direct user permissions with security group memberships. Create appropriate security groups and grant permissions to groups instead.',
-                'acl_details': {'direct_user_aces': direct_user_aces},
-                'first_detected': datetime.now(timezone.utc),
-                'last_seen': datetime.now(timezone.utc)
-            })
-        
-        return issues
+        if direct_user_aces:
+            return [self._direct_user_issue(path, direct_user_aces)]
+        return []
+    
+    def _direct_user_issue(self, path: str, direct_user_aces: List[Dict[str, Any]]) -> Dict[str, Any]:
+        severity = IssueSeverity.HIGH if len(direct_user_aces) > 5 else IssueSeverity.MEDIUM
+        
+        return {
+            'issue_type': IssueType.DIRECT_USER_ACE,
+            'severity': severity,
+            'path': path,
+            'title': f'Excessive Direct User Permissions ({len(direct_user_aces)})',
+            'description': f'Found {len(direct_user_aces)} direct user ACEs in {path}. Best practice is to grant permissions to security groups instead of individual users.',
+            'risk_score': 10.0 + (len(direct_user_aces) * 2.0),
+            'affected_principals': [ace['trustee']['name'] for ace in direct_user_aces],
+            'recommendations': 'Replace direct user permissions with security group memberships. Create appropriate security groups and grant permissions to groups instead.',
+            'acl_details': {'direct_user_aces': direct_user_aces},
+            'first_detected': datetime.now(timezone.utc),
+            'last_seen': datetime.now(timezone.utc)
+        }
+    
+    def _is_orphaned_sid(self, trustee: Dict[str, Any]) -> bool:
+        """A SID that could not be resolved to an account."""
+        return (trustee.get('name') or '').startswith('S-') and trustee.get('type') == 'unknown'
     
     def _check_orphaned_sids(self, path: str, aces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Check for orphaned SIDs (SIDs that cannot be resolved)."""
-        issues = []
-        orphaned_sids = []
-        
-        for ace in aces:
-            trustee = ace.get('trustee', {})
-            if trustee.get('name', '').startswith('S-') and trustee.get('type') == 'unknown':
-                orphaned_sids.append(ace)
+        orphaned_sids = [ace for ace in aces if self._is_orphaned_sid(ace.get('trustee', {}))]
         
         if orphaned_sids:
-            severity = IssueSeverity.MEDIUM if len(orphaned_sids) > 3 else IssueSeverity.LOW
-            
-            issues.append({
-                'issue_type': IssueType.ORPHANED_SID,
-                'severity': severity,
-                'path': path,
-                'title': f'Orphaned SIDs ({len(orphaned_sids)})',
-                'description': f'Found {len(orphaned_sids)} orphaned SIDs in {path}. These are security identifiers that cannot be resolved to user or group names.',
-                'risk_score': 5.0 + (len(orphaned_sids) * 1.0),
-                'affected_principals': [ace['trustee']['sid'] for ace in orphaned_sids],
-                'recommendations': 'Remove orphaned SIDs from ACLs. These may be from deleted users or groups and pose security risks.',
-                'acl_details': {'orphaned_sids': orphaned_sids},
-                'first_detected': datetime.now(timezone.utc),
-                'last_seen': datetime.now(timezone.utc)
-            })
-        
-        return issues
+            return [self._orphaned_sid_issue(path, orphaned_sids)]
+        return []
+    
+    def _orphaned_sid_issue(self, path: str, orphaned_sids: List[Dict[str, Any]]) -> Dict[str, Any]:
+        severity = IssueSeverity.MEDIUM if len(orphaned_sids) > 3 else IssueSeverity.LOW
+        
+        return {
+            'issue_type': IssueType.ORPHANED_SID,
+            'severity': severity,
+            'path': path,
+            'title': f'Orphaned SIDs ({len(orphaned_sids)})',
+            'description': f'Found {len(orphaned_sids)} orphaned SIDs in {path}. These are security identifiers that cannot be resolved to user or group names.',
+            'risk_score': 5.0 + (len(orphaned_sids) * 1.0),
+            'affected_principals': [ace['trustee']['sid'] for ace in orphaned_sids],
+            'recommendations': 'Remove orphaned SIDs from ACLs. These may be from deleted users or groups and pose security risks.',
+            'acl_details': {'orphaned_sids': orphaned_sids},
+            'first_detected': datetime.now(timezone.utc),
+            'last_seen': datetime.now(timezone.utc)
+        }
     
     def _check_excessive_ace_count(self, path: str, aces: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """Check for excessive number of ACEs."""
         ace_count = len(aces)
         if ace_count > self.config.max_ace_count_threshold:
-            severity = IssueSeverity.HIGH if ace_count > 100 else IssueSeverity.MEDIUM
-            
-            return {
-                'issue_type': IssueType.EXCESSIVE_ACE_COUNT,
-                'severity': severity,
-                'path': path,
-                'title': f'Excessive ACE Count ({ace_count})',
-                'description': f'Path {path} has {ace_count} ACEs, which exceeds the recommended maximum of {self.config.max_ace_count_threshold}.',
-                'risk_score': 20.0 + (ace_count * 0.5),
-                'recommendations': 'Consolidate permissions by using security groups instead of individual ACEs. Review and remove unnecessary permissions.',
-                'acl_details': {'ace_count': ace_count, 'threshold': self.config.max_ace_count_threshold},
-                'first_detected': datetime.now(timezone.utc),
-                'last_seen': datetime.now(timezone.utc)
-            }
+            return self._excessive_ace_count_issue(path, ace_count)
         return None
     
-    def _check_conflicting_deny_order(self, path: str, aces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Check for deny ACEs that come after allow ACEs (order matters)."""
-        issues = []
-        
+    def _excessive_ace_count_issue(self, path: str, ace_count: int) -> Dict[str, Any]:
+        severity = IssueSeverity.HIGH if ace_count > 100 else IssueSeverity.MEDIUM
+        
+        return {
+            'issue_type': IssueType.EXCESSIVE_ACE_COUNT,
+            'severity': severity,
+            'path': path,
+            'title': f'Excessive ACE Count ({ace_count})',
+            'description': f'Path {path} has {ace_count} ACEs, which exceeds the recommended maximum of {self.config.max_ace_count_threshold}.',
+            'risk_score': 20.0 + (ace_count * 0.5),
+            'recommendations': 'Consolidate permissions by using security groups instead of individual ACEs. Review and remove unnecessary permissions.',
+            'acl_details': {'ace_count': ace_count, 'threshold': self.config.max_ace_count_threshold},
+            'first_detected': datetime.now(timezone.utc),
+            'last_seen': datetime.now(timezone.utc)
+        }
+    
+    def _conflicting_trustees(self, aces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deny ACEs that come after an allow ACE for the same trustee SID, one entry per such deny."""
         # Find deny ACEs that come after allow ACEs for the same trustee
         trustee_aces = {}
         for i, ace in enumerate(aces):
@@ -512,58 +628,83 @@ class HealthAnalyzer:
                         'deny_index': deny_idx,
                         'allow_indices': [idx for idx in allow_indices if idx < deny_idx]
                     })
-        
+        return conflicting_trustees
+    
+    def _check_conflicting_deny_order(self, path: str, aces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Check for deny ACEs that come after allow ACEs (order matters)."""
+        conflicting_trustees = self._conflicting_trustees(aces)
         if conflicting_trustees:
-            issues.append({
-                'issue_type': IssueType.CONFLICTING_DENY_ORDER,
-                'severity': IssueSeverity.HIGH,
-                'path': path,
-                'title': f'Conflicting ACE Order ({len(conflicting_trustees)} trustees)',
-                'description': f'Found deny ACEs that come after allow ACEs for the same trustees in {path}. This may result in ineffective access control.',
-                'risk_score': 25.0 + (len(conflicting_trustees) * 5.0),
-                'affected_principals': [ct['trustee']['name'] for ct in conflicting_trustees],
-                'recommendations': 'Reorder ACEs so that deny ACEs come before allow ACEs. Review ACL structure and remove conflicting permissions.',
-                'acl_details': {'conflicting_trustees': conflicting_trustees},
-                'first_detected': datetime.now(timezone.utc),
-                'last_seen': datetime.now(timezone.utc)
-            })
-        
-        return issues
+            return [self._conflicting_deny_issue(path, conflicting_trustees)]
+        return []
+    
+    def _conflicting_deny_issue(self, path: str, conflicting_trustees: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            'issue_type': IssueType.CONFLICTING_DENY_ORDER,
+            'severity': IssueSeverity.HIGH,
+            'path': path,
+            'title': f'Conflicting ACE Order ({len(conflicting_trustees)} trustees)',
+            'description': f'Found deny ACEs that come after allow ACEs for the same trustees in {path}. This may result in ineffective access control.',
+            'risk_score': 25.0 + (len(conflicting_trustees) * 5.0),
+            'affected_principals': [ct['trustee']['name'] for ct in conflicting_trustees],
+            'recommendations': 'Reorder ACEs so that deny ACEs come before allow ACEs. Review ACL structure and remove conflicting permissions.',
+            'acl_details': {'conflicting_trustees': conflicting_trustees},
+            'first_detected': datetime.now(timezone.utc),
+            'last_seen': datetime.now(timezone.utc)
+        }
+    
+    def _is_critical_group(self, trustee: Dict[str, Any]) -> bool:
+        """A trustee whose name contains one of the configured high-privilege groups."""
+        trustee_name = (trustee.get('name') or '').lower()
+        return any(cg.lower() in trustee_name for cg in self.config.critical_groups)
     
     def _check_over_permissive_groups(self, path: str, aces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Check for over-permissive group permissions."""
-        issues = []
-        critical_group_aces = []
-        
-        for ace in aces:
-            trustee = ace.get('trustee', {})
-            trustee_name = trustee.get('name', '')
-            
-            if ace.get('type') == 'allow' and any(cg.lower() in trustee_name.lower() for cg in self.config.critical_groups):
-                critical_group_aces.append(ace)
+        critical_group_aces = [
+            ace for ace in aces
+            if ace.get('type') == 'allow' and self._is_critical_group(ace.get('trustee', {}))
+        ]
         
         if critical_group_aces:
-            severity = IssueSeverity.CRITICAL if len(critical_group_aces) > 2 else IssueSeverity.HIGH
-            
-            issues.append({
-                'issue_type': IssueType.OVER_PERMISSIVE_GROUPS,
-                'severity': severity,
-                'path': path,
-                'title': f'Over-Permissive Group Access ({len(critical_group_aces)})',
-                'description': f'Found {len(critical_group_aces)} ACEs granting permissions to high-privilege groups in {path}.',
-                'risk_score': 25.0 + (len(critical_group_aces) * 10.0),
-                'affected_principals': [ace['trustee']['name'] for ace in critical_group_aces],
-                'recommendations': 'Review permissions granted to high-privilege groups. Use principle of least privilege and create more specific security groups.',
-                'acl_details': {'critical_group_aces': critical_group_aces},
-                'first_detected': datetime.now(timezone.utc),
-                'last_seen': datetime.now(timezone.utc)
-            })
-        
-        return issues
+            return [self._over_permissive_issue(path, critical_group_aces)]
+        return []
+    
+    def _over_permissive_issue(self, path: str, critical_group_aces: List[Dict[str, Any]]) -> Dict[str, Any]:
+        severity = IssueSeverity.CRITICAL if len(critical_group_aces) > 2 else IssueSeverity.HIGH
+        
+        return {
+            'issue_type': IssueType.OVER_PERMISSIVE_GROUPS,
+            'severity': severity,
+            'path': path,
+            'title': f'Over-Permissive Group Access ({len(critical_group_aces)})',
+            'description': f'Found {len(critical_group_aces)} ACEs granting permissions to high-privilege groups in {path}.',
+            'risk_score': 25.0 + (len(critical_group_aces) * 10.0),
+            'affected_principals': [ace['trustee']['name'] for ace in critical_group_aces],
+            'recommendations': 'Review permissions granted to high-privilege groups. Use principle of least privilege and create more specific security groups.',
+            'acl_details': {'critical_group_aces': critical_group_aces},
+            'first_detected': datetime.now(timezone.utc),
+            'last_seen': datetime.now(timezone.utc)
+        }
     
     def _calculate_health_score(self, issues: List[Dict[str, Any]]) -> float:
         """Calculate overall health score based on detected issues."""
-        if not issues:
+        return self._score_from_totals(self._issue_totals(issues))
+    
+    def _issue_totals(self, issues: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Issue counts per issue type and severity, keyed by totals_key."""
+        totals = {}
+        for issue in issues:
+            key = totals_key(issue['issue_type'], issue['severity'])
+            totals[key] = totals.get(key, 0) + 1
+        return totals
+    
+    def _iter_totals(self, totals: Dict[str, int]) -> Iterator[Tuple[IssueType, IssueSeverity, int]]:
+        for key, count in totals.items():
+            issue_type, severity = key.split(':', 1)
+            yield IssueType(issue_type), IssueSeverity(severity), count
+    
+    def _score_from_totals(self, totals: Dict[str, int]) -> float:
+        """Calculate the health score from issue counts per type and severity."""
+        if not any(totals.values()):
             return 100.0
         
         total_risk = 0.0
@@ -576,14 +717,11 @@ class HealthAnalyzer:
             IssueSeverity.CRITICAL: 1.0
         }
         
-        for issue in issues:
-            issue_type = issue['issue_type']
-            severity = issue['severity']
-            
+        for issue_type, severity, count in self._iter_totals(totals):
             base_weight = self.config.score_weights.get(issue_type.value, 10.0)
             severity_multiplier = severity_multipliers.get(severity, 0.5)
             
-            total_risk += base_weight * severity_multiplier
+            total_risk += base_weight * severity_multiplier * count
         
         # Cap total risk at max possible risk
         total_risk = min(total_risk, max_possible_risk)
@@ -594,21 +732,32 @@ class HealthAnalyzer:
         
         return round(score, 1)
     
-    def _create_health_metrics(self, scan_id: int, issues: List[Dict[str, Any]], score: float, paths_scanned: int) -> HealthMetrics:
+    def _record_scores(self, db: Session, scan_id: int, totals: Dict[str, int], score: float, paths_scanned: int) -> None:
+        """Add the HealthMetrics and HealthScoreHistory rows of a scan."""
+        db.add(self._create_health_metrics(scan_id, totals, score, paths_scanned))
+        db.add(HealthScoreHistory(
+            timestamp=datetime.now(timezone.utc),
+            score=score,
+            issue_count=sum(totals.values()),
+            scan_id=scan_id,
+            **self._get_severity_counts_for_history(totals)
+        ))
+    
+    def _create_health_metrics(self, scan_id: int, totals: Dict[str, int], score: float, paths_scanned: int) -> HealthMetrics:
         """Create health metrics record."""
-        severity_counts = self._get_severity_counts(issues)
-        type_counts = self._get_type_counts(issues)
+        severity_counts = self._get_severity_counts(totals)
+        type_counts = self._get_type_counts(totals)
         
         return HealthMetrics(
             scan_date=datetime.now(timezone.utc),
             overall_score=score,
-            total_issues=len(issues),
+            total_issues=sum(totals.values()),
             total_paths_scanned=paths_scanned,
             **severity_counts,
             **type_counts
         )
     
-    def _get_severity_counts(self, issues: List[Dict[str, Any]]) -> Dict[str, int]:
+    def _get_severity_counts(self, totals: Dict[str, int]) -> Dict[str, int]:
         """Get issue counts by severity."""
         counts = {
             'critical_issues': 0,
@@ -617,20 +766,12 @@ class HealthAnalyzer:
             'low_issues': 0
         }
         
-        for issue in issues:
-            severity = issue['severity']
-            if severity == IssueSeverity.CRITICAL:
-                counts['critical_issues'] += 1
-            elif severity == IssueSeverity.HIGH:
-                counts['high_issues'] += 1
-            elif severity == IssueSeverity.MEDIUM:
-                counts['medium_issues'] += 1
-            elif severity == IssueSeverity.LOW:
-                counts['low_issues'] += 1
+        for _, severity, count in self._iter_totals(totals):
+            counts[f'{severity.value}_issues'] += count
         
         return counts
     
-    def _get_severity_counts_for_history(self, issues: List[Dict[str, Any]]) -> Dict[str, int]:
+    def _get_severity_counts_for_history(self, totals: Dict[str, int]) -> Dict[str, int]:
         """Get issue counts by severity for HealthScoreHistory (uses _count suffix)."""
         counts = {
             'critical_count': 0,
@@ -639,20 +780,12 @@ class HealthAnalyzer:
             'low_count': 0
         }
         
-        for issue in issues:
-            severity = issue['severity']
-            if severity == IssueSeverity.CRITICAL:
-                counts['critical_count'] += 1
-            elif severity == IssueSeverity.HIGH:
-                counts['high_count'] += 1
-            elif severity == IssueSeverity.MEDIUM:
-                counts['medium_count'] += 1
-            elif severity == IssueSeverity.LOW:
-                counts['low_count'] += 1
+        for _, severity, count in self._iter_totals(totals):
+            counts[f'{severity.value}_count'] += count
         
         return counts
     
-    def _get_type_counts(self, issues: List[Dict[str, Any]]) -> Dict[str, int]:
+    def _get_type_counts(self, totals: Dict[str, int]) -> Dict[str, int]:
         """Get issue counts by type."""
         counts = {
             'broken_inheritance_count': 0,
@@ -663,20 +796,10 @@ class HealthAnalyzer:
             'over_permissive_groups_count': 0
         }
         
-        for issue in issues:
-            issue_type = issue['issue_type']
-            if issue_type == IssueType.BROKEN_INHERITANCE:
-                counts['broken_inheritance_count'] += 1
-            elif issue_type == IssueType.DIRECT_USER_ACE:
-                counts['direct_user_ace_count'] += 1
-            elif issue_type == IssueType.ORPHANED_SID:
-                counts['orphaned_sid_count'] += 1
-            elif issue_type == IssueType.EXCESSIVE_ACE_COUNT:
-                counts['excessive_ace_count'] += 1
-            elif issue_type == IssueType.CONFLICTING_DENY_ORDER:
-                counts['conflicting_deny_order_count'] += 1
-            elif issue_type == IssueType.OVER_PERMISSIVE_GROUPS:
-                counts['over_permissive_groups_count'] += 1
+        for issue_type, _, count in self._iter_totals(totals):
+            # The excessive ACE column is not suffixed twice
+            column = 'excessive_ace_count' if issue_type == IssueType.EXCESSIVE_ACE_COUNT else f'{issue_type.value}_count'
+            counts[column] += count
         
         return counts
     
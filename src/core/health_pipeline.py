@@ -0,0 +1,192 @@
+# src/core/health_pipeline.py
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from src.core.ace_table import HAS_NUMPY
+from src.core.health_rules import RuleStats
+
+logger = logging.getLogger(__name__)
+
+# (folder path, scan result) as accepted by HealthAnalyzer._analyze_path_results
+FolderResult = Tuple[str, Dict[str, Any]]
+
+# Analyzer of an analysis worker process, built once by _init_worker
+_worker_analyzer = None
+
+
+def _init_worker(config) -> None:
+    global _worker_analyzer
+    from src.core.health_analyzer import HealthAnalyzer
+    # Per-folder check logging from several processes would only interleave
+    logging.getLogger('src.core.health_analyzer').setLevel(logging.WARNING)
+    _worker_analyzer = HealthAnalyzer(config)
+
+
+ChunkResult = Tuple[int, List[Dict[str, Any]], List[str], Dict[str, Any]]
+
+
+def analyze_chunk(analyzer, chunk: List[FolderResult], scan_id: int) -> ChunkResult:
+    """
+    Run the registered rules over a chunk of folders.
+
+    Returns (folders analyzed, significant issues, failed paths, rule
+    statistics in RuleStats.as_dict() form).
+    """
+    engine = analyzer.rule_engine
+    if analyzer.config.vectorized and HAS_NUMPY:
+        stats = RuleStats()
+        try:
+            return len(chunk), engine.analyze_table(chunk, scan_id, stats), [], stats.as_dict()
+        except Exception as e:
+            # Malformed scan data; the folder-by-folder checks isolate and count the bad folders
+            logger.warning(f"Vectorized analysis of {len(chunk)} folders failed, checking them one by one: {str(e)}")
+
+    stats = RuleStats()
+    issues = []
+    failed = []
+    for path, scan_result in chunk:
+        try:
+            issues.extend(engine.analyze_folder(path, scan_result, scan_id, stats))
+        except Exception as e:
+            failed.append(path)
+            logger.error(f"Error analyzing {path}: {str(e)}")
+    return len(chunk), issues, failed, stats.as_dict()
+
+
+def _analyze_chunk_in_worker(chunk: List[FolderResult], scan_id: int):
+    return analyze_chunk(_worker_analyzer, chunk, scan_id)
+
+
+class HealthAnalysisPipeline:
+    """
+    Streams every folder of the stored scan trees through the health rules.
+
+    The calling thread reads folder records target by target and hands them
+    in chunks to a process pool; at most two chunks per worker are in flight,
+    so memory stays flat however large the trees are. Issues are merged
+    centrally, one per folder and issue type, and progress (folders done,
+    folders found so far, folders/sec) is written to the HealthScan row
+    every progress_interval_seconds.
+    """
+
+    def __init__(self, analyzer, db, scan):
+        self.analyzer = analyzer
+        self.db = db
+        self.scan = scan
+        self.scan_id = scan.id
+        config = analyzer.config
+        self.workers = config.workers or os.cpu_count() or 1
+        self.chunk_size = max(1, config.chunk_size)
+        self.progress_interval = config.progress_interval_seconds
+        self.discovered = 0
+        self.processed = 0
+        self.targets_done = 0
+        self.analyzed_paths: Set[str] = set()    # folders the rules ran on
+        self.failed_paths = set()                 # folders the rules could not be run on
+        self.rule_stats = RuleStats()
+        self._issues: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        self._started = 0.0
+        self._last_progress = 0.0
+
+    def run(self, target_paths: List[str]) -> Tuple[List[Dict[str, Any]], Set[str]]:
+        """
+        Analyze all targets; returns the merged significant issues and the folders analyzed.
+
+        Only the analyzed folders may have their issues reconciled: a target
+        whose stored tree could not be read, or a folder that failed in the
+        rules, says nothing about the issues recorded for it.
+        """
+        self._started = self._last_progress = time.perf_counter()
+        chunks = self._chunks(self._folders(target_paths))
+
+        if self.workers <= 1:
+            for chunk in chunks:
+                self._merge(analyze_chunk(self.analyzer, chunk, self.scan_id))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(self.analyzer.config,)) as pool:
+                in_flight = set()
+                for chunk in chunks:
+                    if len(in_flight) >= self.workers * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._merge(future.result())
+                    in_flight.add(pool.submit(_analyze_chunk_in_worker, chunk, self.scan_id))
+                for future in wait(in_flight).done:
+                    self._merge(future.result())
+
+        self.analyzed_paths -= self.failed_paths
+        self._report_progress(final=True)
+        logger.info(f"Health scan {self.scan_id}: analyzed {self.processed} folders under {len(target_paths)} targets "
+                    f"at {self.folders_per_second:.0f} folders/sec with {self.workers} workers, "
+                    f"{len(self._issues)} issues, {self.errors} errors")
+        return list(self._issues.values()), self.analyzed_paths
+
+    @property
+    def folders_per_second(self) -> float:
+        elapsed = time.perf_counter() - self._started
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def _folders(self, target_paths: Iterable[str]) -> Iterator[FolderResult]:
+        for path in target_paths:
+            try:
+                for folder in self.analyzer.iter_folder_results(self.db, path):
+                    self.discovered += 1
+                    self.analyzed_paths.add(folder[0])
+                    yield folder
+            except Exception as e:
+                logger.error(f"Error reading scan data for {path}: {str(e)}")
+            self.targets_done += 1
+
+    def _chunks(self, folders: Iterator[FolderResult]) -> Iterator[List[FolderResult]]:
+        chunk = []
+        for folder in folders:
+            chunk.append(folder)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @property
+    def errors(self) -> int:
+        return len(self.failed_paths)
+
+    def _merge(self, result: ChunkResult) -> None:
+        analyzed, issues, failed, rule_stats = result
+        self.processed += analyzed
+        self.failed_paths.update(failed)
+        self.rule_stats.merge(rule_stats)
+        for issue in issues:
+            # A folder reached through two overlapping targets keeps its first issue of each type
+            self._issues.setdefault((issue['path'], issue['issue_type']), issue)
+        if time.perf_counter() - self._last_progress >= self.progress_interval:
+            self._report_progress()
+
+    def _report_progress(self, final: bool = False) -> None:
+        self._last_progress = time.perf_counter()
+        try:
+            self.scan.processed_paths = self.processed
+            self.scan.total_paths = max(self.discovered, self.processed)
+            self.scan.issues_found = len(self._issues)
+            # Reassigned so the JSON column is flagged as changed
+            self.scan.scan_parameters = {
+                **(self.scan.scan_parameters or {}),
+                'progress': {
+                    'folders_processed': self.processed,
+                    'folders_discovered': self.discovered,
+                    'targets_done': self.targets_done,
+                    'folders_per_second': round(self.folders_per_second, 1),
+                    'workers': self.workers,
+                    'errors': self.errors,
+                    'complete': final
+                },
+                'rule_stats': self.rule_stats.as_dict()
+            }
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Error updating progress of health scan {self.scan_id}: {str(e)}")
@@ -0,0 +1,369 @@
+# src/core/health_rules.py
+import importlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.core.ace_table import AceTable, FLAG_CRITICAL_GROUP, FLAG_DIRECT_USER, FLAG_ORPHANED_SID, TYPE_ALLOW, np
+from src.db.models.health import IssueType
+
+logger = logging.getLogger(__name__)
+
+
+class Folder(NamedTuple):
+    """What a rule sees of one folder."""
+    path: str
+    aces: List[Dict[str, Any]]
+    inheritance_enabled: Any
+
+
+def _field(ace: Dict[str, Any], name: str) -> Any:
+    value = ace
+    for part in name.split('.'):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+class HealthRule:
+    """
+    A health check, invoked by the RuleEngine for every folder with ACEs.
+
+    fields names the inputs the rule reads: ACE fields in dotted form
+    ('type', 'trustee.name'), or the folder-level 'inheritance_enabled' and
+    'ace_count'. match() returns a finding that depends on those inputs
+    only (not on the path), or None; build() turns a finding into an issue
+    for a folder. Because of that split, a cacheable rule is skipped for a
+    folder whose inputs equal ones it has already seen.
+
+    Rules that can also be written as array operations over an AceTable
+    implement evaluate() (per-path hit counts) and table_finding(); others
+    are run folder by folder in vectorized mode as well.
+    """
+
+    name: str = ''
+    issue_type: IssueType = None
+    fields: Tuple[str, ...] = ()
+    cacheable: bool = True
+
+    def input_key(self, folder: Folder) -> Tuple:
+        key = []
+        for name in self.fields:
+            if name == 'inheritance_enabled':
+                key.append(folder.inheritance_enabled)
+            elif name == 'ace_count':
+                key.append(len(folder.aces))
+            else:
+                key.append(tuple(_field(ace, name) for ace in folder.aces))
+        return tuple(key)
+
+    def match(self, analyzer, folder: Folder) -> Any:
+        raise NotImplementedError
+
+    def build(self, analyzer, folder: Folder, finding: Any) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def evaluate(self, analyzer, table: AceTable):
+        """Per-path hit counts over the whole table, or None without an array form."""
+        return None
+
+    def table_finding(self, analyzer, table: AceTable, path_id: int, folder: Folder) -> Any:
+        return self.match(analyzer, folder)
+
+
+class BrokenInheritanceRule(HealthRule):
+    name = IssueType.BROKEN_INHERITANCE.value
+    issue_type = IssueType.BROKEN_INHERITANCE
+    fields = ('inheritance_enabled',)
+    cacheable = False
+
+    def match(self, analyzer, folder):
+        return None if folder.inheritance_enabled else folder.inheritance_enabled
+
+    def build(self, analyzer, folder, finding):
+        return analyzer._broken_inheritance_issue(folder.path, finding)
+
+    def evaluate(self, analyzer, table):
+        return table.has_aces & ~table.inheritance_flags
+
+    def table_finding(self, analyzer, table, path_id, folder):
+        return folder.inheritance_enabled
+
+
+class _FlaggedAceRule(HealthRule):
+    """Rules that pick out ACEs; the finding is their positions in the DACL."""
+
+    def selects(self, analyzer, ace: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    def table_mask(self, table: AceTable, rows: slice = slice(None)):
+        """Selected ACEs among the given table rows."""
+        raise NotImplementedError
+
+    def match(self, analyzer, folder):
+        positions = [i for i, ace in enumerate(folder.aces) if self.selects(analyzer, ace)]
+        return positions or None
+
+    def evaluate(self, analyzer, table):
+        return table.per_path(self.table_mask(table))
+
+    def table_finding(self, analyzer, table, path_id, folder):
+        return np.flatnonzero(self.table_mask(table, table.path_slice(path_id))).tolist()
+
+    def selected(self, folder: Folder, positions: List[int]) -> List[Dict[str, Any]]:
+        return [folder.aces[i] for i in positions]
+
+
+class DirectUserAceRule(_FlaggedAceRule):
+    name = IssueType.DIRECT_USER_ACE.value
+    issue_type = IssueType.DIRECT_USER_ACE
+    fields = ('trustee.name', 'trustee.domain', 'trustee.type', 'trustee.is_system')
+
+    def selects(self, analyzer, ace):
+        return analyzer._is_direct_user(ace.get('trustee', {}))
+
+    def table_mask(self, table, rows=slice(None)):
+        return (table.flags[rows] & FLAG_DIRECT_USER) != 0
+
+    def build(self, analyzer, folder, finding):
+        return analyzer._direct_user_issue(folder.path, self.selected(folder, finding))
+
+
+class OrphanedSidRule(_FlaggedAceRule):
+    name = IssueType.ORPHANED_SID.value
+    issue_type = IssueType.ORPHANED_SID
+    fields = ('trustee.name', 'trustee.type')
+
+    def selects(self, analyzer, ace):
+        return analyzer._is_orphaned_sid(ace.get('trustee', {}))
+
+    def table_mask(self, table, rows=slice(None)):
+        return (table.flags[rows] & FLAG_ORPHANED_SID) != 0
+
+    def build(self, analyzer, folder, finding):
+        return analyzer._orphaned_sid_issue(folder.path, self.selected(folder, finding))
+
+
+class ExcessiveAceCountRule(HealthRule):
+    name = IssueType.EXCESSIVE_ACE_COUNT.value
+    issue_type = IssueType.EXCESSIVE_ACE_COUNT
+    fields = ('ace_count',)
+    cacheable = False
+
+    def match(self, analyzer, folder):
+        return len(folder.aces) if len(folder.aces) > analyzer.config.max_ace_count_threshold else None
+
+    def build(self, analyzer, folder, finding):
+        return analyzer._excessive_ace_count_issue(folder.path, finding)
+
+    def evaluate(self, analyzer, table):
+        return table.ace_count > analyzer.config.max_ace_count_threshold
+
+    def table_finding(self, analyzer, table, path_id, folder):
+        return len(folder.aces)
+
+
+class ConflictingDenyOrderRule(HealthRule):
+    name = IssueType.CONFLICTING_DENY_ORDER.value
+    issue_type = IssueType.CONFLICTING_DENY_ORDER
+    fields = ('type', 'trustee.sid')
+
+    def match(self, analyzer, folder):
+        return len(analyzer._conflicting_trustees(folder.aces)) or None
+
+    def build(self, analyzer, folder, finding):
+        # The report carries trustee details, so it is rebuilt from this folder's ACEs
+        return analyzer._conflicting_deny_issue(folder.path, analyzer._conflicting_trustees(folder.aces))
+
+    def evaluate(self, analyzer, table):
+        return table.deny_after_allow_counts()
+
+
+class OverPermissiveGroupsRule(_FlaggedAceRule):
+    name = IssueType.OVER_PERMISSIVE_GROUPS.value
+    issue_type = IssueType.OVER_PERMISSIVE_GROUPS
+    fields = ('type', 'trustee.name')
+
+    def selects(self, analyzer, ace):
+        return ace.get('type') == 'allow' and analyzer._is_critical_group(ace.get('trustee', {}))
+
+    def table_mask(self, table, rows=slice(None)):
+        return (table.type[rows] == TYPE_ALLOW) & ((table.flags[rows] & FLAG_CRITICAL_GROUP) != 0)
+
+    def build(self, analyzer, folder, finding):
+        return analyzer._over_permissive_issue(folder.path, self.selected(folder, finding))
+
+
+# Registered rules, in the order their issues are reported for a folder
+_registry: List[HealthRule] = []
+
+
+def register_rule(rule: HealthRule) -> HealthRule:
+    """Add a rule to the registry; a rule with the same name is replaced in place."""
+    for i, existing in enumerate(_registry):
+        if existing.name == rule.name:
+            _registry[i] = rule
+            return rule
+    _registry.append(rule)
+    return rule
+
+
+def get_rules() -> List[HealthRule]:
+    return list(_registry)
+
+
+for _rule in (BrokenInheritanceRule(), DirectUserAceRule(), OrphanedSidRule(),
+              ExcessiveAceCountRule(), ConflictingDenyOrderRule(), OverPermissiveGroupsRule()):
+    register_rule(_rule)
+
+
+class RuleStats:
+    """Per-rule wall time, invocations, skips (inputs already seen) and issues emitted."""
+
+    def __init__(self):
+        self.rules: Dict[str, Dict[str, float]] = {}
+        self.table_seconds = 0.0
+
+    def record(self, name: str, seconds: float = 0.0, invocations: int = 0,
+               skipped: int = 0, issues: int = 0) -> None:
+        entry = self.rules.get(name)
+        if entry is None:
+            entry = self.rules[name] = {'invocations': 0, 'skipped': 0, 'issues': 0, 'seconds': 0.0}
+        entry['seconds'] += seconds
+        entry['invocations'] += invocations
+        entry['skipped'] += skipped
+        entry['issues'] += issues
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """Add the as_dict() form of another RuleStats, e.g. from an analysis worker."""
+        for name, entry in other.get('rules', {}).items():
+            self.record(name, **entry)
+        self.table_seconds += other.get('table_seconds', 0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'rules': {name: {**entry, 'seconds': round(entry['seconds'], 4)} for name, entry in self.rules.items()},
+            'table_seconds': round(self.table_seconds, 4)
+        }
+
+
+class RuleEngine:
+    """
+    Runs the registered rules over folders, one at a time or as a columnar batch.
+
+    Findings of cacheable rules are kept in a per-rule LRU keyed by the
+    rule's inputs (rule_cache_size entries), so folders whose inputs were
+    already evaluated - identical inherited ACLs, or folders unchanged since
+    an earlier scan in the same process - skip the rule. Issues are passed
+    through the analyzer's significance filter before they are counted.
+    Plugin rules are registered by importing the modules listed in the
+    rule_modules setting, in the scanning process and in every worker.
+    """
+
+    def __init__(self, analyzer, rules: Iterable[HealthRule] = None):
+        self.analyzer = analyzer
+        for module in analyzer.config.rule_modules or ():
+            # Plugin modules register their rules on import
+            importlib.import_module(module)
+        self.rules = list(rules) if rules is not None else get_rules()
+        self.cache_size = analyzer.config.rule_cache_size
+        self._findings: Dict[str, OrderedDict] = {rule.name: OrderedDict() for rule in self.rules}
+
+    def analyze_folder(self, path: str, scan_result: Dict[str, Any], scan_id: int,
+                       stats: Optional[RuleStats] = None, significant_only: bool = True) -> List[Dict[str, Any]]:
+        """Issues of one folder; only those passing the analyzer's significance filter unless significant_only is off."""
+        aces, inheritance_data = self.analyzer._split_scan_result(scan_result)
+        if not aces:
+            logger.debug(f"No ACEs found for path {path}")
+            return []
+        folder = Folder(path, aces, self.analyzer._inheritance_enabled(inheritance_data))
+
+        issues = []
+        for rule in self.rules:
+            started = time.perf_counter()
+            finding, skipped = self._match(rule, folder)
+            emitted = self._emit(rule, folder, finding, scan_id, significant_only) if finding is not None else []
+            issues.extend(emitted)
+            if stats is not None:
+                stats.record(rule.name, time.perf_counter() - started, 1, int(skipped), len(emitted))
+        return issues
+
+    def analyze_table(self, folders: List[Tuple[str, Dict[str, Any]]], scan_id: int,
+                      stats: Optional[RuleStats] = None) -> List[Dict[str, Any]]:
+        """Significant issues of a batch of folders, with array rules evaluated over one AceTable."""
+        stats = stats if stats is not None else RuleStats()
+        started = time.perf_counter()
+        table = AceTable.from_folders(self.analyzer, folders)
+        table.classify_trustees(self.analyzer)
+        stats.table_seconds += time.perf_counter() - started
+        with_aces = np.flatnonzero(table.has_aces)
+
+        # Per rule, per-path hits (array rules) or findings by path (the others)
+        hits: Dict[str, Any] = {}
+        findings: Dict[str, Dict[int, Any]] = {}
+        for rule in self.rules:
+            started = time.perf_counter()
+            rule_hits = rule.evaluate(self.analyzer, table)
+            skipped = 0
+            if rule_hits is None:
+                findings[rule.name] = {}
+                for path_id in with_aces:
+                    finding, was_skipped = self._match(rule, self._folder(table, path_id))
+                    skipped += was_skipped
+                    if finding is not None:
+                        findings[rule.name][int(path_id)] = finding
+            else:
+                hits[rule.name] = rule_hits
+            stats.record(rule.name, time.perf_counter() - started, len(with_aces), skipped)
+
+        flagged = np.zeros(len(table.paths), dtype=bool)
+        for rule_hits in hits.values():
+            flagged |= rule_hits > 0
+        for rule_findings in findings.values():
+            flagged[list(rule_findings)] = True
+
+        issues = []
+        for path_id in np.flatnonzero(flagged):
+            folder = self._folder(table, path_id)
+            for rule in self.rules:
+                started = time.perf_counter()
+                if rule.name in hits:
+                    if not hits[rule.name][path_id]:
+                        continue
+                    finding = rule.table_finding(self.analyzer, table, path_id, folder)
+                else:
+                    finding = findings[rule.name].get(int(path_id))
+                    if finding is None:
+                        continue
+                emitted = self._emit(rule, folder, finding, scan_id)
+                issues.extend(emitted)
+                stats.record(rule.name, time.perf_counter() - started, issues=len(emitted))
+        return issues
+
+    def _folder(self, table: AceTable, path_id: int) -> Folder:
+        return Folder(table.paths[path_id], table.aces[table.path_slice(path_id)], table.inheritance[path_id])
+
+    def _match(self, rule: HealthRule, folder: Folder) -> Tuple[Any, bool]:
+        """The rule's finding for a folder, and whether it came from the cache."""
+        if not (rule.cacheable and self.cache_size):
+            return rule.match(self.analyzer, folder), False
+        cache = self._findings.setdefault(rule.name, OrderedDict())
+        try:
+            key = rule.input_key(folder)
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key], True
+        except TypeError:
+            # Unhashable input values; evaluate without caching
+            return rule.match(self.analyzer, folder), False
+        finding = rule.match(self.analyzer, folder)
+        cache[key] = finding
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return finding, False
+
+    def _emit(self, rule: HealthRule, folder: Folder, finding: Any, scan_id: int,
+              significant_only: bool = True) -> List[Dict[str, Any]]:
+        issue = rule.build(self.analyzer, folder, finding)
+        issue['health_scan_id'] = scan_id
+        return self.analyzer._filter_significant_issues([issue]) if significant_only else [issue]
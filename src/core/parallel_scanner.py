@@ -0,0 +1,473 @@
+# src/core/parallel_scanner.py
+import os
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.core.scan_baseline import ScanBaseline
+from src.utils.logger import setup_logger
+
+logger = setup_logger('parallel_scanner')
+
+# Reads the permissions of a single folder, e.g. a partial of
+# PermissionScanner.get_folder_permissions or a synthetic source for benchmarks.
+AclReader = Callable[[str], Dict]
+
+# Reads the permissions of several folders at once, resolving their SIDs in one
+# pass, e.g. a partial of PermissionScanner.get_folder_permissions_batch.
+BatchAclReader = Callable[[List[str]], Dict[str, Dict]]
+
+# Returns a folder's descriptor fingerprint without resolving SIDs, or None.
+FingerprintReader = Callable[[str], Optional[str]]
+
+# Incremental scan outcome per folder
+STATUS_REANALYZED = "reanalyzed"  # new or changed since the baseline, fully analyzed
+STATUS_UNCHANGED = "unchanged"    # fingerprint matched, baseline result reused
+
+# Frontier item: (path, parent_path, depth, index among parent's children)
+_FrontierItem = Tuple[str, Optional[str], int, int]
+
+_WORKER_DONE = object()
+
+
+@dataclass
+class FolderRecord:
+    """Result of visiting a single folder during a tree walk."""
+    path: str
+    parent: Optional[str]
+    depth: int
+    index: int
+    scan_time: str = ""
+    permissions: Optional[Dict] = None
+    children: List[str] = field(default_factory=list)
+    exists: bool = True
+    access_denied: bool = False
+    error: Optional[str] = None
+    status: Optional[str] = None  # Only set by incremental walks
+
+    @property
+    def success(self) -> bool:
+        return self.exists and self.error is None
+
+    def to_scan_record(self) -> Dict:
+        """Flat per-folder record used by streaming scans."""
+        record = {
+            "path": self.path,
+            "parent": self.parent,
+            "depth": self.depth,
+            "success": self.success,
+            "scan_time": self.scan_time,
+            "permissions": self.permissions,
+            "subfolder_count": len(self.children)
+        }
+        if self.error is not None:
+            record["error"] = self.error
+        if self.access_denied:
+            record["access_error"] = "Permission denied for some subfolders"
+        if self.status is not None:
+            record["incremental_status"] = self.status
+        return record
+
+
+class _Frontier:
+    """
+    Work-stealing frontier of directories still to visit.
+
+    Every worker owns a deque: it pushes the children it discovers onto its own
+    deque and pops LIFO (depth-first, keeps the frontier small), while idle
+    workers steal FIFO from the other end of a busy worker's deque.
+    """
+
+    def __init__(self, worker_count: int):
+        self._deques = [deque() for _ in range(worker_count)]
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._closed = False
+
+    def push(self, worker_id: int, items: List[_FrontierItem]) -> None:
+        if not items:
+            return
+        with self._cond:
+            self._deques[worker_id].extend(items)
+            self._pending += len(items)
+            self._cond.notify_all()
+
+    def pop(self, worker_id: int) -> Optional[_FrontierItem]:
+        """Get the next directory for a worker, or None once the walk is finished."""
+        items = self.pop_many(worker_id, 1)
+        return items[0] if items else None
+
+    def pop_many(self, worker_id: int, limit: int) -> List[_FrontierItem]:
+        """
+        Get up to limit directories for a worker, or [] once the walk is finished.
+
+        Takes at most an even share of the queued directories so that a
+        batch never leaves the other workers idle while the frontier is small.
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    return []
+
+                queued = sum(len(d) for d in self._deques)
+                if queued:
+                    share = max(1, min(limit, queued // len(self._deques)))
+                    own = self._deques[worker_id]
+                    items = [own.pop() for _ in range(min(share, len(own)))]
+
+                    worker_count = len(self._deques)
+                    for offset in range(1, worker_count):
+                        victim = self._deques[(worker_id + offset) % worker_count]
+                        while victim and len(items) < share:
+                            items.append(victim.popleft())
+                    return items
+
+                if self._pending == 0:
+                    return []
+                self._cond.wait()
+
+    def task_done(self, count: int = 1) -> None:
+        with self._cond:
+            self._pending -= count
+            if self._pending == 0:
+                self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class ParallelTreeScanner:
+    """Parallel folder tree walker with a bounded pool of ACL reader threads."""
+
+    def __init__(
+        self,
+        acl_reader: AclReader,
+        max_workers: int = 8,
+        should_exclude: Optional[Callable[[str], bool]] = None,
+        thread_initializer: Optional[Callable[[], None]] = None,
+        queue_size: int = 1000,
+        fingerprint_reader: Optional[FingerprintReader] = None,
+        batch_reader: Optional[BatchAclReader] = None,
+        read_batch_size: int = 32
+    ):
+        """
+        Initialize the tree scanner.
+
+        Args:
+            acl_reader: Callable returning the permissions dict for a folder path
+            max_workers: Number of worker threads reading ACLs
+            should_exclude: Optional predicate for paths that must not be visited
+            thread_initializer: Optional callable run once in every worker thread
+            queue_size: Maximum number of finished records buffered for the consumer
+            fingerprint_reader: Optional cheap descriptor fingerprint source used by
+                incremental walks to detect unchanged folders
+            batch_reader: Optional reader for several folders at once; workers then take
+                up to read_batch_size folders from the frontier and read their ACLs
+                together, so SIDs shared across directories are resolved once
+            read_batch_size: Maximum folders per batch_reader call
+        """
+        self.acl_reader = acl_reader
+        self.max_workers = max(1, max_workers)
+        self.should_exclude = should_exclude or (lambda path: False)
+        self.thread_initializer = thread_initializer
+        self.queue_size = max(1, queue_size)
+        self.fingerprint_reader = fingerprint_reader
+        self.batch_reader = batch_reader
+        self.read_batch_size = max(1, read_batch_size) if batch_reader is not None else 1
+
+    def walk(
+        self,
+        root_path: str,
+        max_depth: Optional[int],
+        baseline: Optional[ScanBaseline] = None
+    ) -> Iterator[FolderRecord]:
+        """
+        Walk the tree below root_path and yield a record per folder as soon as it is read.
+
+        Records are yielded in completion order, not tree order; use the parent,
+        depth and index fields to rebuild the hierarchy. The root itself is not
+        validated here - callers check existence and exclusion first. A
+        max_depth of None walks the whole tree.
+
+        With a baseline (and a fingerprint_reader), folders whose descriptor
+        fingerprint is unchanged reuse the baseline result instead of being
+        re-analyzed. Child directories are always enumerated, so folders
+        created or deleted since the baseline are picked up like in a full scan.
+        """
+        if baseline is not None and self.fingerprint_reader is None:
+            logger.warning("Incremental walk requested without a fingerprint reader, scanning everything")
+            baseline = None
+
+        frontier = _Frontier(self.max_workers)
+        results = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        frontier.push(0, [(root_path, None, 0, 0)])
+
+        threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(worker_id, frontier, results, stop, max_depth, baseline),
+                daemon=True,
+                name=f"ShareGuardScan-{worker_id}"
+            )
+            for worker_id in range(self.max_workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        finished_workers = 0
+        try:
+            while finished_workers < len(threads):
+                item = results.get()
+                if item is _WORKER_DONE:
+                    finished_workers += 1
+                    continue
+                yield item
+        finally:
+            # Also reached when the consumer stops iterating early
+            stop.set()
+            frontier.close()
+            for thread in threads:
+                while thread.is_alive():
+                    self._drain(results)
+                    thread.join(timeout=0.05)
+
+    def scan_tree(self, root_path: str, max_depth: int,
+                  baseline: Optional[ScanBaseline] = None) -> Dict:
+        """
+        Scan a tree and return it in the nested format of ShareGuardScanner.scan_path.
+
+        Subfolder order and the statistics roll-up match the recursive scan.
+        """
+        records = {record.path: record for record in self.walk(root_path, max_depth, baseline)}
+
+        built: Dict[str, Dict] = {}
+        # Children are always one level deeper than their parent, so building
+        # deepest-first guarantees every child exists before its parent.
+        for record in sorted(records.values(), key=lambda r: r.depth, reverse=True):
+            built[record.path] = self._build_scan_node(record, built)
+
+        if root_path not in built:
+            # The walk ended before the root was read (a scan worker failed)
+            return {
+                "success": False,
+                "error": "Scan did not complete",
+                "path": root_path,
+                "scan_time": datetime.now().isoformat()
+            }
+        return built[root_path]
+
+    def _worker(
+        self,
+        worker_id: int,
+        frontier: _Frontier,
+        results: queue.Queue,
+        stop: threading.Event,
+        max_depth: Optional[int],
+        baseline: Optional[ScanBaseline] = None
+    ) -> None:
+        if self.thread_initializer:
+            try:
+                self.thread_initializer()
+            except Exception as e:
+                logger.warning(f"Scan worker {worker_id} initializer failed: {str(e)}")
+
+        try:
+            while not stop.is_set():
+                items = frontier.pop_many(worker_id, self.read_batch_size)
+                if not items:
+                    break
+
+                try:
+                    for record in self._visit_batch(items, max_depth, baseline):
+                        # Push children before marking this folder done so the
+                        # pending count never drops to zero while work remains.
+                        frontier.push(worker_id, [
+                            (child_path, record.path, record.depth + 1, index)
+                            for index, child_path in enumerate(record.children)
+                        ])
+                        self._put(results, record, stop)
+                finally:
+                    frontier.task_done(len(items))
+        except Exception as e:
+            logger.error(f"Scan worker {worker_id} failed: {str(e)}", exc_info=True)
+            frontier.close()
+        finally:
+            self._put(results, _WORKER_DONE, stop)
+
+    def _visit_batch(self, items: List[_FrontierItem], max_depth: Optional[int],
+                     baseline: Optional[ScanBaseline] = None) -> List[FolderRecord]:
+        """Read the ACLs of a batch of folders and enumerate their child directories."""
+        records = []
+        to_read = []
+        for path, parent, depth, index in items:
+            record = FolderRecord(path=path, parent=parent, depth=depth, index=index)
+            records.append(record)
+            try:
+                if not os.path.exists(path):
+                    record.exists = False
+                    record.error = "Path does not exist"
+                    record.scan_time = datetime.now().isoformat()
+                elif not self._reuse_baseline(record, baseline):
+                    to_read.append(record)
+            except Exception as e:
+                self._fail(record, e)
+
+        self._read_permissions(to_read, incremental=baseline is not None)
+
+        for record in records:
+            if record.error is not None or (max_depth is not None and record.depth >= max_depth):
+                continue
+            try:
+                with os.scandir(record.path) as entries:
+                    for entry in entries:
+                        if entry.is_dir() and not self.should_exclude(entry.path):
+                            record.children.append(entry.path)
+            except PermissionError:
+                record.access_denied = True
+            except Exception as e:
+                self._fail(record, e)
+
+        return records
+
+    def _reuse_baseline(self, record: FolderRecord, baseline: Optional[ScanBaseline]) -> bool:
+        """Take the baseline result for a folder whose fingerprint is unchanged; False if it must be read."""
+        previous = baseline.get(record.path) if baseline is not None else None
+        if previous is None or not previous.fingerprint or \
+                self.fingerprint_reader(record.path) != previous.fingerprint:
+            return False
+
+        record.permissions = previous.permissions
+        record.scan_time = datetime.now().isoformat()
+        record.status = STATUS_UNCHANGED
+        return True
+
+    def _read_permissions(self, records: List[FolderRecord], incremental: bool) -> None:
+        """Read the ACLs of records, with one batch_reader call when there are several."""
+        if not records:
+            return
+
+        batch = None
+        if self.batch_reader is not None and len(records) > 1:
+            try:
+                batch = self.batch_reader([record.path for record in records])
+            except Exception as e:
+                for record in records:
+                    self._fail(record, e)
+                return
+
+        for record in records:
+            try:
+                record.permissions = batch[record.path] if batch is not None else self.acl_reader(record.path)
+            except Exception as e:
+                self._fail(record, e)
+                continue
+            record.scan_time = datetime.now().isoformat()
+            if incremental:
+                record.status = STATUS_REANALYZED
+
+    @staticmethod
+    def _fail(record: FolderRecord, error: Exception) -> None:
+        logger.error(f"Error scanning path {record.path}: {str(error)}", exc_info=True)
+        record.error = str(error)
+        record.children = []
+        record.scan_time = datetime.now().isoformat()
+
+    def _build_scan_node(self, record: FolderRecord, built: Dict[str, Dict]) -> Dict:
+        """Build a scan_path-style result for a record whose children are already built."""
+        if not record.exists:
+            return {
+                "success": False,
+                "error": "Path does not exist",
+                "path": record.path,
+                "scan_time": record.scan_time
+            }
+
+        if record.error is not None:
+            return {
+                "success": False,
+                "error": record.error,
+                "path": record.path,
+                "scan_time": record.scan_time,
+                "statistics": {
+                    "total_folders": 1,
+                    "processed_folders": 0,
+                    "error_count": 1,
+                    "system_accounts": 0,
+                    "non_system_accounts": 0
+                }
+            }
+
+        folder_path = Path(record.path)
+        permissions = record.permissions or {}
+        result = {
+            "success": True,
+            "scan_time": record.scan_time,
+            "folder_info": {
+                "name": folder_path.name,
+                "path": str(folder_path),
+                "parent": str(folder_path.parent),
+                "is_root": folder_path.parent == folder_path
+            },
+            "permissions": permissions,
+            "subfolders": [],
+            "statistics": {
+                "total_folders": 1,
+                "processed_folders": 1,
+                "error_count": 0,
+                "system_accounts": permissions.get("metadata", {}).get("system_aces", 0),
+                "non_system_accounts": permissions.get("metadata", {}).get("non_system_aces", 0)
+            }
+        }
+
+        stats = result["statistics"]
+        for child_path in record.children:
+            child = built.pop(child_path, None)
+            if child is None:
+                # Listed but never visited: the walk was cut short
+                stats["error_count"] += 1
+                result["incomplete"] = True
+                continue
+            result["subfolders"].append(child)
+
+            if child["success"]:
+                child_stats = child["statistics"]
+                stats["total_folders"] += child_stats["total_folders"]
+                stats["processed_folders"] += child_stats["processed_folders"]
+                stats["error_count"] += child_stats["error_count"]
+                stats["system_accounts"] += child_stats.get("system_accounts", 0)
+                stats["non_system_accounts"] += child_stats.get("non_system_accounts", 0)
+            else:
+                stats["error_count"] += 1
+
+        if record.access_denied:
+            result["access_error"] = "Permission denied for some subfolders"
+            stats["error_count"] += 1
+
+        return result
+
+    @staticmethod
+    def _put(results: queue.Queue, item, stop: threading.Event) -> None:
+        """Put into the bounded result queue without blocking forever once stopped."""
+        while True:
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if stop.is_set():
+                    return
+
+    @staticmethod
+    def _drain(results: queue.Queue) -> None:
+        try:
+            while True:
+                results.get_nowait()
+        except queue.Empty:
+            pass
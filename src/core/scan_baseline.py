@@ -0,0 +1,154 @@
+# src/core/scan_baseline.py
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from config.settings import SCANNER_CONFIG
+from src.utils.logger import setup_logger
+
+logger = setup_logger('scan_baseline')
+
+# Scan job parameters a baseline job must share with the incremental scan
+_BASELINE_OPTIONS = ('simplified_system', 'include_inherited')
+
+
+@dataclass
+class BaselineFolder:
+    """What an earlier scan recorded for one folder."""
+    path: str
+    parent: Optional[str]
+    fingerprint: Optional[str]
+    permissions: Optional[Dict]
+    scan_time: str = ""
+
+
+class ScanBaseline:
+    """
+    Per-folder descriptor fingerprints and results from an earlier scan.
+
+    Incremental scans compare each folder's current fingerprint with the
+    baseline and reuse the stored result when it is unchanged. The tree
+    itself is always enumerated again; the baseline only saves ACL reads.
+    """
+
+    def __init__(self, folders: Iterable[BaselineFolder], source: str = ""):
+        self.source = source
+        self.folders: Dict[str, BaselineFolder] = {folder.path: folder for folder in folders}
+
+    def __len__(self) -> int:
+        return len(self.folders)
+
+    def get(self, path: str) -> Optional[BaselineFolder]:
+        return self.folders.get(path)
+
+    @classmethod
+    def from_scan_records(cls, records: Iterable[Dict], source: str = "") -> "ScanBaseline":
+        """Build a baseline from per-folder records as produced by iter_scan_path."""
+        folders = []
+        for record in records:
+            if not isinstance(record, dict) or "path" not in record:
+                continue
+            permissions = record.get("permissions")
+            if not record.get("success", True) or not isinstance(permissions, dict):
+                continue
+            folders.append(BaselineFolder(
+                path=record["path"],
+                parent=record.get("parent"),
+                fingerprint=permissions.get("descriptor_fingerprint"),
+                permissions=permissions,
+                scan_time=record.get("scan_time", "")
+            ))
+        return cls(folders, source=source)
+
+    @classmethod
+    def from_scan_job(cls, db: Session, job_id: int) -> "ScanBaseline":
+        """Load the per-folder results of a streamed scan job."""
+        from src.db.models import ScanResult
+        from src.db.descriptor_store import hydrate_scan_results
+
+        results = db.query(ScanResult).filter(
+            ScanResult.job_id == job_id,
+            ScanResult.success == True
+        ).all()
+        baseline = cls.from_scan_records(hydrate_scan_results(db, results), source=f"job:{job_id}")
+        logger.info(f"Loaded baseline of {len(baseline)} folders from scan job {job_id}")
+        return baseline
+
+    @classmethod
+    def from_permission_cache(cls, db: Session, root_path: str) -> "ScanBaseline":
+        """Load a baseline for a tree from FolderPermissionCache, using checksum as the fingerprint."""
+        from src.db.models import FolderPermissionCache
+        from src.db.descriptor_store import load_descriptors, merge_permissions
+
+        root = root_path.rstrip("\\/")
+        entries = db.query(FolderPermissionCache).filter(
+            FolderPermissionCache.is_stale == False,
+            (FolderPermissionCache.folder_path == root) |
+            FolderPermissionCache.folder_path.like(f"{root}%")
+        ).all()
+
+        entries = [
+            entry for entry in entries
+            if entry.folder_path == root or entry.folder_path.startswith(root + os.sep)
+        ]
+        descriptors = load_descriptors(db, (entry.descriptor_hash for entry in entries))
+
+        folders = []
+        for entry in entries:
+            if entry.descriptor_hash and entry.descriptor_hash not in descriptors:
+                continue
+            parent = os.path.dirname(entry.folder_path)
+            folders.append(BaselineFolder(
+                path=entry.folder_path,
+                parent=parent if entry.folder_path != root and parent != entry.folder_path else None,
+                fingerprint=entry.checksum,
+                permissions=merge_permissions(
+                    entry.permissions_data, descriptors.get(entry.descriptor_hash)
+                ),
+                scan_time=entry.last_scan_time.isoformat() if entry.last_scan_time else ""
+            ))
+        baseline = cls(folders, source="permission_cache")
+        logger.info(f"Loaded baseline of {len(baseline)} folders from permission cache for {root}")
+        return baseline
+
+
+def effective_scan_depth(parameters: Dict) -> int:
+    """Depth a scan job with these parameters walks to."""
+    if not parameters.get('include_subfolders'):
+        return 0
+    max_depth = parameters.get('max_depth')
+    return max(max_depth if max_depth is not None else SCANNER_CONFIG['max_depth'], 0)
+
+
+def load_scan_baseline(db: Session, job, path: str) -> ScanBaseline:
+    """
+    Baseline for an incremental scan job.
+
+    Uses the latest completed per-folder scan of the same target that walked
+    to the same depth with the same options, recording it as the job's
+    baseline_job_id. Falls back to the folder permission cache for the path.
+    """
+    from src.db.models import ScanJob
+
+    parameters = job.parameters or {}
+    previous_jobs = db.query(ScanJob).filter(
+        ScanJob.target_id == job.target_id,
+        ScanJob.id != job.id,
+        ScanJob.status == 'completed'
+    ).order_by(ScanJob.id.desc()).limit(20).all()
+
+    for previous in previous_jobs:
+        previous_parameters = previous.parameters or {}
+        per_folder = previous_parameters.get('stream_results') or previous_parameters.get('incremental')
+        same_options = all(
+            previous_parameters.get(key) == parameters.get(key) for key in _BASELINE_OPTIONS
+        ) and effective_scan_depth(previous_parameters) == effective_scan_depth(parameters)
+        if per_folder and same_options:
+            job.baseline_job_id = previous.id
+            db.commit()
+            return ScanBaseline.from_scan_job(db, previous.id)
+
+    logger.info(f"No baseline scan job for {path}, using the permission cache")
+    return ScanBaseline.from_permission_cache(db, path)
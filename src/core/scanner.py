@@ -1,15 +1,27 @@
 # src/core/scanner.py
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 import logging
 from src.scanner.file_scanner import PermissionScanner
 from src.scanner.group_resolver import GroupResolver
+from src.core.parallel_scanner import ParallelTreeScanner
+from src.core.scan_baseline import ScanBaseline
+from src.core.effective_access import EffectiveAccessEngine, WELL_KNOWN_TOKEN_SIDS
 from src.utils.logger import setup_logger
 from config.settings import SCANNER_CONFIG
 
 logger = setup_logger('core_scanner')
 
+def _initialize_scan_thread() -> None:
+    """Initialize COM in scan worker threads (GroupResolver uses ADSI)."""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pass
+
 class ShareGuardScanner:
     """Core ShareGuard scanning functionality."""
     
@@ -19,12 +31,34 @@ class ShareGuardScanner:
         self.max_depth = SCANNER_CONFIG['max_depth']
         self.batch_size = SCANNER_CONFIG['batch_size']
         self.excluded_paths = set(SCANNER_CONFIG['excluded_paths'])
+        self.scan_workers = SCANNER_CONFIG['scan_workers']
         logger.info("ShareGuard Core Scanner initialized")
 
     def _should_exclude_path(self, path: str) -> bool:
         """Check if path should be excluded from scanning."""
         return any(path.startswith(excluded) for excluded in self.excluded_paths)
 
+    def _get_tree_scanner(self, simplified_system: bool, include_inherited: bool) -> ParallelTreeScanner:
+        """Create a parallel tree scanner reading ACLs through the permission scanner."""
+        return ParallelTreeScanner(
+            acl_reader=partial(
+                self.permission_scanner.get_folder_permissions,
+                simplified_system=simplified_system,
+                include_inherited=include_inherited
+            ),
+            max_workers=self.scan_workers,
+            should_exclude=self._should_exclude_path,
+            thread_initializer=_initialize_scan_thread,
+            queue_size=self.batch_size,
+            fingerprint_reader=self.permission_scanner.get_descriptor_fingerprint,
+            batch_reader=partial(
+                self.permission_scanner.get_folder_permissions_batch,
+                simplified_system=simplified_system,
+                include_inherited=include_inherited
+            ),
+            read_batch_size=SCANNER_CONFIG['sid_batch_folders']
+        )
+
     def scan_path(
         self, 
         path: str, 
@@ -62,6 +96,13 @@ class ShareGuardScanner:
                     "scan_time": datetime.now().isoformat()
                 }
 
+            # Walk large trees with the parallel scanner; it produces the same
+            # nested structure as the recursive scan below.
+            if include_subfolders and self.scan_workers > 1:
+                depth_limit = max_depth if max_depth is not None else self.max_depth
+                tree_scanner = self._get_tree_scanner(simplified_system, include_inherited)
+                return tree_scanner.scan_tree(str(folder_path), max(depth_limit, 0))
+
             # Get base folder permissions
             base_results = self.permission_scanner.get_folder_permissions(
                 str(folder_path),
@@ -139,8 +180,68 @@ class ShareGuardScanner:
                 }
             }
 
-    def get_user_access(self, username: str, domain: str, base_path: Optional[str] = None) -> Dict:
-        """Get all accessible folders for a user."""
+    def iter_scan_path(
+        self,
+        path: str,
+        max_depth: Optional[int] = None,
+        simplified_system: bool = True,
+        include_inherited: bool = True,
+        baseline: Optional[ScanBaseline] = None,
+        depth_limited: bool = True
+    ) -> Iterator[Dict]:
+        """
+        Scan a folder tree and yield one flat record per folder as it is read.
+
+        Unlike scan_path, no nested tree is built, so memory use does not grow
+        with the size of the share. Each record carries its parent path and
+        depth so the hierarchy can be rebuilt by the consumer.
+
+        Args:
+            path: Root path to scan
+            max_depth: Maximum depth for subfolder scanning (overrides config)
+            simplified_system: Whether to use simplified system account information
+            include_inherited: Whether to include inherited permissions
+            baseline: Earlier per-folder results; enables the incremental mode where
+                folders with an unchanged descriptor fingerprint are not re-analyzed
+                and each record carries an incremental_status
+            depth_limited: When False, walk the whole tree and ignore max_depth
+        """
+        folder_path = Path(path)
+        if not folder_path.exists() or self._should_exclude_path(str(folder_path)):
+            yield {
+                "path": path,
+                "parent": None,
+                "depth": 0,
+                "success": False,
+                "scan_time": datetime.now().isoformat(),
+                "permissions": None,
+                "error": "Path does not exist" if not folder_path.exists() else "Path is in exclusion list"
+            }
+            return
+
+        depth_limit = max_depth if max_depth is not None else self.max_depth
+        tree_scanner = self._get_tree_scanner(simplified_system, include_inherited)
+        for record in tree_scanner.walk(str(folder_path), max(depth_limit, 0) if depth_limited else None,
+                                        baseline=baseline):
+            yield record.to_scan_record()
+
+    def get_user_access(
+        self,
+        username: str,
+        domain: str,
+        base_path: Optional[str] = None,
+        folders: Optional[Iterable[Tuple[str, Dict]]] = None
+    ) -> Dict:
+        """
+        Get all accessible folders for a user.
+
+        Args:
+            username: Account name
+            domain: Account domain
+            base_path: Tree to evaluate
+            folders: Already-scanned (path, permissions) pairs for the tree, e.g. from
+                the permission cache; when omitted the tree is scanned now
+        """
         try:
             # Get user's groups
             user_info = {
@@ -153,6 +254,7 @@ class ShareGuardScanner:
             
             groups = self.group_resolver._get_user_groups(username, domain)
             access_paths = self.group_resolver.get_access_paths(user_info)
+            token_sids = self._get_token_sids(user_info, groups)
             
             results = {
                 "success": True,
@@ -163,74 +265,39 @@ class ShareGuardScanner:
                 "accessible_folders": [],
                 "statistics": {
                     "total_groups": len(groups),
+                    "token_sids": len(token_sids),
                     "folders_checked": 0,
+                    "unique_acls": 0,
                     "accessible_folders": 0,
                     "error_count": 0
                 }
             }
 
-            # If base path provided, scan for accessible folders
+            # If base path provided, evaluate the folders of the tree
             if base_path:
-                base_folder = Path(base_path)
-                if not base_folder.exists():
-                    raise FileNotFoundError(f"Base path does not exist: {base_path}")
+                if folders is None:
+                    if not Path(base_path).exists():
+                        raise FileNotFoundError(f"Base path does not exist: {base_path}")
+                    results["data_source"] = "live_scan"
+                    engine = EffectiveAccessEngine.from_scan_records(
+                        # Access reports cover the whole tree; a max_depth of 0 still
+                        # restricts the check to base_path itself
+                        self.iter_scan_path(base_path, depth_limited=self.max_depth > 0),
+                        describe_mask=self.permission_scanner._get_categorized_permissions
+                    )
+                else:
+                    results["data_source"] = "cache"
+                    engine = EffectiveAccessEngine(
+                        folders, describe_mask=self.permission_scanner._get_categorized_permissions
+                    )
 
-                # Get all folders to check
-                folders_to_check = [base_folder]
-                if self.max_depth > 0:
-                    try:
-                        folders_to_check.extend(
-                            f for f in base_folder.rglob("*") 
-                            if f.is_dir() and not self._should_exclude_path(str(f))
-                        )
-                    except PermissionError:
-                        results["access_error"] = "Permission denied for some subfolders"
-                        results["statistics"]["error_count"] += 1
-
-                # Check each folder
-                for folder in folders_to_check:
-                    results["statistics"]["folders_checked"] += 1
-                    
-                    try:
-                        folder_perms = self.permission_scanner.get_folder_permissions(str(folder))
-                        if folder_perms["success"]:
-                            # Check if user has access through any group
-                            has_access = False
-                            effective_permissions = {
-                                'Basic': set(),
-                                'Advanced': set(),
-                                'Directory': set()
-                            }
-                            matching_aces = []
-                            
-                            for ace in folder_perms.get("aces", []):
-                                trustee = ace["trustee"]
-                                # Check direct user match or group membership
-                                if (trustee["full_name"] == user_info["full_name"] or
-                                    any(group["full_name"] == trustee["full_name"] for group in groups)):
-                                    has_access = True
-                                    # Accumulate permissions
-                                    for category, perms in ace["permissions"].items():
-                                        effective_permissions[category].update(perms)
-                                    
-                                    # Include ACE details for reporting
-                                    ace_copy = ace.copy()
-                                    ace_copy['inherited'] = ace.get('inherited', False)
-                                    matching_aces.append(ace_copy)
-                            
-                            if has_access:
-                                results["statistics"]["accessible_folders"] += 1
-                                results["accessible_folders"].append({
-                                    "path": str(folder),
-                                    "effective_permissions": {
-                                        k: sorted(v) for k, v in effective_permissions.items() if v
-                                    },
-                                    "aces": matching_aces
-                                })
-                    
-                    except Exception as e:
-                        logger.error(f"Error checking folder {folder}: {str(e)}")
-                        results["statistics"]["error_count"] += 1
+                results["accessible_folders"] = engine.evaluate(token_sids)
+                results["statistics"].update({
+                    "folders_checked": len(engine) + engine.failed_folders,
+                    "unique_acls": engine.unique_acls,
+                    "accessible_folders": len(results["accessible_folders"]),
+                    "error_count": engine.failed_folders
+                })
 
             return results
 
@@ -243,6 +310,26 @@ class ShareGuardScanner:
                 "user_info": user_info if 'user_info' in locals() else None
             }
 
+    def _get_token_sids(self, user_info: Dict, groups: List[Dict]) -> Set[str]:
+        """SIDs a user's access token would carry: the user, all its groups and well-known groups."""
+        token = set(WELL_KNOWN_TOKEN_SIDS)
+        try:
+            user_sid = self.group_resolver._get_account_details(
+                user_info["name"], user_info["domain"]
+            ).get("sid")
+        except Exception as e:
+            logger.warning(f"Could not resolve SID for {user_info['full_name']}: {str(e)}")
+            user_sid = None
+
+        index = self.group_resolver.membership_index
+        if user_sid and index is not None and user_sid in index:
+            return token | index.token_sids(user_sid)
+
+        if user_sid:
+            token.add(user_sid)
+        token.update(group["sid"] for group in groups if group.get("sid"))
+        return token
+
     def get_folder_structure(
         self, 
         root_path: str, 
@@ -0,0 +1,146 @@
+# src/db/coordination.py
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from sqlalchemy import case, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def append_events(db: Session, channel: str, origin: str, payloads: List[Dict]) -> List[int]:
+    """Append events to the bus table and return their sequence numbers. Runs inside the caller's transaction."""
+    if not payloads:
+        return []
+
+    from .models import EventBusMessage
+
+    table = EventBusMessage.__table__
+    now = datetime.utcnow()
+    rows = [{'channel': channel, 'origin': origin, 'payload': payload, 'created_at': now} for payload in payloads]
+    dialect = db.get_bind().dialect
+    if getattr(dialect, 'insert_executemany_returning_sort_by_parameter_order', False):
+        stmt = insert(table).returning(table.c.seq, sort_by_parameter_order=True)
+        return list(db.execute(stmt, rows).scalars().all())
+
+    seqs = []
+    for row in rows:
+        result = db.execute(insert(table), row)
+        seqs.append(result.inserted_primary_key[0])
+    return seqs
+
+
+def read_events(db: Session, after_seq: int, limit: int = 500,
+                missing_seqs: Optional[Iterable[int]] = None) -> List[Dict]:
+    """
+    Events after after_seq, plus any of missing_seqs that have appeared since, ordered by seq.
+
+    missing_seqs lets a reader pick up rows from transactions that committed
+    after a later seq had already been read.
+    """
+    from .models import EventBusMessage
+
+    table = EventBusMessage.__table__
+    condition = table.c.seq > after_seq
+    missing_seqs = list(missing_seqs or ())
+    if missing_seqs:
+        condition = or_(condition, table.c.seq.in_(missing_seqs))
+
+    rows = db.execute(
+        select(table.c.seq, table.c.channel, table.c.origin, table.c.payload)
+        .where(condition)
+        .order_by(table.c.seq)
+        .limit(limit + len(missing_seqs))
+    ).mappings()
+    return [dict(row) for row in rows]
+
+
+def latest_event_seq(db: Session) -> int:
+    from .models import EventBusMessage
+
+    table = EventBusMessage.__table__
+    return db.execute(select(func.max(table.c.seq))).scalar() or 0
+
+
+def prune_events(db: Session, retention_seconds: float) -> int:
+    """Delete events older than the retention period. Commits; returns the number removed."""
+    from .models import EventBusMessage
+
+    table = EventBusMessage.__table__
+    cutoff = datetime.utcnow() - timedelta(seconds=retention_seconds)
+    try:
+        removed = db.execute(delete(table).where(table.c.created_at < cutoff)).rowcount or 0
+        db.commit()
+        return removed
+    except Exception:
+        db.rollback()
+        raise
+
+
+def try_acquire_lease(db: Session, name: str, holder: str, lease_seconds: float) -> bool:
+    """
+    Take or renew a lease; True if holder owns it afterwards.
+
+    A single conditional UPDATE succeeds only for the current holder or
+    when the lease has expired, so two workers can never both win. The
+    first acquisition inserts the row, and a concurrent insert loses on the
+    primary key. Commits.
+    """
+    from .models import ServiceLease
+
+    table = ServiceLease.__table__
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=lease_seconds)
+    try:
+        result = db.execute(
+            update(table)
+            .where(table.c.name == name,
+                   or_(table.c.holder == holder, table.c.holder.is_(None), table.c.expires_at < now))
+            .values(holder=holder, expires_at=expires_at,
+                    acquired_at=case((table.c.holder == holder, table.c.acquired_at), else_=now))
+        )
+        if result.rowcount:
+            db.commit()
+            return True
+
+        exists = db.execute(select(table.c.name).where(table.c.name == name)).first()
+        if exists:
+            db.commit()
+            return False
+
+        db.execute(insert(table).values(name=name, holder=holder, acquired_at=now, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+    except Exception:
+        db.rollback()
+        raise
+
+
+def release_lease(db: Session, name: str, holder: str) -> None:
+    """Give up a lease so another worker can take over without waiting for it to expire. Commits."""
+    from .models import ServiceLease
+
+    table = ServiceLease.__table__
+    try:
+        db.execute(
+            update(table)
+            .where(table.c.name == name, table.c.holder == holder)
+            .values(holder=None, expires_at=None)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def get_lease(db: Session, name: str) -> Optional[Dict]:
+    from .models import ServiceLease
+
+    table = ServiceLease.__table__
+    row = db.execute(select(table).where(table.c.name == name)).mappings().first()
+    return dict(row) if row else None
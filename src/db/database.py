@@ -79,36 +79,19 @@ def store_scan_job(scan_type: str, target: str, parameters: dict) -> int:
 
 def store_scan_result(job_id: int, path: str, scan_data: dict) -> None:
     """Store scan results in the database."""
-    from .models import ScanResult, AccessEntry
+    from .scan_writer import (
+        scan_result_row, access_entry_rows, insert_scan_results, insert_access_entries
+    )
+    from .trustee_index import update_trustee_index
     
     db = SessionLocal()
     try:
-        # Create scan result
-        result = ScanResult(
-            job_id=job_id,
-            path=path,
-            scan_time=datetime.utcnow(),
-            owner=scan_data.get('owner'),
-            permissions=scan_data,
-            success=scan_data.get('success', True),
-            error_message=scan_data.get('error')
-        )
-        db.add(result)
-        db.flush()  # Get result.id
-
-        # Store individual access entries
-        for ace in scan_data.get('aces', []):
-            trustee = ace['trustee']
-            entry = AccessEntry(
-                scan_result_id=result.id,
-                trustee_name=trustee['name'],
-                trustee_domain=trustee['domain'],
-                trustee_sid=trustee['sid'],
-                access_type=ace['type'],
-                inherited=ace['inherited'],
-                permissions=ace['permissions']
-            )
-            db.add(entry)
+        # Create scan result and its access entries with bulk inserts
+        result_id = insert_scan_results(db, [
+            scan_result_row(job_id, path, scan_data, owner=scan_data.get('owner'))
+        ])[0]
+        insert_access_entries(db, access_entry_rows(result_id, scan_data.get('aces', [])))
+        update_trustee_index(db, [(path, scan_data)], job_id=job_id, scan_result_ids={path: result_id})
 
         db.commit()
     except Exception as e:
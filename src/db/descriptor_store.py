@@ -0,0 +1,144 @@
+# src/db/descriptor_store.py
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Parts of a get_folder_permissions result that are identical for every folder
+# sharing an ACL. Everything else (path, folder_info, scan_time...) stays per folder.
+DESCRIPTOR_FIELDS = ('owner', 'primary_group', 'inheritance_enabled', 'aces', 'metadata')
+
+# Keep IN (...) lists well below the SQL Server parameter limit
+_LOOKUP_CHUNK = 500
+
+
+def descriptor_hash(descriptor: Dict) -> str:
+    """SHA-256 of the canonical JSON form of a descriptor."""
+    canonical = json.dumps(descriptor, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def split_permissions(permissions: Optional[Dict]) -> Tuple[Optional[str], Optional[Dict], Optional[Dict]]:
+    """
+    Split a permissions result into (hash, shared descriptor, per-folder remainder).
+
+    Failed scans and results without an ACL are returned unchanged with no hash.
+    """
+    if not permissions or not permissions.get('success', True) or 'aces' not in permissions:
+        return None, None, permissions
+
+    descriptor = {field: permissions.get(field) for field in DESCRIPTOR_FIELDS}
+    remainder = {k: v for k, v in permissions.items() if k not in DESCRIPTOR_FIELDS}
+    return descriptor_hash(descriptor), descriptor, remainder
+
+
+def merge_permissions(remainder: Optional[Dict], descriptor: Optional[Dict]) -> Optional[Dict]:
+    """Rebuild a full permissions result from its per-folder remainder and descriptor."""
+    if descriptor is None:
+        return remainder
+    merged = dict(remainder or {})
+    merged.update(descriptor)
+    return merged
+
+
+def intern_descriptors(db: Session, descriptors: Dict[str, Dict]) -> int:
+    """
+    Make sure every descriptor exists in security_descriptors.
+
+    Only hashes not yet stored are inserted. Runs inside the caller's
+    transaction; returns the number of new descriptors.
+    """
+    if not descriptors:
+        return 0
+
+    from .models import SecurityDescriptor
+
+    table = SecurityDescriptor.__table__
+    existing = set()
+    hashes = list(descriptors)
+    for start in range(0, len(hashes), _LOOKUP_CHUNK):
+        chunk = hashes[start:start + _LOOKUP_CHUNK]
+        existing.update(db.execute(select(table.c.hash).where(table.c.hash.in_(chunk))).scalars())
+
+    rows = [
+        _descriptor_row(digest, descriptor)
+        for digest, descriptor in descriptors.items()
+        if digest not in existing
+    ]
+    if not rows:
+        return 0
+
+    try:
+        with db.begin_nested():
+            db.execute(insert(table), rows)
+        return len(rows)
+    except IntegrityError:
+        # Another writer stored some of the same descriptors concurrently
+        inserted = 0
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(table), row)
+                inserted += 1
+            except IntegrityError:
+                pass
+        return inserted
+
+
+def load_descriptors(db: Session, hashes: Iterable[str]) -> Dict[str, Dict]:
+    """Fetch descriptors by hash."""
+    from .models import SecurityDescriptor
+
+    table = SecurityDescriptor.__table__
+    wanted = list({h for h in hashes if h})
+    descriptors = {}
+    for start in range(0, len(wanted), _LOOKUP_CHUNK):
+        chunk = wanted[start:start + _LOOKUP_CHUNK]
+        for digest, descriptor in db.execute(
+            select(table.c.hash, table.c.descriptor).where(table.c.hash.in_(chunk))
+        ):
+            descriptors[digest] = descriptor
+    return descriptors
+
+
+def hydrate_scan_results(db: Session, results: List) -> List[Optional[Dict]]:
+    """
+    Return the full permissions payload of each ScanResult.
+
+    Per-folder records written with descriptor dedup keep the shared ACL in
+    security_descriptors; it is merged back in here. Rows written before dedup
+    are returned as stored.
+    """
+    descriptors = load_descriptors(db, (result.hash for result in results))
+    payloads = []
+    for result in results:
+        payload = result.permissions
+        if result.hash and isinstance(payload, dict):
+            descriptor = descriptors.get(result.hash)
+            if descriptor is None:
+                logger.warning(f"Missing security descriptor {result.hash} for scan result {result.id}")
+            elif isinstance(payload.get('permissions'), dict):
+                # Streamed per-folder record: the ACL lives under 'permissions'
+                payload = dict(payload)
+                payload['permissions'] = merge_permissions(payload['permissions'], descriptor)
+            else:
+                payload = merge_permissions(payload, descriptor)
+        payloads.append(payload)
+    return payloads
+
+
+def _descriptor_row(digest: str, descriptor: Dict) -> Dict:
+    aces = descriptor.get('aces') or []
+    return {
+        'hash': digest,
+        'descriptor': descriptor,
+        'ace_count': len(aces),
+        'explicit_ace_count': sum(1 for ace in aces if not ace.get('inherited')),
+        'inheritance_enabled': descriptor.get('inheritance_enabled', True)
+    }
@@ -0,0 +1,198 @@
+# src/db/health_issues.py
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Paths or ids per statement; keeps bind parameters well under SQL Server's 2100 limit
+_IDS_PER_STATEMENT = 1000
+
+# Changed-folder records read per page
+_CHANGES_PAGE_SIZE = 500
+
+# Issue fields refreshed on an issue that is still present
+_UPDATED_FIELDS = ('severity', 'title', 'description', 'affected_principals', 'acl_details',
+                   'recommendations', 'risk_score')
+
+
+def totals_key(issue_type, severity) -> str:
+    """Key of an (issue type, severity) cell in issue totals and deltas, e.g. 'orphaned_sid:low'."""
+    return f"{issue_type.value}:{severity.value}"
+
+
+def load_active_issue_keys(db: Session, paths: Iterable[str]) -> List[Tuple[int, str, Any, Any]]:
+    """(id, path, issue_type, severity) of the active issues of exactly these folders, oldest first."""
+    from .models.health import Issue, IssueStatus
+
+    table = Issue.__table__
+    paths = sorted(set(paths))
+    rows = []
+    for i in range(0, len(paths), _IDS_PER_STATEMENT):
+        rows.extend(db.execute(
+            select(table.c.id, table.c.path, table.c.issue_type, table.c.severity)
+            .where(table.c.status == IssueStatus.ACTIVE, table.c.path.in_(paths[i:i + _IDS_PER_STATEMENT]))
+        ).all())
+    return sorted((tuple(row) for row in rows), key=lambda row: row[0])
+
+
+def reconcile_issues(db: Session, scan_id: int, issues: List[Dict[str, Any]],
+                     analyzed_paths: Iterable[str], skipped_paths: Set[str] = frozenset()) -> Dict[str, Any]:
+    """
+    Bring the active issues of the analyzed folders in line with a scan's findings.
+
+    The active issue keys are read in one pass; the inserts, updates and
+    resolutions are worked out in memory and applied as three executemany
+    statements. Issues found again are refreshed and moved to this scan,
+    new ones are inserted, and active issues of the analyzed folders that
+    the scan no longer found are resolved. Only the listed folders are
+    touched - never what lies below them - and folders listed in
+    skipped_paths (they could not be analyzed) keep their issues. When a
+    key has several active issues the oldest is kept and the rest are
+    resolved.
+
+    Runs inside the caller's transaction. Returns the inserted, updated
+    and resolved counts, and under 'delta' the net change in active issues
+    per totals_key cell.
+    """
+    from .models.health import Issue, IssueStatus
+
+    table = Issue.__table__
+    existing: Dict[Tuple[str, Any], Tuple[int, Any]] = {}
+    gone: List[Tuple[int, Any, Any]] = []   # (id, issue_type, severity) of issues to resolve
+    for issue_id, path, issue_type, severity in load_active_issue_keys(db, analyzed_paths):
+        if (path, issue_type) in existing:
+            gone.append((issue_id, issue_type, severity))
+        else:
+            existing[(path, issue_type)] = (issue_id, severity)
+
+    found: Set[Tuple[str, Any]] = set()
+    inserts, updates = [], []
+    delta: Dict[str, int] = {}
+
+    def count(issue_type, severity, change):
+        key = totals_key(issue_type, severity)
+        delta[key] = delta.get(key, 0) + change
+
+    now = datetime.now(timezone.utc)
+    for issue in issues:
+        key = (issue['path'], issue['issue_type'])
+        if key in found:
+            continue
+        found.add(key)
+        current = existing.get(key)
+        count(issue['issue_type'], issue['severity'], 1)
+        if current is None:
+            inserts.append({
+                'status': IssueStatus.ACTIVE,
+                'affected_principals': None,
+                'acl_details': None,
+                'recommendations': None,
+                'impact_description': None,
+                'context_data': None,
+                'resolved_at': None,
+                'first_detected': now,
+                'last_seen': now,
+                **issue,
+                'health_scan_id': scan_id
+            })
+        else:
+            issue_id, severity = current
+            count(issue['issue_type'], severity, -1)
+            row = {f'new_{field}': issue.get(field) for field in _UPDATED_FIELDS}
+            row.update({
+                'issue_id': issue_id,
+                'new_health_scan_id': scan_id,
+                'new_last_seen': now,
+                'new_affected_principals': issue.get('affected_principals', []),
+                'new_acl_details': issue.get('acl_details', {}),
+                'new_risk_score': issue.get('risk_score', 0.0)
+            })
+            updates.append(row)
+
+    gone.extend((issue_id, key[1], severity) for key, (issue_id, severity) in existing.items()
+                if key not in found and key[0] not in skipped_paths)
+    for _, issue_type, severity in gone:
+        count(issue_type, severity, -1)
+    resolved = [issue_id for issue_id, _, _ in gone]
+
+    if inserts:
+        db.execute(insert(table), inserts)
+    if updates:
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam('issue_id'))
+            .values({field: bindparam(f'new_{field}') for field in ('health_scan_id', 'last_seen') + _UPDATED_FIELDS}),
+            updates
+        )
+    for i in range(0, len(resolved), _IDS_PER_STATEMENT):
+        db.execute(
+            update(table)
+            .where(table.c.id.in_(resolved[i:i + _IDS_PER_STATEMENT]), table.c.status == IssueStatus.ACTIVE)
+            .values(status=IssueStatus.RESOLVED, resolved_at=now)
+        )
+
+    logger.info(f"Health scan {scan_id} issues: {len(inserts)} new, {len(updates)} still present, "
+                f"{len(resolved)} resolved")
+    return {
+        'inserted': len(inserts),
+        'updated': len(updates),
+        'resolved': len(resolved),
+        'delta': {key: change for key, change in delta.items() if change}
+    }
+
+
+def active_issue_totals(db: Session) -> Dict[str, int]:
+    """Active issues per totals_key cell, in one aggregate query."""
+    from .models.health import Issue, IssueStatus
+
+    table = Issue.__table__
+    rows = db.execute(
+        select(table.c.issue_type, table.c.severity, func.count())
+        .where(table.c.status == IssueStatus.ACTIVE)
+        .group_by(table.c.issue_type, table.c.severity)
+    )
+    return {totals_key(issue_type, severity): count for issue_type, severity, count in rows}
+
+
+def load_changed_folders(db: Session, since: datetime) -> Dict[str, Optional[Dict]]:
+    """
+    Folders whose ACL changed after since.
+
+    Maps each path to the permissions recorded with its latest
+    PermissionChange. Folders that are only marked stale in
+    FolderPermissionCache map to None; their ACL has to be read again.
+    Change records that carry no folder path (group membership changes)
+    are ignored.
+    """
+    from .models import FolderPermissionCache, PermissionChange
+
+    table = PermissionChange.__table__
+    changed: Dict[str, Optional[Dict]] = {}
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(table.c.id, table.c.previous_state, table.c.current_state)
+            .where(table.c.detected_time > since, table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(_CHANGES_PAGE_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        for _, previous_state, current_state in rows:
+            current_state = current_state if isinstance(current_state, dict) else {}
+            previous_state = previous_state if isinstance(previous_state, dict) else {}
+            path = current_state.get('path') or previous_state.get('path')
+            if path:
+                changed[path] = current_state if 'aces' in current_state else None
+
+    cache = FolderPermissionCache.__table__
+    for path in db.execute(
+        select(cache.c.folder_path).where(cache.c.is_stale == True, cache.c.updated_at > since)
+    ).scalars():
+        changed.setdefault(path, None)
+    return changed
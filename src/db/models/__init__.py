@@ -5,6 +5,10 @@ from .alerts import AlertConfiguration, Alert
 from .changes import PermissionChange
 from .cache import UserGroupMapping
 from .folder_cache import FolderPermissionCache, FolderStructureCache
+from .descriptor import SecurityDescriptor
+from .trustee_access import TrusteeAccess
+from .notifications import NotificationOutbox
+from .coordination import EventBusMessage, ServiceLease
 from .health import Issue, HealthScan, HealthMetrics, HealthScoreHistory, IssueSeverity, IssueType, IssueStatus
 from .enums import ScanScheduleType, AlertType, AlertSeverity
 
@@ -20,6 +24,11 @@ __all__ = [
     'UserGroupMapping',
     'FolderPermissionCache',
     'FolderStructureCache',
+    'SecurityDescriptor',
+    'TrusteeAccess',
+    'NotificationOutbox',
+    'EventBusMessage',
+    'ServiceLease',
     'Issue',
     'HealthScan',
     'HealthMetrics',
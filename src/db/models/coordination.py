@@ -0,0 +1,27 @@
+# src/db/models/coordination.py
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON, Index
+from datetime import datetime
+from .base import Base
+
+class EventBusMessage(Base):
+    """Event published by one API worker for the others; workers tail the table by seq."""
+    __tablename__ = 'event_bus_messages'
+
+    seq = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    channel = Column(String(100), nullable=False)
+    origin = Column(String(100), nullable=False)  # Publishing worker, which has already delivered it locally
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_event_bus_created', created_at),
+    )
+
+class ServiceLease(Base):
+    """Time-limited lease on a singleton role, e.g. running the change monitor; held by at most one worker."""
+    __tablename__ = 'service_leases'
+
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(100), nullable=True)
+    acquired_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
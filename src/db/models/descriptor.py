@@ -0,0 +1,20 @@
+# src/db/models/descriptor.py
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Index
+from datetime import datetime
+from .base import Base
+
+class SecurityDescriptor(Base):
+    """Content-addressed security descriptor shared by every folder with the same ACL."""
+    __tablename__ = 'security_descriptors'
+
+    id = Column(Integer, primary_key=True)
+    hash = Column(String(64), nullable=False)
+    descriptor = Column(JSON, nullable=False)  # owner, primary_group, inheritance_enabled, aces, metadata
+    ace_count = Column(Integer, default=0)
+    explicit_ace_count = Column(Integer, default=0)
+    inheritance_enabled = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_security_descriptor_hash', hash, unique=True),
+    )
@@ -12,7 +12,8 @@ class FolderPermissionCache(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     folder_path = Column(String(500), nullable=False, unique=True, index=True)
-    permissions_data = Column(JSON, nullable=False)  # Stores the full permissions structure
+    permissions_data = Column(JSON, nullable=False)  # Per-folder permissions fields (ACL lives in security_descriptors when descriptor_hash is set)
+    descriptor_hash = Column(String(64), nullable=True, index=True)  # security_descriptors.hash
     owner_info = Column(JSON, nullable=True)
     inheritance_enabled = Column(Boolean, default=True)
     last_scan_time = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,22 @@
+# src/db/models/notifications.py
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON, Text, Index
+from datetime import datetime
+from .base import Base
+
+class NotificationOutbox(Base):
+    """Append-only log of sent notifications; seq orders them for replay to reconnecting clients."""
+    __tablename__ = 'notification_outbox'
+
+    seq = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    notification_id = Column(String(36), nullable=False)
+    type = Column(String(50), nullable=False)
+    severity = Column(String(20), nullable=True)
+    title = Column(String(255), nullable=True)
+    message = Column(Text, nullable=True)
+    payload = Column(JSON, nullable=False)          # The message exactly as it was sent
+    target_user = Column(String(255), nullable=True)  # NULL for broadcasts
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_notification_outbox_created', created_at),
+    )
@@ -0,0 +1,32 @@
+# src/db/models/trustee_access.py
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, JSON, Index
+from datetime import datetime
+from .base import Base
+
+class TrusteeAccess(Base):
+    """Reverse index row: one trustee's aggregated ACEs on one folder, replaced whenever the folder is rescanned."""
+    __tablename__ = 'trustee_access_index'
+
+    id = Column(Integer, primary_key=True)
+    trustee_sid = Column(String(255), nullable=False)
+    trustee_name = Column(String(255), nullable=True)
+    trustee_domain = Column(String(255), nullable=True)
+    folder_path = Column(String(500), nullable=False)
+    # Access masks of the trustee's ACEs on the folder, split the way a canonical DACL is ordered
+    explicit_allow_mask = Column(BigInteger, default=0)
+    explicit_deny_mask = Column(BigInteger, default=0)
+    inherited_allow_mask = Column(BigInteger, default=0)
+    inherited_deny_mask = Column(BigInteger, default=0)
+    access_mask = Column(BigInteger, default=0)  # Effective rights from this trustee's ACEs alone
+    permissions = Column(JSON, nullable=True)    # Categorized permission names, for results without masks
+    inherited_only = Column(Boolean, default=True)
+    descriptor_hash = Column(String(64), nullable=True)
+    scan_job_id = Column(Integer, nullable=True)
+    scan_result_id = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_trustee_access_sid_path', trustee_sid, folder_path, unique=True),
+        Index('idx_trustee_access_path', folder_path),
+        Index('idx_trustee_access_name', trustee_name, trustee_domain),
+    )
@@ -0,0 +1,133 @@
+# src/db/notification_outbox.py
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Larger jumps are identity gaps (e.g. after a SQL Server restart), not pending inserts
+_MAX_TRACKED_GAP = 100
+
+
+def append_notifications(db: Session, rows: List[Dict]) -> List[int]:
+    """
+    Append outbox rows and return their sequence numbers in row order.
+
+    Rows need notification_id, type and payload; severity, title, message,
+    target_user and created_at are optional. Runs inside the caller's
+    transaction.
+    """
+    if not rows:
+        return []
+
+    from .models import NotificationOutbox
+
+    table = NotificationOutbox.__table__
+    now = datetime.utcnow()
+    rows = [{'created_at': now, 'target_user': None, **row} for row in rows]
+    dialect = db.get_bind().dialect
+    if getattr(dialect, 'insert_executemany_returning_sort_by_parameter_order', False):
+        stmt = insert(table).returning(table.c.seq, sort_by_parameter_order=True)
+        return list(db.execute(stmt, rows).scalars().all())
+
+    seqs = []
+    for row in rows:
+        result = db.execute(insert(table), row)
+        seqs.append(result.inserted_primary_key[0])
+    return seqs
+
+
+def read_since(db: Session, after_seq: int, user_id: Optional[str] = None,
+               limit: int = 200, up_to_seq: Optional[int] = None) -> List[Dict]:
+    """
+    Notifications after after_seq (and up to up_to_seq) visible to user_id, oldest first.
+
+    One range scan on the primary key; broadcasts are visible to everyone,
+    targeted notifications only to their user. Each message carries its seq.
+    """
+    from .models import NotificationOutbox
+
+    table = NotificationOutbox.__table__
+    visible = table.c.target_user.is_(None)
+    if user_id:
+        visible = or_(visible, table.c.target_user == user_id)
+    conditions = [table.c.seq > after_seq, visible]
+    if up_to_seq is not None:
+        conditions.append(table.c.seq <= up_to_seq)
+
+    rows = db.execute(
+        select(table.c.seq, table.c.payload)
+        .where(*conditions)
+        .order_by(table.c.seq)
+        .limit(limit)
+    )
+    return [{**payload, 'seq': seq} for seq, payload in rows]
+
+
+def committed_seq(db: Session, after_seq: int, gap_timeout: float, scan_limit: int = 5000) -> int:
+    """
+    Highest seq a reader at after_seq can advance to without skipping a pending append.
+
+    Workers append concurrently, so a seq can become visible after a higher
+    one. A skipped seq is waited for while the row after it is younger than
+    gap_timeout seconds; after that it is taken to be a rolled-back insert.
+    At most scan_limit rows are examined.
+    """
+    from .models import NotificationOutbox
+
+    table = NotificationOutbox.__table__
+    rows = db.execute(
+        select(table.c.seq, table.c.created_at)
+        .where(table.c.seq > after_seq)
+        .order_by(table.c.seq)
+        .limit(scan_limit)
+    )
+    cutoff = datetime.utcnow() - timedelta(seconds=gap_timeout)
+    horizon = after_seq
+    for seq, created_at in rows:
+        skipped = seq - horizon - 1
+        if 0 < skipped <= _MAX_TRACKED_GAP and created_at is not None and created_at > cutoff:
+            break
+        horizon = seq
+    return horizon
+
+
+def seq_bounds(db: Session) -> Tuple[Optional[int], Optional[int]]:
+    """Oldest and latest retained sequence numbers, (None, None) when the outbox is empty."""
+    from .models import NotificationOutbox
+
+    table = NotificationOutbox.__table__
+    oldest, latest = db.execute(select(func.min(table.c.seq), func.max(table.c.seq))).one()
+    return oldest, latest
+
+
+def compact_outbox(db: Session, retention_days: float, max_entries: Optional[int] = None) -> int:
+    """
+    Delete notifications older than the retention period, then all but the newest max_entries.
+
+    Both deletes are ranges on indexed columns. Commits; returns the number
+    of rows removed.
+    """
+    from .models import NotificationOutbox
+
+    table = NotificationOutbox.__table__
+    removed = 0
+    try:
+        if retention_days:
+            cutoff = datetime.utcnow() - timedelta(days=retention_days)
+            removed += db.execute(delete(table).where(table.c.created_at < cutoff)).rowcount or 0
+
+        if max_entries:
+            latest = db.execute(select(func.max(table.c.seq))).scalar()
+            if latest is not None and latest > max_entries:
+                removed += db.execute(delete(table).where(table.c.seq <= latest - max_entries)).rowcount or 0
+
+        db.commit()
+        return removed
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error compacting notification outbox: {str(e)}")
+        raise
@@ -0,0 +1,220 @@
+# src/db/scan_writer.py
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from config.settings import SCANNER_CONFIG
+from .descriptor_store import split_permissions, intern_descriptors
+from .trustee_index import update_trustee_index
+
+logger = logging.getLogger(__name__)
+
+
+def scan_result_row(job_id: Optional[int], path: str, scan_data: Dict,
+                    owner: Optional[Dict] = None, descriptor_hash: Optional[str] = None) -> Dict:
+    """Build a scan_results row for a Core insert."""
+    return {
+        'job_id': job_id,
+        'path': path,
+        'scan_time': datetime.utcnow(),
+        'owner': owner,
+        'permissions': scan_data,
+        'success': scan_data.get('success', True),
+        'error_message': scan_data.get('error'),
+        'hash': descriptor_hash
+    }
+
+
+def access_entry_rows(scan_result_id: int, aces: Iterable[Dict]) -> List[Dict]:
+    """Build access_entries rows for the ACEs of one scan result."""
+    rows = []
+    for ace in aces:
+        trustee = ace['trustee']
+        rows.append({
+            'scan_result_id': scan_result_id,
+            'trustee_name': trustee['name'],
+            'trustee_domain': trustee['domain'],
+            'trustee_sid': trustee['sid'],
+            'access_type': ace['type'],
+            'inherited': ace['inherited'],
+            'permissions': ace['permissions']
+        })
+    return rows
+
+
+def insert_scan_results(db: Session, rows: List[Dict]) -> List[int]:
+    """
+    Insert scan_results rows in one executemany and return their ids in row order.
+
+    Uses INSERT ... RETURNING with parameter ordering where the dialect supports
+    it (SQLite 3.35+, SQL Server, PostgreSQL); otherwise falls back to one
+    insert per row so the ids can still be linked to their access entries.
+    """
+    if not rows:
+        return []
+
+    from .models import ScanResult
+
+    table = ScanResult.__table__
+    dialect = db.get_bind().dialect
+    # Ordered executemany RETURNING needs SQLAlchemy 2.0.10+; older installs insert row by row
+    if getattr(dialect, 'insert_executemany_returning_sort_by_parameter_order', False):
+        stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        return list(db.execute(stmt, rows).scalars().all())
+
+    ids = []
+    for row in rows:
+        result = db.execute(insert(table), row)
+        ids.append(result.inserted_primary_key[0])
+    return ids
+
+
+def insert_access_entries(db: Session, rows: List[Dict], batch_size: Optional[int] = None) -> int:
+    """Insert access_entries rows with executemany in chunks of batch_size."""
+    if not rows:
+        return 0
+
+    from .models import AccessEntry
+
+    batch_size = batch_size or SCANNER_CONFIG['batch_size']
+    stmt = insert(AccessEntry.__table__)
+    for start in range(0, len(rows), batch_size):
+        db.execute(stmt, rows[start:start + batch_size])
+    return len(rows)
+
+
+class ScanResultWriter:
+    """
+    Batched writer for streamed per-folder scan records.
+
+    Records are buffered and written to ScanResult/AccessEntry every
+    batch_size folders using Core executemany inserts, so memory stays flat
+    and the database sees a handful of round trips per batch instead of one
+    per row. With descriptor dedup the ACL part of each record is stored once
+    per distinct descriptor in security_descriptors and ScanResult.hash
+    points at it. The trustee reverse index is refreshed for the same
+    folders in the same transaction, unless the scan left out inherited ACEs.
+    """
+
+    def __init__(self, db: Session, job_id: Optional[int], batch_size: Optional[int] = None,
+                 dedup_descriptors: Optional[bool] = None, include_inherited: bool = True):
+        self.db = db
+        self.job_id = job_id
+        self.include_inherited = include_inherited
+        # Folders whose subtree was not fully read, and listed subfolders vs.
+        # folders received, to tell whether the walk covered the whole tree
+        self.unexplored_paths: List[str] = []
+        self._records_seen = 0
+        self._subfolders_listed = 0
+        self.batch_size = batch_size or SCANNER_CONFIG['batch_size']
+        self.dedup_descriptors = (
+            SCANNER_CONFIG.get('dedup_descriptors', True)
+            if dedup_descriptors is None else dedup_descriptors
+        )
+        self._pending: List[Dict] = []
+        self._known_descriptors = set()
+        self.stats = {
+            'folders_written': 0,
+            'access_entries_written': 0,
+            'failed_folders': 0,
+            'batches_committed': 0,
+            'descriptors_referenced': 0,
+            'descriptors_stored': 0,
+            'folders_reanalyzed': 0,
+            'folders_unchanged': 0,
+            'trustee_index_rows': 0
+        }
+
+    @property
+    def walk_complete(self) -> bool:
+        """Whether every subfolder listed by the walk was also received."""
+        return self._records_seen == self._subfolders_listed + 1
+
+    def add(self, record: Dict) -> None:
+        """Queue a per-folder record, writing the batch once it is full."""
+        self._records_seen += 1
+        self._subfolders_listed += record.get('subfolder_count', 0)
+        permissions = record.get('permissions')
+        if (not record.get('success', True) or record.get('access_error')
+                or (isinstance(permissions, dict) and not permissions.get('success', True))):
+            self.unexplored_paths.append(record['path'])
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def write_all(self, records) -> Dict[str, int]:
+        """Consume an iterable of records and return the write statistics."""
+        for record in records:
+            self.add(record)
+        self.flush()
+        return self.stats
+
+    def flush(self) -> None:
+        """Write and commit all buffered records."""
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        try:
+            rows = []
+            new_descriptors = {}
+            for record in batch:
+                permissions = record.get('permissions') or {}
+                status = record.get('incremental_status')
+                if status:
+                    self.stats[f'folders_{status}'] += 1
+                digest = None
+                stored = record
+                if self.dedup_descriptors:
+                    digest, descriptor, remainder = split_permissions(record.get('permissions'))
+                    if digest is not None:
+                        stored = dict(record, permissions=remainder)
+                        self.stats['descriptors_referenced'] += 1
+                        if digest not in self._known_descriptors:
+                            new_descriptors[digest] = descriptor
+                rows.append(scan_result_row(
+                    self.job_id,
+                    record['path'],
+                    stored,
+                    owner=permissions.get('owner'),
+                    descriptor_hash=digest
+                ))
+
+            stored_descriptors = intern_descriptors(self.db, new_descriptors)
+            result_ids = insert_scan_results(self.db, rows)
+
+            entries = []
+            failed = 0
+            for result_id, record in zip(result_ids, batch):
+                if not record.get('success', True):
+                    failed += 1
+                    continue
+                entries.extend(access_entry_rows(
+                    result_id, (record.get('permissions') or {}).get('aces', [])
+                ))
+            insert_access_entries(self.db, entries, self.batch_size)
+            index_rows = update_trustee_index(
+                self.db,
+                ((record['path'], record.get('permissions')) for record in batch
+                 if record.get('success', True)),
+                job_id=self.job_id,
+                scan_result_ids={record['path']: result_id for result_id, record in zip(result_ids, batch)},
+                descriptor_hashes={row['path']: row['hash'] for row in rows if row['hash']},
+                include_inherited=self.include_inherited
+            )
+            self.db.commit()
+            self._known_descriptors.update(new_descriptors)
+
+            self.stats['descriptors_stored'] += stored_descriptors
+            self.stats['folders_written'] += len(result_ids)
+            self.stats['access_entries_written'] += len(entries)
+            self.stats['failed_folders'] += failed
+            self.stats['batches_committed'] += 1
+            self.stats['trustee_index_rows'] += index_rows
+        except Exception as e:
+            logger.error(f"Error writing scan result batch: {str(e)}")
+            self.db.rollback()
+            raise
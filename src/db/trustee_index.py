@@ -0,0 +1,314 @@
+# src/db/trustee_index.py
+from datetime import datetime
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from config.settings import SCANNER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+INHERIT_ONLY_ACE = 0x08
+
+# Keep IN (...) lists well below the SQL Server parameter limit
+_LOOKUP_CHUNK = 500
+
+_MASK_FIELDS = ('explicit_allow_mask', 'explicit_deny_mask', 'inherited_allow_mask', 'inherited_deny_mask')
+
+
+def effective_mask(explicit_allow: int, explicit_deny: int, inherited_allow: int, inherited_deny: int) -> int:
+    """
+    Rights granted by a set of ACEs in canonical DACL order.
+
+    Explicit ACEs come before inherited ones and deny before allow within
+    each level, so an explicit allow beats an inherited deny but never an
+    explicit deny.
+    """
+    return (explicit_allow & ~explicit_deny) | (inherited_allow & ~(explicit_deny | inherited_deny))
+
+
+def trustee_access_rows(folder_path: str, permissions: Optional[Dict], job_id: Optional[int] = None,
+                        scan_result_id: Optional[int] = None,
+                        descriptor_hash: Optional[str] = None) -> List[Dict]:
+    """Build trustee_access_index rows for one folder: one row per trustee SID in its DACL."""
+    if not permissions or not permissions.get('success', True):
+        return []
+
+    now = datetime.utcnow()
+    rows: Dict[str, Dict] = {}
+    for ace in permissions.get('aces') or []:
+        trustee = ace.get('trustee') or {}
+        sid = trustee.get('sid')
+        if not sid or ace.get('ace_flags', 0) & INHERIT_ONLY_ACE:
+            continue
+
+        row = rows.get(sid)
+        if row is None:
+            row = rows[sid] = {
+                'trustee_sid': sid,
+                'trustee_name': trustee.get('name'),
+                'trustee_domain': trustee.get('domain'),
+                'folder_path': folder_path,
+                'explicit_allow_mask': 0,
+                'explicit_deny_mask': 0,
+                'inherited_allow_mask': 0,
+                'inherited_deny_mask': 0,
+                'permissions': {},
+                'inherited_only': True,
+                'descriptor_hash': descriptor_hash,
+                'scan_job_id': job_id,
+                'scan_result_id': scan_result_id,
+                'updated_at': now
+            }
+
+        deny = ace.get('type') == 'Deny'
+        inherited = bool(ace.get('inherited'))
+        field = f"{'inherited' if inherited else 'explicit'}_{'deny' if deny else 'allow'}_mask"
+        row[field] |= ace.get('access_mask') or 0
+        if not inherited:
+            row['inherited_only'] = False
+        if not deny:
+            for category, values in (ace.get('permissions') or {}).items():
+                if isinstance(values, str):
+                    values = [values]
+                names = row['permissions'].setdefault(category, [])
+                names.extend(value for value in values if value not in names)
+
+    for row in rows.values():
+        row['access_mask'] = effective_mask(*(row[field] for field in _MASK_FIELDS))
+    return list(rows.values())
+
+
+def update_trustee_index(db: Session, folders: Iterable[Tuple[str, Optional[Dict]]],
+                         job_id: Optional[int] = None,
+                         scan_result_ids: Optional[Dict[str, int]] = None,
+                         descriptor_hashes: Optional[Dict[str, str]] = None,
+                         include_inherited: bool = True) -> int:
+    """
+    Replace the index rows of every successfully scanned folder in the batch.
+
+    Failed folders keep their previous rows, so a transient read error does
+    not drop access that is still there. Scans run with include_inherited=False
+    only see explicit ACEs and leave the index alone. Runs inside the caller's
+    transaction; returns the number of rows written.
+    """
+    if not SCANNER_CONFIG.get('maintain_trustee_index', True) or not include_inherited:
+        return 0
+
+    from .models import TrusteeAccess
+
+    scan_result_ids = scan_result_ids or {}
+    descriptor_hashes = descriptor_hashes or {}
+    rows_by_path: Dict[str, List[Dict]] = {}
+    for path, permissions in folders:
+        if not permissions or not permissions.get('success', True):
+            continue
+        rows_by_path[path] = trustee_access_rows(
+            path, permissions, job_id,
+            scan_result_ids.get(path), descriptor_hashes.get(path)
+        )
+    if not rows_by_path:
+        return 0
+
+    table = TrusteeAccess.__table__
+    paths = list(rows_by_path)
+    for start in range(0, len(paths), _LOOKUP_CHUNK):
+        db.execute(delete(table).where(table.c.folder_path.in_(paths[start:start + _LOOKUP_CHUNK])))
+
+    rows = [row for path_rows in rows_by_path.values() for row in path_rows]
+    batch_size = SCANNER_CONFIG['batch_size']
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(table), rows[start:start + batch_size])
+    return len(rows)
+
+
+def prune_trustee_index(db: Session, root_path: str, job_id: int, max_depth: Optional[int],
+                        unexplored: Iterable[str] = ()) -> int:
+    """
+    Drop the rows of folders below a rescanned tree that the scan no longer found.
+
+    Call after every folder of a full scan of root_path went through
+    update_trustee_index with job_id: rows within max_depth that still carry
+    another job belong to folders that were deleted or are now excluded.
+    Folders in unexplored (failed reads, listings that were denied or cut
+    short) keep their rows and those of everything below them. Runs inside
+    the caller's transaction; returns the number of rows deleted.
+    """
+    if not SCANNER_CONFIG.get('maintain_trustee_index', True):
+        return 0
+
+    from .models import TrusteeAccess
+
+    table = TrusteeAccess.__table__
+    root = root_path.rstrip(os.sep) or root_path
+    protected = {path.rstrip(os.sep) or path for path in unexplored}
+    candidates = db.execute(
+        select(table.c.folder_path)
+        .where(
+            or_(table.c.folder_path == root,
+                table.c.folder_path.like(f"{_escape_like(root.rstrip(os.sep) + os.sep)}%", escape='!')),
+            or_(table.c.scan_job_id.is_(None), table.c.scan_job_id != job_id)
+        )
+        .distinct()
+    ).scalars()
+
+    stale = []
+    for path in candidates:
+        relative = path[len(root):].strip(os.sep)
+        depth = len(relative.split(os.sep)) if relative else 0
+        if max_depth is not None and depth > max_depth:
+            continue
+        if not _below_any(path, root, protected):
+            stale.append(path)
+
+    deleted = 0
+    for start in range(0, len(stale), _LOOKUP_CHUNK):
+        deleted += db.execute(
+            delete(table).where(table.c.folder_path.in_(stale[start:start + _LOOKUP_CHUNK]))
+        ).rowcount or 0
+    if deleted:
+        logger.info(f"Removed {deleted} trustee index rows for {len(stale)} folders no longer under {root}")
+    return deleted
+
+
+def iter_unexplored_paths(scan_result: Dict) -> Iterator[str]:
+    """Yield the folders of a nested scan_path result whose subtree was not fully read."""
+    stack = [scan_result]
+    while stack:
+        node = stack.pop()
+        path = (node.get('folder_info') or {}).get('path') or node.get('path')
+        permissions = node.get('permissions')
+        if path and (not node.get('success', True) or node.get('access_error') or node.get('incomplete')
+                     or (isinstance(permissions, dict) and not permissions.get('success', True))):
+            yield path
+        stack.extend(node.get('subfolders') or [])
+
+
+def iter_tree_permissions(scan_result: Dict) -> Iterator[Tuple[str, Dict]]:
+    """Yield (path, permissions) for every folder in a nested scan_path result."""
+    stack = [scan_result]
+    while stack:
+        node = stack.pop()
+        permissions = node.get('permissions')
+        # Scanned folders keep their path in folder_info; only failed ones have it at the top
+        path = (node.get('folder_info') or {}).get('path') or node.get('path')
+        if path and isinstance(permissions, dict):
+            yield path, permissions
+        stack.extend(reversed(node.get('subfolders') or []))
+
+
+def find_trustee_sids(db: Session, name: str, domain: Optional[str] = None) -> List[str]:
+    """SIDs recorded in the index for an account name."""
+    from .models import TrusteeAccess
+
+    table = TrusteeAccess.__table__
+    query = select(table.c.trustee_sid).where(func.lower(table.c.trustee_name) == name.lower())
+    if domain:
+        query = query.where(func.lower(table.c.trustee_domain) == domain.lower())
+    return list(db.execute(query.distinct()).scalars())
+
+
+def indexed_trustees(db: Session) -> List[Dict[str, str]]:
+    """Distinct named trustees that have an ACE anywhere in the index."""
+    from .models import TrusteeAccess
+
+    table = TrusteeAccess.__table__
+    rows = db.execute(
+        select(table.c.trustee_name, table.c.trustee_domain)
+        .where(table.c.trustee_name.isnot(None))
+        .distinct()
+    )
+    return [{'name': name, 'domain': domain or ''} for name, domain in rows]
+
+
+def query_trustee_access(db: Session, sids: Iterable[str], path_prefix: Optional[str] = None,
+                         page: int = 1, page_size: int = 100) -> Dict:
+    """
+    Folders where any of the given SIDs has an ACE, one page at a time.
+
+    Pass a user's SID together with the groups it belongs to to answer
+    "where does this user have access": the masks of all matching trustees
+    on a folder are combined before deny is applied, as for a real token.
+    """
+    from .models import TrusteeAccess
+
+    table = TrusteeAccess.__table__
+    sids = list(dict.fromkeys(sid for sid in sids if sid))
+    if not sids:
+        return {'total': 0, 'page': page, 'page_size': page_size, 'folders': []}
+
+    conditions = [_in_chunks(table.c.trustee_sid, sids)]
+    if path_prefix:
+        conditions.append(table.c.folder_path.like(f"{_escape_like(path_prefix)}%", escape='!'))
+
+    paths_query = select(table.c.folder_path).where(*conditions).distinct()
+    total = db.execute(select(func.count()).select_from(paths_query.subquery())).scalar() or 0
+    page_paths = list(db.execute(
+        paths_query.order_by(table.c.folder_path)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    ).scalars())
+
+    folders = {path: None for path in page_paths}
+    if page_paths:
+        rows = db.execute(
+            select(table).where(conditions[0], table.c.folder_path.in_(page_paths))
+        ).mappings()
+        for row in rows:
+            folder = folders[row['folder_path']]
+            if folder is None:
+                folder = folders[row['folder_path']] = {
+                    'path': row['folder_path'],
+                    'via': [],
+                    'permissions': {},
+                    'inherited_only': True,
+                    'updated_at': row['updated_at'],
+                    **{field: 0 for field in _MASK_FIELDS}
+                }
+            for field in _MASK_FIELDS:
+                folder[field] |= row[field] or 0
+            for category, values in (row['permissions'] or {}).items():
+                names = folder['permissions'].setdefault(category, [])
+                names.extend(value for value in values if value not in names)
+            folder['inherited_only'] = folder['inherited_only'] and bool(row['inherited_only'])
+            folder['via'].append({
+                'sid': row['trustee_sid'],
+                'name': row['trustee_name'],
+                'domain': row['trustee_domain'],
+                'access_mask': row['access_mask'],
+                'inherited_only': row['inherited_only']
+            })
+
+    results = []
+    for folder in folders.values():
+        masks = [folder.pop(field) for field in _MASK_FIELDS]
+        folder['access_mask'] = effective_mask(*masks)
+        folder['denied_mask'] = masks[1] | masks[3]
+        results.append(folder)
+
+    return {'total': total, 'page': page, 'page_size': page_size, 'folders': results}
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards with '!' (SQL Server also treats '[' as one)."""
+    return value.replace('!', '!!').replace('%', '!%').replace('_', '!_').replace('[', '![')
+
+
+def _below_any(path: str, root: str, ancestors: set) -> bool:
+    """Whether path or one of its parents up to root is in ancestors."""
+    while path not in ancestors:
+        parent = os.path.dirname(path)
+        if parent == path or len(parent) < len(root):
+            return False
+        path = parent
+    return True
+
+
+def _in_chunks(column, values: List[str]):
+    """column IN (...) split into OR-ed chunks for long SID lists."""
+    clauses = [column.in_(values[start:start + _LOOKUP_CHUNK])
+               for start in range(0, len(values), _LOOKUP_CHUNK)]
+    return clauses[0] if len(clauses) == 1 else or_(*clauses)
@@ -0,0 +1,28 @@
+# src/scanner/acl_fingerprint.py
+import hashlib
+from typing import Dict, Iterable, Optional
+
+
+def fingerprint_descriptor(
+    owner_sid: Optional[str],
+    group_sid: Optional[str],
+    inheritance_enabled: bool,
+    aces: Iterable[Dict]
+) -> str:
+    """
+    Fingerprint a raw security descriptor without resolving any SIDs.
+
+    Covers the owner and primary group SIDs, the DACL protection flag and every
+    ACE's type, flags, access mask and SID in DACL order, so two folders get
+    the same fingerprint exactly when their descriptors are identical.
+    """
+    parts = [
+        f"O:{owner_sid or ''}",
+        f"G:{group_sid or ''}",
+        f"P:{0 if inheritance_enabled else 1}"
+    ]
+    for ace in aces:
+        parts.append(
+            f"A:{ace['ace_type']}:{ace.get('ace_flags', 0)}:{ace['access_mask']}:{ace['sid']}"
+        )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
@@ -10,6 +10,10 @@ from pathlib import Path
 import logging
 from ..utils.logger import setup_logger
 from .group_resolver import GroupResolver
+from .sid_cache import SidCache
+from .sid_resolver import BatchSidResolver, Win32SidBackend
+from .acl_fingerprint import fingerprint_descriptor
+from config.settings import SID_CACHE_CONFIG
 
 logger = setup_logger('scanner')
 
@@ -55,10 +59,18 @@ class PermissionScanner:
             'CREATOR OWNER'
         }
         
-        # SID resolution cache to improve performance
-        self.sid_cache = {}
+        # Persistent SID resolution cache shared by all workers on this host
+        self.sid_cache = SidCache(**SID_CACHE_CONFIG)
         
         self.group_resolver = GroupResolver()
+        
+        # Resolves all distinct SIDs of one or more security descriptors in a single pass
+        self.sid_resolver = BatchSidResolver(
+            Win32SidBackend(domain_controller_provider=lambda: self.group_resolver.domain_controller),
+            self.sid_cache,
+            is_system_account=self._is_system_account,
+            fallback=self._resolve_sid_offline
+        )
         logger.info("PermissionScanner initialized with categorized Windows permissions and SID caching")
 
     def _is_system_account(self, account_name: str) -> bool:
@@ -66,119 +78,24 @@ class PermissionScanner:
         return (account_name in self.system_accounts or 
                 any(account_name.startswith(prefix) for prefix in ['NT ', 'BUILTIN\\', 'NT SERVICE\\']))
 
-    def _get_account_type_str(self, account_type: int) -> str:
-        """Convert Windows account type to string representation."""
-        type_mapping = {
-            win32security.SidTypeUser: "User",
-            win32security.SidTypeGroup: "Group",
-            win32security.SidTypeWellKnownGroup: "WellKnownGroup",
-            win32security.SidTypeAlias: "Alias",
-            win32security.SidTypeDeletedAccount: "DeletedAccount",
-            win32security.SidTypeInvalid: "Invalid",
-            win32security.SidTypeUnknown: "Unknown",
-            win32security.SidTypeComputer: "Computer"
-        }
-        # Add SidTypeLabel if available in this pywin32 version
-        if hasattr(win32security, 'SidTypeLabel'):
-            type_mapping[win32security.SidTypeLabel] = "Label"
-        
-        return type_mapping.get(account_type, f"Other ({account_type})")
-
     def _get_trustee_name(self, sid: bytes) -> Dict[str, str]:
         """Convert a security identifier (SID) to a readable name with multiple fallback methods."""
         sid_string = win32security.ConvertSidToStringSid(sid)
-        
-        # Check cache first
-        if sid_string in self.sid_cache:
-            logger.debug(f"Using cached SID resolution for {sid_string}")
-            return self.sid_cache[sid_string]
-        
-        # Try multiple resolution methods
-        methods = [
-            self._lookup_sid_local,
-            self._lookup_sid_with_domain,
-            self._lookup_well_known_sid,
-            self._parse_sid_components
-        ]
-        
-        for method in methods:
+        return self.sid_resolver.resolve(sid_string)
+
+    def _resolve_sid_offline(self, sid_string: str) -> Optional[Dict[str, str]]:
+        """Resolve a SID the lookup backend could not map using well-known SIDs and RID parsing."""
+        for method in (self._lookup_well_known_sid, self._parse_sid_components):
             try:
-                result = method(sid, sid_string)
+                result = method(None, sid_string)
                 if result and result.get("name") != "Unknown":
                     logger.debug(f"Successfully resolved SID {sid_string} using {method.__name__}")
-                    # Cache the successful result
-                    self.sid_cache[sid_string] = result
                     return result
             except Exception as e:
                 logger.debug(f"Method {method.__name__} failed for SID {sid_string}: {str(e)}")
-                continue
         
-        # All methods failed - return unknown with SID info
         logger.warning(f"Could not resolve SID {sid_string} using any method")
-        unknown_result = {
-            "name": "Unknown",
-            "domain": "Unknown",
-            "sid": sid_string,
-            "full_name": f"Unknown SID: {sid_string}",
-            "account_type": "Unknown",
-            "is_system": False
-        }
-        
-        # Cache the unknown result to avoid repeated failed lookups
-        self.sid_cache[sid_string] = unknown_result
-        return unknown_result
-
-    def _lookup_sid_local(self, sid: bytes, sid_string: str) -> Dict[str, str]:
-        """Try to lookup SID on local system."""
-        try:
-            name, domain, account_type = win32security.LookupAccountSid(None, sid)
-            
-            # Additional validation - sometimes LookupAccountSid returns empty strings
-            if not name or name.strip() == "":
-                raise Exception("Empty name returned from LookupAccountSid")
-                
-            trustee_info = {
-                "name": name,
-                "domain": domain or "Unknown",
-                "sid": sid_string,
-                "full_name": f"{domain}\\{name}" if domain else name,
-                "account_type": self._get_account_type_str(account_type)
-            }
-            trustee_info["is_system"] = self._is_system_account(trustee_info["full_name"])
-            logger.debug(f"Local SID lookup successful: {trustee_info['full_name']}")
-            return trustee_info
-            
-        except Exception as e:
-            logger.debug(f"Local SID lookup failed for {sid_string}: {str(e)}")
-            raise
-
-    def _lookup_sid_with_domain(self, sid: bytes, sid_string: str) -> Dict[str, str]:
-        """Try to lookup SID with domain controller if available."""
-        if hasattr(self, 'group_resolver') and self.group_resolver.domain_controller:
-            try:
-                name, domain, account_type = win32security.LookupAccountSid(
-                    self.group_resolver.domain_controller, sid
-                )
-                
-                # Additional validation
-                if not name or name.strip() == "":
-                    raise Exception("Empty name returned from domain LookupAccountSid")
-                    
-                trustee_info = {
-                    "name": name,
-                    "domain": domain or self.group_resolver.domain_controller,
-                    "sid": sid_string,
-                    "full_name": f"{domain}\\{name}" if domain else f"{self.group_resolver.domain_controller}\\{name}",
-                    "account_type": self._get_account_type_str(account_type)
-                }
-                trustee_info["is_system"] = self._is_system_account(trustee_info["full_name"])
-                logger.debug(f"Domain SID lookup successful: {trustee_info['full_name']}")
-                return trustee_info
-                
-            except Exception as e:
-                logger.debug(f"Domain SID lookup failed for {sid_string}: {str(e)}")
-                
-        raise Exception("No domain controller available or lookup failed")
+        return None
 
     def _lookup_well_known_sid(self, sid: bytes, sid_string: str) -> Dict[str, str]:
         """Handle well-known SIDs that might not resolve through normal lookup."""
@@ -331,20 +248,26 @@ class PermissionScanner:
 
     def clear_sid_cache(self):
         """Clear the SID resolution cache."""
-        cache_size = len(self.sid_cache)
-        self.sid_cache.clear()
+        cache_size = self.sid_cache.clear()
         logger.info(f"Cleared SID cache containing {cache_size} entries")
 
     def get_sid_cache_stats(self) -> Dict[str, int]:
         """Get statistics about the SID cache."""
-        total_entries = len(self.sid_cache)
-        unknown_entries = sum(1 for entry in self.sid_cache.values() if entry.get("name") == "Unknown")
-        resolved_entries = total_entries - unknown_entries
+        cache_stats = self.sid_cache.stats()
+        total_entries = cache_stats["store_entries"] or cache_stats["memory_entries"]
+        unknown_entries = cache_stats["negative_entries"]
         
         return {
             "total_entries": total_entries,
-            "resolved_entries": resolved_entries,
-            "unknown_entries": unknown_entries
+            "resolved_entries": total_entries - unknown_entries,
+            "unknown_entries": unknown_entries,
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "negative_hits": cache_stats["negative_hits"],
+            "evictions": cache_stats["evictions"],
+            "expirations": cache_stats["expirations"],
+            "hit_rate": cache_stats["hit_rate"],
+            "resolver": self.sid_resolver.get_stats()
         }
 
     def diagnose_sid_issues(self, folder_path: str) -> Dict:
@@ -439,104 +362,190 @@ class PermissionScanner:
             simplified_system: If True, provides simplified information for system accounts
             include_inherited: Include inherited permissions
         """
-        logger.info(f"Analyzing permissions for: {folder_path}")
-        
-        try:
-            if not os.path.exists(folder_path):
-                raise FileNotFoundError(f"Path does not exist: {folder_path}")
-
-            # Get security descriptor
-            sd = win32security.GetFileSecurity(
-                folder_path,
-                win32security.DACL_SECURITY_INFORMATION | 
-                win32security.OWNER_SECURITY_INFORMATION |
-                win32security.GROUP_SECURITY_INFORMATION
-            )
+        return self.get_folder_permissions_batch(
+            [folder_path],
+            simplified_system=simplified_system,
+            include_inherited=include_inherited
+        )[folder_path]
 
-            # Check if inheritance is disabled by looking at the security descriptor control flags
-            sd_control = sd.GetSecurityDescriptorControl()
-            # SE_DACL_PROTECTED flag indicates that inheritance is disabled
-            inheritance_enabled = not (sd_control[0] & win32security.SE_DACL_PROTECTED)
-            logger.debug(f"Security descriptor control for {folder_path}: {sd_control[0]}, inheritance_enabled: {inheritance_enabled}")
+    def get_folder_permissions_batch(
+        self,
+        folder_paths: List[str],
+        simplified_system: bool = True,
+        include_inherited: bool = True
+    ) -> Dict[str, Dict]:
+        """
+        Get permission information for several folders with one SID resolution pass.
+        
+        Security descriptors are read first, the distinct SIDs across all of them
+        are resolved together, and the trustees are then fanned back out to the
+        ACEs of each folder.
+        
+        Args:
+            folder_paths: Paths to scan
+            simplified_system: If True, provides simplified information for system accounts
+            include_inherited: Include inherited permissions
+            
+        Returns:
+            Mapping of folder path to the get_folder_permissions result for that path
+        """
+        descriptors = {}
+        results = {}
+        for folder_path in folder_paths:
+            logger.info(f"Analyzing permissions for: {folder_path}")
+            try:
+                descriptors[folder_path] = self._read_security_descriptor(folder_path, include_inherited)
+            except Exception as e:
+                logger.error(f"Error scanning {folder_path}: {str(e)}", exc_info=True)
+                results[folder_path] = self._permission_error_result(folder_path, e)
+        
+        # Resolve every distinct SID of the batch in one pass
+        trustees = self.sid_resolver.resolve_many(
+            sid_string
+            for descriptor in descriptors.values()
+            for sid_string in descriptor["sids"]
+        )
+        
+        for folder_path, descriptor in descriptors.items():
+            try:
+                results[folder_path] = self._build_folder_permissions(
+                    folder_path, descriptor, trustees, simplified_system
+                )
+            except Exception as e:
+                logger.error(f"Error scanning {folder_path}: {str(e)}", exc_info=True)
+                results[folder_path] = self._permission_error_result(folder_path, e)
+        
+        return {folder_path: results[folder_path] for folder_path in folder_paths}
+
+    def _read_security_descriptor(self, folder_path: str, include_inherited: bool) -> Dict:
+        """Read a folder's security descriptor and collect the SIDs it references."""
+        if not os.path.exists(folder_path):
+            raise FileNotFoundError(f"Path does not exist: {folder_path}")
+
+        # Get security descriptor
+        sd = win32security.GetFileSecurity(
+            folder_path,
+            win32security.DACL_SECURITY_INFORMATION | 
+            win32security.OWNER_SECURITY_INFORMATION |
+            win32security.GROUP_SECURITY_INFORMATION
+        )
+
+        # Check if inheritance is disabled by looking at the security descriptor control flags
+        sd_control = sd.GetSecurityDescriptorControl()
+        # SE_DACL_PROTECTED flag indicates that inheritance is disabled
+        inheritance_enabled = not (sd_control[0] & win32security.SE_DACL_PROTECTED)
+        logger.debug(f"Security descriptor control for {folder_path}: {sd_control[0]}, inheritance_enabled: {inheritance_enabled}")
+
+        owner_sid = win32security.ConvertSidToStringSid(sd.GetSecurityDescriptorOwner())
+        group_sid = win32security.ConvertSidToStringSid(sd.GetSecurityDescriptorGroup())
+
+        # Collect ACEs; the fingerprint covers all of them, the result skips
+        # inherited ones if not requested
+        all_aces = []
+        dacl = sd.GetSecurityDescriptorDacl()
+        if dacl:
+            for ace_index in range(dacl.GetAceCount()):
+                ace = dacl.GetAce(ace_index)
+                all_aces.append({
+                    "sid": win32security.ConvertSidToStringSid(ace[2]),
+                    "ace_type": ace[0][0],
+                    "ace_flags": ace[0][1],
+                    "access_mask": ace[1],
+                    "inherited": bool(ace[0][1] & win32security.INHERITED_ACE)
+                })
+        aces = [ace for ace in all_aces if include_inherited or not ace["inherited"]]
 
-            # Get owner information
-            owner_sid = sd.GetSecurityDescriptorOwner()
-            owner_info = self._get_trustee_name(owner_sid)
+        return {
+            "owner_sid": owner_sid,
+            "group_sid": group_sid,
+            "inheritance_enabled": inheritance_enabled,
+            "aces": aces,
+            "sids": [owner_sid, group_sid] + [ace["sid"] for ace in aces],
+            "fingerprint": fingerprint_descriptor(owner_sid, group_sid, inheritance_enabled, all_aces)
+        }
 
-            # Get primary group information
-            group_sid = sd.GetSecurityDescriptorGroup()
-            group_info = self._get_trustee_name(group_sid)
+    def get_descriptor_fingerprint(self, folder_path: str) -> Optional[str]:
+        """
+        Fingerprint a folder's security descriptor without resolving any SIDs.
+        
+        Much cheaper than get_folder_permissions; used to detect whether a
+        folder's ACL changed since it was last analyzed. Returns None if the
+        descriptor cannot be read.
+        """
+        try:
+            return self._read_security_descriptor(folder_path, include_inherited=True)["fingerprint"]
+        except Exception as e:
+            logger.debug(f"Could not fingerprint {folder_path}: {str(e)}")
+            return None
 
-            # Get DACL
-            dacl = sd.GetSecurityDescriptorDacl()
+    def _build_folder_permissions(
+        self,
+        folder_path: str,
+        descriptor: Dict,
+        trustees: Dict[str, Dict],
+        simplified_system: bool
+    ) -> Dict:
+        """Build the permissions result for a folder from its descriptor and resolved trustees."""
+        aces = []
+        for raw_ace in descriptor["aces"]:
+            trustee_info = trustees[raw_ace["sid"]]
+            is_system = trustee_info.get("is_system", False)
             
-            # Process ACEs
-            aces = []
-            if dacl:
-                for ace_index in range(dacl.GetAceCount()):
-                    ace = dacl.GetAce(ace_index)
-                    is_inherited = bool(ace[0][1] & win32security.INHERITED_ACE)
-                    
-                    # Skip inherited permissions if not requested
-                    if is_inherited and not include_inherited:
-                        continue
-                        
-                    trustee_info = self._get_trustee_name(ace[2])
-                    is_system = trustee_info.get("is_system", False)
-                    
-                    # Create basic ACE info
-                    ace_info = {
-                        "trustee": trustee_info,
-                        "type": "Allow" if ace[0][0] == win32security.ACCESS_ALLOWED_ACE_TYPE else "Deny",
-                        "inherited": is_inherited,
-                        "is_system": is_system
-                    }
-                    
-                    # Add permissions based on account type
-                    if is_system and simplified_system:
-                        ace_info["permissions"] = self._get_categorized_permissions(ace[1], simplified=True)
-                    else:
-                        ace_info["permissions"] = self._get_categorized_permissions(ace[1])
-                        ace_info["access_paths"] = self.group_resolver.get_access_paths(trustee_info)
+            # Create basic ACE info
+            ace_info = {
+                "trustee": trustee_info,
+                "type": "Allow" if raw_ace["ace_type"] == win32security.ACCESS_ALLOWED_ACE_TYPE else "Deny",
+                "inherited": raw_ace["inherited"],
+                "is_system": is_system,
+                "access_mask": raw_ace["access_mask"],
+                "ace_flags": raw_ace.get("ace_flags", 0)
+            }
+            
+            # Add permissions based on account type
+            if is_system and simplified_system:
+                ace_info["permissions"] = self._get_categorized_permissions(raw_ace["access_mask"], simplified=True)
+            else:
+                ace_info["permissions"] = self._get_categorized_permissions(raw_ace["access_mask"])
+                ace_info["access_paths"] = self.group_resolver.get_access_paths(trustee_info)
 
-                    aces.append(ace_info)
+            aces.append(ace_info)
 
-            scan_time = datetime.now().isoformat()
-            
-            # Build folder info
-            folder = Path(folder_path)
-            folder_info = {
-                "name": folder.name,
-                "path": str(folder),
-                "parent": str(folder.parent),
-                "is_root": folder.parent == folder
-            }
+        scan_time = datetime.now().isoformat()
+        
+        # Build folder info
+        folder = Path(folder_path)
+        folder_info = {
+            "name": folder.name,
+            "path": str(folder),
+            "parent": str(folder.parent),
+            "is_root": folder.parent == folder
+        }
 
-            return {
-                "path": folder_path,
-                "folder_info": folder_info,
-                "owner": owner_info,
-                "primary_group": group_info,
-                "inheritance_enabled": inheritance_enabled,
-                "aces": aces,
-                "scan_time": scan_time,
-                "success": True,
-                "metadata": {
-                    "has_system_accounts": any(ace["is_system"] for ace in aces),
-                    "total_aces": len(aces),
-                    "system_aces": sum(1 for ace in aces if ace["is_system"]),
-                    "non_system_aces": sum(1 for ace in aces if not ace["is_system"]),
-                }
+        return {
+            "path": folder_path,
+            "folder_info": folder_info,
+            "owner": trustees[descriptor["owner_sid"]],
+            "primary_group": trustees[descriptor["group_sid"]],
+            "inheritance_enabled": descriptor["inheritance_enabled"],
+            "descriptor_fingerprint": descriptor["fingerprint"],
+            "aces": aces,
+            "scan_time": scan_time,
+            "success": True,
+            "metadata": {
+                "has_system_accounts": any(ace["is_system"] for ace in aces),
+                "total_aces": len(aces),
+                "system_aces": sum(1 for ace in aces if ace["is_system"]),
+                "non_system_aces": sum(1 for ace in aces if not ace["is_system"]),
             }
+        }
 
-        except Exception as e:
-            logger.error(f"Error scanning {folder_path}: {str(e)}", exc_info=True)
-            return {
-                "path": folder_path,
-                "error": str(e),
-                "scan_time": datetime.now().isoformat(),
-                "success": False
-            }
+    def _permission_error_result(self, folder_path: str, error: Exception) -> Dict:
+        return {
+            "path": folder_path,
+            "error": str(error),
+            "scan_time": datetime.now().isoformat(),
+            "success": False
+        }
 
     def scan_directory(
         self,
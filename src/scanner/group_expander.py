@@ -0,0 +1,172 @@
+# src/scanner/group_expander.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger('group_expander')
+
+GROUP_TYPES = ('Group', 'WellKnownGroup', 'Alias')
+
+# (group name, domain) -> direct members, as returned by GroupResolver._get_group_members_multi_provider
+MemberFetcher = Callable[[str, str], List[Dict]]
+
+
+class ParallelGroupExpander:
+    """
+    Expands nested groups level by level with concurrent directory queries.
+
+    Every group reachable within max_depth is discovered breadth-first and
+    the members of each level are fetched in parallel on a bounded thread
+    pool, once per group per call even when several branches share it. The
+    group paths are then assembled from those results with the same depth
+    limit and per-branch cycle detection as a depth-first trace, so the tree
+    is identical to the serial one.
+    """
+
+    def __init__(self, fetch_members: MemberFetcher, max_workers: int = 8, max_depth: int = 10,
+                 is_system_account: Optional[Callable[[str], bool]] = None,
+                 thread_initializer: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            fetch_members: Directory lookup of a group's direct members
+            max_workers: Maximum concurrent directory queries
+            max_depth: Nesting depth at which expansion stops
+            is_system_account: Groups for which members are not looked up
+            thread_initializer: Run once in each pool thread (e.g. COM initialization)
+        """
+        self.fetch_members = fetch_members
+        self.max_workers = max(1, max_workers)
+        self.max_depth = max_depth
+        self.is_system_account = is_system_account or (lambda name: False)
+        self._thread_initializer = thread_initializer
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.last_stats: Dict = {}
+
+    def expand(self, groups: Iterable[Dict], visited: Optional[Set[str]] = None,
+               start_depth: int = 0) -> List[Optional[Dict]]:
+        """
+        Build the group path of each group.
+
+        Args:
+            groups: Group details with 'name', 'domain', 'full_name' and 'type'
+            visited: Groups already on the chain above these groups
+            start_depth: Nesting level of the given groups
+
+        Returns:
+            One path per group, None where the depth limit or a cycle stops it
+        """
+        groups = list(groups)
+        started = time.perf_counter()
+        members, errors, levels = self._fetch_levels(groups, start_depth)
+
+        chain = set(visited or ())
+        paths = [self._build_path(group, chain, start_depth, members, errors) for group in groups]
+
+        self.last_stats = {
+            "groups": len(groups),
+            "groups_fetched": len(members),
+            "levels": levels,
+            "fetch_errors": len(errors),
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+        return paths
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _fetch_levels(self, roots: List[Dict], start_depth: int):
+        """Fetch the members of every group within the depth limit, one level at a time."""
+        members: Dict[str, List[Dict]] = {}
+        errors: Dict[str, Exception] = {}
+        seen = set()
+        frontier = []
+        for group in roots:
+            if group['full_name'] not in seen:
+                seen.add(group['full_name'])
+                frontier.append(group)
+
+        depth = start_depth
+        levels = 0
+        while frontier and depth < self.max_depth:
+            to_fetch = [group for group in frontier if not self.is_system_account(group['full_name'])]
+            levels += 1
+            for group, result in zip(to_fetch, self._fetch_all(to_fetch)):
+                if isinstance(result, Exception):
+                    errors[group['full_name']] = result
+                else:
+                    members[group['full_name']] = result
+
+            next_frontier = []
+            for group in to_fetch:
+                for member in members.get(group['full_name'], ()):
+                    if member.get('type') in GROUP_TYPES and member['full_name'] not in seen:
+                        seen.add(member['full_name'])
+                        next_frontier.append(member)
+            frontier = next_frontier
+            depth += 1
+
+        return members, errors, levels
+
+    def _fetch_all(self, groups: List[Dict]) -> List[object]:
+        if len(groups) <= 1 or self.max_workers == 1:
+            return [self._fetch(group) for group in groups]
+        return list(self._get_executor().map(self._fetch, groups))
+
+    def _fetch(self, group: Dict) -> object:
+        try:
+            return self.fetch_members(group['name'], group['domain'])
+        except Exception as e:
+            return e
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="group-expander",
+                    initializer=self._thread_initializer
+                )
+            return self._executor
+
+    def _build_path(self, group: Dict, visited: Set[str], current_depth: int,
+                    members: Dict[str, List[Dict]], errors: Dict[str, Exception]) -> Optional[Dict]:
+        """Assemble one group path from fetched members, mirroring the depth-first trace."""
+        if current_depth >= self.max_depth:
+            logger.warning(f"Max depth reached while tracing group: {group['full_name']}")
+            return None
+
+        group_key = group['full_name']
+        if group_key in visited:
+            logger.debug(f"Cycle detected in group path: {group_key}")
+            return None
+
+        visited.add(group_key)
+        try:
+            path = {
+                'group': group,
+                'member_groups': [],
+                'nested_level': current_depth,
+                'members': []
+            }
+            if group_key in errors:
+                logger.error(f"Error getting members for {group_key}: {str(errors[group_key])}")
+            elif group_key in members:
+                path['members'] = members[group_key]
+                for member in path['members']:
+                    if member['type'] not in GROUP_TYPES:
+                        continue
+                    nested_path = self._build_path(member, visited, current_depth + 1, members, errors)
+                    if nested_path:
+                        path['member_groups'].append(nested_path)
+                        path['nested_level'] = max(path['nested_level'], nested_path['nested_level'] + 1)
+            return path
+        finally:
+            # visited holds only the current chain, so sibling branches may revisit a group
+            visited.discard(group_key)
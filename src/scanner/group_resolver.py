@@ -9,10 +9,32 @@ from typing import Dict, List, Set, Optional
 from datetime import datetime, timedelta
 import logging
 from ..utils.logger import setup_logger
+from .membership_index import DirectoryBackend, GroupResolverBackend, MembershipIndex
+from .resolver_cache import ResolverCache
+from .group_expander import ParallelGroupExpander
+from config.settings import GROUP_CACHE_CONFIG
 import socket
 
 logger = setup_logger('group_resolver')
 
+CACHE_TYPES = (
+    'groups',           # Cache for group details
+    'users',            # Cache for user group memberships
+    'paths',            # Cache for access paths
+    'memberships',      # Cache for group memberships
+    'group_members',    # Cache for direct group members
+    'sid_to_account',   # Cache for SID resolutions
+    'domain_info'       # Cache for domain information
+)
+
+def _initialize_refresh_thread() -> None:
+    """Initialize COM in cache refresh and expansion threads (lookups use ADSI)."""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pass
+
 class GroupResolver:
     """Universal group resolver supporting multiple domain environments."""
 
@@ -23,18 +45,15 @@ class GroupResolver:
         Args:
             domain_controller: Optional domain controller address. If None, auto-discovers.
         """
-        self._cache = {
-            'groups': {},           # Cache for group details
-            'users': {},            # Cache for user group memberships
-            'paths': {},            # Cache for access paths
-            'memberships': {},      # Cache for group memberships
-            'group_members': {},    # Cache for direct group members
-            'sid_to_account': {},   # Cache for SID resolutions
-            'domain_info': {}       # Cache for domain information
-        }
-
-        self._cache_times = {}
-        self.cache_ttl = 3600  # 1 hour default TTL
+        self.cache_ttl = GROUP_CACHE_CONFIG['ttl_seconds']
+        self.cache = ResolverCache(
+            CACHE_TYPES,
+            max_entries=GROUP_CACHE_CONFIG['max_entries'],
+            ttl_seconds=self.cache_ttl,
+            stale_seconds=GROUP_CACHE_CONFIG['stale_seconds'],
+            refresh_workers=GROUP_CACHE_CONFIG['refresh_workers'],
+            thread_initializer=_initialize_refresh_thread
+        )
         self.max_depth = 10    # Maximum depth for nested group resolution
         self.query_timeout = 30 # Timeout for AD queries
 
@@ -55,6 +74,18 @@ class GroupResolver:
             'CREATOR OWNER'
         }
 
+        # Nested groups are expanded level by level with concurrent directory queries
+        self.group_expander = ParallelGroupExpander(
+            self._get_group_members_multi_provider,
+            max_workers=GROUP_CACHE_CONFIG['directory_workers'],
+            max_depth=self.max_depth,
+            is_system_account=self._is_system_account,
+            thread_initializer=_initialize_refresh_thread
+        )
+
+        # Transitive membership closure, rebuilt by refresh_membership_index
+        self.membership_index: Optional[MembershipIndex] = None
+
         self._initialize_domain_info()
         logger.info("GroupResolver initialized with TTL: %d seconds", self.cache_ttl)
 
@@ -96,27 +127,14 @@ class GroupResolver:
         except Exception as e:
             logger.warning(f"Error during domain initialization: {str(e)}")
 
-    def _is_cache_valid(self, cache_type: str, key: str) -> bool:
-        """Check if cached data is still valid."""
-        if key in self._cache_times:
-            cache_time = self._cache_times.get(key)
-            if cache_time and (datetime.now() - cache_time) < timedelta(seconds=self.cache_ttl):
-                logger.debug(f"Cache hit for {cache_type}: {key}")
-                return True
-        return False
-
     def _get_cached(self, cache_type: str, key: str) -> Optional[Dict]:
         """Get data from cache if valid."""
-        if cache_type in self._cache and self._is_cache_valid(cache_type, key):
-            return self._cache[cache_type].get(key)
-        return None
+        return self.cache.get(cache_type, key)
 
     def _set_cached(self, cache_type: str, key: str, value: Dict) -> None:
-        """Store data in cache with timestamp."""
-        if cache_type in self._cache:
-            self._cache[cache_type][key] = value
-            self._cache_times[key] = datetime.now()
-            logger.debug(f"Cached {cache_type}: {key}")
+        """Store data in cache with its own expiry."""
+        self.cache.set(cache_type, key, value)
+        logger.debug(f"Cached {cache_type}: {key}")
 
     def _is_system_account(self, account_name: str) -> bool:
         """Check if the account is a system account."""
@@ -173,13 +191,14 @@ class GroupResolver:
 
     def _get_group_members_multi_provider(self, group_name: str, domain: str) -> List[Dict]:
         """Get group members using multiple providers with fallback."""
-        members = []
         cache_key = f"{domain}\\{group_name}"
+        return self.cache.get_or_load(
+            'group_members', cache_key, lambda: self._load_group_members(group_name, domain)
+        )
 
-        # Check cache first
-        cached_members = self._get_cached('group_members', cache_key)
-        if cached_members is not None:
-            return cached_members
+    def _load_group_members(self, group_name: str, domain: str) -> List[Dict]:
+        """Query group members from the directory, trying ADSI then Win32Net."""
+        members = []
 
         # Try ADSI first, then fall back to Win32Net
         try:
@@ -191,10 +210,8 @@ class GroupResolver:
             except Exception as e2:
                 logger.warning(f"All member resolution methods failed for {domain}\\{group_name}. Error: {str(e2)}")
 
-        # Cache the results even if empty
-        self._set_cached('group_members', cache_key, members)
-        logger.info(f"Found {len(members)} members for group {cache_key}")
-
+        # Cached even if empty
+        logger.info(f"Found {len(members)} members for group {domain}\\{group_name}")
         return members
 
     def _get_members_adsi(self, group_name: str, domain: str) -> List[Dict]:
@@ -328,13 +345,15 @@ class GroupResolver:
     def _get_user_groups(self, username: str, domain: str) -> List[Dict]:
         """Get all groups a user belongs to using multiple methods."""
         cache_key = f"{domain}\\{username}"
-        cached_groups = self._get_cached('users', cache_key)
-        if cached_groups is not None:
-            return cached_groups
-
         if self._is_system_account(cache_key):
             return []
+        return self.cache.get_or_load(
+            'users', cache_key, lambda: self._load_user_groups(username, domain)
+        )
 
+    def _load_user_groups(self, username: str, domain: str) -> List[Dict]:
+        """Query a user's groups from the directory, trying ADSI then Win32Net."""
+        cache_key = f"{domain}\\{username}"
         logger.info(f"Getting groups for user: {cache_key}")
         groups = []
         last_error = None
@@ -404,8 +423,7 @@ class GroupResolver:
                 else:
                     logger.error(f"Win32Net lookup failed: {str(e)}")
 
-        # Cache results even if empty
-        self._set_cached('users', cache_key, groups)
+        # Cached even if empty
         logger.info(f"Found {len(groups)} groups for user {cache_key}")
 
         return groups
@@ -427,69 +445,9 @@ class GroupResolver:
             - group_memberships: List of group members
         """
         try:
-            cache_key = trustee['full_name']
-            cached_paths = self._get_cached('paths', cache_key)
-            if cached_paths is not None:
-                return cached_paths
-
-            logger.info(f"Building access paths for: {cache_key}")
-
-            access_paths = {
-                'trustee': trustee,
-                'direct_access': True,
-                'group_paths': [],
-                'nested_level': 0,
-                'group_memberships': []
-            }
-
-            if not self._is_system_account(trustee['full_name']):
-                try:
-                    account_details = self._get_account_details(trustee['name'], trustee['domain'])
-                    account_type = account_details['type']
-                    logger.debug(f"Processing trustee {trustee['full_name']} of type {account_type}")
-
-                    if account_type in ['Group', 'WellKnownGroup', 'Alias']:
-                        # Get direct members for groups
-                        direct_members = self._get_group_members_multi_provider(
-                            trustee['name'],
-                            trustee['domain']
-                        )
-                        access_paths['group_memberships'] = direct_members
-                        logger.debug(f"Found {len(direct_members)} direct members")
-
-                        # Process nested groups
-                        nested_groups = [m for m in direct_members 
-                                         if m['type'] in ['Group', 'WellKnownGroup', 'Alias']]
-                        for group in nested_groups:
-                            nested_path = self._trace_group_path(group)
-                            if nested_path:
-                                access_paths['group_paths'].append(nested_path)
-
-                    elif account_type in ['User', 'Unknown']:
-                        # Get group memberships for users
-                        user_groups = self._get_user_groups(trustee['name'], trustee['domain'])
-                        logger.debug(f"Found {len(user_groups)} groups for user")
-
-                        for group in user_groups:
-                            group_path = self._trace_group_path(group)
-                            if group_path:
-                                access_paths['group_paths'].append(group_path)
-                                # Get members of each group
-                                group_members = self._get_group_members_multi_provider(
-                                    group['name'],
-                                    group['domain']
-                                )
-                                for member in group_members:
-                                    if member not in access_paths['group_memberships']:
-                                        access_paths['group_memberships'].append(member)
-
-                except Exception as e:
-                    logger.error(f"Error processing {trustee['full_name']}: {str(e)}", exc_info=True)
-
-            # Cache the results
-            self._set_cached('paths', cache_key, access_paths)
-            return access_paths
-
+            return self.cache.get_or_load(
+                'paths', trustee['full_name'], lambda: self._build_access_paths(trustee)
+            )
         except Exception as e:
             logger.error(f"Error building access paths for {trustee['full_name']}: {str(e)}", 
                          exc_info=True)
@@ -502,65 +460,67 @@ class GroupResolver:
                 'group_memberships': []
             }
 
-    def _trace_group_path(self, group: Dict[str, str], visited: Optional[Set[str]] = None, 
-                          current_depth: int = 0) -> Optional[Dict]:
-        """Recursively trace group membership path."""
-        if visited is None:
-            visited = set()
-
-        if current_depth >= self.max_depth:
-            logger.warning(f"Max depth reached while tracing group: {group['full_name']}")
-            return None
-
-        group_key = group['full_name']
-        if group_key in visited:
-            logger.debug(f"Cycle detected in group path: {group_key}")
-            return None
-
-        visited.add(group_key)
-        logger.debug(f"Tracing group path for: {group_key} (depth: {current_depth})")
+    def _build_access_paths(self, trustee: Dict[str, str]) -> Dict:
+        """Resolve the group paths and memberships of a trustee from the directory."""
+        logger.info(f"Building access paths for: {trustee['full_name']}")
 
-        try:
-            path = {
-                'group': group,
-                'member_groups': [],
-                'nested_level': current_depth,
-                'members': []
-            }
+        access_paths = {
+            'trustee': trustee,
+            'direct_access': True,
+            'group_paths': [],
+            'nested_level': 0,
+            'group_memberships': []
+        }
 
-            if not self._is_system_account(group_key):
-                try:
-                    path['members'] = self._get_group_members_multi_provider(
-                        group['name'],
-                        group['domain']
+        if not self._is_system_account(trustee['full_name']):
+            try:
+                account_details = self._get_account_details(trustee['name'], trustee['domain'])
+                account_type = account_details['type']
+                logger.debug(f"Processing trustee {trustee['full_name']} of type {account_type}")
+
+                if account_type in ['Group', 'WellKnownGroup', 'Alias']:
+                    # Get direct members for groups
+                    direct_members = self._get_group_members_multi_provider(
+                        trustee['name'],
+                        trustee['domain']
                     )
+                    access_paths['group_memberships'] = direct_members
+                    logger.debug(f"Found {len(direct_members)} direct members")
 
                     # Process nested groups
-                    nested_groups = [m for m in path['members'] 
+                    nested_groups = [m for m in direct_members 
                                      if m['type'] in ['Group', 'WellKnownGroup', 'Alias']]
-
-                    for member in nested_groups:
-                        nested_path = self._trace_group_path(
-                            member, 
-                            visited.copy(), 
-                            current_depth + 1
-                        )
+                    for nested_path in self.group_expander.expand(nested_groups):
                         if nested_path:
-                            path['member_groups'].append(nested_path)
-                            path['nested_level'] = max(
-                                path['nested_level'],
-                                nested_path['nested_level'] + 1
+                            access_paths['group_paths'].append(nested_path)
+
+                elif account_type in ['User', 'Unknown']:
+                    # Get group memberships for users
+                    user_groups = self._get_user_groups(trustee['name'], trustee['domain'])
+                    logger.debug(f"Found {len(user_groups)} groups for user")
+
+                    group_paths = self.group_expander.expand(user_groups)
+                    for group, group_path in zip(user_groups, group_paths):
+                        if group_path:
+                            access_paths['group_paths'].append(group_path)
+                            # Get members of each group
+                            group_members = self._get_group_members_multi_provider(
+                                group['name'],
+                                group['domain']
                             )
+                            for member in group_members:
+                                if member not in access_paths['group_memberships']:
+                                    access_paths['group_memberships'].append(member)
 
-                except Exception as e:
-                    logger.error(f"Error getting members for {group_key}: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error processing {trustee['full_name']}: {str(e)}", exc_info=True)
 
-            return path
+        return access_paths
 
-        except Exception as e:
-            logger.error(f"Error tracing group path for {group_key}: {str(e)}", 
-                         exc_info=True)
-            return None
+    def _trace_group_path(self, group: Dict[str, str], visited: Optional[Set[str]] = None, 
+                          current_depth: int = 0) -> Optional[Dict]:
+        """Trace the nested group path below a group."""
+        return self.group_expander.expand([group], visited=visited, start_depth=current_depth)[0]
 
     def get_group_members(self, group_name: str, domain: str, include_nested: bool = True) -> Dict:
         """
@@ -595,6 +555,7 @@ class GroupResolver:
                 # Find nested groups
                 nested_groups = [m for m in direct_members 
                                if m.get('type', '').lower() in ['group', 'wellknowngroup', 'alias']]
+                seen_sids = {m.get('sid') for m in result['all_members']}
                 
                 for nested_group in nested_groups:
                     try:
@@ -607,7 +568,8 @@ class GroupResolver:
                         
                         # Add nested members to all_members (avoiding duplicates)
                         for member in nested_result['all_members']:
-                            if not any(m.get('sid') == member.get('sid') for m in result['all_members']):
+                            if member.get('sid') not in seen_sids:
+                                seen_sids.add(member.get('sid'))
                                 result['all_members'].append(member)
                                 
                     except Exception as e:
@@ -631,6 +593,22 @@ class GroupResolver:
                 'total_all_members': 0
             }
 
+    def refresh_membership_index(self, seed_groups: Optional[List[Dict[str, str]]] = None,
+                                 backend: Optional[DirectoryBackend] = None) -> MembershipIndex:
+        """
+        Rebuild the transitive membership index.
+
+        Args:
+            seed_groups: Groups to crawl from when no backend is given
+            backend: Directory backend to load memberships from
+
+        Returns:
+            The new index, which also replaces self.membership_index
+        """
+        backend = backend or GroupResolverBackend(self, seed_groups or [])
+        self.membership_index = MembershipIndex.build(backend)
+        return self.membership_index
+
     def clear_cache(self, cache_type: Optional[str] = None):
         """
         Clear resolver cache.
@@ -640,26 +618,19 @@ class GroupResolver:
         """
         try:
             if cache_type:
-                if cache_type in self._cache:
-                    self._cache[cache_type].clear()
-                    if cache_type in self._cache_times:
-                        self._cache_times[cache_type].clear()
+                if cache_type in self.cache.cache_types:
+                    self.cache.clear(cache_type)
                     logger.info(f"Cleared {cache_type} cache")
             else:
-                self._cache = {
-                    'groups': {},
-                    'users': {},
-                    'paths': {},
-                    'memberships': {},
-                    'group_members': {},
-                    'sid_to_account': {},
-                    'domain_info': {}
-                }
-                self._cache_times = {}
+                self.cache.clear()
                 logger.info("All resolver caches cleared")
         except Exception as e:
             logger.error(f"Error clearing cache: {str(e)}")
 
+    def get_cache_stats(self) -> Dict:
+        """Hit, miss and eviction counters of the resolver cache."""
+        return self.cache.get_stats()
+
     def __str__(self) -> str:
         """String representation of the resolver."""
         return f"GroupResolver(dc={self.domain_controller}, cache_ttl={self.cache_ttl}s)"
@@ -0,0 +1,239 @@
+# src/scanner/resolver_cache.py
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger('resolver_cache')
+
+_COUNTERS = (
+    "hits", "misses", "stale_hits", "coalesced", "evictions",
+    "expirations", "refreshes", "refresh_errors", "load_errors"
+)
+
+
+class ResolverCache:
+    """
+    Bounded in-process cache for directory lookups, partitioned by cache type.
+
+    Each type is an LRU with its own size limit and every entry carries its
+    own expiry. An entry past its TTL is still served for stale_seconds while
+    a background thread reloads it, so hot groups never make a caller wait
+    on AD. Concurrent misses for the same key share a single load instead of
+    each querying the directory.
+    """
+
+    def __init__(
+        self,
+        cache_types: Iterable[str],
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600,
+        stale_seconds: float = 600,
+        refresh_workers: int = 2,
+        thread_initializer: Optional[Callable[[], None]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_types: Names of the cache partitions
+            max_entries: Maximum number of entries kept per cache type
+            ttl_seconds: Lifetime of an entry before it is refreshed
+            stale_seconds: How long an expired entry may be served while it is refreshed
+            refresh_workers: Threads used for background refreshes
+            thread_initializer: Run once in each refresh thread (e.g. COM initialization)
+            clock: Time source, in seconds
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = max(0, stale_seconds)
+        self.refresh_workers = max(1, refresh_workers)
+        self._thread_initializer = thread_initializer
+        self._clock = clock
+
+        # cache_type -> key -> (value, expires_at)
+        self._entries: Dict[str, "OrderedDict[str, Tuple[Any, float]]"] = {
+            cache_type: OrderedDict() for cache_type in cache_types
+        }
+        self._counters = {cache_type: dict.fromkeys(_COUNTERS, 0) for cache_type in self._entries}
+        # (cache_type, key) -> (future, owning thread id)
+        self._inflight: Dict[Tuple[str, str], Tuple[Future, int]] = {}
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.last_cleared_at: Optional[float] = None
+
+    @property
+    def cache_types(self):
+        return list(self._entries)
+
+    def get(self, cache_type: str, key: str) -> Optional[Any]:
+        """Return a fresh cached value, or None. Does not load or refresh."""
+        with self._lock:
+            entry = self._entries[cache_type].get(key)
+            if entry is None or entry[1] <= self._clock():
+                return None
+            self._entries[cache_type].move_to_end(key)
+            return entry[0]
+
+    def set(self, cache_type: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._store(cache_type, key, value)
+
+    def get_or_load(self, cache_type: str, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader on a miss.
+
+        Loader errors propagate to every caller waiting on that load and
+        nothing is cached for the key.
+        """
+        flight_key = (cache_type, key)
+        with self._lock:
+            entries = self._entries[cache_type]
+            counters = self._counters[cache_type]
+            entry = entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                now = self._clock()
+                if expires_at > now:
+                    entries.move_to_end(key)
+                    counters["hits"] += 1
+                    return value
+                if expires_at + self.stale_seconds > now:
+                    entries.move_to_end(key)
+                    counters["stale_hits"] += 1
+                    if flight_key not in self._inflight:
+                        self._start_refresh(cache_type, key, loader)
+                    return value
+                del entries[key]
+                counters["expirations"] += 1
+
+            inflight = self._inflight.get(flight_key)
+            waiting = None
+            owner = False
+            if inflight is not None and inflight[1] != threading.get_ident():
+                counters["coalesced"] += 1
+                waiting = inflight[0]
+            else:
+                counters["misses"] += 1
+                # A thread looking up a key it is already loading loads it again directly
+                if inflight is None:
+                    future = Future()
+                    self._inflight[flight_key] = (future, threading.get_ident())
+                    owner = True
+
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self._counters[cache_type]["load_errors"] += 1
+                if owner:
+                    self._inflight.pop(flight_key, None)
+            if owner:
+                future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._store(cache_type, key, value)
+            if owner:
+                self._inflight.pop(flight_key, None)
+        if owner:
+            future.set_result(value)
+        return value
+
+    def invalidate(self, cache_type: str, key: str) -> None:
+        with self._lock:
+            self._entries[cache_type].pop(key, None)
+
+    def clear(self, cache_type: Optional[str] = None) -> None:
+        """Drop all entries of one cache type, or of every type. Counters are kept."""
+        with self._lock:
+            for name in ([cache_type] if cache_type else list(self._entries)):
+                if name in self._entries:
+                    self._entries[name].clear()
+            self.last_cleared_at = time.time()
+
+    def size(self, cache_type: str) -> int:
+        with self._lock:
+            return len(self._entries.get(cache_type, ()))
+
+    def get_stats(self) -> Dict:
+        """Per-type sizes and hit/miss/eviction counters, plus totals."""
+        with self._lock:
+            types = {}
+            totals = dict.fromkeys(_COUNTERS, 0)
+            totals["entries"] = 0
+            for cache_type, entries in self._entries.items():
+                counters = dict(self._counters[cache_type])
+                for name, count in counters.items():
+                    totals[name] += count
+                totals["entries"] += len(entries)
+                counters.update({
+                    "entries": len(entries),
+                    "max_entries": self.max_entries,
+                    "hit_rate": _hit_rate(counters)
+                })
+                types[cache_type] = counters
+            totals["hit_rate"] = _hit_rate(totals)
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "stale_seconds": self.stale_seconds,
+                "refreshes_in_flight": len(self._inflight),
+                "last_cleared_at": self.last_cleared_at,
+                "totals": totals,
+                "types": types
+            }
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _store(self, cache_type: str, key: str, value: Any) -> None:
+        entries = self._entries[cache_type]
+        entries[key] = (value, self._clock() + self.ttl_seconds)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self._counters[cache_type]["evictions"] += 1
+
+    def _start_refresh(self, cache_type: str, key: str, loader: Callable[[], Any]) -> None:
+        """Reload an expired entry in the background. Called with the lock held."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.refresh_workers,
+                thread_name_prefix="resolver-refresh",
+                initializer=self._thread_initializer
+            )
+        future = Future()
+        self._inflight[(cache_type, key)] = (future, -1)
+        self._executor.submit(self._refresh, cache_type, key, loader, future)
+
+    def _refresh(self, cache_type: str, key: str, loader: Callable[[], Any], future: Future) -> None:
+        try:
+            value = loader()
+        except Exception as e:
+            logger.warning(f"Background refresh of {cache_type} {key} failed: {str(e)}")
+            with self._lock:
+                self._counters[cache_type]["refresh_errors"] += 1
+                self._inflight.pop((cache_type, key), None)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._store(cache_type, key, value)
+            self._counters[cache_type]["refreshes"] += 1
+            self._inflight.pop((cache_type, key), None)
+        future.set_result(value)
+
+
+def _hit_rate(counters: Dict) -> Optional[float]:
+    served = counters["hits"] + counters["stale_hits"] + counters["coalesced"]
+    lookups = served + counters["misses"]
+    return round(served / lookups, 4) if lookups else None
@@ -0,0 +1,286 @@
+# src/scanner/sid_cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger('sid_cache')
+
+
+class SidCache:
+    """
+    Persistent, size-bounded SID -> trustee cache shared between processes.
+
+    Entries live in a local SQLite file so every API worker on the host and
+    every restart reuse earlier LookupAccountSid results. A small in-process
+    LRU sits in front of the file to keep hot SIDs off the disk. Unresolved
+    SIDs are cached as negative entries with a shorter TTL so they get retried
+    sooner than resolved ones.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        max_entries: int = 100000,
+        memory_entries: int = 10000,
+        ttl_seconds: int = 86400,
+        negative_ttl_seconds: int = 900,
+        busy_timeout_seconds: int = 5,
+        evict_interval: int = 1000
+    ):
+        """
+        Initialize the SID cache.
+
+        Args:
+            path: SQLite file for the shared store, or None for a memory-only cache
+            max_entries: Maximum number of entries kept in the shared store
+            memory_entries: Maximum number of entries kept in the in-process LRU
+            ttl_seconds: Lifetime of resolved entries
+            negative_ttl_seconds: Lifetime of entries for SIDs that failed to resolve
+            busy_timeout_seconds: How long to wait for another process holding the file lock
+            evict_interval: Writes between size checks of the shared store; the store
+                can exceed max_entries by this many writes per process in between
+        """
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.memory_entries = max(1, memory_entries)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.busy_timeout_seconds = busy_timeout_seconds
+        self.evict_interval = max(1, min(evict_interval, self.max_entries))
+        self._writes_since_evict = 0
+
+        # sid -> (trustee, expires_at, negative)
+        self._memory: "OrderedDict[str, Tuple[Dict, float, bool]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "memory_hits": 0,
+            "store_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "store_errors": 0
+        }
+
+        if path:
+            self._open_store()
+
+    def _open_store(self) -> None:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout_seconds,
+                check_same_thread=False,
+                isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sid_cache (
+                    sid TEXT PRIMARY KEY,
+                    trustee TEXT NOT NULL,
+                    negative INTEGER NOT NULL DEFAULT 0,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sid_cache_last_access ON sid_cache (last_access)"
+            )
+            self._conn = conn
+            logger.info(f"SID cache store opened at {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not open SID cache store {self.path}, using memory only: {str(e)}")
+            self._conn = None
+
+    def get(self, sid: str) -> Optional[Dict]:
+        """Return the cached trustee for a SID, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(sid)
+            if entry is not None:
+                trustee, expires_at, negative = entry
+                if expires_at > now:
+                    self._memory.move_to_end(sid)
+                    self._record_hit(negative, "memory_hits")
+                    return trustee
+                del self._memory[sid]
+                self._counters["expirations"] += 1
+
+            stored = self._store_get(sid, now)
+            if stored is not None:
+                trustee, expires_at, negative = stored
+                self._remember(sid, trustee, expires_at, negative)
+                self._record_hit(negative, "store_hits")
+                return trustee
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, sid: str, trustee: Dict, negative: bool = False) -> None:
+        """Cache a trustee; negative entries use the shorter negative TTL."""
+        now = time.time()
+        expires_at = now + (self.negative_ttl_seconds if negative else self.ttl_seconds)
+        with self._lock:
+            self._remember(sid, trustee, expires_at, negative)
+            self._store_set(sid, trustee, expires_at, negative, now)
+
+    def clear(self) -> int:
+        """Remove every entry from the memory and shared stores and return how many were dropped."""
+        with self._lock:
+            cleared = len(self._memory)
+            self._memory.clear()
+            if self._conn is not None:
+                try:
+                    cleared = max(cleared, self._conn.execute("DELETE FROM sid_cache").rowcount)
+                except sqlite3.Error as e:
+                    self._store_error("clear", e)
+            return cleared
+
+    def entries(self) -> Dict[str, Dict]:
+        """Return all live entries, preferring the shared store when available."""
+        now = time.time()
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    rows = self._conn.execute(
+                        "SELECT sid, trustee FROM sid_cache WHERE expires_at > ?", (now,)
+                    ).fetchall()
+                    return {sid: json.loads(trustee) for sid, trustee in rows}
+                except sqlite3.Error as e:
+                    self._store_error("read", e)
+            return {
+                sid: trustee
+                for sid, (trustee, expires_at, _) in self._memory.items()
+                if expires_at > now
+            }
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters for this process plus current entry counts."""
+        now = time.time()
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["negative_entries"] = sum(
+                1 for _, expires_at, negative in self._memory.values()
+                if negative and expires_at > now
+            )
+            stats["store_entries"] = 0
+            if self._conn is not None:
+                try:
+                    total, negative = self._conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(negative), 0) FROM sid_cache "
+                        "WHERE expires_at > ?", (now,)
+                    ).fetchone()
+                    stats["store_entries"] = total
+                    stats["negative_entries"] = negative
+                except sqlite3.Error as e:
+                    self._store_error("stats", e)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self) -> int:
+        stats = self.stats()
+        return stats["store_entries"] if self._conn is not None else stats["memory_entries"]
+
+    def _record_hit(self, negative: bool, source: str) -> None:
+        self._counters["hits"] += 1
+        self._counters[source] += 1
+        if negative:
+            self._counters["negative_hits"] += 1
+
+    def _remember(self, sid: str, trustee: Dict, expires_at: float, negative: bool) -> None:
+        self._memory[sid] = (trustee, expires_at, negative)
+        self._memory.move_to_end(sid)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _store_get(self, sid: str, now: float) -> Optional[Tuple[Dict, float, bool]]:
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT trustee, expires_at, negative FROM sid_cache WHERE sid = ?", (sid,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            trustee, expires_at, negative = row
+            if expires_at <= now:
+                self._conn.execute(
+                    "DELETE FROM sid_cache WHERE sid = ? AND expires_at <= ?", (sid, now)
+                )
+                self._counters["expirations"] += 1
+                return None
+
+            self._conn.execute("UPDATE sid_cache SET last_access = ? WHERE sid = ?", (now, sid))
+            return json.loads(trustee), expires_at, bool(negative)
+        except sqlite3.Error as e:
+            self._store_error("read", e)
+            return None
+
+    def _store_set(self, sid: str, trustee: Dict, expires_at: float,
+                   negative: bool, now: float) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sid_cache (sid, trustee, negative, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (sid, json.dumps(trustee), int(negative), expires_at, now)
+            )
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= self.evict_interval:
+                self._writes_since_evict = 0
+                self._evict()
+        except sqlite3.Error as e:
+            self._store_error("write", e)
+
+    def _evict(self) -> None:
+        """
+        Drop expired entries, then the least recently used ones above max_entries.
+
+        Counting the store is a full scan, so this runs every evict_interval
+        writes rather than on each one.
+        """
+        count = self._conn.execute("SELECT COUNT(*) FROM sid_cache").fetchone()[0]
+        if count <= self.max_entries:
+            return
+
+        expired = self._conn.execute(
+            "DELETE FROM sid_cache WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+        self._counters["expirations"] += expired
+
+        overflow = count - expired - self.max_entries
+        if overflow > 0:
+            evicted = self._conn.execute(
+                "DELETE FROM sid_cache WHERE sid IN ("
+                "SELECT sid FROM sid_cache ORDER BY last_access LIMIT ?)",
+                (overflow,)
+            ).rowcount
+            self._counters["evictions"] += evicted
+            logger.debug(f"Evicted {evicted} least recently used SID cache entries")
+
+    def _store_error(self, operation: str, error: Exception) -> None:
+        self._counters["store_errors"] += 1
+        logger.warning(f"SID cache store {operation} failed: {str(error)}")
@@ -0,0 +1,276 @@
+# src/scanner/sid_resolver.py
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger('sid_resolver')
+
+# Backend answer for one SID: (name, domain, account_type)
+SidLookup = Tuple[str, str, str]
+
+
+class SidLookupBackend:
+    """Interface for resolving many SIDs to account names in one call."""
+
+    name = "base"
+
+    def lookup_sids(self, sid_strings: List[str]) -> Dict[str, SidLookup]:
+        """
+        Resolve a batch of string SIDs.
+
+        Returns a mapping for the SIDs that could be resolved; SIDs missing
+        from the result are treated as unresolved by the caller.
+        """
+        raise NotImplementedError
+
+
+class Win32SidBackend(SidLookupBackend):
+    """
+    Windows backend using the local LSA and, if configured, a domain controller.
+
+    The whole batch is translated with one LsaLookupSids call when the
+    installed pywin32 exposes it; otherwise each distinct SID is looked up once
+    with LookupAccountSid.
+    """
+
+    name = "win32"
+
+    def __init__(
+        self,
+        domain_controller: Optional[str] = None,
+        domain_controller_provider: Optional[Callable[[], Optional[str]]] = None
+    ):
+        """
+        Args:
+            domain_controller: Fixed domain controller to query after the local system
+            domain_controller_provider: Callable returning the current domain controller,
+                for callers that discover it lazily
+        """
+        self._domain_controller = domain_controller
+        self._domain_controller_provider = domain_controller_provider
+
+    @property
+    def domain_controller(self) -> Optional[str]:
+        if self._domain_controller_provider is not None:
+            return self._domain_controller_provider()
+        return self._domain_controller
+
+    def lookup_sids(self, sid_strings: List[str]) -> Dict[str, SidLookup]:
+        import win32security
+
+        pysids = {}
+        for sid_string in sid_strings:
+            try:
+                pysids[sid_string] = win32security.ConvertStringSidToSid(sid_string)
+            except Exception as e:
+                logger.debug(f"Invalid SID string {sid_string}: {str(e)}")
+
+        results = self._lookup_lsa(win32security, pysids)
+
+        # Local system first, then the domain controller
+        domain_controller = self.domain_controller
+        systems = [None] + ([domain_controller] if domain_controller else [])
+        for sid_string, pysid in pysids.items():
+            if sid_string in results:
+                continue
+            for system_name in systems:
+                try:
+                    name, domain, account_type = win32security.LookupAccountSid(system_name, pysid)
+                    if name and name.strip():
+                        # A domain controller answer without a domain is reported under the DC's name
+                        results[sid_string] = (name, domain or system_name or "",
+                                               self._account_type_str(win32security, account_type))
+                        break
+                except Exception as e:
+                    logger.debug(f"LookupAccountSid({system_name}) failed for {sid_string}: {str(e)}")
+
+        return results
+
+    def _lookup_lsa(self, win32security, pysids: Dict) -> Dict[str, SidLookup]:
+        """Translate all SIDs with a single LsaLookupSids call if available."""
+        lsa_lookup = getattr(win32security, 'LsaLookupSids', None)
+        if lsa_lookup is None or not pysids:
+            return {}
+
+        results = {}
+        policy = None
+        try:
+            policy = win32security.LsaOpenPolicy(
+                self.domain_controller, win32security.POLICY_LOOKUP_NAMES
+            )
+            sid_strings = list(pysids)
+            translated = lsa_lookup(policy, [pysids[s] for s in sid_strings])
+            for sid_string, (name, domain, account_type) in zip(sid_strings, translated):
+                if name and name.strip():
+                    results[sid_string] = (name, domain or self.domain_controller or "",
+                                           self._account_type_str(win32security, account_type))
+        except Exception as e:
+            # Partially mapped batches raise; the per-SID path picks up the rest
+            logger.debug(f"LsaLookupSids failed for batch of {len(pysids)}: {str(e)}")
+        finally:
+            if policy is not None:
+                try:
+                    win32security.LsaClose(policy)
+                except Exception:
+                    pass
+        return results
+
+    @staticmethod
+    def _account_type_str(win32security, account_type: int) -> str:
+        type_mapping = {
+            win32security.SidTypeUser: "User",
+            win32security.SidTypeGroup: "Group",
+            win32security.SidTypeWellKnownGroup: "WellKnownGroup",
+            win32security.SidTypeAlias: "Alias",
+            win32security.SidTypeDeletedAccount: "DeletedAccount",
+            win32security.SidTypeInvalid: "Invalid",
+            win32security.SidTypeUnknown: "Unknown",
+            win32security.SidTypeComputer: "Computer"
+        }
+        if hasattr(win32security, 'SidTypeLabel'):
+            type_mapping[win32security.SidTypeLabel] = "Label"
+        return type_mapping.get(account_type, f"Other ({account_type})")
+
+
+class FakeSidBackend(SidLookupBackend):
+    """In-memory backend for tests and benchmarks on non-Windows hosts."""
+
+    name = "fake"
+
+    def __init__(self, accounts: Optional[Dict[str, SidLookup]] = None):
+        self.accounts = dict(accounts or {})
+        self.calls = 0
+        self.sids_looked_up = 0
+
+    def lookup_sids(self, sid_strings: List[str]) -> Dict[str, SidLookup]:
+        self.calls += 1
+        self.sids_looked_up += len(sid_strings)
+        return {sid: self.accounts[sid] for sid in sid_strings if sid in self.accounts}
+
+
+class BatchSidResolver:
+    """
+    Resolves the distinct SIDs of a batch of security descriptors in one pass.
+
+    Cached SIDs are answered from the SID cache; the remaining distinct SIDs go
+    to the backend in a single call, and whatever the backend cannot resolve is
+    passed through the offline fallback (well-known SIDs, RID parsing) before
+    being cached as a negative entry.
+    """
+
+    def __init__(
+        self,
+        backend: SidLookupBackend,
+        cache,
+        is_system_account: Callable[[str], bool],
+        fallback: Optional[Callable[[str], Optional[Dict]]] = None
+    ):
+        """
+        Initialize the resolver.
+
+        Args:
+            backend: Backend used for SIDs that are not cached
+            cache: SidCache (or any object with get/set) holding resolved trustees
+            is_system_account: Predicate applied to DOMAIN\\name to set is_system
+            fallback: Optional offline resolver for SIDs the backend cannot map
+        """
+        self.backend = backend
+        self.cache = cache
+        self.is_system_account = is_system_account
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._stats = {
+            "batches": 0,
+            "sids_requested": 0,
+            "distinct_sids": 0,
+            "cache_hits": 0,
+            "backend_calls": 0,
+            "backend_sids": 0,
+            "fallback_resolved": 0,
+            "unresolved": 0
+        }
+
+    def resolve_many(self, sid_strings: Iterable[str]) -> Dict[str, Dict]:
+        """Resolve every SID in the iterable and return a sid -> trustee mapping."""
+        requested = list(sid_strings)
+        distinct = list(dict.fromkeys(requested))
+
+        trustees: Dict[str, Dict] = {}
+        missing = []
+        for sid_string in distinct:
+            cached = self.cache.get(sid_string)
+            if cached is not None:
+                trustees[sid_string] = cached
+            else:
+                missing.append(sid_string)
+
+        backend_results: Dict[str, SidLookup] = {}
+        if missing:
+            try:
+                backend_results = self.backend.lookup_sids(missing)
+            except Exception as e:
+                logger.warning(f"SID backend {self.backend.name} failed for {len(missing)} SIDs: {str(e)}")
+
+        fallback_resolved = 0
+        unresolved = 0
+        for sid_string in missing:
+            trustee = None
+            if sid_string in backend_results:
+                name, domain, account_type = backend_results[sid_string]
+                trustee = self._make_trustee(sid_string, name, domain, account_type)
+            elif self.fallback is not None:
+                trustee = self.fallback(sid_string)
+                if trustee is not None:
+                    fallback_resolved += 1
+
+            if trustee is not None:
+                self.cache.set(sid_string, trustee)
+            else:
+                unresolved += 1
+                trustee = self.unknown_trustee(sid_string)
+                self.cache.set(sid_string, trustee, negative=True)
+            trustees[sid_string] = trustee
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["sids_requested"] += len(requested)
+            self._stats["distinct_sids"] += len(distinct)
+            self._stats["cache_hits"] += len(distinct) - len(missing)
+            if missing:
+                self._stats["backend_calls"] += 1
+                self._stats["backend_sids"] += len(missing)
+            self._stats["fallback_resolved"] += fallback_resolved
+            self._stats["unresolved"] += unresolved
+
+        return trustees
+
+    def resolve(self, sid_string: str) -> Dict:
+        """Resolve a single SID."""
+        return self.resolve_many([sid_string])[sid_string]
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _make_trustee(self, sid_string: str, name: str, domain: str, account_type: str) -> Dict:
+        full_name = f"{domain}\\{name}" if domain else name
+        return {
+            "name": name,
+            "domain": domain or "Unknown",
+            "sid": sid_string,
+            "full_name": full_name,
+            "account_type": account_type,
+            "is_system": self.is_system_account(full_name)
+        }
+
+    @staticmethod
+    def unknown_trustee(sid_string: str) -> Dict:
+        return {
+            "name": "Unknown",
+            "domain": "Unknown",
+            "sid": sid_string,
+            "full_name": f"Unknown SID: {sid_string}",
+            "account_type": "Unknown",
+            "is_system": False
+        }
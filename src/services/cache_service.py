@@ -4,20 +4,39 @@ import json
 import hashlib
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Tuple
 from pathlib import Path
 import os
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, literal
 
 from src.db.models.folder_cache import FolderPermissionCache, FolderStructureCache
 from src.db.database import get_db
+from src.db.descriptor_store import (
+    split_permissions, merge_permissions, intern_descriptors, load_descriptors
+)
+from src.db.trustee_index import update_trustee_index
 from src.utils.logger import setup_logger
 from src.core.scanner import scanner
 
 logger = setup_logger('cache_service')
 
+def permissions_checksum(permissions_data: Dict) -> str:
+    """
+    Checksum stored in FolderPermissionCache.checksum.
+    
+    Uses the raw security descriptor fingerprint when the scan provided one, so
+    the checksum only changes when the ACL itself changes; older results fall
+    back to a hash of the whole permissions payload.
+    """
+    fingerprint = permissions_data.get('descriptor_fingerprint') if permissions_data else None
+    if fingerprint:
+        return fingerprint
+    return hashlib.sha256(
+        json.dumps(permissions_data, sort_keys=True).encode()
+    ).hexdigest()
+
 class PermissionCacheService:
     """Service for managing folder permission caching."""
     
@@ -57,7 +76,7 @@ class PermissionCacheService:
                 
                 if cache_entry and self._is_cache_valid(cache_entry):
                     logger.debug(f"Cache hit for permissions: {normalized_path}")
-                    return cache_entry.permissions_data
+                    return self.hydrate_cache_entry(db, cache_entry)
             
             # Cache miss or force refresh - scan the folder
             logger.info(f"Cache miss or refresh for permissions: {normalized_path}")
@@ -75,6 +94,71 @@ class PermissionCacheService:
             logger.error(f"Error getting cached permissions for {folder_path}: {str(e)}")
             return None
     
+    def get_tree_permissions_cached(
+        self,
+        db: Session,
+        root_path: str,
+        max_depth: int
+    ) -> Optional[List[Tuple[str, Dict]]]:
+        """
+        Get (path, permissions) for every folder of a tree from cache.
+        
+        The tree's folders down to max_depth are listed from the file system
+        (no ACL reads) and each must have a valid cache entry; otherwise None
+        is returned so the caller scans live rather than answer from part of
+        the tree.
+        """
+        try:
+            paths = self._list_tree_folders(root_path, max_depth)
+            if not paths:
+                return None
+            
+            entries = {}
+            for start in range(0, len(paths), self.batch_size):
+                for entry in db.query(FolderPermissionCache).filter(
+                    FolderPermissionCache.folder_path.in_(paths[start:start + self.batch_size])
+                ):
+                    entries[entry.folder_path] = entry
+            
+            for path in paths:
+                entry = entries.get(path)
+                if entry is None or not self._is_cache_valid(entry):
+                    logger.info(f"Permission cache does not cover {root_path} ({path} missing or stale)")
+                    return None
+            
+            descriptors = load_descriptors(db, (entry.descriptor_hash for entry in entries.values()))
+            return [
+                (path, merge_permissions(entries[path].permissions_data,
+                                         descriptors.get(entries[path].descriptor_hash)))
+                for path in paths
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error reading cached permissions for tree {root_path}: {str(e)}")
+            return None
+    
+    def _list_tree_folders(self, root_path: str, max_depth: int) -> List[str]:
+        """Folders of a tree down to max_depth, named the way the tree scanner names them."""
+        if not os.path.isdir(root_path):
+            return []
+        folders = [root_path]
+        level = [root_path]
+        for _ in range(max(max_depth, 0)):
+            next_level = []
+            for folder in level:
+                try:
+                    with os.scandir(folder) as entries:
+                        next_level.extend(
+                            entry.path for entry in entries
+                            if entry.is_dir() and not scanner._should_exclude_path(entry.path)
+                        )
+                except OSError:
+                    # The scan reports the folder as denied and reads nothing below it
+                    continue
+            folders.extend(next_level)
+            level = next_level
+        return folders
+    
     def get_folder_structure_cached(
         self,
         db: Session,
@@ -158,7 +242,7 @@ class PermissionCacheService:
                 or_(
                     FolderStructureCache.root_path == normalized_path,
                     FolderStructureCache.root_path.like(f"{normalized_path}%"),
-                    normalized_path.like(FolderStructureCache.root_path + "%")
+                    literal(normalized_path).like(FolderStructureCache.root_path + "%")
                 )
             ).update({"is_stale": True})
             
@@ -259,10 +343,12 @@ class PermissionCacheService:
             except Exception:
                 pass
             
-            # Calculate checksum of permissions data
-            checksum = hashlib.sha256(
-                json.dumps(permissions_data, sort_keys=True).encode()
-            ).hexdigest()
+            checksum = permissions_checksum(permissions_data)
+            
+            # Store the ACL once per distinct descriptor and keep only per-folder fields here
+            descriptor_hash, descriptor, stored_data = split_permissions(permissions_data)
+            if descriptor_hash is not None:
+                intern_descriptors(db, {descriptor_hash: descriptor})
             
             # Check if entry exists
             cache_entry = db.query(FolderPermissionCache).filter(
@@ -271,7 +357,8 @@ class PermissionCacheService:
             
             if cache_entry:
                 # Update existing entry
-                cache_entry.permissions_data = permissions_data
+                cache_entry.permissions_data = stored_data
+                cache_entry.descriptor_hash = descriptor_hash
                 cache_entry.last_scan_time = datetime.utcnow()
                 cache_entry.last_modified_time = folder_mtime
                 cache_entry.is_stale = False
@@ -288,7 +375,8 @@ class PermissionCacheService:
                 # Create new entry
                 cache_entry = FolderPermissionCache(
                     folder_path=folder_path,
-                    permissions_data=permissions_data,
+                    permissions_data=stored_data,
+                    descriptor_hash=descriptor_hash,
                     last_scan_time=datetime.utcnow(),
                     last_modified_time=folder_mtime,
                     is_stale=False,
@@ -298,12 +386,27 @@ class PermissionCacheService:
                 )
                 db.add(cache_entry)
             
+            update_trustee_index(
+                db, [(folder_path, permissions_data)],
+                descriptor_hashes={folder_path: descriptor_hash} if descriptor_hash else None
+            )
             db.commit()
             
         except Exception as e:
             logger.error(f"Error updating permission cache: {str(e)}")
             db.rollback()
     
+    def hydrate_cache_entry(self, db: Session, cache_entry: FolderPermissionCache) -> Dict:
+        """Merge the shared security descriptor back into a cached permissions entry."""
+        if not cache_entry.descriptor_hash:
+            return cache_entry.permissions_data
+        
+        descriptor = load_descriptors(db, [cache_entry.descriptor_hash]).get(cache_entry.descriptor_hash)
+        if descriptor is None:
+            logger.warning(f"Missing security descriptor for cached path: {cache_entry.folder_path}")
+            return cache_entry.permissions_data
+        return merge_permissions(cache_entry.permissions_data, descriptor)
+    
     def _update_structure_cache(
         self,
         db: Session,
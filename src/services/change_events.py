@@ -0,0 +1,315 @@
+# src/services/change_events.py
+
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger('change_events')
+
+@dataclass
+class ChangeEvent:
+    """A hint that the security descriptor of a path may have changed."""
+    path: str
+    kind: str = "security"  # security, created, renamed
+    source: str = ""
+    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+# Called from the source's own thread; must be thread-safe.
+EventCallback = Callable[[ChangeEvent], None]
+
+class ChangeEventSource:
+    """
+    Interface for push-based change detection.
+
+    Sources watch the monitored trees and report paths whose permissions may
+    have changed; the change monitor then rechecks only those paths.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._callback: Optional[EventCallback] = None
+        self.paths: Set[str] = set()
+        self.events_emitted = 0
+
+    def start(self, paths: Iterable[str], callback: EventCallback) -> None:
+        """Start watching paths and report events through callback."""
+        self._callback = callback
+        for path in paths:
+            self.add_path(path)
+
+    def stop(self) -> None:
+        """Stop watching all paths."""
+        for path in list(self.paths):
+            self.remove_path(path)
+        self._callback = None
+
+    def add_path(self, path: str) -> None:
+        self.paths.add(path)
+
+    def remove_path(self, path: str) -> None:
+        self.paths.discard(path)
+
+    def _emit(self, path: str, kind: str = "security") -> None:
+        if self._callback is None:
+            return
+        self.events_emitted += 1
+        try:
+            self._callback(ChangeEvent(path=path, kind=kind, source=self.name))
+        except Exception as e:
+            logger.error(f"Error delivering change event for {path}: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        return {
+            "source": self.name,
+            "watched_paths": len(self.paths),
+            "events_emitted": self.events_emitted
+        }
+
+class MemoryChangeSource(ChangeEventSource):
+    """In-memory source for tests; events are injected with emit()."""
+
+    name = "memory"
+
+    def emit(self, path: str, kind: str = "security") -> None:
+        self._emit(path, kind)
+
+class Win32DirectoryChangeSource(ChangeEventSource):
+    """
+    Directory change notifications (ReadDirectoryChangesW) for Windows.
+
+    Watches each monitored tree for security descriptor changes and new or
+    renamed folders, with one watcher thread per monitored root.
+    """
+
+    name = "win32_directory_changes"
+
+    FILE_LIST_DIRECTORY = 0x0001
+    BUFFER_SIZE = 64 * 1024
+    WAIT_TIMEOUT_MS = 1000
+
+    def __init__(self):
+        super().__init__()
+        self._threads: Dict[str, threading.Thread] = {}
+        self._stops: Dict[str, threading.Event] = {}
+
+    def add_path(self, path: str) -> None:
+        if path in self._threads:
+            return
+        super().add_path(path)
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._watch, args=(path, stop), daemon=True, name=f"ShareGuardWatch-{os.path.basename(path)}"
+        )
+        self._stops[path] = stop
+        self._threads[path] = thread
+        thread.start()
+
+    def remove_path(self, path: str) -> None:
+        super().remove_path(path)
+        stop = self._stops.pop(path, None)
+        thread = self._threads.pop(path, None)
+        if stop:
+            stop.set()
+        if thread:
+            thread.join(timeout=(self.WAIT_TIMEOUT_MS / 1000) * 2)
+
+    def _watch(self, root: str, stop: threading.Event) -> None:
+        import pywintypes
+        import win32con
+        import win32event
+        import win32file
+
+        handle = None
+        try:
+            handle = win32file.CreateFile(
+                root,
+                self.FILE_LIST_DIRECTORY,
+                win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+                None,
+                win32con.OPEN_EXISTING,
+                win32con.FILE_FLAG_BACKUP_SEMANTICS | win32file.FILE_FLAG_OVERLAPPED,
+                None
+            )
+            overlapped = pywintypes.OVERLAPPED()
+            overlapped.hEvent = win32event.CreateEvent(None, True, False, None)
+            buffer = win32file.AllocateReadBuffer(self.BUFFER_SIZE)
+            notify_filter = (
+                win32con.FILE_NOTIFY_CHANGE_SECURITY |
+                win32con.FILE_NOTIFY_CHANGE_DIR_NAME
+            )
+            logger.info(f"Watching directory changes under: {root}")
+
+            while not stop.is_set():
+                win32file.ReadDirectoryChangesW(handle, buffer, True, notify_filter, overlapped)
+                while not stop.is_set():
+                    rc = win32event.WaitForSingleObject(overlapped.hEvent, self.WAIT_TIMEOUT_MS)
+                    if rc == win32event.WAIT_OBJECT_0:
+                        break
+                if stop.is_set():
+                    break
+
+                size = win32file.GetOverlappedResult(handle, overlapped, True)
+                win32event.ResetEvent(overlapped.hEvent)
+                if size == 0:
+                    # Buffer overflowed; the whole tree may have changed
+                    self._emit(root, "overflow")
+                    continue
+
+                for action, relative_path in win32file.FILE_NOTIFY_INFORMATION(buffer, size):
+                    full_path = os.path.join(root, relative_path)
+                    folder = full_path if os.path.isdir(full_path) else os.path.dirname(full_path)
+                    kind = "security" if action == 3 else "created" if action in (1, 5) else "renamed"
+                    if action != 2:  # FILE_ACTION_REMOVED has nothing left to check
+                        self._emit(folder, kind)
+
+        except Exception as e:
+            logger.error(f"Directory watcher for {root} stopped: {str(e)}")
+        finally:
+            if handle is not None:
+                try:
+                    win32file.CancelIo(handle)
+                    handle.Close()
+                except Exception:
+                    pass
+
+class InotifyChangeSource(ChangeEventSource):
+    """
+    inotify-based source for Linux development and tests.
+
+    Attribute changes (chmod, chown, ACL xattrs) map to security events; new
+    directories are watched as they appear.
+    """
+
+    name = "inotify"
+
+    IN_ATTRIB = 0x00000004
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE_SELF = 0x00000400
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0x00000800
+    WATCH_MASK = IN_ATTRIB | IN_CREATE | IN_MOVED_TO | IN_DELETE_SELF
+
+    def __init__(self):
+        super().__init__()
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._fd: Optional[int] = None
+        self._watches: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, paths: Iterable[str], callback: EventCallback) -> None:
+        import ctypes
+
+        fd = self._libc.inotify_init1(self.IN_NONBLOCK)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        super().start(paths, callback)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._read_loop, daemon=True, name="ShareGuardInotify")
+        self._thread.start()
+
+    def stop(self) -> None:
+        super().stop()
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._watches.clear()
+
+    def add_path(self, path: str) -> None:
+        super().add_path(path)
+        if self._fd is None:
+            return
+        for directory, _, _ in os.walk(path):
+            self._add_watch(directory)
+
+    def remove_path(self, path: str) -> None:
+        super().remove_path(path)
+        if self._fd is None:
+            return
+        with self._lock:
+            for wd, watched in list(self._watches.items()):
+                if watched == path or watched.startswith(path.rstrip(os.sep) + os.sep):
+                    self._libc.inotify_rm_watch(self._fd, wd)
+                    del self._watches[wd]
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd >= 0:
+            with self._lock:
+                self._watches[wd] = directory
+
+    def _read_loop(self) -> None:
+        import select
+        import struct
+
+        header = struct.Struct("iIII")
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._fd], [], [], 0.5)
+            if not readable:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+
+            offset = 0
+            while offset + header.size <= len(data):
+                wd, mask, _, name_len = header.unpack_from(data, offset)
+                name = data[offset + header.size:offset + header.size + name_len].rstrip(b"\0")
+                offset += header.size + name_len
+
+                with self._lock:
+                    directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+
+                target = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if mask & self.IN_ATTRIB:
+                    self._emit(target if os.path.isdir(target) else directory, "security")
+                elif mask & (self.IN_CREATE | self.IN_MOVED_TO) and mask & self.IN_ISDIR:
+                    for new_directory, _, _ in os.walk(target):
+                        self._add_watch(new_directory)
+                    self._emit(target, "created")
+                elif mask & self.IN_DELETE_SELF:
+                    with self._lock:
+                        self._watches.pop(wd, None)
+
+def create_event_source(kind: str = "auto") -> Optional[ChangeEventSource]:
+    """
+    Create the configured change event source.
+
+    "auto" picks directory change notifications on Windows and inotify on
+    Linux; "none" disables event-driven detection so only polling remains.
+    """
+    try:
+        if kind == "none":
+            return None
+        if kind == "memory":
+            return MemoryChangeSource()
+        if kind == "win32" or (kind == "auto" and sys.platform == "win32"):
+            return Win32DirectoryChangeSource()
+        if kind == "inotify" or (kind == "auto" and sys.platform.startswith("linux")):
+            return InotifyChangeSource()
+    except Exception as e:
+        logger.warning(f"Change event source '{kind}' unavailable, falling back to polling: {str(e)}")
+    return None
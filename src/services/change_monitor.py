@@ -3,10 +3,10 @@
 import asyncio
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set
 from pathlib import Path
-import hashlib
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
@@ -15,35 +15,107 @@ from src.db.database import get_db_sync
 from src.db.models.changes import PermissionChange
 from src.db.models.alerts import Alert, AlertConfiguration
 from src.db.models.folder_cache import FolderPermissionCache
-from src.services.cache_service import cache_service
+from src.db.models.scan import ScanTarget, ScanResult
+from src.db.descriptor_store import hydrate_scan_results
+from src.core.scan_baseline import ScanBaseline
+from src.services.cache_service import cache_service, permissions_checksum
 from src.services.notification_service import notification_service
+from src.services.notification_coalescer import PendingChange, change_type_of
+from src.services.change_events import ChangeEvent, ChangeEventSource, create_event_source
+from src.services.loop_monitor import loop_lag_monitor
+from src.services.poll_scheduler import AdaptivePollScheduler
 from src.core.scanner import scanner
 from src.utils.logger import setup_logger
+from config.settings import MONITOR_CONFIG
 
 logger = setup_logger('change_monitor')
 
+def _initialize_monitor_thread() -> None:
+    """Initialize COM in monitor executor threads (ACL reads resolve groups through ADSI)."""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pass
+
+def _existing_paths(paths: List[str]) -> List[str]:
+    # os.path.exists can block for seconds on an unreachable share
+    return [path for path in paths if os.path.exists(path)]
+
 class ChangeMonitorService:
     """Service for monitoring permission changes and updating cache."""
     
-    def __init__(self):
+    def __init__(self, event_source: Optional[ChangeEventSource] = None):
         self.monitoring_paths: Set[str] = set()
         self.is_monitoring = False
-        self.check_interval = 60  # 1 minute for testing (was 5 minutes)
+        self.poll_interval = MONITOR_CONFIG['poll_interval_seconds']
+        self.safety_poll_interval = MONITOR_CONFIG['safety_poll_interval_seconds']
+        self.debounce_seconds = MONITOR_CONFIG['debounce_seconds']
+        self.check_interval = self.poll_interval
+        self.cleanup_interval = MONITOR_CONFIG['cache_cleanup_interval_seconds']
         self._monitor_task: Optional[asyncio.Task] = None
+        self._seed_tasks: Set[asyncio.Task] = set()
+        
+        # Per-path polling adapted to change frequency and sensitivity
+        self.scheduler = AdaptivePollScheduler(
+            base_interval=self.poll_interval,
+            min_interval=MONITOR_CONFIG['min_interval_seconds'],
+            max_interval=MONITOR_CONFIG['max_interval_seconds'],
+            checks_per_second=MONITOR_CONFIG['checks_per_second']
+        )
+        
+        # Push-based change detection; polling remains as a safety net
+        self.event_source = event_source
+        self._event_source_kind = MONITOR_CONFIG['event_source']
+        self._event_queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_overflow = False
+        
+        # ACL reads and DB work run on a dedicated pool so the API's event loop stays responsive
+        self.executor_workers = MONITOR_CONFIG['executor_workers']
+        self.per_root_concurrency = MONITOR_CONFIG['per_root_concurrency']
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._root_limits: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight = 0
+        
+        self.stats = {
+            "events_received": 0,
+            "events_ignored": 0,
+            "event_rechecks": 0,
+            "scheduled_checks": 0,
+            "changes_detected": 0,
+            "folders_seeded": 0,
+            "offloaded_calls": 0,
+            "offloaded_seconds": 0.0
+        }
         
     async def start_monitoring(self, paths: Optional[List[str]] = None) -> None:
         """Start monitoring for permission changes."""
         try:
-            if paths:
-                self.monitoring_paths.update(paths)
+            new_paths = [path for path in dict.fromkeys(paths or []) if path not in self.monitoring_paths]
+            self.monitoring_paths.update(new_paths)
             
             if self.is_monitoring:
-                logger.info("Monitoring already active")
+                if new_paths:
+                    await self._schedule_paths(new_paths)
+                    if self.event_source:
+                        for path in new_paths:
+                            self.event_source.add_path(path)
+                        self._start_seeding(new_paths)
+                logger.info(f"Monitoring already active, added {len(new_paths)} paths")
                 return
             
             self.is_monitoring = True
+            self._start_event_source()
+            self.scheduler.set_base_interval(self.check_interval)
+            await self._schedule_paths(list(self.monitoring_paths))
+            self._start_seeding(list(self.monitoring_paths))
             self._monitor_task = asyncio.create_task(self._monitor_loop())
-            logger.info(f"Started monitoring {len(self.monitoring_paths)} paths")
+            logger.info(
+                f"Started monitoring {len(self.monitoring_paths)} paths "
+                f"(event source: {self.event_source.name if self.event_source else 'none'}, "
+                f"base check interval {self.check_interval}s)"
+            )
             
         except Exception as e:
             logger.error(f"Error starting monitoring: {str(e)}")
@@ -62,6 +134,17 @@ class ChangeMonitorService:
                     pass
                 self._monitor_task = None
             
+            for task in list(self._seed_tasks):
+                task.cancel()
+            
+            if self.event_source:
+                self.event_source.stop()
+            
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._root_limits.clear()
+            
             logger.info("Stopped monitoring")
             
         except Exception as e:
@@ -71,20 +154,205 @@ class ChangeMonitorService:
         """Add a path to monitor."""
         normalized_path = str(Path(path).resolve())
         self.monitoring_paths.add(normalized_path)
+        if self.is_monitoring:
+            await self._schedule_paths([normalized_path])
+            if self.event_source:
+                self.event_source.add_path(normalized_path)
+                self._start_seeding([normalized_path])
         logger.info(f"Added monitoring path: {normalized_path}")
     
     async def remove_monitoring_path(self, path: str) -> None:
         """Remove a path from monitoring."""
         normalized_path = str(Path(path).resolve())
         self.monitoring_paths.discard(normalized_path)
+        self.scheduler.remove(normalized_path)
+        if self.event_source:
+            self.event_source.remove_path(normalized_path)
         logger.info(f"Removed monitoring path: {normalized_path}")
     
+    def get_monitor_stats(self) -> Dict:
+        """Get event and recheck counters for the monitor."""
+        return {
+            **self.stats,
+            "offloaded_seconds": round(self.stats["offloaded_seconds"], 3),
+            "in_flight": self._in_flight,
+            "executor_workers": self.executor_workers,
+            "per_root_concurrency": self.per_root_concurrency,
+            "check_interval": self.check_interval,
+            "scheduler": self.scheduler.get_stats(),
+            "event_source": self.event_source.get_stats() if self.event_source else None,
+            "event_loop_lag": loop_lag_monitor.get_stats()
+        }
+    
+    async def _run_blocking(self, func, *args):
+        """Run a blocking call on the monitor's executor and await its result."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.executor_workers, thread_name_prefix="ShareGuardMonitor",
+                initializer=_initialize_monitor_thread
+            )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self._in_flight += 1
+        try:
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._in_flight -= 1
+            self.stats["offloaded_calls"] += 1
+            self.stats["offloaded_seconds"] += loop.time() - started
+    
+    def _root_for(self, path: str) -> str:
+        """The innermost monitored path containing path, or path itself."""
+        roots = [
+            root for root in self.monitoring_paths
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+        ]
+        return max(roots, key=len) if roots else path
+    
+    def _root_limit(self, path: str) -> asyncio.Semaphore:
+        """Concurrency limit shared by all rechecks inside the same monitored tree."""
+        root = self._root_for(path)
+        if root not in self._root_limits:
+            self._root_limits[root] = asyncio.Semaphore(self.per_root_concurrency)
+        return self._root_limits[root]
+    
+    def _start_event_source(self) -> None:
+        """Start the change event source and pick the full-check interval."""
+        if self.event_source is None:
+            self.event_source = create_event_source(self._event_source_kind)
+        
+        self.check_interval = self.poll_interval
+        if self.event_source is None:
+            return
+        
+        self._loop = asyncio.get_running_loop()
+        self._event_queue = asyncio.Queue(maxsize=10000)
+        try:
+            self.event_source.start(list(self.monitoring_paths), self._on_change_event)
+            self.check_interval = self.safety_poll_interval
+        except Exception as e:
+            logger.error(f"Error starting change event source, using polling only: {str(e)}")
+            self.event_source = None
+    
+    def _on_change_event(self, event: ChangeEvent) -> None:
+        """Receive an event from the source's thread and hand it to the event loop."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._enqueue_event, event)
+    
+    def _enqueue_event(self, event: ChangeEvent) -> None:
+        try:
+            self._event_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too many events to track individually; fall back to a full check
+            self._event_overflow = True
+    
+    async def _schedule_paths(self, paths: List[str]) -> None:
+        """Add paths to the poll scheduler, scaled by their scan target's sensitivity."""
+        try:
+            factors = await self._run_blocking(self._load_interval_factors, paths)
+        except Exception as e:
+            logger.error(f"Error loading path sensitivity, using default intervals: {str(e)}")
+            factors = {}
+        for path in paths:
+            self.scheduler.add(path, interval_factor=factors.get(path, 1.0))
+    
+    def _start_seeding(self, roots: List[str]) -> None:
+        """
+        Snapshot the folders below newly watched roots in the background.
+        
+        Polling only checks the roots themselves; subfolders are rechecked on
+        events, which need a previous state to diff against. Without one the
+        first change to a subfolder could only be snapshotted, not alerted.
+        """
+        if not self.event_source or not roots:
+            return
+        task = asyncio.create_task(self._seed_roots(roots))
+        self._seed_tasks.add(task)
+        task.add_done_callback(self._seed_tasks.discard)
+    
+    async def _seed_roots(self, roots: List[str]) -> None:
+        for root in roots:
+            try:
+                seeded = await self._run_blocking(self._seed_tree, root)
+                self.stats["folders_seeded"] += seeded
+                logger.info(f"Seeded {seeded} folder baselines below {root}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error seeding folder baselines below {root}: {str(e)}")
+    
+    def _seed_tree(self, root: str) -> int:
+        """Cache the permissions of every folder below root that has no cache entry yet."""
+        db = next(get_db_sync())
+        try:
+            # Folders already cached keep their entry; only their fingerprint is read
+            cached = ScanBaseline.from_permission_cache(db, root)
+            seeded = 0
+            for record in scanner.iter_scan_path(root, simplified_system=True, baseline=cached):
+                path = record["path"]
+                if not self.is_monitoring:
+                    break
+                if cached.get(path) is not None or not record.get("success"):
+                    continue
+                # An event may have snapshotted the folder while the tree was walked
+                if db.query(FolderPermissionCache.id).filter(
+                    FolderPermissionCache.folder_path == path
+                ).first() is not None:
+                    continue
+                cache_service._update_permission_cache(db, path, record["permissions"])
+                seeded += 1
+            return seeded
+        finally:
+            db.close()
+    
+    def _load_interval_factors(self, paths: List[str]) -> Dict[str, float]:
+        """Map monitored paths to polling interval factors from ScanTarget sensitivity."""
+        factors_by_level = MONITOR_CONFIG['sensitivity_interval_factors']
+        wanted = {os.path.normcase(os.path.normpath(path)): path for path in paths}
+        
+        db = next(get_db_sync())
+        try:
+            targets = db.query(ScanTarget).filter(
+                (ScanTarget.is_sensitive == True) | (ScanTarget.sensitivity_level.isnot(None))
+            ).all()
+            factors = {}
+            for target in targets:
+                path = wanted.get(os.path.normcase(os.path.normpath(target.path)))
+                if path is None:
+                    continue
+                level = (target.sensitivity_level or "").lower()
+                default = factors_by_level["high"] if target.is_sensitive else 1.0
+                factors[path] = min(factors.get(path, 1.0), factors_by_level.get(level, default))
+            return factors
+        finally:
+            db.close()
+    
     async def _monitor_loop(self) -> None:
-        """Main monitoring loop."""
+        """Main monitoring loop: targeted rechecks on events, scheduled checks per path."""
+        loop = asyncio.get_running_loop()
+        next_cleanup = loop.time() + self.cleanup_interval
         while self.is_monitoring:
             try:
-                await self._check_for_changes()
-                await asyncio.sleep(self.check_interval)
+                if self._event_overflow:
+                    self._event_overflow = False
+                    self.scheduler.expedite_all()
+                
+                due_paths = self.scheduler.pop_due()
+                if due_paths:
+                    await self._check_scheduled_paths(due_paths)
+                
+                if loop.time() >= next_cleanup:
+                    await self._run_blocking(self._cleanup_stale_cache)
+                    next_cleanup = loop.time() + self.cleanup_interval
+                
+                timeout = self.scheduler.seconds_until_due()
+                if timeout is None:
+                    timeout = self.check_interval
+                timeout = min(timeout, max(0.0, next_cleanup - loop.time()))
+                
+                changed_paths = await self._wait_for_events(timeout)
+                if changed_paths:
+                    await self._check_event_paths(changed_paths)
                 
             except asyncio.CancelledError:
                 break
@@ -92,29 +360,100 @@ class ChangeMonitorService:
                 logger.error(f"Error in monitor loop: {str(e)}")
                 await asyncio.sleep(60)  # Wait a minute before retrying
     
-    async def _check_for_changes(self) -> None:
-        """Check all monitored paths for changes."""
+    async def _wait_for_events(self, timeout: float) -> Set[str]:
+        """Wait up to timeout for change events and return the affected monitored paths."""
+        if self._event_queue is None:
+            await asyncio.sleep(timeout)
+            return set()
+        
         try:
-            db = next(get_db_sync())
-            
-            for path in list(self.monitoring_paths):
-                if not os.path.exists(path):
-                    logger.warning(f"Monitored path no longer exists: {path}")
-                    self.monitoring_paths.discard(path)
-                    continue
-                
-                await self._check_path_changes(db, path)
+            first = await asyncio.wait_for(self._event_queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return set()
+        
+        # Let a burst of related events (e.g. a recursive ACL change) settle
+        await asyncio.sleep(self.debounce_seconds)
+        events = [first]
+        while not self._event_queue.empty():
+            events.append(self._event_queue.get_nowait())
+        
+        paths = set()
+        for event in events:
+            self.stats["events_received"] += 1
+            normalized_path = os.path.normpath(event.path)
+            if self._is_monitored(normalized_path):
+                paths.add(normalized_path)
+            else:
+                self.stats["events_ignored"] += 1
+        return paths
+    
+    def _is_monitored(self, path: str) -> bool:
+        """True if path is a monitored path or lies inside one."""
+        return any(
+            path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+            for root in self.monitoring_paths
+        )
+    
+    async def _check_event_paths(self, paths: Set[str]) -> None:
+        """Recheck only the paths reported by the event source."""
+        try:
+            existing = await self._run_blocking(_existing_paths, sorted(paths))
+            self.stats["event_rechecks"] += len(existing)
+            results = await asyncio.gather(*(self._check_path_changes(path) for path in existing))
+            for path, changed in zip(existing, results):
+                if changed:
+                    self.scheduler.note_change(self._root_for(path))
+        except Exception as e:
+            logger.error(f"Error checking changed paths: {str(e)}")
+    
+    async def _check_scheduled_paths(self, paths: List[str]) -> None:
+        """Check the monitored paths the scheduler reports as due and reschedule them."""
+        results = {}
+        try:
+            existing = await self._run_blocking(_existing_paths, paths)
+            for path in set(paths) - set(existing):
+                logger.warning(f"Monitored path no longer exists: {path}")
+                self.monitoring_paths.discard(path)
+                self.scheduler.remove(path)
             
-            # Cleanup old stale cache entries
-            cache_service.cleanup_stale_cache(db, older_than_hours=48)
+            self.stats["scheduled_checks"] += len(existing)
+            changed = await asyncio.gather(*(self._check_path_changes(path) for path in existing))
+            results = dict(zip(existing, changed))
             
         except Exception as e:
             logger.error(f"Error checking for changes: {str(e)}")
+        finally:
+            for path in paths:
+                self.scheduler.record(path, results.get(path, False))
+    
+    def _cleanup_stale_cache(self) -> None:
+        db = next(get_db_sync())
+        try:
+            cache_service.cleanup_stale_cache(db, older_than_hours=48)
         finally:
             db.close()
     
-    async def _check_path_changes(self, db: Session, path: str) -> None:
-        """Check a specific path for permission changes."""
+    async def _check_path_changes(self, path: str) -> bool:
+        """Check a specific path for permission changes. Returns True if one was found."""
+        async with self._root_limit(path):
+            change = await self._run_blocking(self._detect_path_change, path)
+        
+        if not change:
+            return False
+        
+        self.stats["changes_detected"] += 1
+        previous_permissions, current_permissions = change
+        await self._send_change_notification(path, previous_permissions, current_permissions)
+        return True
+    
+    def _detect_path_change(self, path: str) -> Optional[tuple]:
+        """
+        Compare a path with its cache entry and record any significant change.
+        
+        Runs on the monitor executor with its own session. Returns the previous
+        and current permissions when a significant change was recorded.
+        """
+        db = next(get_db_sync())
         try:
             # Get cached permissions
             cache_entry = db.query(FolderPermissionCache).filter(
@@ -122,13 +461,28 @@ class ChangeMonitorService:
             ).first()
             
             if not cache_entry:
-                # No cache entry, create one
-                logger.info(f"Creating initial cache entry for: {path}")
                 permissions = scanner.permission_scanner.get_folder_permissions(
                     path, simplified_system=True
                 )
+                # Not seeded yet: diff against the folder's last stored scan if there is one
+                previous_permissions = self._stored_scan_permissions(db, path)
+                if previous_permissions is not None and \
+                        permissions_checksum(previous_permissions) != permissions_checksum(permissions) and \
+                        self._record_permission_change(db, path, previous_permissions, permissions):
+                    logger.info(f"Confirmed significant permission change against stored scan for: {path}")
+                    cache_service._update_permission_cache(db, path, permissions)
+                    cache_service.mark_path_stale(db, path)
+                    return previous_permissions, permissions
+                
+                logger.info(f"Creating initial cache entry for: {path}")
                 cache_service._update_permission_cache(db, path, permissions)
-                return
+                return None
+            
+            # Cheap check first: the descriptor fingerprint needs no SID resolution
+            fingerprint = scanner.permission_scanner.get_descriptor_fingerprint(path)
+            if fingerprint is not None and fingerprint == cache_entry.checksum:
+                logger.debug(f"Descriptor unchanged for: {path}")
+                return None
             
             # Get current permissions
             current_permissions = scanner.permission_scanner.get_folder_permissions(
@@ -136,19 +490,19 @@ class ChangeMonitorService:
             )
             
             # Calculate checksum
-            current_checksum = hashlib.sha256(
-                json.dumps(current_permissions, sort_keys=True).encode()
-            ).hexdigest()
+            current_checksum = permissions_checksum(current_permissions)
             
             # Compare with cached checksum
             if cache_entry.checksum != current_checksum:
                 logger.info(f"Detected potential permission change for: {path}")
                 
+                previous_permissions = cache_service.hydrate_cache_entry(db, cache_entry)
+                
                 # Check if there are significant changes before proceeding
-                has_significant_changes = await self._record_permission_change(
+                has_significant_changes = self._record_permission_change(
                     db, 
                     path, 
-                    cache_entry.permissions_data, 
+                    previous_permissions, 
                     current_permissions
                 )
                 
@@ -161,15 +515,38 @@ class ChangeMonitorService:
                     # Mark dependent caches as stale
                     cache_service.mark_path_stale(db, path)
                     
-                    # Send notification
-                    await self._send_change_notification(path, cache_entry.permissions_data, current_permissions)
+                    return previous_permissions, current_permissions
                 else:
                     logger.debug(f"No significant changes detected for: {path}, skipping alert")
+                    # Refresh the stored checksum so the fingerprint check short-circuits next time
+                    cache_service._update_permission_cache(db, path, current_permissions)
+            
+            return None
                 
         except Exception as e:
             logger.error(f"Error checking path {path}: {str(e)}")
+            return None
+        finally:
+            db.close()
     
-    async def _record_permission_change(
+    def _stored_scan_permissions(self, db: Session, path: str) -> Optional[Dict]:
+        """Permissions of path from its most recent successful stored scan result, if any."""
+        result = db.query(ScanResult).filter(
+            ScanResult.path == path,
+            ScanResult.success == True
+        ).order_by(ScanResult.id.desc()).first()
+        if result is None:
+            return None
+        payload = hydrate_scan_results(db, [result])[0]
+        if not isinstance(payload, dict):
+            return None
+        # Streamed per-folder records keep the ACL under 'permissions'
+        permissions = payload if "aces" in payload else payload.get("permissions")
+        if not isinstance(permissions, dict) or "aces" not in permissions:
+            return None
+        return permissions
+    
+    def _record_permission_change(
         self, 
         db: Session, 
         path: str, 
@@ -222,8 +599,8 @@ class ChangeMonitorService:
         }
         
         # Check owner change
-        old_owner = old_perms.get("owner", {})
-        new_owner = new_perms.get("owner", {})
+        old_owner = old_perms.get("owner") or {}
+        new_owner = new_perms.get("owner") or {}
         if old_owner.get("full_name") != new_owner.get("full_name"):
             changes["owner_changed"] = {
                 "old": old_owner.get("full_name"),
@@ -283,30 +660,27 @@ class ChangeMonitorService:
         """Send notification about permission change."""
         try:
             changes = self._analyze_permission_changes(old_permissions, new_permissions)
+            severity = "high" if any(changes.values()) else "medium"
             
-            # Create alert in database
-            db = next(get_db_sync())
-            try:
-                alert = Alert(
-                    severity="high" if any(changes.values()) else "medium",
-                    message=self._format_change_message(path, changes),
-                    details=self._format_alert_details(path, changes)
-                )
-                db.add(alert)
-                db.commit()
-                
-                # Send WebSocket notification
-                change_record = PermissionChange(
-                    change_type="permission_change",
-                    detected_time=datetime.utcnow(),
-                    previous_state=old_permissions,
-                    current_state=new_permissions
-                )
-                
-                await notification_service.send_permission_change_notification(change_record)
-                
-            finally:
-                db.close()
+            # The notification service writes the alert and notifies clients, batching bursts of changes
+            change_record = PermissionChange(
+                change_type="permission_change",
+                detected_time=datetime.utcnow(),
+                previous_state=old_permissions,
+                current_state=new_permissions
+            )
+            await notification_service.submit_permission_change(PendingChange(
+                path=path,
+                root_path=self._root_for(path),
+                change_type=change_type_of(changes),
+                severity=severity,
+                alert={
+                    "severity": severity,
+                    "message": self._format_change_message(path, changes),
+                    "details": self._format_alert_details(path, changes)
+                },
+                record=change_record
+            ))
                 
         except Exception as e:
             logger.error(f"Error sending change notification: {str(e)}")
@@ -0,0 +1,244 @@
+# src/services/event_bus.py
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List
+
+from src.db.database import get_db
+from src.db.coordination import append_events, latest_event_seq, prune_events, read_events
+from src.utils.logger import setup_logger
+from config.settings import API_CONFIG, CLUSTER_CONFIG
+
+logger = setup_logger('event_bus')
+
+# Identifies this API worker process in the bus table and in leases
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+EventHandler = Callable[[Dict], Awaitable[None]]
+
+# Skipped sequence numbers are only waited for when the jump is small; identity
+# columns can jump by much more (e.g. SQL Server after a restart) without anything missing
+_MAX_TRACKED_GAP = 100
+
+
+class EventBus:
+    """
+    Publish/subscribe between API workers, by channel.
+
+    Payloads must be JSON serializable. Handlers are coroutines and run on
+    the subscribing worker's event loop; a failing handler is logged and
+    does not affect the others. The publishing worker's own handlers are
+    always called directly.
+    """
+
+    cross_process = False
+
+    def __init__(self):
+        self._handlers: Dict[str, List[EventHandler]] = {}
+        self.stats = {
+            'published': 0,
+            'received': 0,
+            'handler_errors': 0
+        }
+
+    def subscribe(self, channel: str, handler: EventHandler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def unsubscribe(self, channel: str, handler: EventHandler) -> None:
+        handlers = self._handlers.get(channel, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, channel: str, payload: Dict) -> None:
+        await self.publish_many(channel, [payload])
+
+    async def publish_many(self, channel: str, payloads: List[Dict]) -> None:
+        raise NotImplementedError
+
+    async def _dispatch(self, channel: str, payload: Dict) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                await handler(payload)
+            except Exception as e:
+                self.stats['handler_errors'] += 1
+                logger.error(f"Error in {channel} event handler: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        return {
+            'type': type(self).__name__,
+            'worker_id': WORKER_ID,
+            'channels': {channel: len(handlers) for channel, handlers in self._handlers.items()},
+            **self.stats
+        }
+
+
+class InProcessEventBus(EventBus):
+    """Delivers events to this process only; for a single API worker."""
+
+    async def publish_many(self, channel: str, payloads: List[Dict]) -> None:
+        for payload in payloads:
+            self.stats['published'] += 1
+            await self._dispatch(channel, payload)
+
+
+class DatabaseEventBus(EventBus):
+    """
+    Event bus over a table in the application database; needs no broker.
+
+    Published events are delivered locally straight away and appended to
+    event_bus_messages in one insert per batch. Every worker tails the table
+    by sequence number and dispatches the events other workers published.
+    A sequence number that is skipped over (a concurrent insert that had not
+    committed yet) is re-checked on the next polls for a short while, so
+    late commits are not lost. Old rows are pruned by retention.
+    """
+
+    cross_process = True
+
+    def __init__(self, db_session_factory=get_db, worker_id: str = WORKER_ID,
+                 poll_interval: float = None, batch_size: int = None,
+                 retention_seconds: float = None, gap_timeout: float = None):
+        super().__init__()
+        self.db_session_factory = db_session_factory
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval or CLUSTER_CONFIG['bus_poll_interval_seconds']
+        self.batch_size = batch_size or CLUSTER_CONFIG['bus_batch_size']
+        self.retention_seconds = retention_seconds or CLUSTER_CONFIG['bus_retention_seconds']
+        self.gap_timeout = gap_timeout or CLUSTER_CONFIG['bus_gap_timeout_seconds']
+        self._last_seq = 0
+        self._missing: Dict[int, float] = {}  # skipped seq -> when it was first missed
+        self._poll_task = None
+        self._last_prune = time.monotonic()
+        self.stats.update({
+            'publish_errors': 0,
+            'polls': 0,
+            'poll_errors': 0,
+            'late_events': 0,
+            'pruned': 0
+        })
+
+    async def start(self) -> None:
+        if self._poll_task:
+            return
+        # Only events published from now on are delivered
+        self._last_seq = await asyncio.to_thread(self._run_db, latest_event_seq)
+        self._poll_task = asyncio.create_task(self._poll_loop())
+        logger.info(f"Database event bus started for worker {self.worker_id} at seq {self._last_seq}")
+
+    async def stop(self) -> None:
+        if self._poll_task:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+
+    async def publish_many(self, channel: str, payloads: List[Dict]) -> None:
+        if not payloads:
+            return
+        for payload in payloads:
+            await self._dispatch(channel, payload)
+        try:
+            await asyncio.to_thread(self._run_db, append_events, channel, self.worker_id, payloads, commit=True)
+            self.stats['published'] += len(payloads)
+        except Exception as e:
+            # Local subscribers already have them; other workers miss this batch
+            self.stats['publish_errors'] += 1
+            logger.error(f"Error publishing {len(payloads)} {channel} events: {str(e)}")
+
+    async def poll_once(self) -> int:
+        """Dispatch events published by other workers since the last poll; returns the number read."""
+        rows = await asyncio.to_thread(
+            self._run_db, read_events, self._last_seq, self.batch_size, list(self._missing)
+        )
+        self.stats['polls'] += 1
+        now = time.monotonic()
+        for row in rows:
+            seq = row['seq']
+            if seq in self._missing:
+                del self._missing[seq]
+                self.stats['late_events'] += 1
+            elif seq > self._last_seq:
+                if seq - self._last_seq - 1 <= _MAX_TRACKED_GAP:
+                    for skipped in range(self._last_seq + 1, seq):
+                        self._missing[skipped] = now
+                self._last_seq = seq
+            else:
+                continue
+            if row['origin'] != self.worker_id:
+                self.stats['received'] += 1
+                await self._dispatch(row['channel'], row['payload'])
+
+        # Sequence numbers of rolled-back inserts never show up
+        for seq, missed_at in list(self._missing.items()):
+            if now - missed_at > self.gap_timeout:
+                del self._missing[seq]
+        return len(rows)
+
+    async def _poll_loop(self) -> None:
+        try:
+            while True:
+                try:
+                    read = await self.poll_once()
+                    if time.monotonic() - self._last_prune > self.retention_seconds / 4:
+                        self._last_prune = time.monotonic()
+                        self.stats['pruned'] += await asyncio.to_thread(
+                            self._run_db, prune_events, self.retention_seconds
+                        )
+                except Exception as e:
+                    self.stats['poll_errors'] += 1
+                    logger.error(f"Error polling event bus: {str(e)}")
+                    read = 0
+                # Keep reading without a pause while there is a backlog
+                if read < self.batch_size:
+                    await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            pass
+
+    def _run_db(self, operation: Callable, *args, commit: bool = False):
+        """Run a bus table operation in its own session; called from a worker thread."""
+        db = next(self.db_session_factory())
+        try:
+            result = operation(db, *args)
+            if commit:
+                db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict:
+        return {
+            **super().get_stats(),
+            'last_seq': self._last_seq,
+            'pending_gaps': len(self._missing),
+            'poll_interval_seconds': self.poll_interval
+        }
+
+
+def create_event_bus(kind: str = None) -> EventBus:
+    """Build the configured bus; 'auto' uses the database when the API runs more than one worker."""
+    kind = kind or CLUSTER_CONFIG['event_bus']
+    if kind == 'auto':
+        kind = 'database' if API_CONFIG['workers'] > 1 else 'memory'
+    if kind == 'database':
+        return DatabaseEventBus()
+    if kind == 'memory':
+        return InProcessEventBus()
+    raise ValueError(f"Unknown event bus: {kind}")
+
+
+# Global event bus instance
+event_bus = create_event_bus()
@@ -7,6 +7,7 @@ from typing import Dict, List, Set, Optional, Any
 import threading
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc, distinct
@@ -15,10 +16,24 @@ from src.scanner.group_resolver import GroupResolver
 from src.db.database import get_db
 from src.db.models.scan import ScanJob, AccessEntry
 from src.db.models.changes import PermissionChange
+from src.services.event_bus import event_bus
+from src.services.membership_refresh import GROUP_MEMBERSHIP_CHANNEL
 from src.utils.logger import setup_logger
 
 logger = setup_logger('group_monitor')
 
+# Group type names returned by LookupAccountName
+_GROUP_ACCOUNT_TYPES = ('Group', 'WellKnownGroup', 'Alias')
+
+
+def _initialize_tracker_thread() -> None:
+    """Initialize COM in the tracker's worker thread (membership lookups go through ADSI)."""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pass
+
 class GroupMembershipTracker:
     """
     Enhanced group membership tracking service that monitors for indirect access changes.
@@ -47,6 +62,9 @@ class GroupMembershipTracker:
         self._monitoring = False
         self._monitor_thread = None
         self._stop_event = threading.Event()
+        self._loop = None
+        # Directory lookups and DB work run here, never on the event loop
+        self._executor: Optional[ThreadPoolExecutor] = None
         
         logger.info("Group Membership Tracker initialized")
 
@@ -59,6 +77,8 @@ class GroupMembershipTracker:
         try:
             self._monitoring = True
             self._stop_event.clear()
+            # Cycles run as coroutines on the caller's loop, submitted from the monitor thread
+            self._loop = asyncio.get_running_loop()
             
             # Start monitoring thread
             self._monitor_thread = threading.Thread(
@@ -85,10 +105,25 @@ class GroupMembershipTracker:
         self._stop_event.set()
         
         if self._monitor_thread and self._monitor_thread.is_alive():
-            self._monitor_thread.join(timeout=10.0)
+            # The thread may be waiting on a cycle running on this loop, so don't block it
+            await asyncio.to_thread(self._monitor_thread.join, 10.0)
+        
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
         
         logger.info("Group membership monitoring stopped")
 
+    async def _run_blocking(self, func, *args):
+        """Run a blocking call on the tracker's COM-initialized worker thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="GroupTrackerWorker",
+                initializer=_initialize_tracker_thread
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
     def _monitoring_loop(self) -> None:
         """Main monitoring loop running in separate thread."""
         try:
@@ -99,7 +134,7 @@ class GroupMembershipTracker:
                     # Run monitoring cycle
                     asyncio.run_coroutine_threadsafe(
                         self._run_monitoring_cycle(),
-                        asyncio.get_event_loop()
+                        self._loop
                     ).result()
                     
                     # Wait for next cycle or stop signal
@@ -151,62 +186,63 @@ class GroupMembershipTracker:
     async def _get_groups_to_monitor(self) -> List[Dict[str, str]]:
         """Get list of groups that should be monitored based on recent access grants."""
         try:
-            with next(self.db_session_factory()) as db:
-                # Get groups that have been granted access in recent scans
-                recent_cutoff = datetime.utcnow() - timedelta(days=30)
-                
-                # Query for access entries where trustee appears to be a group
-                access_entries = db.query(AccessEntry).join(
-                    ScanJob
-                ).filter(
-                    and_(
-                        ScanJob.end_time >= recent_cutoff,
-                        ScanJob.status == "completed"
-                    )
-                ).limit(1000).all()
-                
-                groups_found = set()
-                
-                for entry in access_entries:
-                    if entry.trustee_name and entry.trustee_domain:
-                        try:
-                            # Use group resolver to check if this is actually a group
-                            full_name = f"{entry.trustee_domain}\\{entry.trustee_name}"
-                            
-                            # Check cache first to avoid expensive lookups
-                            if full_name not in self._membership_snapshots:
-                                account_details = self.group_resolver._get_account_details(
-                                    entry.trustee_name, 
-                                    entry.trustee_domain
-                                )
-                                
-                                if account_details['type'] in ['Group', 'WellKnownGroup', 'Alias']:
-                                    groups_found.add((entry.trustee_name, entry.trustee_domain))
-                            else:
-                                # Already in cache, assume it's a group
-                                groups_found.add((entry.trustee_name, entry.trustee_domain))
-                                
-                        except Exception:
-                            # Skip if we can't determine the type
-                            continue
-                
-                # Convert to list of dictionaries
-                result = [
-                    {
-                        'name': name,
-                        'domain': domain,
-                        'full_name': f"{domain}\\{name}"
-                    }
-                    for name, domain in groups_found
-                ]
-                
-                logger.debug(f"Found {len(result)} groups to monitor")
-                return result
-                
+            return await self._run_blocking(self._load_groups_to_monitor)
         except Exception as e:
             logger.error(f"Error getting groups to monitor: {str(e)}")
             return []
 
+    def _load_groups_to_monitor(self) -> List[Dict[str, str]]:
+        """Query recently granted trustees and keep the groups (blocking)."""
+        with next(self.db_session_factory()) as db:
+            # Get groups that have been granted access in recent scans
+            recent_cutoff = datetime.utcnow() - timedelta(days=30)
+            
+            # One row per trustee rather than one per access entry
+            trustees = db.query(
+                AccessEntry.trustee_name, AccessEntry.trustee_domain
+            ).join(
+                ScanJob
+            ).filter(
+                and_(
+                    ScanJob.end_time >= recent_cutoff,
+                    ScanJob.status == "completed",
+                    AccessEntry.trustee_name.isnot(None),
+                    AccessEntry.trustee_domain.isnot(None)
+                )
+            ).distinct().limit(1000).all()
+        
+        groups_found = set()
+        
+        for trustee_name, trustee_domain in trustees:
+            try:
+                full_name = f"{trustee_domain}\\{trustee_name}"
+                
+                # Check cache first to avoid expensive lookups
+                if full_name in self._membership_snapshots:
+                    # Already in cache, assume it's a group
+                    groups_found.add((trustee_name, trustee_domain))
+                    continue
+                
+                account_details = self.group_resolver._get_account_details(trustee_name, trustee_domain)
+                if account_details['type'] in _GROUP_ACCOUNT_TYPES:
+                    groups_found.add((trustee_name, trustee_domain))
+                    
+            except Exception:
+                # Skip if we can't determine the type
+                continue
+        
+        result = [
+            {
+                'name': name,
+                'domain': domain,
+                'full_name': f"{domain}\\{name}"
+            }
+            for name, domain in groups_found
+        ]
+        
+        logger.debug(f"Found {len(result)} groups to monitor")
+        return result
+
     async def _check_group_membership_changes(self, group_info: Dict[str, str]) -> List[Dict]:
         """Check for membership changes in a specific group."""
         try:
@@ -215,8 +251,7 @@ class GroupMembershipTracker:
             full_name = group_info['full_name']
             
             # Get current group membership
-            current_membership = await asyncio.get_event_loop().run_in_executor(
-                None,
+            current_membership = await self._run_blocking(
                 self.group_resolver.get_group_members,
                 group_name,
                 domain,
@@ -413,47 +448,58 @@ class GroupMembershipTracker:
     async def _process_membership_changes(self, changes: List[Dict]) -> None:
         """Process detected membership changes and create database records."""
         try:
-            with next(self.db_session_factory()) as db:
-                # Create a scan job for these changes
-                scan_job = ScanJob(
-                    target_id=None,
-                    scan_type="group_membership_monitoring",
-                    status="completed",
-                    start_time=datetime.utcnow(),
-                    end_time=datetime.utcnow(),
-                    parameters={
-                        "changes_count": len(changes),
-                        "monitoring_cycle": True,
-                        "change_types": list(set(change['type'] for change in changes))
-                    }
-                )
-                db.add(scan_job)
-                db.flush()  # Get the scan job ID
-                
-                # Create permission change records
-                for change in changes:
-                    try:
-                        change_record = PermissionChange(
-                            scan_job_id=scan_job.id,
-                            change_type=f"group_{change['type']}",
-                            previous_state=self._build_change_previous_state(change),
-                            current_state=self._build_change_current_state(change),
-                            detected_time=change['change_time']
-                        )
-                        db.add(change_record)
-                        
-                    except Exception as change_error:
-                        logger.warning(f"Error creating change record: {str(change_error)}")
-                
-                db.commit()
-                logger.info(f"Processed {len(changes)} group membership changes")
-                
-                # Analyze impact of these changes
-                await self._analyze_change_impact(changes, scan_job.id)
+            scan_job_id = await self._run_blocking(self._record_membership_changes, changes)
+            
+            # Every worker rebuilds its membership index from the new state
+            await event_bus.publish(GROUP_MEMBERSHIP_CHANNEL, {
+                'scan_job_id': scan_job_id,
+                'groups': sorted({change['group'] for change in changes})
+            })
+            
+            # Analyze impact of these changes
+            await self._analyze_change_impact(changes, scan_job_id)
                 
         except Exception as e:
             logger.error(f"Error processing membership changes: {str(e)}", exc_info=True)
 
+    def _record_membership_changes(self, changes: List[Dict]) -> int:
+        """Store a monitoring scan job with one change record per change (blocking); returns its id."""
+        with next(self.db_session_factory()) as db:
+            # Create a scan job for these changes
+            scan_job = ScanJob(
+                target_id=None,
+                scan_type="group_membership_monitoring",
+                status="completed",
+                start_time=datetime.utcnow(),
+                end_time=datetime.utcnow(),
+                parameters={
+                    "changes_count": len(changes),
+                    "monitoring_cycle": True,
+                    "change_types": list(set(change['type'] for change in changes))
+                }
+            )
+            db.add(scan_job)
+            db.flush()  # Get the scan job ID
+            
+            # Create permission change records
+            for change in changes:
+                try:
+                    change_record = PermissionChange(
+                        scan_job_id=scan_job.id,
+                        change_type=f"group_{change['type']}",
+                        previous_state=self._build_change_previous_state(change),
+                        current_state=self._build_change_current_state(change),
+                        detected_time=change['change_time']
+                    )
+                    db.add(change_record)
+                    
+                except Exception as change_error:
+                    logger.warning(f"Error creating change record: {str(change_error)}")
+            
+            db.commit()
+            logger.info(f"Processed {len(changes)} group membership changes")
+            return scan_job.id
+
     def _build_change_previous_state(self, change: Dict) -> Optional[Dict]:
         """Build previous state data for a change record."""
         try:
@@ -496,61 +542,64 @@ class GroupMembershipTracker:
     async def _analyze_change_impact(self, changes: List[Dict], scan_job_id: int) -> None:
         """Analyze the impact of group membership changes on file access."""
         try:
-            with next(self.db_session_factory()) as db:
-                impact_analysis = []
-                
-                for change in changes:
-                    try:
-                        # Find what file system paths this group has access to
-                        group_name = change['group']
-                        
-                        # Query recent access entries for this group
-                        recent_access = db.query(AccessEntry).join(
-                            ScanJob
-                        ).filter(
-                            and_(
-                                AccessEntry.trustee_name == group_name.split('\\')[-1],
-                                AccessEntry.trustee_domain == group_name.split('\\')[0],
-                                ScanJob.end_time >= datetime.utcnow() - timedelta(days=30),
-                                ScanJob.status == "completed"
-                            )
-                        ).limit(100).all()
+            await self._run_blocking(self._store_change_impact, changes, scan_job_id)
+        except Exception as e:
+            logger.error(f"Error analyzing change impact: {str(e)}", exc_info=True)
+
+    def _store_change_impact(self, changes: List[Dict], scan_job_id: int) -> None:
+        """Record the recently granted paths each change affects on its scan job (blocking)."""
+        with next(self.db_session_factory()) as db:
+            impact_analysis = []
+            
+            for change in changes:
+                try:
+                    # Find what file system paths this group has access to
+                    group_name = change['group']
+                    
+                    # Query recent access entries for this group
+                    recent_access = db.query(AccessEntry).join(
+                        ScanJob
+                    ).filter(
+                        and_(
+                            AccessEntry.trustee_name == group_name.split('\\')[-1],
+                            AccessEntry.trustee_domain == group_name.split('\\')[0],
+                            ScanJob.end_time >= datetime.utcnow() - timedelta(days=30),
+                            ScanJob.status == "completed"
+                        )
+                    ).limit(100).all()
+                    
+                    affected_paths = set()
+                    for access in recent_access:
+                        if access.scan_result and access.scan_result.path:
+                            affected_paths.add(access.scan_result.path)
+                    
+                    if affected_paths:
+                        impact = {
+                            'change_id': f"{change['type']}_{change['group']}_{change['change_time'].isoformat()}",
+                            'group': change['group'],
+                            'change_type': change['type'],
+                            'affected_paths': list(affected_paths),
+                            'path_count': len(affected_paths),
+                            'member_info': change.get('member_info', {}),
+                            'access_path': change.get('access_path', [])
+                        }
                         
-                        affected_paths = set()
-                        for access in recent_access:
-                            if access.scan_result and access.scan_result.path:
-                                affected_paths.add(access.scan_result.path)
+                        impact_analysis.append(impact)
                         
-                        if affected_paths:
-                            impact = {
-                                'change_id': f"{change['type']}_{change['group']}_{change['change_time'].isoformat()}",
-                                'group': change['group'],
-                                'change_type': change['type'],
-                                'affected_paths': list(affected_paths),
-                                'path_count': len(affected_paths),
-                                'member_info': change.get('member_info', {}),
-                                'access_path': change.get('access_path', [])
-                            }
-                            
-                            impact_analysis.append(impact)
-                            
-                    except Exception as change_error:
-                        logger.warning(f"Error analyzing change impact: {str(change_error)}")
-                
-                if impact_analysis:
-                    logger.info(f"Impact analysis: {len(impact_analysis)} changes "
-                               f"affect file system access")
-                    
-                    # Store impact analysis (could be added to scan job parameters)
-                    scan_job = db.query(ScanJob).filter(ScanJob.id == scan_job_id).first()
-                    if scan_job:
-                        current_params = scan_job.parameters or {}
-                        current_params['impact_analysis'] = impact_analysis
-                        scan_job.parameters = current_params
-                        db.commit()
+                except Exception as change_error:
+                    logger.warning(f"Error analyzing change impact: {str(change_error)}")
+            
+            if impact_analysis:
+                logger.info(f"Impact analysis: {len(impact_analysis)} changes "
+                           f"affect file system access")
                 
-        except Exception as e:
-            logger.error(f"Error analyzing change impact: {str(e)}", exc_info=True)
+                # Store impact analysis (could be added to scan job parameters)
+                scan_job = db.query(ScanJob).filter(ScanJob.id == scan_job_id).first()
+                if scan_job:
+                    current_params = scan_job.parameters or {}
+                    current_params['impact_analysis'] = impact_analysis
+                    scan_job.parameters = current_params
+                    db.commit()
 
     async def _cleanup_old_snapshots(self) -> None:
         """Clean up old membership snapshots to prevent memory bloat."""
@@ -580,8 +629,7 @@ class GroupMembershipTracker:
         try:
             logger.info(f"Forcing snapshot for group {domain}\\{group_name}")
             
-            membership = await asyncio.get_event_loop().run_in_executor(
-                None,
+            membership = await self._run_blocking(
                 self.group_resolver.get_group_members,
                 group_name,
                 domain,
@@ -0,0 +1,104 @@
+# src/services/health_refresh.py
+
+import asyncio
+from typing import Dict, Optional
+
+from src.core.health_analyzer import HealthAnalyzer
+from src.utils.logger import setup_logger
+from config.settings import HEALTH_CONFIG
+
+logger = setup_logger('health_refresh')
+
+# Incremental scans requested on a worker that is not the monitor leader are forwarded here
+HEALTH_REFRESH_CHANNEL = 'health_refresh'
+
+
+class HealthRefresher:
+    """
+    Keeps the health score current between full health scans.
+
+    Runs an incremental health scan every interval on a worker thread, so
+    only folders whose ACL changed are re-checked. Runs on the monitor
+    leader only, as the scans of two workers would reconcile the same
+    issues; requested scans are forwarded to the leader and share a lock
+    with the periodic ones, so at most one incremental scan runs at a time.
+    """
+
+    def __init__(self, interval_seconds: float = None):
+        self.interval = HEALTH_CONFIG['incremental_interval_seconds'] if interval_seconds is None else interval_seconds
+        self.analyzer = None
+        self._task: Optional[asyncio.Task] = None
+        self._requested: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.stats = {
+            'runs': 0,
+            'requested': 0,
+            'errors': 0,
+            'last_scan_id': None
+        }
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Incremental health scans every {self.interval}s")
+
+    async def stop(self) -> None:
+        for task in (self._task, self._requested):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._requested = None
+
+    async def refresh_once(self) -> Optional[int]:
+        async with self._lock:
+            if self.analyzer is None:
+                self.analyzer = HealthAnalyzer()
+            scan_id = await asyncio.to_thread(self.analyzer.run_incremental_health_scan)
+            self.stats['runs'] += 1
+            if scan_id is not None:
+                self.stats['last_scan_id'] = scan_id
+            return scan_id
+
+    def request_refresh(self) -> bool:
+        """Start an incremental scan in the background; False if a requested one is still pending."""
+        if self._requested is not None and not self._requested.done():
+            return False
+        self.stats['requested'] += 1
+        self._requested = asyncio.create_task(self._run_requested())
+        return True
+
+    async def on_refresh_requested(self, event: Dict) -> None:
+        """Requests forwarded over the event bus; only the monitor leader acts on them."""
+        from src.services.leader_election import monitor_leader
+        if monitor_leader.is_leader:
+            self.request_refresh()
+
+    async def _run_requested(self) -> None:
+        try:
+            scan_id = await self.refresh_once()
+            logger.info(f"Requested incremental health scan {scan_id} completed")
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Requested incremental health scan failed: {str(e)}")
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.refresh_once()
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Incremental health scan failed: {str(e)}")
+        except asyncio.CancelledError:
+            pass
+
+    def get_stats(self) -> Dict:
+        return {'interval_seconds': self.interval, 'running': self._task is not None, **self.stats}
+
+
+# Global health refresher instance
+health_refresher = HealthRefresher()
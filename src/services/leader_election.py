@@ -0,0 +1,147 @@
+# src/services/leader_election.py
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.db.database import get_db
+from src.db.coordination import get_lease, release_lease, try_acquire_lease
+from src.services.event_bus import WORKER_ID, event_bus
+from src.utils.logger import setup_logger
+from config.settings import CLUSTER_CONFIG
+
+logger = setup_logger('leader_election')
+
+# Channel on which non-leader workers forward monitoring start/stop requests
+MONITOR_CONTROL_CHANNEL = 'monitor_control'
+
+LeadershipCallback = Callable[[], Awaitable[None]]
+
+
+class LeaderElector:
+    """
+    Keeps one API worker in charge of a singleton role through a renewable lease.
+
+    Every worker tries to take or renew the lease each renew interval; the
+    holder calls on_elected once when it wins and on_demoted when it stops
+    or can no longer renew in time. A leader that cannot reach the database
+    steps down before its lease can expire, so two workers never run the
+    role at once. Without election (a single worker) this worker leads
+    from the start.
+    """
+
+    def __init__(self, name: str, worker_id: str = WORKER_ID, enabled: bool = True,
+                 lease_seconds: float = None, renew_seconds: float = None,
+                 db_session_factory=get_db):
+        self.name = name
+        self.worker_id = worker_id
+        self.enabled = enabled
+        self.lease_seconds = lease_seconds or CLUSTER_CONFIG['leader_lease_seconds']
+        self.renew_seconds = min(renew_seconds or CLUSTER_CONFIG['leader_renew_seconds'], self.lease_seconds / 2)
+        self.db_session_factory = db_session_factory
+        self.is_leader = False
+        self._on_elected: Optional[LeadershipCallback] = None
+        self._on_demoted: Optional[LeadershipCallback] = None
+        self._renewed_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            'elections_won': 0,
+            'demotions': 0,
+            'renew_errors': 0
+        }
+
+    async def start(self, on_elected: LeadershipCallback = None,
+                    on_demoted: LeadershipCallback = None) -> None:
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        if not self.enabled:
+            await self._set_leader(True)
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Leader election for '{self.name}' started (worker {self.worker_id})")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        was_leader = self.is_leader
+        await self._set_leader(False)
+        if was_leader and self.enabled:
+            try:
+                await asyncio.to_thread(self._run_db, release_lease, self.name, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Error releasing '{self.name}' lease: {str(e)}")
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                try:
+                    acquired = await asyncio.to_thread(
+                        self._run_db, try_acquire_lease, self.name, self.worker_id, self.lease_seconds
+                    )
+                    if acquired:
+                        self._renewed_at = time.monotonic()
+                    await self._set_leader(acquired)
+                except Exception as e:
+                    self.stats['renew_errors'] += 1
+                    logger.error(f"Error renewing '{self.name}' lease: {str(e)}")
+                    # Step down before the lease runs out and another worker can take it
+                    if self.is_leader and time.monotonic() - self._renewed_at >= self.lease_seconds - self.renew_seconds:
+                        await self._set_leader(False)
+                await asyncio.sleep(self.renew_seconds)
+        except asyncio.CancelledError:
+            pass
+
+    async def _set_leader(self, leader: bool) -> None:
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        callback = self._on_elected if leader else self._on_demoted
+        if leader:
+            self.stats['elections_won'] += 1
+            logger.info(f"Worker {self.worker_id} is now leader for '{self.name}'")
+        else:
+            self.stats['demotions'] += 1
+            logger.info(f"Worker {self.worker_id} is no longer leader for '{self.name}'")
+        if callback:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Error {'starting' if leader else 'stopping'} '{self.name}' leader services: {str(e)}")
+
+    def _run_db(self, operation: Callable, *args):
+        db = next(self.db_session_factory())
+        try:
+            return operation(db, *args)
+        finally:
+            db.close()
+
+    async def get_status(self) -> Dict:
+        status = {
+            'name': self.name,
+            'worker_id': self.worker_id,
+            'election_enabled': self.enabled,
+            'is_leader': self.is_leader,
+            **self.stats
+        }
+        if self.enabled:
+            try:
+                lease = await asyncio.to_thread(self._run_db, get_lease, self.name)
+                status['leader'] = lease['holder'] if lease else None
+                status['lease_expires_at'] = lease['expires_at'].isoformat() if lease and lease['expires_at'] else None
+            except Exception as e:
+                status['error'] = str(e)
+        else:
+            status['leader'] = self.worker_id
+        return status
+
+
+# Exactly one worker runs the change monitor and group membership tracker;
+# election is only needed when events cross processes
+monitor_leader = LeaderElector('change_monitor', enabled=event_bus.cross_process)
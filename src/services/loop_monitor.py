@@ -0,0 +1,83 @@
+# src/services/loop_monitor.py
+
+import asyncio
+from collections import deque
+from typing import Dict, Optional
+
+from src.utils.logger import setup_logger
+from config.settings import MONITOR_CONFIG
+
+logger = setup_logger('loop_monitor')
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes up from a fixed-interval sleep.
+
+    Any blocking call on the loop (ACL reads, synchronous DB queries) shows up
+    directly as lag, and the same lag is added to every HTTP and WebSocket
+    request being served at that moment.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 600, warn_threshold_ms: float = 250.0):
+        self.interval = interval
+        self.warn_threshold_ms = warn_threshold_ms
+        self._samples = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag_ms = 0.0
+        self.total_samples = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Event loop lag monitor started (interval {self.interval}s)")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self._samples.append(lag_ms)
+            self.total_samples += 1
+            if lag_ms > self.max_lag_ms:
+                self.max_lag_ms = lag_ms
+            if lag_ms > self.warn_threshold_ms:
+                logger.warning(f"Event loop blocked for {lag_ms:.0f}ms")
+
+    def get_stats(self) -> Dict:
+        """Lag over the recent window, in milliseconds."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"running": self.is_running, "samples": 0}
+
+        def percentile(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2)
+
+        return {
+            "running": self.is_running,
+            "samples": len(samples),
+            "current_ms": round(self._samples[-1], 2),
+            "avg_ms": round(sum(samples) / len(samples), 2),
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "window_max_ms": round(samples[-1], 2),
+            "max_ms": round(self.max_lag_ms, 2),
+            "window_seconds": round(len(samples) * self.interval, 1)
+        }
+
+# Global instance
+loop_lag_monitor = EventLoopLagMonitor(interval=MONITOR_CONFIG['loop_lag_interval_seconds'])
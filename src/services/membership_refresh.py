@@ -0,0 +1,129 @@
+# src/services/membership_refresh.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.db.database import get_db
+from src.db.trustee_index import indexed_trustees
+from src.utils.logger import setup_logger
+from config.settings import GROUP_CACHE_CONFIG
+
+logger = setup_logger('membership_refresh')
+
+# Published by GroupMembershipTracker after it recorded membership changes
+GROUP_MEMBERSHIP_CHANNEL = 'group_membership_changed'
+
+
+def _initialize_index_thread() -> None:
+    """Initialize COM in the index build thread (member lookups use ADSI)."""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pass
+
+
+class MembershipIndexRefresher:
+    """
+    Keeps GroupResolver.membership_index built on this worker.
+
+    Builds the index at startup, then again every interval and shortly after
+    a group membership change is announced on the event bus. The crawl starts
+    from the trustees in the trustee access index and runs on a worker
+    thread; queries keep using the previous index until the new one replaces
+    it. Runs on every worker, as each has its own resolver.
+    """
+
+    def __init__(self, group_resolver=None, db_session_factory=get_db,
+                 interval_seconds: float = None, debounce_seconds: float = 5.0):
+        self.group_resolver = group_resolver
+        self.db_session_factory = db_session_factory
+        self.interval = (GROUP_CACHE_CONFIG['membership_index_interval_seconds']
+                         if interval_seconds is None else interval_seconds)
+        self.debounce_seconds = debounce_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {
+            'builds': 0,
+            'errors': 0,
+            'change_events': 0,
+            'seed_groups': None,
+            'indexed_principals': None
+        }
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Membership index rebuilds every {self.interval or 'never'}s and on group changes")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def on_membership_changed(self, event: Dict) -> None:
+        """Event bus handler: rebuild the index soon after a membership change."""
+        self.stats['change_events'] += 1
+        if self._wake is not None:
+            self._wake.set()
+
+    async def refresh_once(self):
+        """Rebuild the index now and return it."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="ShareGuardMembershipIndex",
+                initializer=_initialize_index_thread
+            )
+        resolver = self.group_resolver
+        if resolver is None:
+            from src.core.scanner import scanner
+            resolver = scanner.group_resolver
+
+        loop = asyncio.get_running_loop()
+        seed_groups = await loop.run_in_executor(self._executor, self._load_seed_groups)
+        index = await loop.run_in_executor(self._executor, resolver.refresh_membership_index, seed_groups)
+        self.stats['builds'] += 1
+        self.stats['seed_groups'] = len(seed_groups)
+        self.stats['indexed_principals'] = len(index)
+        logger.info(f"Membership index rebuilt from {len(seed_groups)} trustees: "
+                    f"{len(index)} principals in {index.build_seconds:.2f}s")
+        return index
+
+    def _load_seed_groups(self) -> List[Dict[str, str]]:
+        with next(self.db_session_factory()) as db:
+            return indexed_trustees(db)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                try:
+                    await self.refresh_once()
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Membership index rebuild failed: {str(e)}")
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.interval or None)
+                    # Let a burst of change events settle into one rebuild
+                    await asyncio.sleep(self.debounce_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        except asyncio.CancelledError:
+            pass
+
+    def get_stats(self) -> Dict:
+        return {'interval_seconds': self.interval, 'running': self._task is not None, **self.stats}
+
+
+# Global membership index refresher instance
+membership_refresher = MembershipIndexRefresher()
@@ -0,0 +1,145 @@
+# src/services/notification_coalescer.py
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.services.notification_fanout import SEVERITY_LEVELS, path_components
+from src.utils.logger import setup_logger
+
+logger = setup_logger('notification_coalescer')
+
+
+@dataclass
+class PendingChange:
+    """One detected folder change waiting to be alerted on."""
+    path: str
+    root_path: str
+    change_type: str
+    severity: str
+    alert: Dict[str, Any]       # Alert row: severity, message, details
+    record: Any = None          # Transient PermissionChange for an individual notification
+    detected_time: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class ChangeBatch:
+    """Changes of one type under one monitored root, collected over a window."""
+    root_path: str
+    change_type: str
+    changes: List[PendingChange] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.changes)
+
+    @property
+    def severity(self) -> str:
+        return max((change.severity for change in self.changes),
+                   key=lambda severity: SEVERITY_LEVELS.get(severity, 1), default='low')
+
+    @property
+    def common_path(self) -> str:
+        """Deepest folder containing every changed path, in the original spelling."""
+        paths = [change.path for change in self.changes]
+        if len(paths) == 1:
+            return paths[0]
+        split = [path_components(path) for path in paths]
+        depth = 0
+        for parts in zip(*split):
+            if any(part != parts[0] for part in parts):
+                break
+            depth += 1
+        if depth == 0:
+            return self.root_path
+        # Rebuild the prefix from the first path so case and separators are preserved
+        prefix, seen = [], 0
+        for piece in paths[0].replace('/', '\\').split('\\'):
+            prefix.append(piece)
+            if piece:
+                seen += 1
+                if seen == depth:
+                    break
+        return '\\'.join(prefix)
+
+
+class ChangeCoalescer:
+    """
+    Collects permission changes for a short window and hands them over in batches.
+
+    Changes are grouped by monitored root and change type. A batch is
+    flushed when the window that started with its first change ends, or
+    immediately once max_batch changes are pending, so a share-wide re-ACL
+    becomes a few summaries instead of one alert per folder.
+    """
+
+    def __init__(self, flush: Callable[[List[ChangeBatch]], Awaitable[None]],
+                 window_seconds: float = 2.0, max_batch: int = 500):
+        self._flush_callback = flush
+        self.window_seconds = window_seconds
+        self.max_batch = max(1, max_batch)
+        self._groups: Dict[Tuple[str, str], ChangeBatch] = {}
+        self._pending = 0
+        self._timer: Optional[asyncio.Task] = None
+        self.stats = {
+            'changes_received': 0,
+            'flushes': 0,
+            'batches_flushed': 0,
+            'largest_batch': 0
+        }
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def add(self, change: PendingChange) -> None:
+        key = (change.root_path, change.change_type)
+        batch = self._groups.get(key)
+        if batch is None:
+            batch = self._groups[key] = ChangeBatch(change.root_path, change.change_type)
+        batch.changes.append(change)
+        self._pending += 1
+        self.stats['changes_received'] += 1
+
+        if self._pending >= self.max_batch or self.window_seconds <= 0:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+
+    async def flush(self) -> None:
+        """Hand over everything pending now."""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        if not self._groups:
+            return
+
+        batches = list(self._groups.values())
+        self._groups = {}
+        self._pending = 0
+        self.stats['flushes'] += 1
+        self.stats['batches_flushed'] += len(batches)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], max(batch.count for batch in batches))
+        try:
+            await self._flush_callback(batches)
+        except Exception as e:
+            logger.error(f"Error flushing {sum(batch.count for batch in batches)} coalesced changes: {str(e)}")
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        await self.flush()
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'pending': self._pending,
+            'window_seconds': self.window_seconds,
+            'max_batch': self.max_batch
+        }
+
+
+def change_type_of(changes: Dict) -> str:
+    """Grouping key for an analyzed change: the kinds of change present, e.g. 'permissions_added+owner_changed'."""
+    kinds = sorted(kind for kind, details in changes.items() if details)
+    return '+'.join(kinds) or 'permission_change'
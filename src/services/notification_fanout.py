@@ -0,0 +1,267 @@
+# src/services/notification_fanout.py
+
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+SEVERITY_LEVELS = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+
+_PATH_SEPARATORS = re.compile(r'[\\/]+')
+
+
+def severity_level(severity: Optional[str]) -> int:
+    return SEVERITY_LEVELS.get(severity, 1)
+
+
+def path_components(path: str) -> List[str]:
+    """Case-insensitive path components; \\ and / are treated alike."""
+    return [part for part in _PATH_SEPARATORS.split(path.casefold()) if part]
+
+
+def message_path(message: Dict) -> Optional[str]:
+    """The folder a notification is about, if any."""
+    data = message.get('data') or {}
+    if data.get('path'):
+        return data['path']
+    for key in ('current_state', 'previous_state', 'details'):
+        state = data.get(key)
+        if isinstance(state, dict) and isinstance(state.get('path'), str) and state['path']:
+            return state['path']
+    return None
+
+
+def message_paths(message: Dict) -> List[str]:
+    """Every folder a notification is about: each changed folder of a batch, else its path."""
+    paths = (message.get('data') or {}).get('paths')
+    if isinstance(paths, list) and paths:
+        return paths
+    path = message_path(message)
+    return [path] if path else []
+
+
+class _PathNode:
+    __slots__ = ('children', 'connections')
+
+    def __init__(self):
+        self.children: Dict[str, '_PathNode'] = {}
+        self.connections: Set[str] = set()
+
+
+class SubscriptionIndex:
+    """
+    Connection filters indexed for fan-out.
+
+    Subscriptions are kept by notification type, by minimum severity and in
+    a trie of path prefixes, so matching a message is a few set lookups and
+    one walk down the trie instead of a filter evaluation per connection.
+    A connection without a given filter is in that dimension's wildcard set.
+    Path filters match the folder and everything below it; a batch matches
+    when any of its changed folders does.
+    """
+
+    def __init__(self):
+        self.filters: Dict[str, Dict] = {}
+        self._any_type: Set[str] = set()
+        self._by_type: Dict[str, Set[str]] = {}
+        self._by_min_severity: Dict[int, Set[str]] = {level: set() for level in SEVERITY_LEVELS.values()}
+        self._any_path: Set[str] = set()
+        self._path_root = _PathNode()
+
+    def __len__(self) -> int:
+        return len(self.filters)
+
+    def add(self, connection_id: str, filters: Optional[Dict] = None) -> None:
+        if connection_id in self.filters:
+            self.remove(connection_id)
+        filters = filters or {}
+        self.filters[connection_id] = filters
+
+        types = filters.get('types')
+        if types:
+            for msg_type in _as_list(types):
+                self._by_type.setdefault(msg_type, set()).add(connection_id)
+        else:
+            self._any_type.add(connection_id)
+
+        self._by_min_severity[severity_level(filters.get('min_severity'))].add(connection_id)
+
+        paths = filters.get('paths')
+        if paths:
+            for path in _as_list(paths):
+                self._path_node(path, create=True).connections.add(connection_id)
+        else:
+            self._any_path.add(connection_id)
+
+    def update(self, connection_id: str, filters: Optional[Dict]) -> None:
+        self.add(connection_id, filters)
+
+    def remove(self, connection_id: str) -> None:
+        filters = self.filters.pop(connection_id, None)
+        if filters is None:
+            return
+
+        self._any_type.discard(connection_id)
+        for msg_type in _as_list(filters.get('types') or []):
+            subscribers = self._by_type.get(msg_type)
+            if subscribers is not None:
+                subscribers.discard(connection_id)
+                if not subscribers:
+                    del self._by_type[msg_type]
+
+        self._by_min_severity[severity_level(filters.get('min_severity'))].discard(connection_id)
+
+        self._any_path.discard(connection_id)
+        for path in _as_list(filters.get('paths') or []):
+            self._remove_path(path, connection_id)
+
+    def match(self, message: Dict) -> Set[str]:
+        """Connections whose filters accept the message."""
+        by_type = self._by_type.get(message.get('type'))
+        type_matches = self._any_type | by_type if by_type else self._any_type
+        if not type_matches:
+            return set()
+
+        level = severity_level(message.get('severity', 'low'))
+        severity_matches = set().union(*(
+            subscribers for min_level, subscribers in self._by_min_severity.items() if min_level <= level
+        ))
+        matches = type_matches & severity_matches
+        if not matches or len(self._any_path) == len(self.filters):
+            return matches
+
+        path_matches = self._any_path | self._path_root.connections
+        for path in message_paths(message):
+            if matches <= path_matches:
+                break
+            node = self._path_root
+            for part in path_components(path):
+                node = node.children.get(part)
+                if node is None:
+                    break
+                path_matches |= node.connections
+        return matches & path_matches
+
+    def get_stats(self) -> Dict:
+        return {
+            'subscriptions': len(self.filters),
+            'type_filtered': len(self.filters) - len(self._any_type),
+            'path_filtered': len(self.filters) - len(self._any_path),
+            'indexed_types': len(self._by_type)
+        }
+
+    def _path_node(self, path: str, create: bool = False) -> Optional[_PathNode]:
+        node = self._path_root
+        for part in path_components(path):
+            child = node.children.get(part)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[part] = _PathNode()
+            node = child
+        return node
+
+    def _remove_path(self, path: str, connection_id: str) -> None:
+        trail = [self._path_root]
+        parts = path_components(path)
+        for part in parts:
+            child = trail[-1].children.get(part)
+            if child is None:
+                return
+            trail.append(child)
+        trail[-1].connections.discard(connection_id)
+        # Prune branches nobody subscribes to any more
+        for depth in range(len(parts), 0, -1):
+            node = trail[depth]
+            if node.connections or node.children:
+                break
+            del trail[depth - 1].children[parts[depth - 1]]
+
+
+class ConnectionSendQueue:
+    """
+    Bounded outbound queue of serialized messages for one WebSocket connection.
+
+    A dedicated writer task drains it, so a slow client only delays its own
+    messages. When the queue is full the overflow policy decides what is
+    lost: drop_oldest makes room for the new message, drop_newest discards
+    it, and coalesce replaces a queued message with the same key (type and
+    path) and otherwise falls back to drop_oldest. A queue counts as lagging
+    from the moment it overflows until it drains to half its size.
+    """
+
+    POLICIES = ('drop_oldest', 'drop_newest', 'coalesce')
+
+    def __init__(self, maxsize: int = 256, policy: str = 'coalesce', clock=time.monotonic):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._clock = clock
+        self._items = deque()  # [key, payload] pairs, mutable so coalescing can replace in place
+        self._by_key: Dict[Hashable, list] = {}
+        self._ready = asyncio.Event()
+        self.full_since: Optional[float] = None
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, payload: str, key: Optional[Hashable] = None) -> str:
+        """Queue a payload; returns 'queued', 'coalesced', 'replaced_oldest' or 'dropped'."""
+        outcome = 'queued'
+        if len(self._items) >= self.maxsize:
+            if self.full_since is None:
+                self.full_since = self._clock()
+            if self.policy == 'drop_newest':
+                self.dropped += 1
+                return 'dropped'
+            if self.policy == 'coalesce' and key is not None and key in self._by_key:
+                self._by_key[key][1] = payload
+                self.coalesced += 1
+                return 'coalesced'
+            self._forget(self._items.popleft())
+            self.dropped += 1
+            outcome = 'replaced_oldest'
+
+        item = [key, payload]
+        self._items.append(item)
+        if key is not None:
+            self._by_key[key] = item
+        self._ready.set()
+        return outcome
+
+    async def get(self) -> str:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        item = self._items.popleft()
+        self._forget(item)
+        if len(self._items) <= self.maxsize // 2:
+            self.full_since = None
+        return item[1]
+
+    def lag_seconds(self) -> float:
+        """How long the queue has been backed up, 0 when it is keeping up."""
+        return self._clock() - self.full_since if self.full_since is not None else 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            'depth': len(self._items),
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'lag_seconds': round(self.lag_seconds(), 1)
+        }
+
+    def _forget(self, item: list) -> None:
+        key = item[0]
+        if key is not None and self._by_key.get(key) is item:
+            del self._by_key[key]
+
+
+def _as_list(value) -> Iterable:
+    return [value] if isinstance(value, str) else value
@@ -3,6 +3,7 @@
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Dict, List, Set, Optional, Any, Callable
 from dataclasses import dataclass, asdict
@@ -10,21 +11,33 @@ import uuid
 from enum import Enum
 
 from fastapi import WebSocket, WebSocketDisconnect
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from src.db.database import get_db
 from src.db.models.alerts import Alert, AlertConfiguration
 from src.db.models.changes import PermissionChange
+from src.db.notification_outbox import (
+    append_notifications, committed_seq, compact_outbox, read_since, seq_bounds
+)
+from src.services.event_bus import EventBus, event_bus as shared_event_bus
+from src.services.notification_fanout import ConnectionSendQueue, SubscriptionIndex, message_path
+from src.services.notification_coalescer import ChangeBatch, ChangeCoalescer, PendingChange
 from src.utils.logger import setup_logger
+from config.settings import NOTIFICATION_CONFIG
 
 logger = setup_logger('notification_service')
 
+# Bus channel carrying notifications to every API worker for local fan-out
+NOTIFICATION_CHANNEL = 'notifications'
+
 class NotificationType(Enum):
     PERMISSION_CHANGE = "permission_change"
     GROUP_MEMBERSHIP_CHANGE = "group_membership_change"
     NEW_ACCESS_GRANTED = "new_access_granted"
     ACCESS_REMOVED = "access_removed"
     ALERT_TRIGGERED = "alert_triggered"
+    PERMISSION_CHANGE_BATCH = "permission_change_batch"
     SYSTEM_STATUS = "system_status"
 
 @dataclass
@@ -40,12 +53,41 @@ class Notification:
     read: bool = False
 
 class ConnectionManager:
-    """Manages WebSocket connections for real-time notifications."""
+    """
+    Manages WebSocket connections for real-time notifications.
+
+    Broadcasts serialize each message once and look up the matching
+    connections in a subscription index. Every connection has its own
+    bounded send queue drained by a writer task, so a slow client only
+    falls behind itself; clients that stay backed up for too long, or whose
+    sends time out, are disconnected.
+    """
     
-    def __init__(self):
+    def __init__(self, send_queue_size: int = None, overflow_policy: str = None,
+                 send_timeout: float = None, max_lag_seconds: float = None):
         self.active_connections: Dict[str, WebSocket] = {}
         self.user_connections: Dict[str, Set[str]] = {}  # user_id -> connection_ids
-        self.connection_filters: Dict[str, Dict] = {}  # connection_id -> filters
+        self.subscriptions = SubscriptionIndex()
+        self.connection_filters: Dict[str, Dict] = self.subscriptions.filters  # connection_id -> filters
+        self.send_queues: Dict[str, ConnectionSendQueue] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
+        self._evicting: Set[str] = set()
+
+        self.send_queue_size = send_queue_size or NOTIFICATION_CONFIG['send_queue_size']
+        self.overflow_policy = overflow_policy or NOTIFICATION_CONFIG['overflow_policy']
+        self.send_timeout = send_timeout or NOTIFICATION_CONFIG['send_timeout_seconds']
+        self.max_lag_seconds = max_lag_seconds or NOTIFICATION_CONFIG['max_lag_seconds']
+        self.stats = {
+            'broadcasts': 0,
+            'queued': 0,
+            'deliveries': 0,
+            'dropped': 0,
+            'coalesced': 0,
+            'send_failures': 0,
+            'send_timeouts': 0,
+            'slow_consumers_evicted': 0,
+            'last_fanout_ms': 0.0
+        }
         
     async def connect(self, websocket: WebSocket, connection_id: str, 
                      user_id: str = None, filters: Dict = None) -> None:
@@ -59,8 +101,13 @@ class ConnectionManager:
                     self.user_connections[user_id] = set()
                 self.user_connections[user_id].add(connection_id)
             
-            if filters:
-                self.connection_filters[connection_id] = filters
+            self.subscriptions.add(connection_id, filters)
+
+            queue = ConnectionSendQueue(self.send_queue_size, self.overflow_policy)
+            self.send_queues[connection_id] = queue
+            self._writers[connection_id] = asyncio.create_task(
+                self._write_loop(connection_id, websocket, queue)
+            )
             
             logger.info(f"WebSocket connection established: {connection_id} (user: {user_id})")
             
@@ -81,8 +128,11 @@ class ConnectionManager:
             if connection_id in self.active_connections:
                 del self.active_connections[connection_id]
             
-            if connection_id in self.connection_filters:
-                del self.connection_filters[connection_id]
+            self.subscriptions.remove(connection_id)
+            self.send_queues.pop(connection_id, None)
+            writer = self._writers.pop(connection_id, None)
+            if writer and writer is not asyncio.current_task():
+                writer.cancel()
             
             # Remove from user connections
             for user_id, conn_ids in self.user_connections.items():
@@ -97,77 +147,124 @@ class ConnectionManager:
         except Exception as e:
             logger.error(f"Error disconnecting {connection_id}: {str(e)}")
 
+    def update_filters(self, connection_id: str, filters: Optional[Dict]) -> None:
+        """Replace a connection's notification filters."""
+        if connection_id in self.active_connections:
+            self.subscriptions.update(connection_id, filters)
+
     async def send_to_connection(self, connection_id: str, message: Dict) -> bool:
-        """Send message to a specific connection."""
-        try:
-            if connection_id in self.active_connections:
-                websocket = self.active_connections[connection_id]
-                await websocket.send_text(json.dumps(message))
-                return True
+        """Queue a message for a specific connection."""
+        return self._enqueue(connection_id, json.dumps(message))
+
+    def _enqueue(self, connection_id: str, payload: str, key=None) -> bool:
+        """Put a serialized message on a connection's send queue; False if it was dropped."""
+        queue = self.send_queues.get(connection_id)
+        if queue is None:
             return False
+
+        outcome = queue.put(payload, key)
+        if outcome == 'dropped':
+            self.stats['dropped'] += 1
+            queued = False
+        else:
+            queued = True
+            self.stats['queued'] += 1
+            if outcome == 'coalesced':
+                self.stats['coalesced'] += 1
+            elif outcome == 'replaced_oldest':
+                self.stats['dropped'] += 1
+
+        if queue.lag_seconds() > self.max_lag_seconds and connection_id not in self._evicting:
+            self._evicting.add(connection_id)
+            asyncio.get_running_loop().create_task(self._evict(
+                connection_id, f"send queue full for {queue.lag_seconds():.1f}s"
+            ))
+        return queued
+
+    async def _write_loop(self, connection_id: str, websocket: WebSocket,
+                          queue: ConnectionSendQueue) -> None:
+        """Drain one connection's send queue."""
+        try:
+            while True:
+                payload = await queue.get()
+                await asyncio.wait_for(websocket.send_text(payload), timeout=self.send_timeout)
+                queue.sent += 1
+                self.stats['deliveries'] += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.stats['send_timeouts'] += 1
+            await self._evict(connection_id, f"send took longer than {self.send_timeout}s")
         except WebSocketDisconnect:
+            self.stats['send_failures'] += 1
             await self.disconnect(connection_id)
-            return False
         except Exception as e:
+            self.stats['send_failures'] += 1
             logger.error(f"Error sending to connection {connection_id}: {str(e)}")
             await self.disconnect(connection_id)
-            return False
+
+    async def _evict(self, connection_id: str, reason: str) -> None:
+        """Disconnect a client that cannot keep up."""
+        try:
+            websocket = self.active_connections.get(connection_id)
+            if websocket is None:
+                return
+            logger.warning(f"Disconnecting slow WebSocket consumer {connection_id}: {reason}")
+            self.stats['slow_consumers_evicted'] += 1
+            await self.disconnect(connection_id)
+            try:
+                await asyncio.wait_for(websocket.close(code=1013, reason="Slow consumer"), timeout=self.send_timeout)
+            except Exception:
+                pass
+        finally:
+            self._evicting.discard(connection_id)
+
+    def _queue_many(self, connection_ids, payload: str, key=None) -> int:
+        """Queue one payload for several connections."""
+        return sum(1 for connection_id in connection_ids if self._enqueue(connection_id, payload, key))
 
     async def send_to_user(self, user_id: str, message: Dict) -> int:
         """Send message to all connections for a specific user."""
-        sent_count = 0
-        if user_id in self.user_connections:
-            connection_ids = list(self.user_connections[user_id])
-            for connection_id in connection_ids:
-                if await self.send_to_connection(connection_id, message):
-                    sent_count += 1
-        return sent_count
-
-    async def broadcast(self, message: Dict, filters: Dict = None) -> int:
-        """Broadcast message to all or filtered connections."""
-        sent_count = 0
-        for connection_id in list(self.active_connections.keys()):
-            # Apply filters if specified
-            if filters and not self._message_matches_filters(message, connection_id, filters):
-                continue
-                
-            if await self.send_to_connection(connection_id, message):
-                sent_count += 1
-        return sent_count
+        connection_ids = list(self.user_connections.get(user_id, ()))
+        if not connection_ids:
+            return 0
+        return self._queue_many(connection_ids, json.dumps(message))
 
-    def _message_matches_filters(self, message: Dict, connection_id: str, 
-                               message_filters: Dict) -> bool:
-        """Check if message matches connection filters."""
-        try:
-            connection_filters = self.connection_filters.get(connection_id, {})
-            
-            # Check notification type filter
-            if 'types' in connection_filters:
-                msg_type = message.get('type')
-                if msg_type not in connection_filters['types']:
-                    return False
-            
-            # Check severity filter
-            if 'min_severity' in connection_filters:
-                msg_severity = message.get('severity', 'low')
-                severity_levels = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
-                min_level = severity_levels.get(connection_filters['min_severity'], 1)
-                msg_level = severity_levels.get(msg_severity, 1)
-                if msg_level < min_level:
-                    return False
-            
-            # Check path filter
-            if 'paths' in connection_filters:
-                msg_data = message.get('data', {})
-                msg_path = msg_data.get('path', '')
-                if not any(path in msg_path for path in connection_filters['paths']):
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            logger.warning(f"Error applying filters: {str(e)}")
-            return True  # Default to allowing message
+    async def broadcast(self, message: Dict) -> int:
+        """Queue message for every connection whose filters accept it."""
+        started = time.perf_counter()
+        connection_ids = self.subscriptions.match(message)
+        if not connection_ids:
+            return 0
+        # Overflowing queues may replace an older message about the same thing
+        key = (message.get('type'), message_path(message))
+        queued = self._queue_many(connection_ids, json.dumps(message), key)
+        self.stats['broadcasts'] += 1
+        self.stats['last_fanout_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return queued
+
+    def get_fanout_stats(self) -> Dict:
+        return {**self.stats, **self.subscriptions.get_stats()}
+
+    def get_send_queue_stats(self, top: int = 10) -> Dict:
+        """Depth of every send queue summarized, plus the most backed-up connections."""
+        queues = list(self.send_queues.items())
+        depths = [len(queue) for _, queue in queues]
+        deepest = sorted(queues, key=lambda item: len(item[1]), reverse=True)[:top]
+        return {
+            'capacity': self.send_queue_size,
+            'overflow_policy': self.overflow_policy,
+            'total_depth': sum(depths),
+            'max_depth': max(depths, default=0),
+            'lagging_connections': sum(1 for _, queue in queues if queue.full_since is not None),
+            'dropped': self.stats['dropped'],
+            'coalesced': self.stats['coalesced'],
+            'slow_consumers_evicted': self.stats['slow_consumers_evicted'],
+            'deepest': [
+                {'connection_id': connection_id, **queue.get_stats()}
+                for connection_id, queue in deepest if len(queue)
+            ]
+        }
 
     def get_connection_count(self) -> int:
         """Get total number of active connections."""
@@ -178,21 +275,44 @@ class ConnectionManager:
         return len(self.user_connections)
 
 class NotificationService:
-    """Service for managing real-time notifications and alerts."""
+    """
+    Service for managing real-time notifications and alerts.
+
+    Notifications are persisted to the outbox and published on the event
+    bus; every API worker receives them there and fans them out to its
+    own WebSocket connections.
+    """
     
-    def __init__(self, db_session_factory=get_db):
+    def __init__(self, db_session_factory=get_db, event_bus: EventBus = None):
         self.db_session_factory = db_session_factory
         self.connection_manager = ConnectionManager()
         self.notification_handlers: Dict[NotificationType, List[Callable]] = {}
+        self.event_bus = event_bus or shared_event_bus
+        self.event_bus.subscribe(NOTIFICATION_CHANNEL, self._deliver_notification)
         
-        # Notification queue for persistence
-        self._notification_queue = asyncio.Queue()
+        # Notification queue for persistence; bounded so a stalled processor slows producers instead of growing it
+        self._notification_queue = asyncio.Queue(maxsize=NOTIFICATION_CONFIG['queue_size'])
         self._queue_processor_task = None
+        self._compaction_task = None
+        
+        # Permission changes are alerted on in batches per monitored root and change type
+        self.change_coalescer = ChangeCoalescer(
+            self._flush_change_batches,
+            window_seconds=NOTIFICATION_CONFIG['coalesce_window_seconds'],
+            max_batch=NOTIFICATION_CONFIG['coalesce_max_batch']
+        )
         
         # Statistics
         self.stats = {
             'notifications_sent': 0,
             'notifications_queued': 0,
+            'notifications_spilled': 0,
+            'alerts_persisted': 0,
+            'batch_notifications': 0,
+            'outbox_appended': 0,
+            'outbox_errors': 0,
+            'outbox_compacted': 0,
+            'notifications_replayed': 0,
             'connections_established': 0,
             'connections_closed': 0
         }
@@ -206,6 +326,7 @@ class NotificationService:
             self._queue_processor_task = asyncio.create_task(
                 self._process_notification_queue()
             )
+            self._compaction_task = asyncio.create_task(self._compact_outbox_periodically())
             
             logger.info("Notification service started")
             
@@ -216,12 +337,16 @@ class NotificationService:
     async def stop_service(self) -> None:
         """Stop the notification service."""
         try:
-            if self._queue_processor_task:
-                self._queue_processor_task.cancel()
-                try:
-                    await self._queue_processor_task
-                except asyncio.CancelledError:
-                    pass
+            # Alert on changes still waiting in the coalescing window
+            await self.change_coalescer.flush()
+            
+            for task in (self._queue_processor_task, self._compaction_task):
+                if task:
+                    task.cancel()
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        pass
             
             # Close all connections
             for connection_id in list(self.connection_manager.active_connections.keys()):
@@ -234,20 +359,30 @@ class NotificationService:
 
     async def handle_websocket_connection(self, websocket: WebSocket, 
                                         user_id: str = None, 
-                                        filters: Dict = None) -> str:
-        """Handle a new WebSocket connection."""
+                                        filters: Dict = None,
+                                        last_seq: Optional[int] = None) -> str:
+        """
+        Handle a new WebSocket connection.
+
+        With last_seq, notifications persisted after that sequence number are
+        replayed once the connection is registered. Live notifications may
+        arrive while the replay is running, so clients de-duplicate by seq.
+        """
         connection_id = str(uuid.uuid4())
         
         try:
             await self.connection_manager.connect(websocket, connection_id, user_id, filters)
             self.stats['connections_established'] += 1
             
+            if last_seq is not None:
+                await self._replay_notifications(connection_id, user_id, last_seq)
+            
             # Keep connection alive and handle messages
             try:
                 while True:
                     # Wait for messages from client (like ping/pong or filter updates)
                     message = await websocket.receive_text()
-                    await self._handle_client_message(connection_id, json.loads(message))
+                    await self._handle_client_message(connection_id, json.loads(message), user_id)
                     
             except WebSocketDisconnect:
                 logger.info(f"Client disconnected: {connection_id}")
@@ -263,7 +398,8 @@ class NotificationService:
             
         return connection_id
 
-    async def _handle_client_message(self, connection_id: str, message: Dict) -> None:
+    async def _handle_client_message(self, connection_id: str, message: Dict,
+                                     user_id: str = None) -> None:
         """Handle messages received from WebSocket clients."""
         try:
             msg_type = message.get('type')
@@ -276,13 +412,16 @@ class NotificationService:
             
             elif msg_type == 'update_filters':
                 filters = message.get('filters', {})
-                self.connection_manager.connection_filters[connection_id] = filters
+                self.connection_manager.update_filters(connection_id, filters)
                 await self.connection_manager.send_to_connection(connection_id, {
                     'type': 'filters_updated',
                     'filters': filters,
                     'timestamp': datetime.utcnow().isoformat()
                 })
             
+            elif msg_type == 'resume':
+                await self._replay_notifications(connection_id, user_id, int(message.get('last_seq') or 0))
+            
             elif msg_type == 'acknowledge_notification':
                 notification_id = message.get('notification_id')
                 await self._acknowledge_notification(notification_id, connection_id)
@@ -295,13 +434,25 @@ class NotificationService:
                               broadcast: bool = False) -> None:
         """Send a notification to specific user or broadcast."""
         try:
-            # Add to queue for persistence
-            await self._notification_queue.put({
+            queue_item = {
                 'notification': notification,
                 'target_user': target_user,
                 'broadcast': broadcast,
                 'timestamp': datetime.utcnow()
-            })
+            }
+            
+            # Producers wait for queue space; nothing queued is ever discarded unpersisted
+            try:
+                await asyncio.wait_for(
+                    self._notification_queue.put(queue_item),
+                    timeout=NOTIFICATION_CONFIG['enqueue_timeout_seconds']
+                )
+            except asyncio.TimeoutError:
+                # The processor is stalled: persist straight to the outbox so clients can still replay it
+                await self._persist_notifications([queue_item], [self._to_message(notification)])
+                self.stats['notifications_spilled'] += 1
+                logger.warning(f"Notification queue full, persisted notification {notification.id} without live delivery")
+                return
             
             self.stats['notifications_queued'] += 1
             
@@ -356,6 +507,78 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Error sending group change notification: {str(e)}")
 
+    async def submit_permission_change(self, change: PendingChange) -> None:
+        """
+        Queue a detected folder change for alerting.
+
+        Changes are coalesced for a short window: every change still gets
+        its own Alert row, written in bulk, but clients receive one summary
+        per monitored root and change type once a batch reaches
+        coalesce_min_batch folders.
+        """
+        await self.change_coalescer.add(change)
+
+    async def _flush_change_batches(self, batches: List[ChangeBatch]) -> None:
+        """Persist the alerts of a coalescing window and notify clients."""
+        rows = [dict(change.alert) for batch in batches for change in batch.changes]
+        try:
+            await asyncio.to_thread(self._persist_alerts, rows)
+            self.stats['alerts_persisted'] += len(rows)
+        except Exception as e:
+            logger.error(f"Error persisting {len(rows)} change alerts: {str(e)}")
+
+        min_batch = NOTIFICATION_CONFIG['coalesce_min_batch']
+        for batch in batches:
+            if batch.count < min_batch:
+                for change in batch.changes:
+                    if change.record is not None:
+                        await self.send_permission_change_notification(change.record)
+                continue
+            await self.send_notification(self._batch_notification(batch), broadcast=True)
+            self.stats['batch_notifications'] += 1
+
+    def _persist_alerts(self, rows: List[Dict]) -> None:
+        """Insert alert rows with one executemany."""
+        if not rows:
+            return
+        db = next(self.db_session_factory())
+        try:
+            db.execute(insert(Alert.__table__), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _batch_notification(self, batch: ChangeBatch) -> Notification:
+        """Summary notification for a batch of changes under one root."""
+        location = batch.common_path
+        sample_size = NOTIFICATION_CONFIG['batch_sample_paths']
+        severity_counts: Dict[str, int] = {}
+        for change in batch.changes:
+            severity_counts[change.severity] = severity_counts.get(change.severity, 0) + 1
+        return Notification(
+            id=str(uuid.uuid4()),
+            type=NotificationType.PERMISSION_CHANGE_BATCH,
+            title="Permission Changes Detected",
+            message=f"{batch.count} folders under {location} changed",
+            severity=batch.severity,
+            timestamp=datetime.utcnow().isoformat(),
+            data={
+                'path': location,
+                'root_path': batch.root_path,
+                'change_type': batch.change_type,
+                'folder_count': batch.count,
+                'severity_counts': severity_counts,
+                'sample_paths': [change.path for change in batch.changes[:sample_size]],
+                # Every changed folder, so subscribers filtering below the common path still match
+                'paths': [change.path for change in batch.changes],
+                'first_detected': min(change.detected_time for change in batch.changes).isoformat(),
+                'last_detected': max(change.detected_time for change in batch.changes).isoformat()
+            }
+        )
+
     async def send_alert_notification(self, alert: Alert) -> None:
         """Send notification for triggered alerts."""
         try:
@@ -476,43 +699,29 @@ class NotificationService:
             return 'medium'
 
     async def _process_notification_queue(self) -> None:
-        """Process queued notifications."""
+        """Process queued notifications: persist each batch to the outbox, then fan it out."""
         try:
             logger.info("Notification queue processor started")
+            batch_size = NOTIFICATION_CONFIG['outbox_batch_size']
             
             while True:
                 try:
-                    # Get notification from queue
-                    queue_item = await self._notification_queue.get()
-                    notification = queue_item['notification']
-                    target_user = queue_item['target_user']
-                    broadcast = queue_item['broadcast']
+                    # Take whatever is queued, up to one outbox transaction's worth
+                    items = [await self._notification_queue.get()]
+                    while len(items) < batch_size and not self._notification_queue.empty():
+                        items.append(self._notification_queue.get_nowait())
                     
-                    # Convert notification to message format
-                    message = {
-                        'id': notification.id,
-                        'type': notification.type.value,
-                        'title': notification.title,
-                        'message': notification.message,
-                        'severity': notification.severity,
-                        'timestamp': notification.timestamp,
-                        'data': notification.data,
-                        'read': notification.read
-                    }
+                    messages = [self._to_message(item['notification']) for item in items]
                     
-                    # Send notification
-                    sent_count = 0
-                    if broadcast:
-                        sent_count = await self.connection_manager.broadcast(message)
-                    elif target_user:
-                        sent_count = await self.connection_manager.send_to_user(target_user, message)
+                    # Persist before sending so every delivered message has a seq to resume from
+                    await self._persist_notifications(items, messages)
                     
-                    self.stats['notifications_sent'] += sent_count
-                    
-                    # Persist notification to database
-                    await self._persist_notification(notification)
-                    
-                    logger.debug(f"Processed notification {notification.id} - sent to {sent_count} connections")
+                    # Every worker, this one included, fans out from the bus
+                    await self.event_bus.publish_many(NOTIFICATION_CHANNEL, [{
+                        'message': message,
+                        'target_user': item['target_user'],
+                        'broadcast': item['broadcast']
+                    } for item, message in zip(items, messages)])
                     
                 except Exception as queue_error:
                     logger.error(f"Error processing notification from queue: {str(queue_error)}")
@@ -522,14 +731,164 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Notification queue processor error: {str(e)}")
 
-    async def _persist_notification(self, notification: Notification) -> None:
-        """Persist notification to database for audit trail."""
+    async def _deliver_notification(self, event: Dict) -> None:
+        """Fan a notification from the event bus out to this worker's connections."""
+        message = event['message']
+        sent_count = 0
+        if event.get('broadcast'):
+            sent_count = await self.connection_manager.broadcast(message)
+        elif event.get('target_user'):
+            sent_count = await self.connection_manager.send_to_user(event['target_user'], message)
+        
+        self.stats['notifications_sent'] += sent_count
+        logger.debug(f"Delivered notification {message['id']} - sent to {sent_count} connections")
+
+    def _to_message(self, notification: Notification) -> Dict:
+        """Convert a notification to the WebSocket message format."""
+        return {
+            'id': notification.id,
+            'type': notification.type.value,
+            'title': notification.title,
+            'message': notification.message,
+            'severity': notification.severity,
+            'timestamp': notification.timestamp,
+            'data': notification.data,
+            'read': notification.read
+        }
+
+    async def _persist_notifications(self, items: List[Dict], messages: List[Dict]) -> None:
+        """Append a batch to the notification outbox and stamp each message with its seq."""
+        rows = [{
+            'notification_id': message['id'],
+            'type': message['type'],
+            'severity': message['severity'],
+            'title': message['title'],
+            'message': message['message'],
+            'payload': message,
+            'target_user': None if item['broadcast'] else item['target_user'],
+            'created_at': item['timestamp']
+        } for item, message in zip(items, messages)]
         try:
-            # This could be implemented to store notifications in a database table
-            # for audit purposes and to show notification history
-            pass
+            seqs = await asyncio.to_thread(self._run_outbox, append_notifications, rows, commit=True)
+            for message, seq in zip(messages, seqs):
+                message['seq'] = seq
+            self.stats['outbox_appended'] += len(seqs)
         except Exception as e:
-            logger.warning(f"Error persisting notification: {str(e)}")
+            # Still deliver live; these notifications just cannot be replayed
+            self.stats['outbox_errors'] += 1
+            logger.warning(f"Error persisting {len(rows)} notifications to outbox: {str(e)}")
+
+    def _run_outbox(self, operation: Callable, *args, commit: bool = False, **kwargs):
+        """Run an outbox operation in its own session; called from a worker thread."""
+        db = next(self.db_session_factory())
+        try:
+            result = operation(db, *args, **kwargs)
+            if commit:
+                db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def get_notifications_since(self, after_seq: int, user_id: str = None,
+                                      limit: int = None) -> Dict:
+        """
+        Notifications persisted after after_seq that user_id may see, oldest first.
+
+        'truncated' is set when notifications the client has not seen were
+        already compacted away (or the outbox was reset), in which case the
+        client should reload current state instead of relying on the delta.
+        """
+        limit = limit or NOTIFICATION_CONFIG['replay_batch_size']
+        oldest, latest = await asyncio.to_thread(self._run_outbox, seq_bounds)
+        notifications = []
+        horizon = max(after_seq, latest or 0)
+        if latest is not None and after_seq < latest:
+            # Never move the client past a seq another worker has not committed yet;
+            # everything below the oldest row was compacted, not pending
+            horizon = await asyncio.to_thread(
+                self._run_outbox, committed_seq, max(after_seq, oldest - 1),
+                NOTIFICATION_CONFIG['outbox_gap_timeout_seconds']
+            )
+            if horizon > after_seq:
+                notifications = await asyncio.to_thread(
+                    self._run_outbox, read_since, after_seq, user_id, limit, horizon
+                )
+        has_more = len(notifications) == limit and notifications[-1]['seq'] < horizon
+        last_seq = notifications[-1]['seq'] if has_more else horizon
+        return {
+            'notifications': notifications,
+            'last_seq': last_seq,
+            'latest_seq': latest or 0,
+            'has_more': has_more,
+            'truncated': (oldest is not None and after_seq + 1 < oldest) or after_seq > (latest or 0)
+        }
+
+    async def _replay_notifications(self, connection_id: str, user_id: str, last_seq: int) -> int:
+        """Send a resuming client what it missed, in replay_batch messages, then replay_complete."""
+        try:
+            batch_size = NOTIFICATION_CONFIG['replay_batch_size']
+            replay_max = NOTIFICATION_CONFIG['replay_max']
+            matcher = SubscriptionIndex()
+            matcher.add(connection_id, self.connection_manager.connection_filters.get(connection_id))
+            
+            after_seq, read, replayed, truncated = last_seq, 0, 0, False
+            while True:
+                page = await self.get_notifications_since(after_seq, user_id, min(batch_size, replay_max - read))
+                truncated = truncated or page['truncated']
+                after_seq = page['last_seq']
+                read += len(page['notifications'])
+                # Outbox rows are filtered with the connection's own subscription
+                notifications = [n for n in page['notifications'] if matcher.match(n)]
+                if notifications:
+                    await self.connection_manager.send_to_connection(connection_id, {
+                        'type': 'replay_batch',
+                        'notifications': notifications,
+                        'timestamp': datetime.utcnow().isoformat()
+                    })
+                    replayed += len(notifications)
+                if not page['has_more']:
+                    break
+                if read >= replay_max:
+                    truncated = True
+                    break
+            
+            await self.connection_manager.send_to_connection(connection_id, {
+                'type': 'replay_complete',
+                'last_seq': after_seq,
+                'latest_seq': page['latest_seq'],
+                'replayed': replayed,
+                'truncated': truncated,
+                'timestamp': datetime.utcnow().isoformat()
+            })
+            self.stats['notifications_replayed'] += replayed
+            logger.info(f"Replayed {replayed} notifications after seq {last_seq} to {connection_id}")
+            return replayed
+            
+        except Exception as e:
+            logger.error(f"Error replaying notifications to {connection_id}: {str(e)}")
+            return 0
+
+    async def _compact_outbox_periodically(self) -> None:
+        """Apply the outbox retention policy on a fixed interval."""
+        try:
+            while True:
+                await asyncio.sleep(NOTIFICATION_CONFIG['outbox_compact_interval_seconds'])
+                try:
+                    removed = await asyncio.to_thread(
+                        self._run_outbox, compact_outbox,
+                        NOTIFICATION_CONFIG['outbox_retention_days'],
+                        NOTIFICATION_CONFIG['outbox_max_entries']
+                    )
+                    self.stats['outbox_compacted'] += removed
+                    if removed:
+                        logger.info(f"Compacted {removed} notifications from outbox")
+                except Exception as e:
+                    logger.error(f"Error compacting notification outbox: {str(e)}")
+        except asyncio.CancelledError:
+            pass
 
     async def _acknowledge_notification(self, notification_id: str, 
                                      connection_id: str) -> None:
@@ -554,7 +913,21 @@ class NotificationService:
                 'notifications_queued': self.stats['notifications_queued'],
                 'connections_established': self.stats['connections_established'],
                 'connections_closed': self.stats['connections_closed'],
-                'queue_size': self._notification_queue.qsize()
+                'queue_size': self._notification_queue.qsize(),
+                'queue_capacity': self._notification_queue.maxsize,
+                'notifications_spilled': self.stats['notifications_spilled'],
+                'alerts_persisted': self.stats['alerts_persisted'],
+                'batch_notifications': self.stats['batch_notifications'],
+                'outbox': {
+                    'appended': self.stats['outbox_appended'],
+                    'errors': self.stats['outbox_errors'],
+                    'compacted': self.stats['outbox_compacted'],
+                    'replayed': self.stats['notifications_replayed']
+                },
+                'coalescing': self.change_coalescer.get_stats(),
+                'fanout': self.connection_manager.get_fanout_stats(),
+                'send_queues': self.connection_manager.get_send_queue_stats(),
+                'event_bus': self.event_bus.get_stats()
             }
         except Exception as e:
             logger.error(f"Error getting service stats: {str(e)}")
@@ -0,0 +1,177 @@
+# src/services/poll_scheduler.py
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+@dataclass
+class PathSchedule:
+    """Polling state for one monitored path."""
+    path: str
+    interval: float
+    min_interval: float
+    max_interval: float
+    next_due: float
+    checks: int = 0
+    changes: int = 0
+    last_change: Optional[float] = None
+
+class AdaptivePollScheduler:
+    """
+    Heap of monitored paths keyed by next-due time.
+
+    Each path's interval halves when a check finds a change and grows slowly
+    while it stays quiet, within bounds scaled by the path's sensitivity. A
+    token bucket caps the number of checks started per second across all
+    paths, so a burst of due paths is spread out instead of read at once.
+    """
+
+    GROWTH = 1.5
+    SHRINK = 0.5
+
+    def __init__(self, base_interval: float, min_interval: float, max_interval: float,
+                 checks_per_second: float, clock=time.monotonic):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.checks_per_second = checks_per_second
+        self._clock = clock
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self.paths: Dict[str, PathSchedule] = {}
+        self._tokens = float(checks_per_second)
+        self._refilled = clock()
+        self.checks_deferred = 0
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def add(self, path: str, interval_factor: float = 1.0, due_now: bool = True) -> None:
+        """Schedule a path; interval_factor < 1 polls it more often (sensitive paths)."""
+        now = self._clock()
+        min_interval = max(1.0, self.min_interval * min(interval_factor, 1.0))
+        max_interval = max(min_interval, self.max_interval * interval_factor)
+        interval = min(max(self.base_interval * interval_factor, min_interval), max_interval)
+
+        existing = self.paths.get(path)
+        schedule = PathSchedule(
+            path=path,
+            interval=interval,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            next_due=now if due_now else now + interval
+        )
+        if existing:
+            schedule.interval = min(max(existing.interval, min_interval), max_interval)
+            schedule.next_due = min(existing.next_due, now + schedule.interval)
+            schedule.checks, schedule.changes = existing.checks, existing.changes
+            schedule.last_change = existing.last_change
+        self.paths[path] = schedule
+        self._push(schedule)
+
+    def remove(self, path: str) -> None:
+        # Heap entries for removed paths are skipped lazily
+        self.paths.pop(path, None)
+
+    def set_base_interval(self, base_interval: float) -> None:
+        """Change the starting interval; applies to paths scheduled afterwards."""
+        self.base_interval = base_interval
+
+    def expedite_all(self) -> None:
+        """Make every path due now, e.g. after the event source lost events."""
+        now = self._clock()
+        for schedule in self.paths.values():
+            if schedule.next_due == float('inf'):
+                continue  # Check already in progress
+            schedule.next_due = now
+            self._push(schedule)
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Seconds until the next path is due, or None when nothing is scheduled."""
+        self._drop_stale()
+        if not self._heap:
+            return None
+        now = self._clock()
+        self._refill(now)
+        wait = self._heap[0][0] - now
+        if wait <= 0 and self._tokens < 1:
+            wait = (1 - self._tokens) / self.checks_per_second
+        return max(0.0, wait)
+
+    def pop_due(self) -> List[str]:
+        """Pop the paths that are due now, as many as the check budget allows."""
+        now = self._clock()
+        self._refill(now)
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            next_due, _, path = self._heap[0]
+            schedule = self.paths.get(path)
+            if schedule is None or schedule.next_due != next_due:
+                heapq.heappop(self._heap)
+                continue
+            if self._tokens < 1:
+                self.checks_deferred += 1
+                break
+            heapq.heappop(self._heap)
+            self._tokens -= 1
+            # Not rescheduled until record() reports the outcome
+            schedule.next_due = float('inf')
+            due.append(path)
+        return due
+
+    def record(self, path: str, changed: bool) -> None:
+        """Adapt a path's interval to the outcome of a check and schedule the next one."""
+        schedule = self.paths.get(path)
+        if schedule is None:
+            return
+        now = self._clock()
+        schedule.checks += 1
+        if changed:
+            schedule.changes += 1
+            schedule.last_change = now
+            schedule.interval = max(schedule.min_interval, schedule.interval * self.SHRINK)
+        else:
+            schedule.interval = min(schedule.max_interval, schedule.interval * self.GROWTH)
+        schedule.next_due = now + schedule.interval
+        self._push(schedule)
+
+    def note_change(self, path: str) -> None:
+        """Shorten a path's interval after a change was found outside its scheduled check."""
+        schedule = self.paths.get(path)
+        if schedule is None:
+            return
+        schedule.changes += 1
+        schedule.last_change = self._clock()
+        schedule.interval = max(schedule.min_interval, schedule.interval * self.SHRINK)
+        if schedule.next_due != float('inf'):
+            schedule.next_due = min(schedule.next_due, schedule.last_change + schedule.interval)
+            self._push(schedule)
+
+    def get_stats(self) -> Dict:
+        intervals = [schedule.interval for schedule in self.paths.values()]
+        return {
+            "scheduled_paths": len(self.paths),
+            "checks_per_second": self.checks_per_second,
+            "checks_deferred": self.checks_deferred,
+            "min_interval_seconds": round(min(intervals), 1) if intervals else None,
+            "max_interval_seconds": round(max(intervals), 1) if intervals else None,
+            "next_due_seconds": self.seconds_until_due()
+        }
+
+    def _push(self, schedule: PathSchedule) -> None:
+        heapq.heappush(self._heap, (schedule.next_due, next(self._counter), schedule.path))
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            next_due, _, path = self._heap[0]
+            schedule = self.paths.get(path)
+            if schedule is not None and schedule.next_due == next_due:
+                return
+            heapq.heappop(self._heap)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled
+        self._refilled = now
+        self._tokens = min(float(self.checks_per_second), self._tokens + elapsed * self.checks_per_second)
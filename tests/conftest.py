@@ -0,0 +1,98 @@
+# tests/conftest.py
+import hashlib
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The tests run against a throwaway SQLite database, never the configured SQL Server
+os.environ['USE_SQLITE'] = 'true'
+os.environ.setdefault('SQLITE_PATH', os.path.join(tempfile.mkdtemp(prefix='shareguard-tests-'), 'test.db'))
+os.environ.setdefault('SID_CACHE_PATH', os.path.join(tempfile.mkdtemp(prefix='shareguard-sid-'), 'sid_cache.db'))
+
+
+class FakeAclSource:
+    """
+    Stand-in for PermissionScanner on a real directory tree.
+
+    read() returns a get_folder_permissions-shaped result and fingerprint()
+    a descriptor fingerprint; both follow the ACEs set per path, so a test
+    can change a folder's ACL between scans. Reads are counted per path.
+    """
+
+    def __init__(self):
+        self.aces = {}
+        self.reads = {}
+
+    def set_aces(self, path, aces):
+        self.aces[str(path)] = aces
+
+    def aces_for(self, path):
+        return self.aces.get(str(path), [{
+            "trustee": {"name": "Domain Users", "domain": "CORP", "sid": "S-1-5-21-1-513",
+                        "type": "group", "is_system": False},
+            "type": "Allow",
+            "inherited": True,
+            "access_mask": 0x1200a9,
+            "permissions": {"Basic": ["Read"]}
+        }])
+
+    def read(self, path):
+        path = str(path)
+        self.reads[path] = self.reads.get(path, 0) + 1
+        aces = self.aces_for(path)
+        return {
+            "path": path,
+            "success": True,
+            "inheritance_enabled": True,
+            "aces": aces,
+            "descriptor_fingerprint": self.fingerprint(path),
+            "metadata": {
+                "total_aces": len(aces),
+                "system_aces": sum(1 for ace in aces if ace["trustee"].get("is_system")),
+                "non_system_aces": sum(1 for ace in aces if not ace["trustee"].get("is_system"))
+            }
+        }
+
+    def fingerprint(self, path):
+        aces = self.aces_for(path)
+        key = repr([(ace["type"], ace["inherited"], ace["access_mask"], ace["trustee"]["sid"]) for ace in aces])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+
+@pytest.fixture
+def acl_source():
+    return FakeAclSource()
+
+
+@pytest.fixture
+def make_tree(tmp_path):
+    """Create folders (relative paths, nested with '/') below a temp root and return the root path."""
+    root = tmp_path / "share"
+
+    def make(*folders):
+        root.mkdir(exist_ok=True)
+        for folder in folders:
+            (root / folder).mkdir(parents=True, exist_ok=True)
+        return str(root)
+
+    return make
+
+
+@pytest.fixture
+def db_session():
+    """A session on a freshly created schema; every table is dropped afterwards."""
+    from src.db.database import SessionLocal, engine
+    from src.db.models import Base
+    from src.db.models import auth, health  # noqa: F401 - register their tables
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,56 @@
+# tests/test_core/test_ace_table.py
+import copy
+
+import numpy as np
+
+from src.core.ace_table import TYPE_ALLOW, TYPE_DENY, AceTable
+from src.core.health_analyzer import HealthAnalyzer
+
+USERS = {"sid": "S-1-5-21-1-513", "name": "Domain Users", "domain": "CORP", "type": "group"}
+ALICE = {"sid": "S-1-5-21-1-1104", "name": "alice", "domain": "CORP", "type": "user"}
+
+
+def _ace(trustee, ace_type="allow", inherited=True, mask=0x1200a9):
+    return {"trustee": trustee, "type": ace_type, "inherited": inherited, "access_mask": mask}
+
+
+def _folders(shared):
+    aces = [_ace(USERS), _ace(ALICE, "deny", inherited=False, mask=0x10000)]
+    folders = []
+    for i in range(3):
+        folder_aces = aces if shared else copy.deepcopy(aces)
+        folders.append(("C:\\share\\f%d" % i, {"permissions": {"aces": folder_aces, "inheritance_enabled": True}}))
+    folders.insert(1, ("C:\\share\\empty", {"permissions": {"aces": [], "inheritance_enabled": False}}))
+    return folders
+
+
+def test_columns_follow_dacl_order_per_folder():
+    table = AceTable.from_folders(HealthAnalyzer(), _folders(shared=False))
+
+    assert table.paths[1] == "C:\\share\\empty"
+    assert table.ace_count.tolist() == [2, 0, 2, 2]
+    assert table.path_id.tolist() == [0, 0, 2, 2, 3, 3]
+    assert table.order.tolist() == [0, 1] * 3
+    assert table.type.tolist() == [TYPE_ALLOW, TYPE_DENY] * 3
+    assert table.mask.tolist() == [0x1200a9, 0x10000] * 3
+    assert table.inherited.tolist() == [True, False] * 3
+    # Each trustee and SID is interned once however many folders reference it
+    assert table.trustee_id.tolist() == table.sid_id.tolist() == [0, 1] * 3
+    assert [trustee["name"] for trustee in table.trustees] == ["Domain Users", "alice"]
+
+
+def test_shared_ace_lists_build_the_same_table():
+    copied = AceTable.from_folders(HealthAnalyzer(), _folders(shared=False))
+    shared = AceTable.from_folders(HealthAnalyzer(), _folders(shared=True))
+
+    for column in ("path_id", "sid_id", "trustee_id", "type", "mask", "inherited", "order"):
+        assert np.array_equal(getattr(copied, column), getattr(shared, column)), column
+    assert shared.aces == copied.aces
+
+
+def test_folders_without_aces_build_an_empty_table():
+    table = AceTable.from_folders(HealthAnalyzer(), [("C:\\share", {"permissions": {"aces": []}})])
+
+    assert len(table) == 0
+    assert table.has_aces.tolist() == [False]
+    assert table.deny_after_allow_counts().tolist() == [0]
@@ -0,0 +1,66 @@
+# tests/test_core/test_effective_access.py
+from src.core.effective_access import CompiledAcl, EffectiveAccessEngine
+from src.scanner.membership_index import MembershipIndex, Principal, StaticDirectoryBackend
+
+READ, WRITE = 0x1, 0x2
+
+
+def _ace(sid, mask, deny=False, inherited=False, name=None):
+    return {"trustee": {"sid": sid, "name": name or sid, "domain": "CORP", "full_name": "CORP\\" + (name or sid)},
+            "type": "Deny" if deny else "Allow", "inherited": inherited, "access_mask": mask,
+            "permissions": {}}
+
+
+def _permissions(*aces):
+    return {"success": True, "aces": list(aces)}
+
+
+def test_first_ace_decides_each_right_in_dacl_order():
+    acl = CompiledAcl([_ace("S-eng", WRITE, deny=True), _ace("S-eng", READ | WRITE), _ace("S-ops", WRITE)])
+
+    assert acl.evaluate({"S-eng"})[0] == READ
+    assert acl.evaluate({"S-eng", "S-ops"})[0] == READ
+    assert acl.evaluate({"S-ops"})[0] == WRITE
+    assert acl.evaluate({"S-hr"}) is None
+
+
+def test_inherit_only_aces_are_skipped():
+    ace = _ace("S-eng", READ)
+    ace["ace_flags"] = 0x08
+
+    assert CompiledAcl([ace]).evaluate({"S-eng"}) is None
+
+
+def test_folders_sharing_an_acl_are_evaluated_once():
+    shared = _permissions(_ace("S-eng", READ))
+    engine = EffectiveAccessEngine([("C:\\a", shared), ("C:\\a\\b", shared),
+                                    ("C:\\c", _permissions(_ace("S-ops", READ))),
+                                    ("C:\\d", {"success": False})])
+
+    assert len(engine) == 3 and engine.unique_acls == 2 and engine.failed_folders == 1
+    assert [entry["path"] for entry in engine.evaluate({"S-eng"})] == ["C:\\a", "C:\\a\\b"]
+
+
+def test_who_can_access_expands_groups_through_the_membership_index():
+    index = MembershipIndex.build(StaticDirectoryBackend(
+        [Principal("S-alice", "alice", "CORP"), Principal("S-bob", "bob", "CORP"),
+         Principal("S-eng", "eng", "CORP", "Group"), Principal("S-staff", "staff", "CORP", "Group")],
+        [("S-alice", "S-eng"), ("S-eng", "S-staff"), ("S-bob", "S-staff")]
+    ))
+    engine = EffectiveAccessEngine([
+        ("C:\\share", _permissions(_ace("S-staff", READ, name="staff"))),
+        ("C:\\share\\eng", _permissions(_ace("S-bob", READ, deny=True, name="bob"),
+                                        _ace("S-staff", READ, name="staff"),
+                                        _ace("S-eng", WRITE, name="eng")))
+    ])
+
+    flat = engine.who_can_access("C:\\share\\eng")
+    expanded = engine.who_can_access("C:\\share\\eng", membership_index=index)
+    recursive = engine.who_can_access("C:\\share", membership_index=index, recursive=True)
+
+    assert {entry["sid"] for entry in flat["principals"]} == {"S-staff", "S-eng"}
+    by_sid = {entry["sid"]: entry for entry in expanded["principals"]}
+    assert by_sid["S-alice"]["effective_permissions"] == {"access_mask": [hex(READ | WRITE)]}
+    assert "S-bob" not in by_sid
+    assert recursive["folders_evaluated"] == 2
+    assert {entry["sid"] for entry in recursive["principals"]} >= {"S-alice", "S-bob"}
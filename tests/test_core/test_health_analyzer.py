@@ -0,0 +1,95 @@
+# tests/test_core/test_health_analyzer.py
+import os
+from datetime import datetime
+
+from src.core.health_analyzer import HealthAnalyzer
+from src.core.parallel_scanner import ParallelTreeScanner
+from src.db.models import ScanResult
+
+TREE = ("a", "a/a1", "a/a2", "b", "b/b1")
+
+
+def _store(db, path, result):
+    db.add(ScanResult(path=path, scan_time=datetime.utcnow(), success=True, permissions=result))
+    db.commit()
+
+
+def test_stored_tree_yields_every_scanned_folder_once(db_session, make_tree, acl_source):
+    root = make_tree(*TREE)
+    _store(db_session, root, ParallelTreeScanner(acl_source.read, max_workers=2).scan_tree(root, max_depth=5))
+
+    folders = list(HealthAnalyzer().iter_folder_results(db_session, root))
+
+    paths = [path for path, _ in folders]
+    assert sorted(paths) == sorted([root] + [os.path.join(root, *folder.split("/")) for folder in TREE])
+    assert all(result["permissions"]["aces"] for _, result in folders)
+
+
+def test_failed_subfolders_are_not_yielded(db_session, make_tree, acl_source):
+    root = make_tree(*TREE)
+    broken = os.path.join(root, "a")
+
+    def reader(path):
+        if path == broken:
+            raise OSError("access denied")
+        return acl_source.read(path)
+
+    _store(db_session, root, ParallelTreeScanner(reader, max_workers=2).scan_tree(root, max_depth=5))
+
+    paths = [path for path, _ in HealthAnalyzer().iter_folder_results(db_session, root)]
+
+    assert sorted(paths) == sorted([root, os.path.join(root, "b"), os.path.join(root, "b", "b1")])
+
+
+def test_full_scan_resolves_issues_only_of_analyzed_folders(db_session, make_tree, acl_source):
+    from src.core.health_analyzer import HealthAnalysisConfig
+    from src.db.health_issues import reconcile_issues
+    from src.db.models.health import HealthScan, Issue, IssueSeverity, IssueStatus, IssueType
+
+    root = make_tree(*TREE, "a/a1/deep")
+    # The stored scan stops above a/a1/deep
+    _store(db_session, root, ParallelTreeScanner(acl_source.read, max_workers=2).scan_tree(root, max_depth=2))
+    old = HealthScan(start_time=datetime.utcnow(), status="completed")
+    db_session.add(old)
+    db_session.commit()
+    stale = [os.path.join(root, "a"), os.path.join(root, "a", "a1", "deep")]
+    reconcile_issues(db_session, old.id, [
+        {"issue_type": IssueType.DIRECT_USER_ACE, "severity": IssueSeverity.MEDIUM, "path": path,
+         "title": "t", "description": "d"} for path in stale
+    ], stale)
+    db_session.commit()
+
+    HealthAnalyzer(HealthAnalysisConfig(workers=1)).run_health_scan([root])
+
+    db_session.expire_all()
+    active = [issue.path for issue in db_session.query(Issue).filter(Issue.status == IssueStatus.ACTIVE)]
+    assert active == [os.path.join(root, "a", "a1", "deep")]
+
+
+def test_incremental_scan_ignores_changes_outside_the_scanned_targets(db_session, make_tree, acl_source):
+    from src.core.health_analyzer import HealthAnalysisConfig
+    from src.db.models import PermissionChange
+    from src.db.models.health import HealthScan, Issue, IssueStatus
+
+    root = make_tree(*TREE)
+    _store(db_session, root, ParallelTreeScanner(acl_source.read, max_workers=2).scan_tree(root, max_depth=5))
+    analyzer = HealthAnalyzer(HealthAnalysisConfig(workers=1))
+    analyzer.run_health_scan([root])
+
+    direct_user = [{"trustee": {"sid": "S-1-5-21-1-1104", "name": "alice", "domain": "CORP", "type": "user"},
+                    "type": "allow", "inherited": False, "access_mask": 0x1f01ff}]
+    inside, outside = os.path.join(root, "b"), os.path.join(os.path.dirname(root), "elsewhere")
+    for path in (inside, outside):
+        db_session.add(PermissionChange(change_type="modified", current_state={
+            "path": path, "aces": direct_user, "inheritance_enabled": True}))
+    db_session.commit()
+
+    scan_id = analyzer.run_incremental_health_scan()
+
+    db_session.expire_all()
+    active = [issue.path for issue in db_session.query(Issue).filter(Issue.status == IssueStatus.ACTIVE)]
+    assert active == [inside]
+    scan = db_session.get(HealthScan, scan_id)
+    assert scan.processed_paths == 1
+    assert scan.scan_parameters["target_paths"] == [root]
+    assert scan.scan_parameters["totals"]["issues"] == {"direct_user_ace:" + db_session.query(Issue).one().severity.value: 1}
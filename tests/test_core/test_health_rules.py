@@ -0,0 +1,165 @@
+# tests/test_core/test_health_rules.py
+import pytest
+
+from src.core import health_rules
+from src.core.health_analyzer import HealthAnalysisConfig, HealthAnalyzer
+from src.core.health_rules import HealthRule, RuleEngine, RuleStats, get_rules, register_rule
+from src.db.models.health import IssueSeverity, IssueType
+
+STAFF = {"sid": "S-1-5-21-1-2001", "name": "grp_staff", "domain": "CORP", "type": "group"}
+ALICE = {"sid": "S-1-5-21-1-1104", "name": "alice.smith", "domain": "CORP", "type": "user"}
+ORPHAN = {"sid": "S-1-5-21-9-77", "name": "S-1-5-21-9-77", "domain": "", "type": "unknown"}
+EVERYONE = {"sid": "S-1-1-0", "name": "Everyone", "domain": "", "type": "group"}
+
+
+def _ace(trustee, ace_type="allow", inherited=False):
+    return {"trustee": trustee, "type": ace_type, "inherited": inherited, "access_mask": 0x1200a9}
+
+
+def _folder(path, aces, inheritance_enabled=True):
+    return path, {"permissions": {"aces": aces, "inheritance_enabled": inheritance_enabled}}
+
+
+FOLDERS = [
+    _folder("C:\\share\\clean", [_ace(STAFF, inherited=True)]),
+    _folder("C:\\share\\broken", [_ace(STAFF)], inheritance_enabled=False),
+    _folder("C:\\share\\user", [_ace(STAFF), _ace(ALICE)]),
+    _folder("C:\\share\\orphan", [_ace(ORPHAN)]),
+    # Reported only from 15 ACEs on, whatever the threshold
+    _folder("C:\\share\\crowded", [_ace(STAFF)] * 16),
+    _folder("C:\\share\\crowded_but_quiet", [_ace(STAFF)] * 14),
+    _folder("C:\\share\\deny", [_ace(STAFF), _ace(STAFF, "deny")]),
+    _folder("C:\\share\\everyone", [_ace(EVERYONE)]),
+    _folder("C:\\share\\empty", [], inheritance_enabled=False),
+]
+
+EXPECTED = {
+    ("C:\\share\\broken", IssueType.BROKEN_INHERITANCE),
+    ("C:\\share\\user", IssueType.DIRECT_USER_ACE),
+    ("C:\\share\\orphan", IssueType.ORPHANED_SID),
+    ("C:\\share\\crowded", IssueType.EXCESSIVE_ACE_COUNT),
+    ("C:\\share\\deny", IssueType.CONFLICTING_DENY_ORDER),
+    ("C:\\share\\everyone", IssueType.OVER_PERMISSIVE_GROUPS),
+}
+
+
+@pytest.fixture
+def analyzer():
+    return HealthAnalyzer(HealthAnalysisConfig(workers=1, max_ace_count_threshold=3))
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """The rule registry, restored after the test."""
+    monkeypatch.setattr(health_rules, "_registry", list(health_rules._registry))
+    return health_rules._registry
+
+
+def _keys(issues):
+    return {(issue["path"], issue["issue_type"]) for issue in issues}
+
+
+def test_each_builtin_rule_flags_its_folder(analyzer):
+    engine = analyzer.rule_engine
+    issues = [issue for path, result in FOLDERS for issue in engine.analyze_folder(path, result, 7)]
+
+    assert _keys(issues) == EXPECTED
+    assert all(issue["health_scan_id"] == 7 for issue in issues)
+    # Folders without ACEs are not checked at all, not even for inheritance
+    assert not any(issue["path"] == "C:\\share\\empty" for issue in issues)
+
+
+def test_table_evaluation_matches_the_per_folder_checks(analyzer):
+    per_folder = [issue for path, result in FOLDERS for issue in analyzer.rule_engine.analyze_folder(path, result, 7)]
+    vectorized = HealthAnalyzer(analyzer.config).rule_engine.analyze_table(FOLDERS, 7)
+
+    assert _keys(vectorized) == EXPECTED
+    by_key = {(issue["path"], issue["issue_type"]): issue for issue in per_folder}
+    for issue in vectorized:
+        expected = by_key[(issue["path"], issue["issue_type"])]
+        assert issue["severity"] == expected["severity"]
+        assert issue["risk_score"] == expected["risk_score"]
+        assert issue.get("affected_principals") == expected.get("affected_principals")
+
+
+def test_cached_findings_skip_folders_with_the_same_inputs(analyzer):
+    stats = RuleStats()
+    engine = analyzer.rule_engine
+    same_acl = [_ace(STAFF), _ace(ALICE)]
+    for path in ("C:\\share\\a", "C:\\share\\b", "C:\\share\\c"):
+        issues = engine.analyze_folder(path, {"permissions": {"aces": same_acl}}, 1, stats)
+        assert _keys(issues) == {(path, IssueType.DIRECT_USER_ACE)}
+
+    rules = stats.as_dict()["rules"]
+    assert rules["direct_user_ace"]["invocations"] == 3
+    assert rules["direct_user_ace"]["skipped"] == 2
+    assert rules["direct_user_ace"]["issues"] == 3
+    # Rules that are cheaper than their cache key are never cached
+    assert rules["broken_inheritance"]["skipped"] == 0
+
+
+def test_cache_can_be_disabled():
+    analyzer = HealthAnalyzer(HealthAnalysisConfig(workers=1, rule_cache_size=0))
+    stats = RuleStats()
+    for path in ("C:\\share\\a", "C:\\share\\b"):
+        analyzer.rule_engine.analyze_folder(path, {"permissions": {"aces": [_ace(ALICE)]}}, 1, stats)
+
+    assert stats.as_dict()["rules"]["direct_user_ace"]["skipped"] == 0
+
+
+class LongPathRule(HealthRule):
+    """A plugin-style rule without an array form."""
+    name = "long_acl"
+    issue_type = IssueType.OVER_PERMISSIVE_GROUPS
+    fields = ("trustee.sid",)
+
+    def match(self, analyzer, folder):
+        return len({ace["trustee"]["sid"] for ace in folder.aces}) if len(folder.aces) > 1 else None
+
+    def build(self, analyzer, folder, finding):
+        return {"issue_type": self.issue_type, "severity": IssueSeverity.LOW, "path": folder.path,
+                "title": "Long ACL", "description": f"{finding} trustees", "risk_score": 3.0}
+
+
+def test_registered_rules_run_in_both_modes(analyzer, registry):
+    register_rule(LongPathRule())
+    assert get_rules()[-1].name == "long_acl"
+
+    engine = RuleEngine(analyzer)
+    folders = [_folder("C:\\share\\a", [_ace(STAFF), _ace(EVERYONE)]), _folder("C:\\share\\b", [_ace(STAFF)])]
+    per_folder = [issue for path, result in folders for issue in engine.analyze_folder(path, result, 1)]
+    stats = RuleStats()
+    vectorized = RuleEngine(analyzer).analyze_table(folders, 1, stats)
+
+    long_acl = [issue["description"] for issue in vectorized if issue["title"] == "Long ACL"]
+    assert long_acl == ["2 trustees"]
+    assert _keys(per_folder) == _keys(vectorized)
+    assert stats.as_dict()["rules"]["long_acl"]["invocations"] == 2
+
+
+def test_registering_a_rule_with_a_taken_name_replaces_it(registry):
+    count = len(get_rules())
+
+    class Replacement(LongPathRule):
+        name = IssueType.ORPHANED_SID.value
+
+    register_rule(Replacement())
+
+    names = [rule.name for rule in get_rules()]
+    assert len(names) == count
+    assert isinstance(get_rules()[names.index("orphaned_sid")], Replacement)
+
+
+def test_rule_stats_merge_worker_results():
+    worker = RuleStats()
+    worker.record("orphaned_sid", 0.5, invocations=10, skipped=4, issues=2)
+    worker.table_seconds = 0.25
+    total = RuleStats()
+    total.record("orphaned_sid", 0.5, invocations=1)
+
+    total.merge(worker.as_dict())
+
+    assert total.as_dict() == {
+        "rules": {"orphaned_sid": {"invocations": 11, "skipped": 4, "issues": 2, "seconds": 1.0}},
+        "table_seconds": 0.25
+    }
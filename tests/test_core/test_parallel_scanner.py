@@ -0,0 +1,164 @@
+# tests/test_core/test_parallel_scanner.py
+import os
+import threading
+
+from src.core.parallel_scanner import ParallelTreeScanner
+
+TREE = ("a", "a/a1", "a/a2", "a/a2/deep", "b", "b/b1", "c")
+
+
+def _paths(node):
+    yield node["folder_info"]["path"]
+    for child in node.get("subfolders", []):
+        yield from _paths(child)
+
+
+def test_walk_visits_every_folder_once_with_its_parent(make_tree, acl_source):
+    root = make_tree(*TREE)
+    scanner = ParallelTreeScanner(acl_source.read, max_workers=4)
+
+    records = list(scanner.walk(root, max_depth=5))
+
+    assert sorted(record.path for record in records) == sorted(
+        [root] + [os.path.join(root, *folder.split("/")) for folder in TREE]
+    )
+    by_path = {record.path: record for record in records}
+    for record in records:
+        if record.path == root:
+            assert record.parent is None and record.depth == 0
+        else:
+            assert record.parent == os.path.dirname(record.path)
+            assert record.depth == by_path[record.parent].depth + 1
+    assert all(count == 1 for count in acl_source.reads.values())
+
+
+def test_walk_respects_max_depth_and_exclusions(make_tree, acl_source):
+    root = make_tree(*TREE)
+    excluded = os.path.join(root, "b")
+    scanner = ParallelTreeScanner(acl_source.read, max_workers=3,
+                                  should_exclude=lambda path: path.startswith(excluded))
+
+    paths = {record.path for record in scanner.walk(root, max_depth=1)}
+
+    assert paths == {root, os.path.join(root, "a"), os.path.join(root, "c")}
+
+
+def test_walk_without_max_depth_visits_the_whole_tree(make_tree, acl_source):
+    root = make_tree("a/b/c/d/e/f/g")
+
+    records = list(ParallelTreeScanner(acl_source.read, max_workers=2).walk(root, max_depth=None))
+
+    assert max(record.depth for record in records) == 7
+    assert len(records) == 8
+
+
+def test_scan_tree_builds_nested_result_with_rolled_up_statistics(make_tree, acl_source):
+    root = make_tree(*TREE)
+    scanner = ParallelTreeScanner(acl_source.read, max_workers=4)
+
+    tree = scanner.scan_tree(root, max_depth=5)
+
+    assert tree["success"]
+    assert tree["folder_info"]["path"] == root
+    assert sorted(_paths(tree)) == sorted(
+        [root] + [os.path.join(root, *folder.split("/")) for folder in TREE]
+    )
+    assert tree["statistics"]["total_folders"] == len(TREE) + 1
+    assert tree["statistics"]["processed_folders"] == len(TREE) + 1
+    assert tree["statistics"]["non_system_accounts"] == len(TREE) + 1
+    a = next(child for child in tree["subfolders"] if child["folder_info"]["name"] == "a")
+    assert a["statistics"]["total_folders"] == 4
+
+
+def test_reader_errors_are_reported_per_folder(make_tree, acl_source):
+    root = make_tree(*TREE)
+    broken = os.path.join(root, "a")
+
+    def reader(path):
+        if path == broken:
+            raise OSError("access denied")
+        return acl_source.read(path)
+
+    tree = ParallelTreeScanner(reader, max_workers=2).scan_tree(root, max_depth=5)
+
+    failed = next(child for child in tree["subfolders"] if child.get("path") == broken)
+    assert failed["success"] is False
+    assert failed["error"] == "access denied"
+    assert tree["statistics"]["error_count"] == 1
+    # Nothing below a failed folder is visited
+    assert not any(path.startswith(broken + os.sep) for path in acl_source.reads)
+
+
+def test_consumer_stopping_early_releases_the_workers(make_tree, acl_source):
+    root = make_tree(*("f%d" % i for i in range(50)))
+    scanner = ParallelTreeScanner(acl_source.read, max_workers=4, queue_size=2)
+    before = threading.active_count()
+
+    walk = scanner.walk(root, max_depth=1)
+    next(walk)
+    walk.close()
+
+    assert threading.active_count() == before
+
+
+def test_batch_reader_reads_several_folders_per_call(make_tree, acl_source):
+    root = make_tree(*("d%d/s%d" % (i, j) for i in range(6) for j in range(4)))
+    calls = []
+
+    def batch_reader(paths):
+        calls.append(list(paths))
+        return {path: acl_source.read(path) for path in paths}
+
+    scanner = ParallelTreeScanner(acl_source.read, max_workers=2, batch_reader=batch_reader, read_batch_size=8)
+    records = list(scanner.walk(root, max_depth=5))
+
+    assert len(records) == 31
+    assert all(count == 1 for count in acl_source.reads.values())
+    assert len(acl_source.reads) == 31
+    assert any(len(paths) > 1 for paths in calls)
+    assert max(len(paths) for paths in calls) <= 8
+    assert all(record.permissions["path"] == record.path for record in records)
+
+
+def test_failed_batch_read_fails_only_its_folders(make_tree, acl_source):
+    root = make_tree(*("d%d" % i for i in range(4)))
+
+    def batch_reader(paths):
+        raise OSError("LSA unavailable")
+
+    scanner = ParallelTreeScanner(acl_source.read, max_workers=1, batch_reader=batch_reader, read_batch_size=8)
+    records = {record.path: record for record in scanner.walk(root, max_depth=1)}
+
+    # The root is read on its own; its four children share one failed batch
+    assert records[root].success
+    assert [record.error for path, record in records.items() if path != root] == ["LSA unavailable"] * 4
+
+
+def test_failed_worker_leaves_a_partial_tree_with_errors(make_tree, acl_source, monkeypatch):
+    root = make_tree("a", "b", "c")
+    scanner = ParallelTreeScanner(acl_source.read, max_workers=1)
+    visit = scanner._visit_batch
+
+    def visit_root_only(items, *args):
+        if any(path != root for path, *_ in items):
+            raise RuntimeError("worker crashed")
+        return visit(items, *args)
+
+    monkeypatch.setattr(scanner, "_visit_batch", visit_root_only)
+    tree = scanner.scan_tree(root, max_depth=5)
+
+    assert tree["success"] and tree["subfolders"] == []
+    assert tree["statistics"]["error_count"] == 3
+
+
+def test_missing_root_is_reported_as_a_failed_scan(make_tree, acl_source, monkeypatch):
+    root = make_tree("a")
+    scanner = ParallelTreeScanner(acl_source.read, max_workers=1)
+
+    def crash(items, *args):
+        raise RuntimeError("worker crashed")
+
+    monkeypatch.setattr(scanner, "_visit_batch", crash)
+    tree = scanner.scan_tree(root, max_depth=5)
+
+    assert tree["success"] is False and tree["path"] == root
@@ -0,0 +1,124 @@
+# tests/test_core/test_scan_baseline.py
+import os
+import shutil
+
+from src.core.parallel_scanner import STATUS_REANALYZED, STATUS_UNCHANGED, ParallelTreeScanner
+from src.core.scan_baseline import ScanBaseline, load_scan_baseline
+from src.db.models import ScanJob, ScanTarget
+from src.db.scan_writer import ScanResultWriter
+
+TREE = ("a", "a/a1", "a/a1/a2", "b", "b/b1")
+
+
+def _scanner(acl_source):
+    return ParallelTreeScanner(acl_source.read, max_workers=3, fingerprint_reader=acl_source.fingerprint)
+
+
+def _scan(acl_source, root, max_depth=5, baseline=None):
+    return {record.path: record for record in _scanner(acl_source).walk(root, max_depth, baseline=baseline)}
+
+
+def _baseline(records):
+    return ScanBaseline.from_scan_records(record.to_scan_record() for record in records.values())
+
+
+def test_unchanged_folders_reuse_the_baseline_without_reading_acls(make_tree, acl_source):
+    root = make_tree(*TREE)
+    baseline = _baseline(_scan(acl_source, root))
+    acl_source.reads.clear()
+
+    records = _scan(acl_source, root, baseline=baseline)
+
+    assert len(records) == len(TREE) + 1
+    assert {record.status for record in records.values()} == {STATUS_UNCHANGED}
+    assert acl_source.reads == {}
+    assert records[root].permissions == baseline.get(root).permissions
+
+
+def test_changed_acls_are_read_again(make_tree, acl_source):
+    root = make_tree(*TREE)
+    baseline = _baseline(_scan(acl_source, root))
+    changed = os.path.join(root, "a", "a1")
+    acl_source.set_aces(changed, [{"trustee": {"name": "bob", "domain": "CORP", "sid": "S-1-5-21-1-1002",
+                                               "type": "user", "is_system": False},
+                                   "type": "Allow", "inherited": False, "access_mask": 0x1f01ff}])
+    acl_source.reads.clear()
+
+    records = _scan(acl_source, root, baseline=baseline)
+
+    assert acl_source.reads == {changed: 1}
+    assert records[changed].status == STATUS_REANALYZED
+    assert records[changed].permissions["aces"][0]["trustee"]["name"] == "bob"
+
+
+def test_folders_created_below_unchanged_folders_are_discovered(make_tree, acl_source):
+    root = make_tree(*TREE)
+    baseline = _baseline(_scan(acl_source, root))
+    make_tree("a/a1/a2/new", "b/b2")
+
+    records = _scan(acl_source, root, baseline=baseline)
+
+    for path in (os.path.join(root, "a", "a1", "a2", "new"), os.path.join(root, "b", "b2")):
+        assert records[path].status == STATUS_REANALYZED
+    assert len(records) == len(TREE) + 3
+
+
+def test_deleted_folders_are_dropped(make_tree, acl_source):
+    root = make_tree(*TREE)
+    baseline = _baseline(_scan(acl_source, root))
+    shutil.rmtree(os.path.join(root, "a", "a1"))
+
+    records = _scan(acl_source, root, baseline=baseline)
+
+    assert sorted(records) == sorted([root, os.path.join(root, "a"), os.path.join(root, "b"),
+                                      os.path.join(root, "b", "b1")])
+
+
+def test_a_shallower_baseline_does_not_limit_the_scan(make_tree, acl_source):
+    root = make_tree(*TREE)
+    baseline = _baseline(_scan(acl_source, root, max_depth=0))
+
+    records = _scan(acl_source, root, max_depth=5, baseline=baseline)
+
+    assert len(records) == len(TREE) + 1
+    assert records[root].status == STATUS_UNCHANGED
+    assert all(record.status == STATUS_REANALYZED for path, record in records.items() if path != root)
+
+
+def _job(db, target, **parameters):
+    job = ScanJob(target_id=target.id, scan_type='path', status='running', parameters=parameters)
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_baseline_job_must_match_depth_and_options(db_session, make_tree, acl_source):
+    root = make_tree(*TREE)
+    target = ScanTarget(name='share', path=root, scan_frequency='once')
+    db_session.add(target)
+    db_session.commit()
+    options = dict(include_subfolders=True, simplified_system=True, include_inherited=True, stream_results=True)
+
+    shallow = _job(db_session, target, **options, max_depth=0)
+    other_options = _job(db_session, target, **dict(options, include_inherited=False), max_depth=5)
+    for previous in (shallow, other_options):
+        ScanResultWriter(db_session, previous.id).write_all(
+            record.to_scan_record() for record in _scanner(acl_source).walk(root, 0))
+        previous.status = 'completed'
+    db_session.commit()
+
+    job = _job(db_session, target, **options, max_depth=5, incremental=True)
+    assert load_scan_baseline(db_session, job, root).source == 'permission_cache'
+    assert job.baseline_job_id is None
+
+    matching = _job(db_session, target, **options, max_depth=None)
+    ScanResultWriter(db_session, matching.id).write_all(
+        record.to_scan_record() for record in _scanner(acl_source).walk(root, 5))
+    matching.status = 'completed'
+    db_session.commit()
+
+    # max_depth None walks to SCANNER_CONFIG['max_depth'], which is 5
+    baseline = load_scan_baseline(db_session, job, root)
+    assert baseline.source == f'job:{matching.id}'
+    assert job.baseline_job_id == matching.id
+    assert len(baseline) == len(TREE) + 1
@@ -0,0 +1,62 @@
+# tests/test_db/test_bulk_insert.py
+from sqlalchemy import select
+from sqlalchemy.engine.default import DefaultDialect
+
+from src.db.models import AccessEntry, ScanResult
+from src.db.scan_writer import (access_entry_rows, insert_access_entries, insert_scan_results,
+                                scan_result_row)
+
+
+def _ace(name):
+    return {'trustee': {'name': name, 'domain': 'CORP', 'sid': f'S-1-5-21-{name}'},
+            'type': 'Allow', 'inherited': True, 'permissions': {'Basic': ['Read']}}
+
+
+def _insert(db, paths):
+    ids = insert_scan_results(db, [scan_result_row(None, path, {'success': True}) for path in paths])
+    db.commit()
+    return ids
+
+
+def test_insert_scan_results_returns_ids_in_row_order(db_session):
+    paths = [f'C:\\share\\f{i}' for i in range(25)]
+
+    ids = _insert(db_session, paths)
+
+    stored = dict(db_session.execute(select(ScanResult.id, ScanResult.path)).all())
+    assert [stored[result_id] for result_id in ids] == paths
+
+
+def test_insert_scan_results_without_returning_support(db_session, monkeypatch):
+    dialect = db_session.get_bind().dialect
+    monkeypatch.setattr(dialect, 'insert_executemany_returning_sort_by_parameter_order', False)
+    paths = [f'C:\\share\\f{i}' for i in range(5)]
+
+    ids = _insert(db_session, paths)
+
+    stored = dict(db_session.execute(select(ScanResult.id, ScanResult.path)).all())
+    assert [stored[result_id] for result_id in ids] == paths
+
+
+def test_insert_scan_results_on_dialects_without_the_ordering_flag(db_session, monkeypatch):
+    # SQLAlchemy before 2.0.10 has no insert_executemany_returning_sort_by_parameter_order
+    monkeypatch.delattr(DefaultDialect, 'insert_executemany_returning_sort_by_parameter_order')
+    paths = [f'C:\\share\\f{i}' for i in range(5)]
+
+    ids = _insert(db_session, paths)
+
+    stored = dict(db_session.execute(select(ScanResult.id, ScanResult.path)).all())
+    assert [stored[result_id] for result_id in ids] == paths
+
+
+def test_access_entries_link_to_their_results_across_chunks(db_session):
+    ids = _insert(db_session, ['C:\\a', 'C:\\b'])
+    rows = access_entry_rows(ids[0], [_ace(f'a{i}') for i in range(7)])
+    rows += access_entry_rows(ids[1], [_ace('b0')])
+
+    assert insert_access_entries(db_session, rows, batch_size=3) == 8
+    db_session.commit()
+
+    linked = db_session.execute(select(AccessEntry.scan_result_id, AccessEntry.trustee_name)).all()
+    assert sorted(name for result_id, name in linked if result_id == ids[0]) == [f'a{i}' for i in range(7)]
+    assert [name for result_id, name in linked if result_id == ids[1]] == ['b0']
@@ -0,0 +1,52 @@
+# tests/test_db/test_coordination.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from src.db.coordination import (
+    append_events, latest_event_seq, prune_events, read_events, release_lease, try_acquire_lease
+)
+from src.db.models import EventBusMessage, ServiceLease
+
+
+def test_lease_has_one_holder_until_it_expires_or_is_released(db_session):
+    assert try_acquire_lease(db_session, "monitor", "w1", 30)
+    assert not try_acquire_lease(db_session, "monitor", "w2", 30)
+    # Renewing keeps it
+    assert try_acquire_lease(db_session, "monitor", "w1", 30)
+
+    table = ServiceLease.__table__
+    db_session.execute(update(table).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db_session.commit()
+    assert try_acquire_lease(db_session, "monitor", "w2", 30)
+    assert not try_acquire_lease(db_session, "monitor", "w1", 30)
+
+    release_lease(db_session, "monitor", "w1")   # not the holder: no effect
+    assert not try_acquire_lease(db_session, "monitor", "w1", 30)
+    release_lease(db_session, "monitor", "w2")
+    assert try_acquire_lease(db_session, "monitor", "w1", 30)
+
+
+def test_events_are_read_in_seq_order_with_late_missing_seqs(db_session):
+    seqs = append_events(db_session, "alerts", "w1", [{"n": 1}, {"n": 2}, {"n": 3}])
+    db_session.commit()
+
+    assert seqs == sorted(seqs) and latest_event_seq(db_session) == seqs[-1]
+    assert [row["payload"]["n"] for row in read_events(db_session, 0)] == [1, 2, 3]
+    assert [row["payload"]["n"] for row in read_events(db_session, seqs[1], limit=10)] == [3]
+    # A reader past seqs[2] still picks up seqs[0] when it is listed as missing
+    rows = read_events(db_session, seqs[2], missing_seqs=[seqs[0]])
+    assert [(row["seq"], row["channel"], row["origin"]) for row in rows] == [(seqs[0], "alerts", "w1")]
+
+
+def test_prune_removes_events_past_retention(db_session):
+    append_events(db_session, "alerts", "w1", [{"n": 1}, {"n": 2}])
+    db_session.commit()
+    table = EventBusMessage.__table__
+    first = latest_event_seq(db_session) - 1
+    db_session.execute(update(table).where(table.c.seq == first)
+                       .values(created_at=datetime.utcnow() - timedelta(hours=2)))
+    db_session.commit()
+
+    assert prune_events(db_session, retention_seconds=3600) == 1
+    assert [row["payload"]["n"] for row in read_events(db_session, 0)] == [2]
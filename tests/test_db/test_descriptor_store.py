@@ -0,0 +1,67 @@
+# tests/test_db/test_descriptor_store.py
+from sqlalchemy import func, select
+
+from src.db.descriptor_store import (hydrate_scan_results, intern_descriptors, load_descriptors,
+                                     merge_permissions, split_permissions)
+from src.db.models import AccessEntry, ScanJob, ScanResult, SecurityDescriptor
+from src.db.scan_writer import ScanResultWriter
+
+
+def _permissions(path, sid='S-1-5-21-1-513'):
+    return {
+        'path': path,
+        'success': True,
+        'scan_time': '2026-01-01T00:00:00',
+        'owner': {'name': 'Administrators', 'sid': 'S-1-5-32-544'},
+        'primary_group': {'name': 'None', 'sid': 'S-1-5-21-1-513'},
+        'inheritance_enabled': True,
+        'aces': [{'trustee': {'name': 'Domain Users', 'domain': 'CORP', 'sid': sid},
+                  'type': 'Allow', 'inherited': True, 'permissions': {}}],
+        'metadata': {'total_aces': 1}
+    }
+
+
+def test_folders_with_the_same_acl_share_one_descriptor():
+    first = split_permissions(_permissions('C:\\a'))
+    second = split_permissions(_permissions('C:\\b'))
+    other = split_permissions(_permissions('C:\\c', sid='S-1-5-21-1-1001'))
+
+    assert first[0] == second[0] != other[0]
+    assert 'aces' not in first[2] and first[2]['path'] == 'C:\\a'
+    assert merge_permissions(first[2], first[1]) == _permissions('C:\\a')
+
+
+def test_failed_results_are_not_split():
+    failed = {'path': 'C:\\a', 'success': False, 'error': 'denied'}
+
+    assert split_permissions(failed) == (None, None, failed)
+
+
+def test_intern_descriptors_only_inserts_new_hashes(db_session):
+    digest, descriptor, _ = split_permissions(_permissions('C:\\a'))
+
+    assert intern_descriptors(db_session, {digest: descriptor}) == 1
+    assert intern_descriptors(db_session, {digest: descriptor}) == 0
+    db_session.commit()
+
+    assert load_descriptors(db_session, [digest, None]) == {digest: descriptor}
+
+
+def test_writer_stores_each_acl_once_and_hydrates_it_back(db_session):
+    job = ScanJob(scan_type='path', status='running')
+    db_session.add(job)
+    db_session.commit()
+    records = [{'path': f'C:\\share\\f{i}', 'parent': 'C:\\share', 'depth': 1, 'success': True,
+                'scan_time': '', 'permissions': _permissions(f'C:\\share\\f{i}')} for i in range(10)]
+
+    stats = ScanResultWriter(db_session, job.id, batch_size=4, dedup_descriptors=True).write_all(records)
+
+    assert stats['descriptors_stored'] == 1
+    assert stats['descriptors_referenced'] == 10
+    assert db_session.execute(select(func.count()).select_from(SecurityDescriptor)).scalar() == 1
+    results = db_session.execute(select(ScanResult).order_by(ScanResult.id)).scalars().all()
+    assert all('aces' not in result.permissions['permissions'] for result in results)
+    assert [payload['permissions'] for payload in hydrate_scan_results(db_session, results)] == \
+        [record['permissions'] for record in records]
+    # Access entries are still written per folder and ACE
+    assert db_session.execute(select(func.count()).select_from(AccessEntry)).scalar() == 10
@@ -0,0 +1,59 @@
+# tests/test_db/test_health_issues.py
+from datetime import datetime, timezone
+
+from src.db.health_issues import reconcile_issues
+from src.db.models.health import HealthScan, Issue, IssueSeverity, IssueStatus, IssueType
+
+
+def _scan(db):
+    scan = HealthScan(start_time=datetime.now(timezone.utc), status="running")
+    db.add(scan)
+    db.commit()
+    return scan.id
+
+
+def _issue(path, issue_type=IssueType.DIRECT_USER_ACE, severity=IssueSeverity.MEDIUM):
+    return {"issue_type": issue_type, "severity": severity, "path": path, "title": "t", "description": "d"}
+
+
+def _active(db):
+    rows = db.query(Issue).filter(Issue.status == IssueStatus.ACTIVE).all()
+    return sorted((row.path, row.issue_type) for row in rows)
+
+
+def test_reconcile_touches_only_the_analyzed_folders(db_session):
+    old_scan = _scan(db_session)
+    reconcile_issues(db_session, old_scan, [
+        _issue("C:\\share\\a"), _issue("C:\\share\\a\\deep"), _issue("C:\\share\\b", IssueType.ORPHANED_SID)
+    ], ["C:\\share\\a", "C:\\share\\a\\deep", "C:\\share\\b"])
+    db_session.commit()
+
+    # a was analyzed and is clean now; a\deep lies below it but was not analyzed
+    result = reconcile_issues(db_session, _scan(db_session), [_issue("C:\\share\\b", IssueType.ORPHANED_SID)],
+                              ["C:\\share\\a", "C:\\share\\b"])
+    db_session.commit()
+
+    assert (result["inserted"], result["updated"], result["resolved"]) == (0, 1, 1)
+    assert result["delta"] == {"direct_user_ace:medium": -1}
+    assert _active(db_session) == [("C:\\share\\a\\deep", IssueType.DIRECT_USER_ACE),
+                                   ("C:\\share\\b", IssueType.ORPHANED_SID)]
+
+
+def test_skipped_folders_keep_their_issues(db_session):
+    reconcile_issues(db_session, _scan(db_session), [_issue("C:\\share\\a")], ["C:\\share\\a"])
+    db_session.commit()
+
+    result = reconcile_issues(db_session, _scan(db_session), [], ["C:\\share\\a"], skipped_paths={"C:\\share\\a"})
+
+    assert result["resolved"] == 0
+    assert _active(db_session) == [("C:\\share\\a", IssueType.DIRECT_USER_ACE)]
+
+
+def test_new_severity_moves_the_issue_between_totals_cells(db_session):
+    reconcile_issues(db_session, _scan(db_session), [_issue("C:\\share\\a")], ["C:\\share\\a"])
+    db_session.commit()
+
+    result = reconcile_issues(db_session, _scan(db_session), [_issue("C:\\share\\a", severity=IssueSeverity.HIGH)],
+                              ["C:\\share\\a"])
+
+    assert result["delta"] == {"direct_user_ace:high": 1, "direct_user_ace:medium": -1}
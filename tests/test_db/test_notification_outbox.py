@@ -0,0 +1,76 @@
+# tests/test_db/test_notification_outbox.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+
+from src.db.models import NotificationOutbox
+from src.db.notification_outbox import (
+    append_notifications, committed_seq, compact_outbox, read_since, seq_bounds
+)
+
+
+def _row(n, target_user=None, created_at=None):
+    row = {"notification_id": "n%d" % n, "type": "permission_change", "payload": {"id": "n%d" % n},
+           "target_user": target_user}
+    if created_at:
+        row["created_at"] = created_at
+    return row
+
+
+def test_append_returns_increasing_seqs_in_row_order(db_session):
+    first = append_notifications(db_session, [_row(1), _row(2)])
+    second = append_notifications(db_session, [_row(3)])
+    db_session.commit()
+
+    assert first[0] < first[1] < second[0]
+    assert seq_bounds(db_session) == (first[0], second[0])
+    assert append_notifications(db_session, []) == []
+
+
+def test_read_since_returns_visible_notifications_after_a_seq(db_session):
+    seqs = append_notifications(db_session, [_row(1), _row(2, target_user="alice"), _row(3, target_user="bob"), _row(4)])
+    db_session.commit()
+
+    assert [n["id"] for n in read_since(db_session, 0)] == ["n1", "n4"]
+    assert [n["id"] for n in read_since(db_session, 0, "alice")] == ["n1", "n2", "n4"]
+    assert [n["seq"] for n in read_since(db_session, seqs[0], "alice", limit=1)] == [seqs[1]]
+
+
+def test_compaction_applies_retention_and_size_limits(db_session):
+    old = datetime.utcnow() - timedelta(days=10)
+    append_notifications(db_session, [_row(1, created_at=old)] + [_row(n) for n in range(2, 7)])
+    db_session.commit()
+
+    assert compact_outbox(db_session, retention_days=7) == 1
+    assert compact_outbox(db_session, retention_days=7, max_entries=3) == 2
+    assert [n["id"] for n in read_since(db_session, 0)] == ["n4", "n5", "n6"]
+
+
+def test_empty_outbox_has_no_bounds(db_session):
+    assert seq_bounds(db_session) == (None, None)
+    assert read_since(db_session, 0) == []
+
+
+def _drop(db, seq):
+    # A seq that was allocated but never committed leaves the same hole
+    db.execute(delete(NotificationOutbox.__table__).where(NotificationOutbox.__table__.c.seq == seq))
+    db.commit()
+
+
+def test_committed_seq_stops_before_a_recent_gap(db_session):
+    seqs = append_notifications(db_session, [_row(1), _row(2), _row(3)])
+    db_session.commit()
+    _drop(db_session, seqs[1])
+
+    assert committed_seq(db_session, 0, gap_timeout=10) == seqs[0]
+    assert [n["seq"] for n in read_since(db_session, 0, up_to_seq=seqs[0])] == [seqs[0]]
+
+
+def test_committed_seq_skips_a_gap_once_it_times_out(db_session):
+    old = datetime.utcnow() - timedelta(minutes=5)
+    seqs = append_notifications(db_session, [_row(1, created_at=old), _row(2, created_at=old), _row(3, created_at=old)])
+    db_session.commit()
+    _drop(db_session, seqs[1])
+
+    assert committed_seq(db_session, 0, gap_timeout=10) == seqs[2]
+    assert committed_seq(db_session, seqs[2], gap_timeout=10) == seqs[2]
@@ -0,0 +1,66 @@
+# tests/test_db/test_scan_writer.py
+from sqlalchemy import func, select
+
+from src.core.parallel_scanner import ParallelTreeScanner
+from src.db.models import AccessEntry, ScanJob, ScanResult
+from src.db.scan_writer import ScanResultWriter
+
+TREE = ("a", "a/a1", "a/a2", "b", "b/b1", "c", "c/c1")
+
+
+def _job(db):
+    job = ScanJob(scan_type='path', status='running')
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_streamed_records_are_written_in_batches(db_session, make_tree, acl_source):
+    root = make_tree(*TREE)
+    job_id = _job(db_session)
+    records = (record.to_scan_record() for record in ParallelTreeScanner(acl_source.read).walk(root, 5))
+
+    stats = ScanResultWriter(db_session, job_id, batch_size=3, dedup_descriptors=False).write_all(records)
+
+    assert stats['folders_written'] == len(TREE) + 1
+    assert stats['batches_committed'] == 3
+    assert stats['access_entries_written'] == len(TREE) + 1
+    paths = db_session.execute(select(ScanResult.path).where(ScanResult.job_id == job_id)).scalars().all()
+    assert len(paths) == len(set(paths)) == len(TREE) + 1
+    stored = db_session.execute(select(ScanResult).where(ScanResult.path == root)).scalar_one()
+    assert stored.permissions['parent'] is None
+    assert stored.permissions['permissions']['aces'][0]['trustee']['sid'] == 'S-1-5-21-1-513'
+
+
+def test_failed_folders_are_stored_without_access_entries(db_session):
+    job_id = _job(db_session)
+    records = [
+        {'path': 'C:\\share', 'parent': None, 'depth': 0, 'success': True, 'scan_time': '',
+         'permissions': {'aces': [{'trustee': {'name': 'u', 'domain': 'D', 'sid': 'S-1-5-21-9'},
+                                   'type': 'Allow', 'inherited': False, 'permissions': {}}]}},
+        {'path': 'C:\\share\\gone', 'parent': 'C:\\share', 'depth': 1, 'success': False, 'scan_time': '',
+         'permissions': None, 'error': 'Path does not exist'}
+    ]
+
+    stats = ScanResultWriter(db_session, job_id, batch_size=10, dedup_descriptors=False).write_all(records)
+
+    assert stats['failed_folders'] == 1
+    assert db_session.execute(select(func.count()).select_from(AccessEntry)).scalar() == 1
+    failed = db_session.execute(select(ScanResult).where(ScanResult.path == 'C:\\share\\gone')).scalar_one()
+    assert failed.success is False
+    assert failed.error_message == 'Path does not exist'
+
+
+def test_writer_reports_folders_the_walk_did_not_cover(db_session, make_tree, acl_source):
+    root = make_tree(*TREE)
+    writer = ScanResultWriter(db_session, _job(db_session), batch_size=3, dedup_descriptors=False)
+    writer.write_all(record.to_scan_record() for record in ParallelTreeScanner(acl_source.read).walk(root, 5))
+    assert writer.walk_complete and writer.unexplored_paths == []
+
+    records = [record.to_scan_record() for record in ParallelTreeScanner(acl_source.read).walk(root, 5)]
+    records[-1] = dict(records[-1], success=False, permissions=None, error='access denied')
+    cut_short = ScanResultWriter(db_session, _job(db_session), dedup_descriptors=False)
+    cut_short.write_all(records[1:])
+
+    assert not cut_short.walk_complete
+    assert cut_short.unexplored_paths == [records[-1]['path']]
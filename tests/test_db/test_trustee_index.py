@@ -0,0 +1,112 @@
+# tests/test_db/test_trustee_index.py
+import os
+
+from src.core.parallel_scanner import ParallelTreeScanner
+from src.db.trustee_index import (effective_mask, iter_tree_permissions, iter_unexplored_paths,
+                                  prune_trustee_index, query_trustee_access, trustee_access_rows,
+                                  update_trustee_index)
+
+FINANCE = {"name": "Finance", "domain": "CORP", "sid": "S-1-5-21-1-1104", "type": "group", "is_system": False}
+
+
+def _ace(trustee, mask, deny=False, inherited=False):
+    return {"trustee": trustee, "type": "Deny" if deny else "Allow", "inherited": inherited,
+            "access_mask": mask, "permissions": {"Basic": ["Read"]}}
+
+
+def test_explicit_allow_beats_inherited_deny_but_not_explicit_deny():
+    assert effective_mask(0x3, 0x0, 0x0, 0x1) == 0x3
+    assert effective_mask(0x3, 0x1, 0x0, 0x0) == 0x2
+    assert effective_mask(0x0, 0x0, 0x3, 0x1) == 0x2
+
+
+def test_rows_aggregate_the_aces_of_each_trustee():
+    rows = trustee_access_rows("C:\\a", {"aces": [
+        _ace(FINANCE, 0x1, inherited=True), _ace(FINANCE, 0x2), _ace(FINANCE, 0x1, deny=True)
+    ]})
+
+    assert len(rows) == 1
+    assert rows[0]["access_mask"] == 0x2 and rows[0]["inherited_only"] is False
+
+
+def test_every_folder_of_a_scanned_tree_is_indexed(make_tree, acl_source, db_session):
+    root = make_tree("a", "a/a1", "b")
+    finance_folder = os.path.join(root, "a", "a1")
+    acl_source.set_aces(finance_folder, [_ace(FINANCE, 0x1200a9)])
+    tree = ParallelTreeScanner(acl_source.read, max_workers=2).scan_tree(root, max_depth=5)
+
+    folders = dict(iter_tree_permissions(tree))
+    assert sorted(folders) == sorted([root, os.path.join(root, "a"), finance_folder, os.path.join(root, "b")])
+
+    assert update_trustee_index(db_session, folders.items(), job_id=1) == 4
+    db_session.commit()
+    result = query_trustee_access(db_session, [FINANCE["sid"]], path_prefix=root)
+    assert [folder["path"] for folder in result["folders"]] == [finance_folder]
+    assert query_trustee_access(db_session, ["S-1-5-21-1-513"], path_prefix=root)["total"] == 3
+
+
+def test_failed_folders_keep_their_previous_rows(make_tree, acl_source, db_session):
+    root = make_tree("a")
+    broken = os.path.join(root, "a")
+    update_trustee_index(db_session, [(broken, acl_source.read(broken))])
+
+    def reader(path):
+        if path == broken:
+            raise OSError("access denied")
+        return acl_source.read(path)
+
+    tree = ParallelTreeScanner(reader, max_workers=1).scan_tree(root, max_depth=1)
+    update_trustee_index(db_session, iter_tree_permissions(tree))
+    db_session.commit()
+
+    assert query_trustee_access(db_session, ["S-1-5-21-1-513"], path_prefix=root)["total"] == 2
+
+
+def _rescan(db, root, job_id, reader, max_depth=5):
+    tree = ParallelTreeScanner(reader, max_workers=2).scan_tree(root, max_depth=max_depth)
+    update_trustee_index(db, iter_tree_permissions(tree), job_id=job_id)
+    prune_trustee_index(db, root, job_id, max_depth, iter_unexplored_paths(tree))
+    db.commit()
+
+
+def _indexed_paths(db, root):
+    return {folder["path"] for folder in query_trustee_access(db, ["S-1-5-21-1-513"], path_prefix=root)["folders"]}
+
+
+def test_full_rescan_drops_rows_of_deleted_folders(make_tree, acl_source, db_session):
+    root = make_tree("a", "a/a1", "b", "b/b1")
+    _rescan(db_session, root, 1, acl_source.read)
+    os.rmdir(os.path.join(root, "b", "b1"))
+    os.rmdir(os.path.join(root, "b"))
+
+    _rescan(db_session, root, 2, acl_source.read)
+
+    assert _indexed_paths(db_session, root) == {root, os.path.join(root, "a"), os.path.join(root, "a", "a1")}
+
+
+def test_rescan_keeps_rows_it_could_not_confirm(make_tree, acl_source, db_session):
+    root = make_tree("a", "a/a1", "b", "b/b1")
+    _rescan(db_session, root, 1, acl_source.read)
+    broken = os.path.join(root, "a")
+
+    def reader(path):
+        if path == broken:
+            raise OSError("access denied")
+        return acl_source.read(path)
+
+    # b/b1 lies below the depth limit and a/a1 below a folder that failed
+    _rescan(db_session, root, 2, reader, max_depth=1)
+
+    assert len(_indexed_paths(db_session, root)) == 5
+
+
+def test_scans_without_inherited_aces_leave_the_index_alone(make_tree, acl_source, db_session):
+    root = make_tree()
+    update_trustee_index(db_session, [(root, acl_source.read(root))], job_id=1)
+    explicit_only = {"aces": [_ace(FINANCE, 0x1200a9)]}
+
+    assert update_trustee_index(db_session, [(root, explicit_only)], job_id=2, include_inherited=False) == 0
+    db_session.commit()
+
+    assert _indexed_paths(db_session, root) == {root}
+    assert query_trustee_access(db_session, [FINANCE["sid"]], path_prefix=root)["total"] == 0
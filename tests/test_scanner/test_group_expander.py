@@ -0,0 +1,103 @@
+# tests/test_scanner/test_group_expander.py
+import threading
+
+from src.scanner.group_expander import ParallelGroupExpander
+
+
+def _account(name, type_="Group"):
+    return {"name": name, "domain": "CORP", "full_name": "CORP\\" + name, "type": type_}
+
+
+class Directory:
+    """Direct members by group name; counts lookups and the threads they ran on."""
+
+    def __init__(self, members, failing=()):
+        self.members = members
+        self.failing = set(failing)
+        self.lookups = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def fetch(self, name, domain):
+        with self._lock:
+            self.lookups.append(name)
+            self.threads.add(threading.get_ident())
+        if name in self.failing:
+            raise OSError("server unavailable")
+        return self.members.get(name, [])
+
+
+def _names(path):
+    return {
+        "group": path["group"]["name"],
+        "nested": [_names(child) for child in path["member_groups"]]
+    }
+
+
+def test_shared_nested_groups_are_fetched_once_and_paths_match_the_tree():
+    shared = _account("shared")
+    directory = Directory({
+        "staff": [_account("eng"), _account("ops"), _account("alice", "User")],
+        "eng": [shared],
+        "ops": [shared],
+        "shared": [_account("bob", "User")]
+    })
+    expander = ParallelGroupExpander(directory.fetch, max_workers=4)
+
+    [path] = expander.expand([_account("staff")])
+    expander.shutdown()
+
+    assert sorted(directory.lookups) == ["eng", "ops", "shared", "staff"]
+    assert _names(path) == {"group": "staff", "nested": [
+        {"group": "eng", "nested": [{"group": "shared", "nested": []}]},
+        {"group": "ops", "nested": [{"group": "shared", "nested": []}]}
+    ]}
+    assert expander.last_stats["levels"] == 3
+
+
+def test_cycles_and_depth_limit_stop_a_branch():
+    directory = Directory({"a": [_account("b")], "b": [_account("a"), _account("c")], "c": [_account("d")]})
+
+    [cyclic] = ParallelGroupExpander(directory.fetch, max_workers=1).expand([_account("a")])
+    [shallow] = ParallelGroupExpander(directory.fetch, max_workers=1, max_depth=2).expand([_account("a")])
+
+    assert _names(cyclic) == {"group": "a", "nested": [
+        {"group": "b", "nested": [{"group": "c", "nested": [{"group": "d", "nested": []}]}]}
+    ]}
+    assert _names(shallow) == {"group": "a", "nested": [{"group": "b", "nested": []}]}
+
+
+def test_failed_lookup_leaves_the_group_without_members():
+    directory = Directory({"staff": [_account("eng"), _account("ops")], "ops": [_account("x", "User")]},
+                          failing={"eng"})
+    expander = ParallelGroupExpander(directory.fetch, max_workers=2)
+
+    [path] = expander.expand([_account("staff")])
+    expander.shutdown()
+
+    eng, ops = path["member_groups"]
+    assert eng["members"] == [] and ops["members"] == [_account("x", "User")]
+    assert expander.last_stats["fetch_errors"] == 1
+
+
+def test_system_groups_are_not_looked_up():
+    directory = Directory({"staff": [_account("Domain Users")]})
+    expander = ParallelGroupExpander(directory.fetch, is_system_account=lambda name: name == "CORP\\Domain Users")
+
+    expander.expand([_account("staff")])
+
+    assert directory.lookups == ["staff"]
+
+
+def test_pool_threads_run_the_initializer():
+    initialized = set()
+    directory = Directory({"staff": [_account("g%d" % i) for i in range(8)]})
+    expander = ParallelGroupExpander(directory.fetch, max_workers=4,
+                                     thread_initializer=lambda: initialized.add(threading.get_ident()))
+
+    expander.expand([_account("staff")])
+    expander.shutdown()
+
+    # The eight nested groups were fetched on the pool, each thread initialized first
+    assert directory.threads - {threading.get_ident()} <= initialized
+    assert initialized
@@ -0,0 +1,88 @@
+# tests/test_scanner/test_membership_index.py
+from collections import deque
+
+from src.scanner.membership_index import (GroupResolverBackend, MembershipIndex, Principal,
+                                          StaticDirectoryBackend, generate_org_chart)
+
+
+def _directory(memberships, users=("alice", "bob"), groups=("staff", "eng", "ops", "oncall")):
+    principals = [Principal(sid=name, name=name, domain="CORP", type="User") for name in users]
+    principals += [Principal(sid=name, name=name, domain="CORP", type="Group") for name in groups]
+    return StaticDirectoryBackend(principals, memberships)
+
+
+def test_closure_follows_nesting_and_collapses_cycles():
+    # eng -> staff, ops <-> oncall (cycle) -> staff
+    index = MembershipIndex.build(_directory([
+        ("alice", "eng"), ("bob", "ops"),
+        ("eng", "staff"), ("ops", "oncall"), ("oncall", "ops"), ("oncall", "staff")
+    ]))
+
+    assert index.groups_of("alice") == {"eng", "staff"}
+    assert index.groups_of("bob") == {"ops", "oncall", "staff"}
+    # Groups in a cycle are nested in themselves, as a breadth-first expansion finds
+    assert index.groups_of("ops") == {"ops", "oncall", "staff"}
+    assert index.is_member_of_any("alice", ["ops", "staff"])
+    assert not index.is_member_of_any("alice", ["ops", "oncall"])
+    assert index.members_of("staff", include_groups=False) == {"alice", "bob"}
+    assert index.token_sids("alice") == {"alice", "eng", "staff"}
+
+
+def test_unknown_sids_are_members_of_nothing():
+    index = MembershipIndex.build(_directory([("alice", "eng")]))
+
+    assert "carol" not in index
+    assert index.groups_of("carol") == set()
+    assert not index.is_member_of_any("carol", ["eng"])
+
+
+def test_closure_matches_breadth_first_expansion_on_an_org_chart():
+    backend = generate_org_chart(users=300, departments=3, teams_per_department=3, project_groups=40)
+    index = MembershipIndex.build(backend)
+    parents = {}
+    for member, group in backend.memberships:
+        parents.setdefault(member, []).append(group)
+
+    for sid in backend.principals:
+        expected, queue = set(), deque(parents.get(sid, ()))
+        while queue:
+            group = queue.popleft()
+            if group not in expected:
+                expected.add(group)
+                queue.extend(parents.get(group, ()))
+        assert index.groups_of(sid) == expected
+
+
+class FakeResolver:
+    def __init__(self, accounts, members):
+        self.accounts = accounts
+        self.members = members
+        self.member_lookups = []
+
+    def _get_account_details(self, name, domain):
+        return self.accounts.get(name, {"name": name, "domain": domain, "sid": None, "type": "Unknown"})
+
+    def _get_group_members_multi_provider(self, name, domain):
+        self.member_lookups.append(name)
+        return self.members.get(name, [])
+
+
+def _account(name, type_):
+    return {"name": name, "domain": "CORP", "sid": "S-" + name, "full_name": "CORP\\" + name, "type": type_}
+
+
+def test_group_resolver_backend_crawls_nested_groups_once_and_skips_user_seeds():
+    accounts = {name: _account(name, kind) for name, kind in
+                (("staff", "Group"), ("eng", "Group"), ("alice", "User"))}
+    resolver = FakeResolver(accounts, {
+        "staff": [accounts["eng"], accounts["alice"]],
+        "eng": [accounts["alice"], accounts["staff"]]
+    })
+    seeds = [{"name": "staff", "domain": "CORP"}, {"name": "eng", "domain": "CORP"},
+             {"name": "alice", "domain": "CORP"}, {"name": "gone", "domain": "CORP"}]
+
+    index = MembershipIndex.build(GroupResolverBackend(resolver, seeds))
+
+    assert sorted(resolver.member_lookups) == ["eng", "staff"]
+    assert index.groups_of("S-alice") == {"S-staff", "S-eng"}
+    assert index.is_group("S-eng") and not index.is_group("S-alice")
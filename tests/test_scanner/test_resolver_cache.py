@@ -0,0 +1,123 @@
+# tests/test_scanner/test_resolver_cache.py
+import threading
+import time
+
+import pytest
+
+from src.scanner.resolver_cache import ResolverCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def _cache(clock, **kwargs):
+    options = dict(max_entries=2, ttl_seconds=100, stale_seconds=50, clock=clock)
+    options.update(kwargs)
+    return ResolverCache(("group_members",), **options)
+
+
+def test_hits_misses_and_lru_eviction(clock):
+    cache = _cache(clock)
+    loads = []
+    load = lambda key: cache.get_or_load("group_members", key, lambda: loads.append(key) or key.upper())
+
+    assert [load("a"), load("b"), load("a"), load("c")] == ["A", "B", "A", "C"]
+    # b was least recently used when c arrived
+    assert cache.get("group_members", "b") is None
+    assert cache.get("group_members", "a") == "A"
+    counters = cache.get_stats()["types"]["group_members"]
+    assert (counters["hits"], counters["misses"], counters["evictions"]) == (1, 3, 1)
+    assert loads == ["a", "b", "c"]
+
+
+def test_expired_entry_is_served_stale_while_it_refreshes(clock):
+    cache = _cache(clock)
+    cache.set("group_members", "a", "old")
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return "new"
+
+    clock.now = 120
+    assert cache.get_or_load("group_members", "a", loader) == "old"
+    assert refreshed.wait(5)
+    cache.shutdown()
+    for _ in range(100):
+        if cache.get("group_members", "a") == "new":
+            break
+        time.sleep(0.01)
+    assert cache.get("group_members", "a") == "new"
+    assert cache.get_stats()["types"]["group_members"]["stale_hits"] == 1
+
+
+def test_entry_past_the_stale_window_is_reloaded_in_line(clock):
+    cache = _cache(clock)
+    cache.set("group_members", "a", "old")
+
+    clock.now = 200
+    assert cache.get_or_load("group_members", "a", lambda: "new") == "new"
+    assert cache.get_stats()["types"]["group_members"]["expirations"] == 1
+
+
+def test_concurrent_misses_share_one_load(clock):
+    cache = _cache(clock)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get_or_load("group_members", "a", loader)))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=lambda: results.append(cache.get_or_load("group_members", "a", loader)))
+    second.start()
+    for _ in range(100):
+        if cache.get_stats()["types"]["group_members"]["coalesced"]:
+            break
+        time.sleep(0.01)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert results == ["value", "value"] and len(calls) == 1
+
+
+def test_load_errors_propagate_and_cache_nothing(clock):
+    cache = _cache(clock)
+
+    def failing():
+        raise OSError("server unavailable")
+
+    with pytest.raises(OSError):
+        cache.get_or_load("group_members", "a", failing)
+    assert cache.get_or_load("group_members", "a", lambda: "value") == "value"
+    assert cache.get_stats()["types"]["group_members"]["load_errors"] == 1
+
+
+def test_refresh_threads_run_the_initializer(clock):
+    initialized = []
+    cache = _cache(clock, thread_initializer=lambda: initialized.append(threading.get_ident()))
+    cache.set("group_members", "a", "old")
+    done = threading.Event()
+
+    clock.now = 120
+    cache.get_or_load("group_members", "a", lambda: done.set() or "new")
+    assert done.wait(5)
+    cache.shutdown()
+    assert len(initialized) == 1
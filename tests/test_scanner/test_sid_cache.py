@@ -0,0 +1,80 @@
+# tests/test_scanner/test_sid_cache.py
+import os
+import time
+
+from config.settings import APP_DATA_DIR, SID_CACHE_CONFIG
+from src.scanner.sid_cache import SidCache
+
+TRUSTEE = {'name': 'alice', 'domain': 'CORP', 'sid': 'S-1-5-21-1-1001', 'type': 'user'}
+
+
+def _cache(tmp_path, **kwargs):
+    return SidCache(str(tmp_path / 'sid_cache.db'), **kwargs)
+
+
+def test_entries_are_shared_through_the_store(tmp_path):
+    writer = _cache(tmp_path)
+    writer.set(TRUSTEE['sid'], TRUSTEE)
+
+    reader = _cache(tmp_path)
+
+    assert reader.get(TRUSTEE['sid']) == TRUSTEE
+    assert reader.stats()['store_hits'] == 1
+    assert reader.get(TRUSTEE['sid']) == TRUSTEE
+    assert reader.stats()['memory_hits'] == 1
+
+
+def test_negative_entries_expire_on_their_own_ttl(tmp_path):
+    cache = _cache(tmp_path, negative_ttl_seconds=0)
+    cache.set('S-1-5-21-9-9', {'name': 'S-1-5-21-9-9'}, negative=True)
+    cache.set(TRUSTEE['sid'], TRUSTEE)
+
+    assert cache.get('S-1-5-21-9-9') is None
+    assert cache.get(TRUSTEE['sid']) == TRUSTEE
+    assert cache.stats()['expirations'] >= 1
+
+
+def test_store_is_trimmed_to_max_entries_every_evict_interval_writes(tmp_path):
+    cache = _cache(tmp_path, max_entries=10, memory_entries=1, evict_interval=5)
+    for i in range(12):
+        cache.set(f'S-1-5-21-1-{i}', dict(TRUSTEE, sid=f'S-1-5-21-1-{i}'))
+        time.sleep(0.001)
+
+    # 12 writes: checked after the 5th and 10th, so two entries may be over the bound
+    assert cache.stats()['store_entries'] == 12
+    cache.set('S-1-5-21-1-12', TRUSTEE)
+    cache.set('S-1-5-21-1-13', TRUSTEE)
+    cache.set('S-1-5-21-1-14', TRUSTEE)
+
+    stats = cache.stats()
+    assert stats['store_entries'] == 10
+    assert stats['evictions'] == 5
+    # Least recently used entries go first
+    assert cache.get('S-1-5-21-1-0') is None
+    assert cache.get('S-1-5-21-1-14') == TRUSTEE
+
+
+def test_unusable_store_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    cache = SidCache(str(blocker / 'sid_cache.db'))
+
+    cache.set(TRUSTEE['sid'], TRUSTEE)
+
+    assert cache.get(TRUSTEE['sid']) == TRUSTEE
+    assert len(cache) == 1
+
+
+def test_default_store_path_does_not_depend_on_the_working_directory(monkeypatch):
+    monkeypatch.delenv('SID_CACHE_PATH', raising=False)
+    import importlib
+    import config.settings as settings
+
+    reloaded = importlib.reload(settings)
+    try:
+        assert os.path.isabs(reloaded.SID_CACHE_CONFIG['path'])
+        assert reloaded.SID_CACHE_CONFIG['path'].startswith(APP_DATA_DIR)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(settings)
+    assert SID_CACHE_CONFIG['evict_interval'] > 0
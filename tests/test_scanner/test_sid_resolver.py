@@ -0,0 +1,78 @@
+# tests/test_scanner/test_sid_resolver.py
+import sys
+import types
+
+from src.scanner.sid_cache import SidCache
+from src.scanner.sid_resolver import BatchSidResolver, FakeSidBackend, Win32SidBackend
+
+ACCOUNTS = {
+    'S-1-5-21-1-1001': ('alice', 'CORP', 'User'),
+    'S-1-5-21-1-513': ('Domain Users', 'CORP', 'Group'),
+    'S-1-5-32-544': ('Administrators', 'BUILTIN', 'Alias')
+}
+
+
+def _resolver(backend, fallback=None):
+    return BatchSidResolver(backend, SidCache(None), is_system_account=lambda name: name.startswith('BUILTIN\\'),
+                            fallback=fallback)
+
+
+def test_distinct_sids_are_resolved_in_one_backend_call():
+    backend = FakeSidBackend(ACCOUNTS)
+    resolver = _resolver(backend)
+
+    trustees = resolver.resolve_many(['S-1-5-21-1-1001', 'S-1-5-21-1-513', 'S-1-5-21-1-1001', 'S-1-5-32-544'])
+
+    assert backend.calls == 1
+    assert backend.sids_looked_up == 3
+    assert trustees['S-1-5-21-1-1001']['full_name'] == 'CORP\\alice'
+    assert trustees['S-1-5-32-544']['is_system'] is True
+    stats = resolver.get_stats()
+    assert (stats['sids_requested'], stats['distinct_sids']) == (4, 3)
+
+
+def test_cached_sids_do_not_reach_the_backend():
+    backend = FakeSidBackend(ACCOUNTS)
+    resolver = _resolver(backend)
+    resolver.resolve_many(['S-1-5-21-1-1001'])
+
+    resolver.resolve_many(['S-1-5-21-1-1001', 'S-1-5-21-1-513'])
+
+    assert backend.calls == 2
+    assert backend.sids_looked_up == 2
+    assert resolver.get_stats()['cache_hits'] == 1
+
+
+def test_unmapped_sids_use_the_fallback_then_a_negative_entry():
+    backend = FakeSidBackend({})
+    fallback = {'S-1-1-0': {'name': 'Everyone', 'domain': 'NT AUTHORITY', 'sid': 'S-1-1-0'}}
+    resolver = _resolver(backend, fallback=fallback.get)
+
+    trustees = resolver.resolve_many(['S-1-1-0', 'S-1-5-21-9-9'])
+
+    assert trustees['S-1-1-0']['name'] == 'Everyone'
+    assert trustees['S-1-5-21-9-9'] == BatchSidResolver.unknown_trustee('S-1-5-21-9-9')
+    assert resolver.cache.stats()['negative_entries'] == 1
+    assert resolver.get_stats()['unresolved'] == 1
+
+
+def test_domain_controller_answers_without_a_domain_keep_the_dc_name(monkeypatch):
+    def lookup_account_sid(system_name, sid):
+        if system_name is None:
+            raise OSError('not local')
+        return ('svc-backup', '', 1)
+
+    fake = types.SimpleNamespace(
+        ConvertStringSidToSid=lambda sid: sid,
+        LookupAccountSid=lookup_account_sid,
+        SidTypeUser=1, SidTypeGroup=2, SidTypeWellKnownGroup=5, SidTypeAlias=4,
+        SidTypeDeletedAccount=6, SidTypeInvalid=7, SidTypeUnknown=8, SidTypeComputer=9
+    )
+    monkeypatch.setitem(sys.modules, 'win32security', fake)
+
+    resolver = _resolver(Win32SidBackend(domain_controller='DC01'))
+    trustee = resolver.resolve('S-1-5-21-1-2000')
+
+    assert trustee['domain'] == 'DC01'
+    assert trustee['full_name'] == 'DC01\\svc-backup'
+    assert trustee['account_type'] == 'User'
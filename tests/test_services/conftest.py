@@ -0,0 +1,55 @@
+# tests/test_services/conftest.py
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.parallel_scanner import ParallelTreeScanner
+
+try:
+    import src.core.scanner  # noqa: F401
+except ImportError:
+    # The real scanner needs pywin32; the services only reach it through its
+    # module-level instance, which the fake_scanner fixture replaces
+    _scanner_module = types.ModuleType('src.core.scanner')
+    _scanner_module.scanner = None
+    sys.modules['src.core.scanner'] = _scanner_module
+
+
+class FakeShareGuardScanner:
+    """ShareGuardScanner over a FakeAclSource: single-folder reads and the streamed tree walk."""
+
+    def __init__(self, acl_source, max_depth=5):
+        self.max_depth = max_depth
+        self.permission_scanner = SimpleNamespace(
+            get_folder_permissions=lambda path, **kwargs: acl_source.read(path),
+            get_descriptor_fingerprint=acl_source.fingerprint
+        )
+        self._tree_scanner = ParallelTreeScanner(
+            acl_source.read, max_workers=2, fingerprint_reader=acl_source.fingerprint
+        )
+
+    def _should_exclude_path(self, path):
+        return False
+
+    def iter_scan_path(self, path, max_depth=None, simplified_system=True,
+                       include_inherited=True, baseline=None):
+        depth = self.max_depth if max_depth is None else max_depth
+        for record in self._tree_scanner.walk(path, depth, baseline=baseline):
+            yield record.to_scan_record()
+
+    def scan_path(self, path, max_depth=None, simplified_system=True, include_inherited=True):
+        depth = self.max_depth if max_depth is None else max_depth
+        return self._tree_scanner.scan_tree(path, depth)
+
+
+@pytest.fixture
+def fake_scanner(acl_source, monkeypatch):
+    """Route the services' scanner calls to a FakeShareGuardScanner."""
+    from src.services import cache_service, change_monitor
+
+    fake = FakeShareGuardScanner(acl_source)
+    monkeypatch.setattr(change_monitor, 'scanner', fake)
+    monkeypatch.setattr(cache_service, 'scanner', fake)
+    return fake
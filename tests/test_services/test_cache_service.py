@@ -0,0 +1,51 @@
+# tests/test_services/test_cache_service.py
+import os
+from datetime import datetime, timedelta
+
+from src.db.models import FolderPermissionCache
+from src.services.cache_service import cache_service
+
+
+def _cache_tree(db, acl_source, paths):
+    for path in paths:
+        cache_service._update_permission_cache(db, path, acl_source.read(path))
+
+
+def test_fully_cached_tree_is_served_from_cache(make_tree, acl_source, fake_scanner, db_session):
+    root = make_tree("a", "a/a1", "b")
+    paths = [root, os.path.join(root, "a"), os.path.join(root, "a", "a1"), os.path.join(root, "b")]
+    _cache_tree(db_session, acl_source, paths)
+
+    folders = cache_service.get_tree_permissions_cached(db_session, root, max_depth=5)
+
+    assert sorted(path for path, _ in folders) == sorted(paths)
+    assert all(permissions["aces"] == acl_source.aces_for(path) for path, permissions in folders)
+
+
+def test_tree_with_an_uncached_folder_is_not_served(make_tree, acl_source, fake_scanner, db_session):
+    root = make_tree("a", "a/a1", "b")
+    _cache_tree(db_session, acl_source, [root, os.path.join(root, "a"), os.path.join(root, "b")])
+
+    assert cache_service.get_tree_permissions_cached(db_session, root, max_depth=5) is None
+    # Down to depth 1 every folder is cached
+    assert len(cache_service.get_tree_permissions_cached(db_session, root, max_depth=1)) == 3
+
+
+def test_stale_or_expired_entries_are_not_served(make_tree, acl_source, fake_scanner, db_session):
+    root = make_tree("a")
+    subfolder = os.path.join(root, "a")
+    _cache_tree(db_session, acl_source, [root, subfolder])
+    entry = db_session.query(FolderPermissionCache).filter_by(folder_path=subfolder).one()
+
+    entry.last_scan_time = datetime.utcnow() - timedelta(hours=cache_service.cache_ttl_hours + 1)
+    db_session.commit()
+    assert cache_service.get_tree_permissions_cached(db_session, root, max_depth=1) is None
+
+    cache_service._update_permission_cache(db_session, subfolder, acl_source.read(subfolder))
+    cache_service.mark_path_stale(db_session, subfolder)
+    assert cache_service.get_tree_permissions_cached(db_session, root, max_depth=1) is None
+    assert cache_service.get_tree_permissions_cached(db_session, root, max_depth=0) is not None
+
+
+def test_missing_root_is_not_served(tmp_path, fake_scanner, db_session):
+    assert cache_service.get_tree_permissions_cached(db_session, str(tmp_path / "gone"), max_depth=1) is None
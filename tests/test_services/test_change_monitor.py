@@ -0,0 +1,110 @@
+# tests/test_services/test_change_monitor.py
+import asyncio
+import os
+import sys
+import threading
+import types
+
+from src.db.models import FolderPermissionCache, PermissionChange, ScanResult
+from src.services.change_events import MemoryChangeSource
+from src.services.change_monitor import ChangeMonitorService
+
+ADMINS = [{
+    "trustee": {"name": "Administrators", "domain": "BUILTIN", "sid": "S-1-5-32-544",
+                "type": "group", "is_system": False},
+    "type": "Allow",
+    "inherited": False,
+    "access_mask": 0x1f01ff,
+    "permissions": {"Basic": ["Full Control"]}
+}]
+
+
+def _monitor():
+    monitor = ChangeMonitorService()
+    monitor.is_monitoring = True
+    return monitor
+
+
+def test_seeding_caches_every_folder_below_a_watched_root(make_tree, acl_source, fake_scanner, db_session):
+    root = make_tree("a", "a/a1", "b")
+    monitor = _monitor()
+
+    assert monitor._seed_tree(root) == 4
+    cached = {path for path, in db_session.query(FolderPermissionCache.folder_path)}
+    assert cached == {root, os.path.join(root, "a"), os.path.join(root, "a", "a1"), os.path.join(root, "b")}
+    # A second pass finds everything cached and leaves it alone
+    assert monitor._seed_tree(root) == 0
+
+
+def test_first_change_to_a_seeded_subfolder_raises_an_alert(make_tree, acl_source, fake_scanner, db_session):
+    root = make_tree("a", "a/a1")
+    subfolder = os.path.join(root, "a", "a1")
+    monitor = _monitor()
+    monitor._seed_tree(root)
+
+    acl_source.set_aces(subfolder, ADMINS)
+    change = monitor._detect_path_change(subfolder)
+
+    assert change is not None
+    previous, current = change
+    assert previous["aces"] != current["aces"] == ADMINS
+    assert db_session.query(PermissionChange).count() > 0
+
+
+def test_unseeded_folder_is_diffed_against_its_stored_scan(make_tree, acl_source, fake_scanner, db_session):
+    root = make_tree("a")
+    subfolder = os.path.join(root, "a")
+    record = next(record for record in fake_scanner.iter_scan_path(root) if record["path"] == subfolder)
+    db_session.add(ScanResult(path=subfolder, permissions=record, success=True))
+    db_session.commit()
+
+    acl_source.set_aces(subfolder, ADMINS)
+    change = _monitor()._detect_path_change(subfolder)
+
+    assert change is not None and change[1]["aces"] == ADMINS
+    assert db_session.query(FolderPermissionCache).filter_by(folder_path=subfolder).count() == 1
+
+
+def test_unseeded_folder_without_history_is_only_snapshotted(make_tree, acl_source, fake_scanner, db_session):
+    root = make_tree("a")
+    subfolder = os.path.join(root, "a")
+
+    assert _monitor()._detect_path_change(subfolder) is None
+    assert db_session.query(FolderPermissionCache).filter_by(folder_path=subfolder).count() == 1
+    assert db_session.query(PermissionChange).count() == 0
+
+
+def test_starting_again_watches_and_seeds_the_new_paths(make_tree, acl_source, fake_scanner, db_session):
+    root = make_tree("a", "b/b1")
+    first, second = os.path.join(root, "a"), os.path.join(root, "b")
+    monitor = ChangeMonitorService(event_source=MemoryChangeSource())
+
+    async def run():
+        await monitor.start_monitoring([first])
+        await asyncio.gather(*monitor._seed_tasks)
+        await monitor.start_monitoring([first, second])
+        await asyncio.gather(*monitor._seed_tasks)
+        await monitor.stop_monitoring()
+
+    asyncio.run(run())
+
+    assert monitor.monitoring_paths == {first, second}
+    assert len(monitor.scheduler) == 2
+    cached = {path for path, in db_session.query(FolderPermissionCache.folder_path)}
+    assert {second, os.path.join(second, "b1")} <= cached
+
+
+def test_executor_threads_initialize_com(monkeypatch):
+    initialized = set()
+    pythoncom = types.ModuleType("pythoncom")
+    pythoncom.CoInitialize = lambda: initialized.add(threading.get_ident())
+    monkeypatch.setitem(sys.modules, "pythoncom", pythoncom)
+    monitor = ChangeMonitorService()
+
+    async def run():
+        try:
+            return await monitor._run_blocking(threading.get_ident)
+        finally:
+            monitor._executor.shutdown(wait=True)
+
+    assert asyncio.run(run()) in initialized
@@ -0,0 +1,111 @@
+# tests/test_services/test_event_bus.py
+import asyncio
+
+import pytest
+from sqlalchemy import delete, insert
+
+from src.db.models import EventBusMessage
+from src.services.event_bus import DatabaseEventBus, InProcessEventBus
+from src.services.leader_election import LeaderElector
+
+
+def _sessions():
+    from src.db.database import SessionLocal
+    yield SessionLocal()
+
+
+@pytest.fixture
+def buses(db_session):
+    return [DatabaseEventBus(db_session_factory=_sessions, worker_id=worker, gap_timeout=60) for worker in ("w1", "w2")]
+
+
+def _recorder(received):
+    async def handler(payload):
+        received.append(payload)
+    return handler
+
+
+def test_events_reach_other_workers_once(buses):
+    first, second = buses
+    on_first, on_second = [], []
+    first.subscribe("alerts", _recorder(on_first))
+    second.subscribe("alerts", _recorder(on_second))
+
+    async def run():
+        await first.publish_many("alerts", [{"n": 1}, {"n": 2}])
+        await first.poll_once()
+        await second.poll_once()
+        await second.poll_once()
+
+    asyncio.run(run())
+
+    # Delivered locally at publish time, and not again from the table
+    assert on_first == [{"n": 1}, {"n": 2}]
+    assert on_second == [{"n": 1}, {"n": 2}]
+
+
+def test_a_late_commit_behind_a_read_seq_is_still_delivered(buses, db_session):
+    first, second = buses
+    received = []
+    second.subscribe("alerts", _recorder(received))
+    table = EventBusMessage.__table__
+
+    async def run():
+        await first.publish_many("alerts", [{"n": 1}, {"n": 2}, {"n": 3}])
+        # Hide the middle row as if its transaction had not committed yet
+        row = db_session.execute(table.select().order_by(table.c.seq)).all()[1]
+        db_session.execute(delete(table).where(table.c.seq == row.seq))
+        db_session.commit()
+        await second.poll_once()
+        assert [payload["n"] for payload in received] == [1, 3]
+        db_session.execute(insert(table).values(**row._mapping))
+        db_session.commit()
+        await second.poll_once()
+
+    asyncio.run(run())
+
+    assert [payload["n"] for payload in received] == [1, 3, 2]
+    assert second.get_stats()["late_events"] == 1 and second.get_stats()["pending_gaps"] == 0
+
+
+def test_failing_handler_does_not_stop_the_others():
+    bus = InProcessEventBus()
+    received = []
+
+    async def failing(payload):
+        raise RuntimeError("boom")
+
+    bus.subscribe("alerts", failing)
+    bus.subscribe("alerts", _recorder(received))
+    asyncio.run(bus.publish("alerts", {"n": 1}))
+
+    assert received == [{"n": 1}]
+    assert bus.get_stats()["handler_errors"] == 1
+
+
+def test_one_leader_at_a_time_and_handover_on_stop(db_session):
+    electors = [LeaderElector("monitor", worker_id=worker, lease_seconds=30, renew_seconds=0.01,
+                              db_session_factory=_sessions) for worker in ("w1", "w2")]
+    events = []
+
+    async def run():
+        for elector in electors:
+            name = elector.worker_id
+
+            async def elected(name=name):
+                events.append(("elected", name))
+
+            async def demoted(name=name):
+                events.append(("demoted", name))
+
+            await elector.start(on_elected=elected, on_demoted=demoted)
+            await asyncio.sleep(0.05)
+        assert [elector.is_leader for elector in electors] == [True, False]
+        await electors[0].stop()
+        await asyncio.sleep(0.1)
+        assert electors[1].is_leader
+        await electors[1].stop()
+
+    asyncio.run(run())
+
+    assert events == [("elected", "w1"), ("demoted", "w1"), ("elected", "w2"), ("demoted", "w2")]
@@ -0,0 +1,81 @@
+# tests/test_services/test_health_refresh.py
+import asyncio
+import threading
+import time
+
+from src.services.health_refresh import HealthRefresher
+from src.services.leader_election import monitor_leader
+
+
+class SlowAnalyzer:
+    """Counts incremental scans and how many ran at the same time."""
+
+    def __init__(self, seconds=0.05):
+        self.seconds = seconds
+        self.runs = 0
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def run_incremental_health_scan(self):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+            self.runs += 1
+            return self.runs
+
+
+def _refresher(analyzer):
+    refresher = HealthRefresher(interval_seconds=0)
+    refresher.analyzer = analyzer
+    return refresher
+
+
+def test_requested_and_periodic_scans_never_overlap():
+    analyzer = SlowAnalyzer()
+    refresher = _refresher(analyzer)
+
+    async def run():
+        assert refresher.request_refresh()
+        await asyncio.gather(refresher.refresh_once(), refresher.refresh_once())
+        await refresher.stop()
+
+    asyncio.run(run())
+
+    assert analyzer.runs == 3
+    assert analyzer.max_running == 1
+
+
+def test_pending_request_is_not_queued_twice():
+    analyzer = SlowAnalyzer()
+    refresher = _refresher(analyzer)
+
+    async def run():
+        assert refresher.request_refresh()
+        assert not refresher.request_refresh()
+        await refresher._requested
+
+    asyncio.run(run())
+
+    assert analyzer.runs == 1
+    assert refresher.stats["requested"] == 1
+
+
+def test_forwarded_requests_run_only_on_the_leader(monkeypatch):
+    analyzer = SlowAnalyzer(seconds=0)
+    refresher = _refresher(analyzer)
+
+    async def run():
+        monkeypatch.setattr(monitor_leader, "is_leader", False)
+        await refresher.on_refresh_requested({})
+        assert refresher._requested is None
+        monkeypatch.setattr(monitor_leader, "is_leader", True)
+        await refresher.on_refresh_requested({})
+        await refresher._requested
+
+    asyncio.run(run())
+
+    assert analyzer.runs == 1
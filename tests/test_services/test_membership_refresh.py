@@ -0,0 +1,85 @@
+# tests/test_services/test_membership_refresh.py
+import asyncio
+
+from src.db.trustee_index import indexed_trustees, update_trustee_index
+from src.scanner.membership_index import MembershipIndex, Principal, StaticDirectoryBackend
+from src.services.membership_refresh import MembershipIndexRefresher
+
+
+def _permissions(*trustees):
+    return {"success": True, "aces": [
+        {"trustee": {"name": name, "domain": "CORP", "sid": "S-" + name}, "type": "Allow",
+         "inherited": False, "access_mask": 0x1200a9, "permissions": {}}
+        for name in trustees
+    ]}
+
+
+class FakeResolver:
+    """Records the seed groups of each rebuild and indexes them as empty groups."""
+
+    def __init__(self):
+        self.membership_index = None
+        self.seeds = []
+
+    def refresh_membership_index(self, seed_groups=None, backend=None):
+        self.seeds.append(sorted(group["name"] for group in seed_groups))
+        backend = StaticDirectoryBackend(
+            [Principal(sid="S-" + group["name"], name=group["name"], domain=group["domain"], type="Group")
+             for group in seed_groups], []
+        )
+        self.membership_index = MembershipIndex.build(backend)
+        return self.membership_index
+
+
+def _refresher(resolver, **kwargs):
+    from src.db.database import SessionLocal
+
+    def sessions():
+        yield SessionLocal()
+
+    return MembershipIndexRefresher(resolver, db_session_factory=sessions, **kwargs)
+
+
+def test_index_is_seeded_from_the_trustee_access_index(db_session):
+    update_trustee_index(db_session, [("C:\\a", _permissions("Finance", "alice")), ("C:\\b", _permissions("Finance"))])
+    db_session.commit()
+    resolver = FakeResolver()
+    refresher = _refresher(resolver)
+
+    async def run():
+        try:
+            return await refresher.refresh_once()
+        finally:
+            await refresher.stop()
+
+    index = asyncio.run(run())
+
+    assert sorted(t["name"] for t in indexed_trustees(db_session)) == ["Finance", "alice"]
+    assert resolver.seeds == [["Finance", "alice"]]
+    assert resolver.membership_index is index and "S-Finance" in index
+    assert refresher.stats["builds"] == 1
+
+
+def test_index_is_built_at_start_and_rebuilt_on_membership_change(db_session):
+    resolver = FakeResolver()
+    refresher = _refresher(resolver, interval_seconds=0, debounce_seconds=0)
+
+    async def run():
+        await refresher.start()
+        for _ in range(100):
+            if refresher.stats["builds"]:
+                break
+            await asyncio.sleep(0.01)
+        update_trustee_index(db_session, [("C:\\a", _permissions("Finance"))])
+        db_session.commit()
+        await refresher.on_membership_changed({"groups": ["CORP\\Finance"]})
+        for _ in range(100):
+            if refresher.stats["builds"] == 2:
+                break
+            await asyncio.sleep(0.01)
+        await refresher.stop()
+
+    asyncio.run(run())
+
+    assert resolver.seeds == [[], ["Finance"]]
+    assert refresher.stats["change_events"] == 1
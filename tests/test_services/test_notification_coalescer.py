@@ -0,0 +1,88 @@
+# tests/test_services/test_notification_coalescer.py
+import asyncio
+
+from src.services.notification_coalescer import ChangeBatch, ChangeCoalescer, PendingChange, change_type_of
+
+
+def _change(path, root="C:\\share", change_type="permissions_added", severity="low"):
+    return PendingChange(path=path, root_path=root, change_type=change_type, severity=severity, alert={})
+
+
+class Collector:
+    def __init__(self):
+        self.flushes = []
+
+    async def __call__(self, batches):
+        self.flushes.append(batches)
+
+
+def test_changes_are_grouped_by_root_and_type_until_the_window_ends():
+    collected = Collector()
+    coalescer = ChangeCoalescer(collected, window_seconds=0.05, max_batch=100)
+
+    async def run():
+        await coalescer.add(_change("C:\\share\\a"))
+        await coalescer.add(_change("C:\\share\\b"))
+        await coalescer.add(_change("C:\\share\\c", change_type="owner_changed"))
+        await coalescer.add(_change("D:\\other\\x", root="D:\\other"))
+        assert collected.flushes == [] and coalescer.pending == 4
+        await asyncio.sleep(0.15)
+
+    asyncio.run(run())
+
+    assert len(collected.flushes) == 1
+    groups = {(batch.root_path, batch.change_type): batch.count for batch in collected.flushes[0]}
+    assert groups == {("C:\\share", "permissions_added"): 2, ("C:\\share", "owner_changed"): 1,
+                      ("D:\\other", "permissions_added"): 1}
+    assert coalescer.get_stats()["largest_batch"] == 2
+
+
+def test_a_full_batch_is_flushed_at_once():
+    collected = Collector()
+    coalescer = ChangeCoalescer(collected, window_seconds=60, max_batch=3)
+
+    async def run():
+        for name in "abcd":
+            await coalescer.add(_change("C:\\share\\" + name))
+        await coalescer.flush()
+
+    asyncio.run(run())
+
+    assert [[batch.count for batch in batches] for batches in collected.flushes] == [[3], [1]]
+
+
+def test_flush_errors_do_not_lose_later_changes():
+    calls = []
+
+    async def failing(batches):
+        calls.append(batches)
+        if len(calls) == 1:
+            raise RuntimeError("outbox down")
+
+    coalescer = ChangeCoalescer(failing, window_seconds=0)
+
+    async def run():
+        await coalescer.add(_change("C:\\share\\a"))
+        await coalescer.add(_change("C:\\share\\b"))
+
+    asyncio.run(run())
+
+    assert len(calls) == 2 and coalescer.pending == 0
+
+
+def test_batch_summary_uses_the_highest_severity_and_deepest_common_folder():
+    batch = ChangeBatch("C:\\Share", "permissions_added", [
+        _change("C:\\Share\\Finance\\Q1\\x", severity="low"),
+        _change("c:/share/finance/Q2", severity="high"),
+        _change("C:\\Share\\Finance\\Q1", severity="medium"),
+    ])
+
+    assert batch.severity == "high"
+    assert batch.common_path == "C:\\Share\\Finance"
+    assert ChangeBatch("C:\\Share", "x", [_change("C:\\A"), _change("D:\\B")]).common_path == "C:\\Share"
+
+
+def test_change_type_lists_the_kinds_present():
+    assert change_type_of({"permissions_added": [1], "owner_changed": {"old": "a"}, "permissions_removed": []}) \
+        == "owner_changed+permissions_added"
+    assert change_type_of({}) == "permission_change"
@@ -0,0 +1,94 @@
+# tests/test_services/test_notification_fanout.py
+import asyncio
+
+import pytest
+
+from src.services.notification_fanout import ConnectionSendQueue, SubscriptionIndex, message_path
+
+
+def _message(msg_type="permission_change", severity="medium", path=None):
+    return {"type": msg_type, "severity": severity, "data": {"path": path} if path else {}}
+
+
+@pytest.fixture
+def index():
+    index = SubscriptionIndex()
+    index.add("everything")
+    index.add("alerts", {"types": ["alert"]})
+    index.add("high", {"min_severity": "high"})
+    index.add("finance", {"paths": ["\\\\fs01\\Finance"]})
+    index.add("finance-alerts", {"types": "alert", "paths": ["//FS01/finance/payroll"]})
+    return index
+
+
+def test_type_and_severity_filters(index):
+    # Path-filtered subscribers only get messages about a folder
+    assert index.match(_message()) == {"everything"}
+    assert index.match(_message("alert", "critical")) == {"everything", "alerts", "high"}
+    assert index.match(_message("alert", "critical", "\\\\fs01\\Finance")) == {"everything", "alerts", "high", "finance"}
+
+
+def test_path_filters_match_the_folder_and_below_ignoring_case_and_separators(index):
+    payroll = "\\\\fs01\\FINANCE\\Payroll\\2026"
+
+    assert index.match(_message("alert", "low", payroll)) == {"everything", "alerts", "finance", "finance-alerts"}
+    assert index.match(_message("alert", "low", "\\\\fs01\\HR")) == {"everything", "alerts"}
+    assert index.match(_message("alert", "low", "\\\\fs01\\Finance2")) == {"everything", "alerts"}
+
+
+def test_path_is_read_from_nested_state_when_data_has_none():
+    message = {"type": "alert", "data": {"current_state": {"path": "C:\\share"}}}
+
+    assert message_path(message) == "C:\\share"
+
+
+def test_removed_and_updated_subscriptions_stop_matching(index):
+    index.remove("finance")
+    index.update("alerts", {"types": ["permission_change"]})
+
+    assert index.match(_message(path="\\\\fs01\\Finance\\x")) == {"everything", "alerts"}
+    index.remove("finance-alerts")
+    assert index._path_root.children == {}
+    assert index.get_stats()["subscriptions"] == 3
+
+
+def test_send_queue_drop_policies():
+    oldest = ConnectionSendQueue(maxsize=2, policy="drop_oldest")
+    newest = ConnectionSendQueue(maxsize=2, policy="drop_newest")
+    for queue in (oldest, newest):
+        for payload in ("a", "b", "c"):
+            queue.put(payload)
+
+    assert list(item[1] for item in oldest._items) == ["b", "c"]
+    assert list(item[1] for item in newest._items) == ["a", "b"]
+    assert oldest.dropped == newest.dropped == 1
+
+
+def test_send_queue_coalesces_by_key_when_full():
+    clock = [0.0]
+    queue = ConnectionSendQueue(maxsize=2, policy="coalesce", clock=lambda: clock[0])
+    queue.put("a1", key=("change", "a"))
+    queue.put("b1", key=("change", "b"))
+
+    assert queue.put("a2", key=("change", "a")) == "coalesced"
+    assert queue.put("c1", key=("change", "c")) == "replaced_oldest"
+    clock[0] = 5.0
+    assert queue.lag_seconds() == 5.0
+
+    async def drain():
+        return [await queue.get(), await queue.get()]
+
+    assert asyncio.run(drain()) == ["b1", "c1"]
+    assert queue.lag_seconds() == 0.0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ConnectionSendQueue(policy="block")
+
+
+def test_batch_matches_when_any_changed_folder_matches(index):
+    batch = {"type": "permission_change_batch", "severity": "low",
+             "data": {"path": "\\\\fs01", "paths": ["\\\\fs01\\HR\\a", "\\\\fs01\\Finance\\b"]}}
+
+    assert index.match(batch) == {"everything", "finance"}
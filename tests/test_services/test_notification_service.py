@@ -0,0 +1,127 @@
+# tests/test_services/test_notification_service.py
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from config.settings import NOTIFICATION_CONFIG
+from src.db.notification_outbox import read_since
+from src.services.event_bus import InProcessEventBus
+from src.services.notification_coalescer import ChangeBatch, PendingChange
+from src.services.notification_service import Notification, NotificationService, NotificationType
+
+
+def _notification(title="change"):
+    return Notification(id=str(uuid.uuid4()), type=NotificationType.PERMISSION_CHANGE, title=title,
+                        message=title, severity="medium", timestamp=datetime.utcnow().isoformat(),
+                        data={"path": "C:\\share"})
+
+
+@pytest.fixture
+def service(db_session, monkeypatch):
+    from src.db.database import SessionLocal
+
+    def sessions():
+        yield SessionLocal()
+
+    monkeypatch.setitem(NOTIFICATION_CONFIG, "queue_size", 1)
+    monkeypatch.setitem(NOTIFICATION_CONFIG, "enqueue_timeout_seconds", 0.05)
+    return NotificationService(db_session_factory=sessions, event_bus=InProcessEventBus())
+
+
+def test_full_queue_persists_instead_of_dropping(service, db_session):
+    async def run():
+        await service.send_notification(_notification("first"), broadcast=True)
+        await service.send_notification(_notification("second"), broadcast=True)
+
+    asyncio.run(run())
+
+    # The processor is not running: the first waits in the queue, the second went straight to the outbox
+    assert service._notification_queue.qsize() == 1
+    assert [n["title"] for n in read_since(db_session, 0)] == ["second"]
+    assert service.stats["notifications_spilled"] == 1
+
+
+def test_producers_wait_for_the_processor_when_the_queue_is_full(service, db_session, monkeypatch):
+    monkeypatch.setitem(NOTIFICATION_CONFIG, "enqueue_timeout_seconds", 5)
+    delivered = []
+
+    async def deliver(event):
+        delivered.append(event["message"]["title"])
+
+    async def run():
+        service.event_bus.subscribe("notifications", deliver)
+        await service.start_service()
+        try:
+            for title in ("a", "b", "c"):
+                await service.send_notification(_notification(title), broadcast=True)
+            for _ in range(200):
+                if len(delivered) == 3:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await service.stop_service()
+
+    asyncio.run(run())
+
+    assert delivered == ["a", "b", "c"]
+    assert [n["title"] for n in read_since(db_session, 0)] == ["a", "b", "c"]
+    assert service.stats["notifications_spilled"] == 0
+
+
+def test_batch_reaches_subscribers_filtering_below_its_common_path(service):
+    root = "\\\\fs01\\share"
+    changes = [PendingChange(path=root + "\\HR\\reviews", root_path=root, change_type="modified",
+                             severity="medium", alert={})]
+    changes += [PendingChange(path=root + "\\Finance\\q%d" % i, root_path=root, change_type="modified",
+                              severity="medium", alert={}) for i in range(30)]
+    message = service._to_message(service._batch_notification(ChangeBatch(root, "modified", changes)))
+    index = service.connection_manager.subscriptions
+    index.add("hr", {"paths": [root + "\\HR\\reviews"]})
+    index.add("finance-q29", {"paths": [root + "\\Finance\\q29"]})
+    index.add("legal", {"paths": [root + "\\Legal"]})
+
+    assert message["data"]["path"] == root
+    # q29 is beyond the sample paths but still matches
+    assert len(message["data"]["sample_paths"]) < 31
+    assert index.match(message) == {"hr", "finance-q29"}
+
+
+def test_resume_reports_truncation_when_missed_notifications_were_compacted(service, db_session):
+    from src.db.notification_outbox import append_notifications, compact_outbox
+
+    seqs = append_notifications(db_session, [
+        {"notification_id": "n%d" % n, "type": "permission_change", "payload": {"id": "n%d" % n}}
+        for n in range(5)
+    ])
+    db_session.commit()
+    compact_outbox(db_session, retention_days=0, max_entries=2)
+
+    missed = asyncio.run(service.get_notifications_since(seqs[0]))
+    current = asyncio.run(service.get_notifications_since(seqs[2]))
+
+    assert missed["truncated"] and [n["id"] for n in missed["notifications"]] == ["n3", "n4"]
+    assert not current["truncated"] and current["last_seq"] == seqs[4]
+
+
+def test_resume_does_not_advance_past_a_pending_append(service, db_session):
+    from sqlalchemy import delete
+
+    from src.db.models import NotificationOutbox
+    from src.db.notification_outbox import append_notifications
+
+    seqs = append_notifications(db_session, [
+        {"notification_id": "n%d" % n, "type": "permission_change", "payload": {"id": "n%d" % n}}
+        for n in range(3)
+    ])
+    db_session.commit()
+    # Another worker holds seqs[1] in an uncommitted transaction
+    table = NotificationOutbox.__table__
+    db_session.execute(delete(table).where(table.c.seq == seqs[1]))
+    db_session.commit()
+
+    page = asyncio.run(service.get_notifications_since(0))
+
+    assert [n["id"] for n in page["notifications"]] == ["n0"]
+    assert page["last_seq"] == seqs[0] and not page["has_more"]
@@ -0,0 +1,94 @@
+# tests/test_services/test_poll_scheduler.py
+from src.services.poll_scheduler import AdaptivePollScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(clock, checks_per_second=100):
+    return AdaptivePollScheduler(base_interval=60, min_interval=10, max_interval=600,
+                                 checks_per_second=checks_per_second, clock=clock)
+
+
+def test_new_paths_are_due_now_and_not_returned_again_until_recorded():
+    clock = Clock()
+    scheduler = _scheduler(clock)
+    scheduler.add("C:\\a")
+    scheduler.add("C:\\b", due_now=False)
+
+    assert scheduler.pop_due() == ["C:\\a"]
+    assert scheduler.pop_due() == []
+    assert scheduler.seconds_until_due() == 60
+
+
+def test_interval_shrinks_on_change_and_grows_while_quiet_within_bounds():
+    clock = Clock()
+    scheduler = _scheduler(clock)
+    scheduler.add("C:\\a")
+
+    scheduler.pop_due()
+    scheduler.record("C:\\a", changed=True)
+    assert scheduler.paths["C:\\a"].interval == 30
+
+    for _ in range(3):
+        scheduler.record("C:\\a", changed=True)
+    assert scheduler.paths["C:\\a"].interval == 10
+
+    for _ in range(20):
+        scheduler.record("C:\\a", changed=False)
+    assert scheduler.paths["C:\\a"].interval == 600
+    assert scheduler.seconds_until_due() == 600
+
+
+def test_sensitive_paths_poll_more_often():
+    scheduler = _scheduler(Clock())
+    scheduler.add("C:\\finance", interval_factor=0.25)
+    scheduler.add("C:\\public")
+
+    finance, public = scheduler.paths["C:\\finance"], scheduler.paths["C:\\public"]
+    assert finance.interval == 15 and finance.max_interval == 150
+    assert public.interval == 60 and public.max_interval == 600
+
+
+def test_check_budget_spreads_a_burst_of_due_paths():
+    clock = Clock()
+    scheduler = _scheduler(clock, checks_per_second=2)
+    for i in range(5):
+        scheduler.add("C:\\p%d" % i)
+
+    assert len(scheduler.pop_due()) == 2
+    assert scheduler.checks_deferred == 1
+    assert scheduler.seconds_until_due() == 0.5
+
+    clock.now += 1
+    assert len(scheduler.pop_due()) == 2
+
+
+def test_removed_paths_and_superseded_entries_are_skipped():
+    clock = Clock()
+    scheduler = _scheduler(clock)
+    scheduler.add("C:\\a", due_now=False)
+    scheduler.add("C:\\b", due_now=False)
+    scheduler.remove("C:\\a")
+    scheduler.note_change("C:\\b")
+
+    clock.now += 30
+    assert scheduler.pop_due() == ["C:\\b"]
+    assert scheduler.seconds_until_due() is None
+
+
+def test_expedite_all_skips_paths_being_checked():
+    clock = Clock()
+    scheduler = _scheduler(clock)
+    scheduler.add("C:\\a")
+    scheduler.add("C:\\b", due_now=False)
+    assert scheduler.pop_due() == ["C:\\a"]
+
+    scheduler.expedite_all()
+
+    assert scheduler.pop_due() == ["C:\\b"]